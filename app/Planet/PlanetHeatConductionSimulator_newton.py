@@ -6,6 +6,7 @@ from fealpy.functionspace import ParametricLagrangeFiniteElementSpaceOnWedgeMesh
 from fealpy.timeintegratoralg.timeline import UniformTimeLine
 from fealpy.boundarycondition.BoundaryCondition import NeumannBC
 from fealpy.decorator import timer
+from fealpy.solver import BlockSplit
 
 from scipy.sparse import csr_matrix
 from scipy.sparse.linalg import cg, LinearOperator, spsolve
@@ -40,27 +41,42 @@ class PlanetHeatConductionWithRotationSimulator():
         self.uh2 = self.space.function() # 上一周期 0 相位数值解
         self.uh2[:] = self.uh0
 
+        # 外边界上的自由度都在第一层, 非线性 Robin 边界项直接组装到 S00 大小
+        # 的子块上, 积分点, 基函数, 面积, 法向和稀疏结构只计算一次
+        self.rdof = self.mesh.ds.NN//(self.args.nh+1)
+        index = self.mesh.ds.exterior_boundary_tface_index()
+        self.robin = self.space.tri_boundary_form_assembler(threshold=index,
+                q=self.args.nq, shape=(self.rdof, self.rdof))
+
     @timer
     def schur(self):
         '''
 
         舒尔补方法矩阵分块
 
+        S 和 M 有相同的稀疏结构, 各块在 data 中的位置只计算一次, 先组合
+        data 再取子块.
         '''
-        rdof = self.mesh.ds.NN//(self.args.nh+1)
-        self.rdof = rdof
-        
-        self.S00 = self.S[:rdof, :rdof]
-        S01 = self.S[:rdof, rdof:]
-        S11 = self.S[rdof:, rdof:]
-
-        self.M00 = self.M[:rdof, :rdof]
-        M01 = self.M[:rdof, rdof:]
-        M11 = self.M[rdof:, rdof:]
-
+        rdof = self.rdof
         dt = self.timeline.current_time_step_length()
-        self.B = M01+dt*S01
-        self.D = M11+dt*S11
+
+        split = BlockSplit(self.S, rdof)
+        if not split.has_same_pattern(self.M):
+            A = self.M + dt*self.S
+            self.S00 = self.S[:rdof, :rdof]
+            self.M00 = self.M[:rdof, :rdof]
+            self.A00 = A[:rdof, :rdof]
+            self.B = A[:rdof, rdof:]
+            self.D = A[rdof:, rdof:]
+            return
+
+        S = self.S.data
+        M = self.M.data
+        self.S00 = split.block(S, 0, 0)
+        self.M00 = split.block(M, 0, 0)
+        self.A00 = split.block(M + dt*S, 0, 0) # Newton 矩阵中不变的部分
+        self.B = split.block(M + dt*S, 0, 1)
+        self.D = split.block(M + dt*S, 1, 1)
 
     def sun_direction(self):
         t = self.timeline.next_time_level()
@@ -74,49 +90,29 @@ class PlanetHeatConductionWithRotationSimulator():
         n = n/np.sqrt(np.dot(n, n)) # 单位化处理
         return n
     
-    def init_mu(self, bcs):
-        index = self.mesh.ds.exterior_boundary_tface_index()
-        m = self.mesh.boundary_tri_face_unit_normal(bcs, index=index)
+    def init_mu(self):
+        m = self.robin.n # 外边界积分点处的单位法向
 
         n = self.sun_direction()
         mu = np.dot(m, n)
         mu[mu<0] = 0
         return mu
 
-    def nolinear_robin_boundary(self):
+    def nolinear_robin_boundary(self, dt):
         """
 
         Notes
         -----
-        处理非线性 Robin 边界条件
+        处理非线性 Robin 边界条件, 返回 M00 + dt*(S00 + R), 其中 R 为外边界
+        上的 <4/Phi u^3 phi_j, phi_i>, 只更新固定稀疏结构中的数值
 
         """
-
-        uh = self.uh 
-        mesh = self.mesh
         Phi = self.pde.options['Phi']
-
-        qf = mesh.integrator(self.args.nq, 'tface')
-        bcs, ws = qf.get_quadrature_points_and_weights()
-        phi = self.space.basis(bcs)
-
-        index = mesh.ds.exterior_boundary_tface_index()
-        face2dof = self.space.tri_face_to_dof()[index]
-
-        val = np.einsum('qfi, fi->qf', phi, uh[face2dof])
+        val = self.robin.value(self.uh)
         val **= 3
         kappa = 4.0/Phi 
-        val *=kappa
-
-        measure = mesh.boundary_tri_face_area(index=index)
-
-        FM = np.einsum('q, qf, qfi, qfj, f->fij', ws, val, phi, phi, measure)
-
-        I = np.broadcast_to(face2dof[:, :, None], shape=FM.shape)
-        J = np.broadcast_to(face2dof[:, None, :], shape=FM.shape)
-
-        R = csr_matrix((FM.flat, (I.flat, J.flat)), shape=self.S00.shape) #这里的 R 是分块后矩阵大小
-        return R+self.S00
+        val *= kappa*dt
+        return self.robin.matrix(val, A=self.A00)
 
     def nl_bc(self):
 
@@ -128,31 +124,18 @@ class PlanetHeatConductionWithRotationSimulator():
         - <\frac{1}{\Phi} a(\bfu^0_l), v>_{\partial \Omega_1}  
         + <\frac{\mu_0}{\Phi}, v>_{\partial \Omega_1}
         """
-        mesh = self.mesh
         uh = self.uh
         Phi = self.pde.options['Phi']
 
-        index = mesh.ds.exterior_boundary_tface_index()
-        face2dof = self.space.tri_face_to_dof()[index]
-
-        qf = mesh.integrator(self.args.nq, etype='tface')
-        bcs, ws = qf.get_quadrature_points_and_weights()
-        phi = self.space.basis(bcs)
-
-        measure = mesh.boundary_tri_face_area(index=index)
-
-        val = np.einsum('qfi, fi->qf', phi, uh[face2dof])
+        val = self.robin.value(uh)
         val = -val**4
 
-        mu = self.init_mu(bcs)
+        mu = self.init_mu()
         val += mu # (NQ, NF, ...)
         val /= Phi
 
         b = np.zeros(len(uh), dtype=np.float64)
-
-        bb = np.einsum('m, mi..., mik, i->ik...', ws, val, phi, measure)
-        np.add.at(b, face2dof, bb)
-        return b
+        return self.robin.vector(val, out=b)
 
     def preconditioner(self, b):
         if self.ctx.myid == 0:
@@ -189,10 +172,8 @@ class PlanetHeatConductionWithRotationSimulator():
             F *= dt
             F += M@uh0[:]-M@uh[:]
 
-            R = self.nolinear_robin_boundary()
-            R *= dt
-            R += self.M00
-            
+            R = self.nolinear_robin_boundary(dt)
+
             self.solver.set_matrix(R)            
             x = self.solver.solve_2(x, F)
 
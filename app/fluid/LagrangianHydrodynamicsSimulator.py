@@ -1,12 +1,15 @@
 import numpy as np
-from scipy.sparse.linalg import spsolve
-from scipy.sparse import csr_matrix
 
 from fealpy.functionspace import ParametricLagrangeFiniteElementSpace
+from fealpy.solver import MassMatrixSolver, CellOperator, hrz_lumped_mass
 
 class LagrangianHydrodynamicsSimulator():
 
-    def __init__(self, model, p, NS=0, NT=100):
+    def __init__(self, model, p, NS=0, NT=100, lumped=None):
+        """
+        @param[in] lumped 运动空间质量矩阵的处理方式, None 表示用 LU 分解
+                   精确求解, 'rowsum' 或 'hrz' 表示使用集中质量矩阵
+        """
 
         self.model = model # 物理模型
         self.mesh0 = model.space_mesh(NS=NS, p=p) # 初始网格
@@ -30,6 +33,20 @@ class LagrangianHydrodynamicsSimulator():
         self.MV = self.cspace.mass_matrix(c=self.rho) # 运动空间的质量矩阵
         self.ME = self.dspace.mass_matrix(c=self.rho) # 热力学空间的质量矩阵
 
+        # 在 Lagrange 坐标下质量矩阵不随时间变化, 只分解 (或集中) 一次
+        c2d0 = self.cspace.cell_to_dof()
+        c2d1 = self.dspace.cell_to_dof()
+        gdof0 = self.cspace.number_of_global_dofs()
+        gdof1 = self.dspace.number_of_global_dofs()
+        if lumped == 'hrz':
+            lumped = hrz_lumped_mass(self.cspace.cell_mass_matrix(c=self.rho),
+                    c2d0, gdof0)
+        self.vsolver = MassMatrixSolver(self.MV, lumped=lumped)
+        self.esolver = MassMatrixSolver(self.ME)
+
+        # 力矩阵的单元矩阵直接作用在向量上, 不组装稀疏矩阵
+        self.force = CellOperator(c2d0, gdof0, c2d1, gdof1)
+
         GD = self.mesh1.geo_dimension()
         self.x = self.cspace.function(dim=GD) # 位置
         self.v = self.cspace.function(dim=GD) # 速度
@@ -52,8 +69,11 @@ class LagrangianHydrodynamicsSimulator():
         self.mesh1.nodedata['velocity'] = self.cv
 
 
-    def get_force_matrix(self, q=None):
-
+    def cell_force_matrix(self, q=None):
+        """
+        @brief 力矩阵的单元矩阵, 形状为 (NC, ldof0, ldof1, GD), 最后一个轴
+               对应速度的分量
+        """
         # 积分公式
         qf = self.integrator if q is None else self.mesh1.integrator(q, etype='cell')
         # bcs : (NQ, n)
@@ -69,43 +89,24 @@ class LagrangianHydrodynamicsSimulator():
         gphi = self.cspace.grad_basis(bcs) # (NQ, NC, ldof, GD)
         phi = self.dspace.basis(bcs)
 
-        M0 = np.einsum('q, qci, qcj, qc->cij', ws*rm, gphi[..., 0], phi, d) # (NC, ldof0, ldof1)
-        M1 = np.einsum('q, qci, qcj, qc->cij', ws*rm, gphi[..., 1], phi, d) # (NC, ldof0, ldof1)
-
-        c2d0 = self.cspace.cell_to_dof()
-        c2d1 = self.dspace.cell_to_dof()
-
-        I = np.broadcast_to(c2d0[:, :, None], shape=M0.shape)
-        J = np.broadcast_to(c2d1[:, None, :], shape=M0.shape)
-
-        gdof0 = self.cspace.number_of_global_dofs()
-        gdof1 = self.dspace.number_of_global_dofs()
-        M0 = csr_matrix(
-                (M0.flat, (I.flat, J.flat)), 
-                shape=(gdof0, gdof1)
-                )
-
-        M1 = csr_matrix(
-                (M1.flat, (I.flat, J.flat)), 
-                shape=(gdof0, gdof1)
-                )
-
-        return M0, M1
+        # 先把权重乘到 phi 上, 四个数组的 einsum 会慢一倍
+        phi = phi*(ws[:, None]*rm*d)[..., None] # (NQ, NC, ldof1)
+        return np.einsum('qcid, qcj->cijd', gphi, phi)
 
+    def get_force_matrix(self, q=None):
+        """
+        @brief 每个速度分量的力矩阵, CSR 格式, 稀疏结构只计算一次
+        """
+        K = self.cell_force_matrix(q=q)
+        return tuple(self.force.tocsr(K[..., i]) for i in range(K.shape[-1]))
 
-    def solve_one_step(self):
-
-        dt = self.timeline.current_time_step_length()
-        
-        M0, M1 = self.get_force_matrix()
-
-        one = np.ones(M0.shape[1])
-        F0 = spsolve(self.MV, M0@one)
-        F1 = spsolve(self.MV, M1@one)
-
-        self.cv[:, 0] = self.v[:, 0] - dt/2*F0 
-        self.cv[:, 1] = self.v[:, 1] - dt/2*F1
+    def force_work(self, K, v):
+        """
+        @brief sum_i v[:, i]@M_i, 其中 M_i 是第 i 个速度分量的力矩阵
+        """
+        return sum(self.force.rmatvec(K[..., i], v[:, i]) for i in range(K.shape[-1]))
 
+    def apply_boundary_condition(self, v):
         # 网格节点自由度
         # dof == 0: 表示固定点
         # dof == 1: 表示边界上的点
@@ -113,35 +114,37 @@ class LagrangianHydrodynamicsSimulator():
         dof = self.mesh0.nodedata['dof'] 
 
         # 边界条件处理
-        self.cv[dof==0] = 0.0
+        v[dof==0] = 0.0
         en = self.mesh0.meshdata['bd_normal']
-        vv = self.cv[dof==1]
+        vv = v[dof==1]
         l = np.sum(vv*en, axis=-1) # (NE, )
-        self.cv[dof==1] -= l[:, None]*en
+        v[dof==1] -= l[:, None]*en
+
+    def solve_one_step(self):
+
+        dt = self.timeline.current_time_step_length()
+        
+        K = self.cell_force_matrix()
 
+        # 一次回代同时求解所有速度分量
+        F = self.vsolver.solve(self.force.row_sum(K)) # (gdof0, GD)
+        self.cv[:] = self.v - dt/2*F 
+        self.apply_boundary_condition(self.cv)
 
-        F = spsolve(self.ME, self.cv[:, 0]@M0 + self.cv[:, 1]@M1)
+        F = self.esolver.solve(self.force_work(K, self.cv))
         self.ce[:] = self.e + dt/2*F
 
         self.cx[:] = self.x + dt/2*self.cv
 
         self.mesh1.node[:] = self.cx
-        M0, M1 = self.get_force_matrix() 
-
-        F0 = spsolve(self.MV, M0@one)
-        F1 = spsolve(self.MV, M1@one)
-        self.cv[:, 0] = self.v[:, 0] - dt*F0 
-        self.cv[:, 1] = self.v[:, 1] - dt*F1
-
-        # 边界条件处理
-        self.cv[dof==0] = 0.0
-        vv = self.cv[dof==1]
-        l = np.sum(vv*en, axis=-1) # (NE, )
-        self.cv[dof==1] -= l[:, None]*en
+        K = self.cell_force_matrix() 
 
+        F = self.vsolver.solve(self.force.row_sum(K))
+        self.cv[:] = self.v - dt*F 
+        self.apply_boundary_condition(self.cv)
 
         v = (self.cv + self.v)/2
-        F = spsolve(self.ME, v[:, 0]@M0 + v[:, 1]@M1)
+        F = self.esolver.solve(self.force_work(K, v))
         self.ce[:] = self.e + dt*F
         self.cx[:] = self.x + dt*v
 
@@ -7,6 +7,7 @@ from scipy.sparse.linalg import spsolve
 
 from fealpy.decorator import barycentric
 from fealpy.timeintegratoralg.timeline import UniformTimeLine
+from fealpy.solver.direct_solver import DirectSolver
 from fealpy.functionspace import LagrangeFiniteElementSpace
 from fealpy.functionspace import RaviartThomasFiniteElementSpace2d
 from fealpy.functionspace import RaviartThomasFiniteElementSpace3d
@@ -52,6 +53,8 @@ class ParallelTwoFluidsWithGeostressSimulator():
     """
     def __init__(self, mesh, args, ctx):
         self.ctx = ctx
+        # 稀疏模式不变时只做数值分解, 不再重复分析
+        self.solver = DirectSolver(backend='mumps', ctx=ctx)
         self.args = args # 模拟相关参数
 
         NT = int((args.T1 - args.T0)/args.DT)
@@ -521,7 +524,8 @@ class ParallelTwoFluidsWithGeostressSimulator():
 
         # 组装压力方程的右端向量
         # * 这里利用了压力空间基是分片常数
-        FP = self.f1.value(bcs) + self.f0.value(bcs) # (NQ, NC)
+        F0, F1 = self.cspace.batch_value([self.f0, self.f1], bcs) # (NQ, NC)
+        FP = F1 + F0
         FP *= ws[:, None]
 
         FP = np.sum(FP, axis=0)
@@ -659,12 +663,12 @@ class ParallelTwoFluidsWithGeostressSimulator():
             A = T@A@T + Tbd
             F[isBdDof] = 0.0
 
-            # 求解
-            self.ctx.set_centralized_sparse(A)
-            x = F.copy()
-            self.ctx.set_rhs(x) # Modified in place
+        else:
+            A = None
+            F = None
 
-        self.ctx.run(job=6) # Analysis + Factorization + Solve
+        # 求解
+        x = self.solver.solve(A, F)
 
         if self.ctx.myid == 0:
             vgdof = self.vspace.number_of_global_dofs()
@@ -747,12 +751,12 @@ class ParallelTwoFluidsWithGeostressSimulator():
             A = T@A@T + Tbd
             F[isBdDof] = 0.0
 
-        #[   S, None,   SP,  SU0,  SU1, SU2]
-            self.ctx.set_centralized_sparse(A)
-            x = F.copy()
-            self.ctx.set_rhs(x) # Modified in place
+        else:
+            A = None
+            F = None
 
-        self.ctx.run(job=6) # Analysis + Factorization + Solve
+        #[   S, None,   SP,  SU0,  SU1, SU2]
+        x = self.solver.solve(A, F)
 
         if self.ctx.myid == 0:
 
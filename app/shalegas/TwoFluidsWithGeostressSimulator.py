@@ -517,7 +517,8 @@ class TwoFluidsWithGeostressSimulator():
 
         # 组装压力方程的右端向量
         # * 这里利用了压力空间基是分片常数
-        FP = self.f1.value(bcs) + self.f0.value(bcs) # (NQ, NC)
+        F0, F1 = self.cspace.batch_value([self.f0, self.f1], bcs) # (NQ, NC)
+        FP = F1 + F0
         FP *= ws[:, None]
 
         FP = np.sum(FP, axis=0)
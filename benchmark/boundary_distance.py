@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+到离散边界的符号距离的基准测试.
+
+比较 `BoundaryDistance` 的 KD 树查询和逐个边界单元直接计算 (按块处理, 计算
+量为 O(NP*NE)) 的时间, 并检查两者的距离一致. 二维边界为局部加密的星形
+多边形, 三维边界为立方体四面体网格的边界三角形.
+
+    python benchmark/boundary_distance.py
+    python benchmark/boundary_distance.py --ne 8000 --np 20000
+"""
+import time
+import argparse
+
+import numpy as np
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.geometry.boundary_distance import BoundaryDistance
+
+
+def brute_force(fd, p, chunksize=64):
+    """
+    @brief 每个点和所有边界单元逐一计算距离
+    """
+    NE = len(fd.cell)
+    d = np.zeros(len(p))
+    for i in range(0, len(p), chunksize):
+        pc = p[i:i+chunksize]
+        I = np.repeat(np.arange(len(pc)), NE)
+        J = np.tile(np.arange(NE), len(pc))
+        d2 = fd.closest_point(pc[I], J)[0].reshape(len(pc), NE)
+        d[i:i+chunksize] = np.sqrt(d2.min(axis=1))
+    return d
+
+
+def star_polygon(n):
+    t = 2*np.pi*np.linspace(0, 1, n, endpoint=False)**2 # 在 t=0 附近加密
+    r = 1 + 0.3*np.sin(5*t)
+    node = np.c_[r*np.cos(t), r*np.sin(t)]
+    edge = np.c_[np.arange(n), (np.arange(n) + 1)%n]
+    return node, edge
+
+
+def cube_surface(n):
+    nz = max(int(np.sqrt(n/12)), 1)
+    mesh = MF.boxmesh3d([-1, 1, -1, 1, -1, 1], nx=nz, ny=nz, nz=nz, meshtype='tet')
+    face = mesh.entity('face')[mesh.ds.boundary_face_flag()]
+    return mesh.entity('node'), face
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="离散边界符号距离的 KD 树查询和直接计算的比较")
+    parser.add_argument('--ne', type=int, default=4000, help='边界单元个数')
+    parser.add_argument('--np', type=int, default=10000, help='查询点个数')
+    args = parser.parse_args()
+
+    print('{:<4s} {:>8s} {:>8s} {:>10s} {:>10s} {:>8s} {:>10s}'.format(
+        'GD', 'NE', 'NP', 'kdtree (s)', 'brute (s)', 'speedup', 'max error'))
+    for GD, build in [(2, star_polygon), (3, cube_surface)]:
+        node, cell = build(args.ne)
+        p = np.random.rand(args.np, GD)*3 - 1.5
+
+        t0 = time.perf_counter()
+        fd = BoundaryDistance(node, cell)
+        d = np.abs(fd(p))
+        t0 = time.perf_counter() - t0
+
+        t1 = time.perf_counter()
+        d0 = brute_force(fd, p)
+        t1 = time.perf_counter() - t1
+        print('{:<4d} {:8d} {:8d} {:10.4f} {:10.4f} {:8.1f} {:10.2e}'.format(
+            GD, len(cell), len(p), t0, t1, t1/t0, np.abs(d - d0).max()))
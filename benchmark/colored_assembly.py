@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+基于单元着色的多线程组装的基准测试.
+
+比较拉格朗日空间刚度矩阵和载荷向量的组装时间:
+* serial: 默认的串行组装, COO 转 CSR 和 np.add.at
+* colored: 按网格单元着色分组, 用 nthreads 个线程往缓存的 CSR 结构的 data
+  和整体向量中累加
+
+同时报告着色的颜色数和着色所需时间 (只在第一次组装时计算). 加速比依赖于
+机器的核数, 单核机器上只能看到缓存稀疏结构带来的收益.
+
+    python benchmark/colored_assembly.py
+    python benchmark/colored_assembly.py --nx 512 -p 2 --nthreads 1 4 16
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh.coloring import mesh_cell_coloring
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.pde.poisson_2d import CosCosData
+
+
+def assemble(space, pde, n=3):
+    """
+    @brief 组装 n 次, 返回平均时间, 第一次组装 (建立缓存) 不计时
+    """
+    A = space.stiff_matrix()
+    F = space.source_vector(pde.source)
+    t = time.perf_counter()
+    for i in range(n):
+        A = space.stiff_matrix()
+    t0 = (time.perf_counter() - t)/n
+    t = time.perf_counter()
+    for i in range(n):
+        F = space.source_vector(pde.source)
+    t1 = (time.perf_counter() - t)/n
+    return A, F, t0, t1
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="单元着色的多线程组装和串行组装的比较")
+    parser.add_argument('--nx', type=int, default=256, help='三角形网格每个方向的剖分段数')
+    parser.add_argument('-p', type=int, default=2, help='拉格朗日元的次数')
+    parser.add_argument('--nthreads', type=int, nargs='+',
+            default=[1, 2, 4, os.cpu_count()], help='线程个数')
+    args = parser.parse_args()
+
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=args.nx, ny=args.nx, meshtype='tri')
+    t = time.perf_counter()
+    groups = mesh_cell_coloring(mesh)
+    print('NC = {}, {} colors, coloring time {:.4f} s, {} cores\n'.format(
+        mesh.number_of_cells(), len(groups), time.perf_counter() - t,
+        os.cpu_count()))
+
+    space = LagrangeFiniteElementSpace(mesh, p=args.p)
+    A0, F0, t0, t1 = assemble(space, pde)
+    print('{:<8s} {:>8s} {:>12s} {:>12s} {:>9s} {:>10s}'.format(
+        'method', 'threads', 'matrix (s)', 'vector (s)', 'speedup', 'max diff'))
+    print('{:<8s} {:>8d} {:12.4f} {:12.4f} {:9.2f} {:10.2e}'.format(
+        'serial', 1, t0, t1, 1.0, 0.0))
+    for nthreads in sorted(set(args.nthreads)):
+        space = LagrangeFiniteElementSpace(mesh, p=args.p, nthreads=nthreads)
+        A, F, s0, s1 = assemble(space, pde)
+        err = max(abs(A - A0).max(), np.abs(F - F0).max())
+        print('{:<8s} {:>8d} {:12.4f} {:12.4f} {:9.2f} {:10.2e}'.format(
+            'colored', nthreads, s0, s1, (t0 + t1)/(s0 + s1), err))
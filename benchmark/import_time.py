@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+导入时间的基准测试.
+
+每个包在一个新的 Python 进程中导入若干次, 报告导入时间的中位数, 并检查有没有
+导入不应该在导入阶段加载的重量级依赖 (matplotlib, vtk 等). 有的话以非零状态
+退出, 可以作为回归检查.
+
+    python benchmark/import_time.py
+    python benchmark/import_time.py -n 10 fealpy.mesh fealpy.functionspace
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+PACKAGES = ['fealpy.mesh', 'fealpy.functionspace', 'fealpy.solver', 'fealpy.pde']
+
+HEAVY = ['matplotlib', 'vtk', 'meshio', 'gmsh', 'taichi',
+        'meshpy', 'pyamg', 'sympy', 'mumps', 'transplant', 'torch']
+
+SCRIPT = """
+import sys, time, json
+t = time.perf_counter()
+import {0}
+t = time.perf_counter() - t
+heavy = sorted({{m.split('.')[0] for m in sys.modules}} & set({1!r}))
+print(json.dumps({{'time': t, 'heavy': heavy}}))
+"""
+
+
+def measure(package, n=5):
+    """
+    @brief 在新进程中导入 package n 次
+
+    @return 导入时间 (秒) 的中位数和导入的重量级依赖
+    """
+    times = []
+    heavy = set()
+    for i in range(n):
+        out = subprocess.run([sys.executable, '-c', SCRIPT.format(package, HEAVY)],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                universal_newlines=True, check=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        times.append(r['time'])
+        heavy.update(r['heavy'])
+    times.sort()
+    return times[n//2], sorted(heavy)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="fealpy 子包的导入时间")
+    parser.add_argument('packages', nargs='*', default=PACKAGES)
+    parser.add_argument('-n', type=int, default=5, help='每个包导入的次数')
+    args = parser.parse_args()
+
+    failed = False
+    for package in args.packages:
+        t, heavy = measure(package, n=args.n)
+        print('{:<24s} {:8.3f} s  {}'.format(package, t, ', '.join(heavy)))
+        failed = failed or len(heavy) > 0
+    sys.exit(1 if failed else 0)
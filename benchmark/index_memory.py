@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+编号数组内存的基准测试.
+
+分别用 int64 和自动选择的整数类型 (规模允许时为 int32) 构造三角形网格和
+四面体网格, 比较拓扑数组 (cell, edge, edge2cell, face2cell, cell2edge),
+拉格朗日空间的 cell2dof, 以及组装刚度矩阵时 COO 格式的行列编号占用的内存.
+
+    python benchmark/index_memory.py
+    python benchmark/index_memory.py --nx 400 --nz 40 -p 3
+"""
+import argparse
+
+import numpy as np
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh import TriangleMesh, TetrahedronMesh
+from fealpy.functionspace import LagrangeFiniteElementSpace
+
+
+def index_memory(mesh, p):
+    """
+    @brief 网格和 p 次拉格朗日空间的编号数组占用的内存 (MB)
+    """
+    ds = mesh.ds
+    topology = sum(v.nbytes for v in vars(ds).values()
+            if isinstance(v, np.ndarray) and v.dtype.kind in 'iu')
+    if hasattr(ds, 'face2cell'):
+        topology += ds.cell_to_face().nbytes
+    else:
+        topology += ds.cell_to_edge().nbytes
+
+    space = LagrangeFiniteElementSpace(mesh, p=p)
+    cell2dof = space.cell_to_dof()
+    ldof = cell2dof.shape[1]
+    coo = 2*cell2dof.shape[0]*ldof*ldof*cell2dof.itemsize # I 和 J
+    return cell2dof.dtype, np.array([topology, cell2dof.nbytes, coo])/2**20
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="int32 和 int64 编号数组的内存比较")
+    parser.add_argument('--nx', type=int, default=256, help='三角形网格每个方向的剖分段数')
+    parser.add_argument('--nz', type=int, default=24, help='四面体网格每个方向的剖分段数')
+    parser.add_argument('-p', type=int, default=2, help='拉格朗日元的次数')
+    args = parser.parse_args()
+
+    tri = MF.boxmesh2d([0, 1, 0, 1], nx=args.nx, ny=args.nx, meshtype='tri')
+    tet = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=args.nz, ny=args.nz, nz=args.nz,
+            meshtype='tet')
+
+    print('{:<5s} {:<7s} {:>14s} {:>14s} {:>14s} {:>10s}'.format(
+        'mesh', 'itype', 'topology (MB)', 'cell2dof (MB)', 'COO I,J (MB)', 'saving'))
+    for name, Mesh, mesh in [('tri', TriangleMesh, tri), ('tet', TetrahedronMesh, tet)]:
+        node = mesh.entity('node')
+        cell = mesh.entity('cell')
+        m64 = Mesh(node, cell, itype=np.int64)
+        m32 = Mesh(node, cell) # 自动选择
+        _, b64 = index_memory(m64, args.p)
+        itype, b32 = index_memory(m32, args.p)
+        for label, b in [('int64', b64), (itype.name, b32)]:
+            print('{:<5s} {:<7s} {:14.2f} {:14.2f} {:14.2f} {:9.0f}%'.format(
+                name, label, *b, 100*(1 - b.sum()/b64.sum())))
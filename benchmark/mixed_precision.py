@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+混合精度的基准测试.
+
+在 Poisson 方程和线弹性方程上比较
+* float64: float64 的空间组装, SuperLU 求解
+* float64+lu: float64 的空间组装, `MixedPrecisionSolver` 用 float32 的 LU
+  分解做迭代加细, 解的精度应该和 float64 相同
+* float32+lu: float32 的空间组装, `MixedPrecisionSolver` 用 float32 的 LU
+  分解做迭代加细
+* float32+cg: float32 的空间组装, `MixedPrecisionSolver` 用 float32 的 Jacobi
+  预条件 CG 做迭代加细
+
+报告组装和求解的时间, 整体矩阵占用的内存, 外层迭代次数和相对于 float64 解的
+相对误差. float32 组装的矩阵本身有 float32 的舍入误差, 所以 float32+* 的
+误差大约是条件数乘以 float32 的机器精度.
+
+    python benchmark/mixed_precision.py
+    python benchmark/mixed_precision.py --nrefine 6 -p 2
+"""
+import time
+import argparse
+
+import numpy as np
+from scipy.sparse.linalg import spsolve
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.boundarycondition import DirichletBC, NeumannBC
+from fealpy.solver import MixedPrecisionSolver
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.pde.linear_elasticity_model import BoxDomainData2d
+
+
+def poisson(mesh, p, ftype):
+    pde = CosCosData()
+    space = LagrangeFiniteElementSpace(mesh, p=p, ftype=ftype)
+    uh = space.function()
+    A = space.stiff_matrix()
+    F = space.source_vector(pde.source)
+    A, F = DirichletBC(space, pde.dirichlet).apply(A, F, uh)
+    return A, F
+
+
+def elasticity(mesh, p, ftype):
+    pde = BoxDomainData2d()
+    space = LagrangeFiniteElementSpace(mesh, p=p, ftype=ftype)
+    uh = space.function(dim=2)
+    A = space.linear_elasticity_matrix(pde.lam, pde.mu)
+    F = space.source_vector(pde.source, dim=2)
+    F = NeumannBC(space, pde.neumann, threshold=pde.is_neumann_boundary).apply(F)
+    bc = DirichletBC(space, pde.dirichlet, threshold=pde.is_dirichlet_boundary)
+    A, F = bc.apply(A, F, uh)
+    return A, F
+
+
+def run(assemble, mesh, p, methods):
+    result = []
+    x0 = None
+    for name in methods:
+        ftype = np.float64 if name.startswith('float64') else np.float32
+        t = time.perf_counter()
+        A, F = assemble(mesh, p, ftype)
+        t0 = time.perf_counter() - t
+        nbytes = A.data.nbytes + A.indices.nbytes + A.indptr.nbytes
+
+        t = time.perf_counter()
+        if name == 'float64':
+            x = spsolve(A.tocsc(), F)
+            nit = 1
+        else:
+            solver = MixedPrecisionSolver(A, inner=name.split('+')[1])
+            x = solver.solve(F)
+            nit = len(solver.residuals) - 1
+        t1 = time.perf_counter() - t
+
+        if x0 is None:
+            x0 = x
+        err = np.linalg.norm(x - x0)/np.linalg.norm(x0)
+        result.append((name, t0, t1, nbytes/2**20, nit, err))
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="float32 组装和混合精度求解的比较")
+    parser.add_argument('--nrefine', type=int, default=5, help='网格加密次数')
+    parser.add_argument('-p', type=int, default=1, help='拉格朗日元的次数')
+    args = parser.parse_args()
+
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=2**args.nrefine, ny=2**args.nrefine,
+            meshtype='tri')
+    problems = [
+        ('poisson', poisson, ['float64', 'float64+lu', 'float32+lu', 'float32+cg']),
+        ('elasticity', elasticity, ['float64', 'float64+lu', 'float32+lu'])]
+
+    print('{:<11s} {:<11s} {:>10s} {:>10s} {:>10s} {:>5s} {:>10s}'.format(
+        'problem', 'method', 'assem (s)', 'solve (s)', 'A (MB)', 'nit', 'rel err'))
+    for name, assemble, methods in problems:
+        for method, t0, t1, mb, nit, err in run(assemble, mesh, args.p, methods):
+            print('{:<11s} {:<11s} {:10.4f} {:10.4f} {:10.2f} {:5d} {:10.2e}'.format(
+                name, method, t0, t1, mb, nit, err))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+网格剖分方法的基准测试.
+
+在三角形网格和四面体网格上比较 `fealpy.graph.partition` 中的递归坐标二分,
+Hilbert 和 Morton 空间填充曲线, 以及递归谱二分的剖分时间, 被切断的边数和
+负载不平衡度. 能找到 METIS 动态库时同时给出 `metis.part_mesh` 的结果.
+
+    python benchmark/partition.py
+    python benchmark/partition.py --nx 512 --nz 32 --nparts 16
+"""
+import time
+import argparse
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.graph.partition import part_mesh, imbalance
+
+
+def metis_part_mesh():
+    try:
+        from fealpy.graph import metis
+    except (RuntimeError, OSError):
+        return None
+    return metis.part_mesh
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="不依赖 METIS 的网格剖分方法的比较")
+    parser.add_argument('--nx', type=int, default=256, help='三角形网格每个方向的剖分段数')
+    parser.add_argument('--nz', type=int, default=20, help='四面体网格每个方向的剖分段数')
+    parser.add_argument('--nparts', type=int, default=8, help='子区域个数')
+    args = parser.parse_args()
+
+    meshes = [
+        ('tri', MF.boxmesh2d([0, 1, 0, 1], nx=args.nx, ny=args.nx, meshtype='tri')),
+        ('tet', MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=args.nz, ny=args.nz,
+            nz=args.nz, meshtype='tet'))]
+    metis = metis_part_mesh()
+    if metis is None:
+        print('METIS dll is not found, skip metis.part_mesh\n')
+
+    print('{:<5s} {:>8s} {:<9s} {:>10s} {:>10s} {:>10s}'.format(
+        'mesh', 'NC', 'method', 'time (s)', 'edgecuts', 'imbalance'))
+    for name, mesh in meshes:
+        NC = mesh.number_of_cells()
+        for method in ['rcb', 'hilbert', 'morton', 'spectral', 'metis']:
+            t = time.perf_counter()
+            if method == 'metis':
+                if metis is None:
+                    continue
+                edgecuts, parts = metis(mesh, nparts=args.nparts, entity='cell')
+            else:
+                edgecuts, parts = part_mesh(mesh, nparts=args.nparts, method=method)
+            t = time.perf_counter() - t
+            print('{:<5s} {:8d} {:<9s} {:10.4f} {:10d} {:10.4f}'.format(
+                name, NC, method, t, edgecuts, imbalance(parts, args.nparts)))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+拉格朗日空间刚度矩阵和质量矩阵组装的基准测试.
+
+比较参考张量的组装路径 (`stiff_matrix`, `mass_matrix` 在常系数时的默认路径)
+和数值积分的组装路径 (`integralalg.serial_construct_matrix`), 报告两者的时间
+和矩阵之差的最大值.
+
+    python benchmark/reference_tensor_assembly.py
+    python benchmark/reference_tensor_assembly.py --nx 20 --pmax 4 -n 5
+"""
+import io
+import time
+import argparse
+import contextlib
+
+import numpy as np
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+
+# 数值积分路径用到的积分公式的最高阶, 四面体上最多到 7
+QMAX = {2: 11, 3: 7}
+
+
+def best_time(fun, n=3):
+    """
+    @brief 运行 fun n 次, 返回最短的时间和最后一次的结果
+    """
+    t = np.inf
+    for i in range(n):
+        with contextlib.redirect_stdout(io.StringIO()): # 屏蔽 timer 的输出
+            start = time.perf_counter()
+            r = fun()
+            t = min(t, time.perf_counter() - start)
+    return t, r
+
+
+def run(mesh, p, n=3):
+    TD = mesh.top_dimension()
+    space = LagrangeFiniteElementSpace(mesh, p=p, q=min(p+3, QMAX[TD]))
+    gdof = space.number_of_global_dofs()
+    cell2dof = space.cell_to_dof()
+    result = []
+    for name, basis, ref in [
+            ('stiff', space.grad_basis, space.stiff_matrix),
+            ('mass', space.basis, space.mass_matrix)]:
+        quad = lambda: space.integralalg.serial_construct_matrix(
+                (basis, cell2dof, gdof))
+        t0, A = best_time(quad, n=n)
+        t1, B = best_time(ref, n=n)
+        result.append((name, t0, t1, abs(A - B).max()))
+    return gdof, result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="参考张量组装和数值积分组装的比较")
+    parser.add_argument('--nx', type=int, default=32, help='二维网格每个方向的剖分段数')
+    parser.add_argument('--pmax', type=int, default=5, help='最高次数')
+    parser.add_argument('-n', type=int, default=3, help='每种组装运行的次数')
+    args = parser.parse_args()
+
+    meshes = [
+        MF.boxmesh2d([0, 1, 0, 1], nx=args.nx, ny=args.nx, meshtype='tri'),
+        MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=args.nx//4, ny=args.nx//4,
+            nz=args.nx//4, meshtype='tet')]
+
+    print('{:<4s} {:>2s} {:>8s} {:<6s} {:>10s} {:>10s} {:>8s} {:>10s}'.format(
+        'mesh', 'p', 'gdof', 'matrix', 'quad (s)', 'ref (s)', 'speedup', 'max diff'))
+    for mesh in meshes:
+        for p in range(1, args.pmax+1):
+            gdof, result = run(mesh, p, n=args.n)
+            for name, t0, t1, err in result:
+                print('{:<4s} {:2d} {:8d} {:<6s} {:10.4f} {:10.4f} {:8.1f} {:10.2e}'.format(
+                    mesh.meshtype, p, gdof, name, t0, t1, t0/t1, err))
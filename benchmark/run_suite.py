@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+运行 `benchmark/suite` 中的基准测试集, 报告每个测试在每组参数下的最短运行
+时间和峰值内存, 并可以保存为基线, 或者和已有的基线比较以发现性能回退.
+
+测试集的写法见 `benchmark/suite/__init__.py`. 基线是一个 json 文件, 记录
+了机器和依赖库的版本, 只有在同一台机器和同样的环境下比较才有意义.
+
+    python benchmark/run_suite.py --list
+    python benchmark/run_suite.py --quick
+    python benchmark/run_suite.py -k lagrange --save baseline.json
+    python benchmark/run_suite.py -k lagrange --compare baseline.json
+    python benchmark/run_suite.py -k 'Triangle.*refine' --compare baseline.json --threshold 1.2
+
+与基线比较时, 时间或峰值内存超过基线的 threshold 倍记为回退, 此时返回值
+为 1, 可以直接用于持续集成. 运行出错的测试也会使返回值为 1.
+"""
+import os
+import re
+import sys
+import gc
+import json
+import time
+import inspect
+import argparse
+import platform
+import itertools
+import importlib
+import tracemalloc
+
+import numpy as np
+import scipy
+
+
+def discover(modules=None):
+    """
+    @brief 收集 suite 包中所有名字以 Suite 结尾的类
+
+    @return [(模块名, 类名, 类)]
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'suite')
+    if modules is None:
+        modules = sorted(f[:-3] for f in os.listdir(path)
+                if f.endswith('.py') and not f.startswith('_'))
+    suites = []
+    for name in modules:
+        m = importlib.import_module('suite.' + name)
+        for cname, cls in inspect.getmembers(m, inspect.isclass):
+            if cname.endswith('Suite') and cls.__module__ == m.__name__:
+                suites.append((name, cname, cls))
+    return suites
+
+
+def cases(suites, pattern=None, quick=False):
+    """
+    @brief 展开所有的 (测试名, 类, 方法名, 参数)
+
+    测试名为 '模块.类.方法(参数名=参数值, ...)', pattern 是对测试名的正则
+    表达式搜索. quick 为真时每个参数只取第一个值.
+    """
+    for name, cname, cls in suites:
+        params = getattr(cls, 'params', [])
+        names = getattr(cls, 'param_names', [])
+        if quick:
+            params = [p[:1] for p in params]
+        methods = sorted(m for m in dir(cls) if m.startswith('time_'))
+        for method in methods:
+            for p in itertools.product(*params):
+                key = '{}.{}.{}({})'.format(name, cname, method,
+                        ', '.join('{}={}'.format(k, v) for k, v in zip(names, p)))
+                if pattern is None or re.search(pattern, key, flags=re.I):
+                    yield key, cls, method, p
+
+
+def measure(cls, method, p, repeat=3):
+    """
+    @brief 最短运行时间 (秒) 和峰值内存 (MB)
+
+    每次运行前都重新创建对象并调用 setup. 峰值内存单独运行一次来统计,
+    tracemalloc 的开销不计入运行时间.
+
+    @return (time, peakmem), 当前环境下跳过时返回 None
+    """
+    def prepare():
+        obj = cls()
+        if hasattr(obj, 'setup'):
+            obj.setup(*p)
+        gc.collect()
+        return getattr(obj, method)
+
+    try:
+        f = prepare()
+    except NotImplementedError:
+        return None
+
+    t = np.inf
+    for i in range(repeat):
+        if i > 0:
+            f = prepare()
+        start = time.perf_counter()
+        f(*p)
+        t = min(t, time.perf_counter() - start)
+        del f
+
+    f = prepare()
+    tracemalloc.start() # 重新开始时峰值从零开始统计
+    current, _ = tracemalloc.get_traced_memory()
+    f(*p)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return t, (peak - current)/2**20
+
+
+def environment():
+    return {
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'node': platform.node(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="FEALPy 核心计算路径的基准测试集")
+    parser.add_argument('-k', '--filter', default=None,
+            help='只运行名字匹配这个正则表达式的测试')
+    parser.add_argument('-m', '--module', action='append', default=None,
+            help='只运行 suite 中的这个模块, 可以多次给出')
+    parser.add_argument('--repeat', type=int, default=3, help='每个测试的运行次数, 取最短时间')
+    parser.add_argument('--quick', action='store_true', help='每个参数只取第一个值')
+    parser.add_argument('--list', action='store_true', help='只列出测试, 不运行')
+    parser.add_argument('--save', default=None, help='把结果保存为基线 json 文件')
+    parser.add_argument('--compare', default=None, help='和基线 json 文件比较')
+    parser.add_argument('--threshold', type=float, default=1.5,
+            help='时间或内存超过基线的这个倍数记为回退')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    suites = discover(args.module)
+    todo = list(cases(suites, pattern=args.filter, quick=args.quick))
+
+    if args.list:
+        for key, *_ in todo:
+            print(key)
+        sys.exit(0)
+
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        env = environment()
+        for k in ['machine', 'node', 'numpy', 'scipy']:
+            if baseline['environment'].get(k) != env[k]:
+                print('warning: the baseline is from a different {} ({} != {})'.format(
+                    k, baseline['environment'].get(k), env[k]))
+        baseline = baseline['results']
+
+    width = max([len(key) for key, *_ in todo] + [10])
+    head = '{:<{w}s} {:>10s} {:>12s}'.format('benchmark', 'time (s)', 'peakmem (MB)', w=width)
+    if baseline is not None:
+        head += ' {:>8s} {:>8s}'.format('time', 'mem')
+    print(head)
+
+    results = {}
+    regressions = []
+    failures = []
+    for key, cls, method, p in todo:
+        try:
+            r = measure(cls, method, p, repeat=args.repeat)
+        except Exception as e:
+            tracemalloc.stop()
+            print('{:<{w}s} {:>10s}  {}: {}'.format(key, 'failed',
+                type(e).__name__, e, w=width))
+            failures.append(key)
+            continue
+        if r is None:
+            print('{:<{w}s} {:>10s}'.format(key, 'skipped', w=width))
+            continue
+        t, mem = r
+        results[key] = {'time': t, 'peakmem': mem}
+        line = '{:<{w}s} {:10.4f} {:12.2f}'.format(key, t, mem, w=width)
+        if baseline is not None and key in baseline:
+            rt = t/baseline[key]['time']
+            rm = (mem + 1)/(baseline[key]['peakmem'] + 1) # 加 1MB, 避免内存很小时比值失真
+            line += ' {:8.2f} {:8.2f}'.format(rt, rm)
+            if rt > args.threshold or rm > args.threshold:
+                line += '  <-- regression'
+                regressions.append(key)
+        print(line, flush=True)
+
+    if args.save is not None:
+        with open(args.save, 'w') as fp:
+            json.dump({'environment': environment(), 'results': results}, fp, indent=2)
+        print('\nsaved {} results to {}'.format(len(results), args.save))
+
+    if len(failures) > 0:
+        print('\n{} benchmark(s) failed:'.format(len(failures)))
+        for key in failures:
+            print('  ' + key)
+
+    if len(regressions) > 0:
+        print('\n{} regression(s) beyond {}x of the baseline:'.format(
+            len(regressions), args.threshold))
+        for key in regressions:
+            print('  ' + key)
+
+    if len(failures) + len(regressions) > 0:
+        sys.exit(1)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Notes
+-----
+
+重叠型加性 Schwarz 预条件子的基准测试.
+
+在三维线弹性悬臂梁 (BoxDomainData3d) 上比较不同预条件子的 Krylov 迭代
+次数, 建立时间 (子区域矩阵的分解) 和求解时间:
+* none: 不加预条件的 CG
+* as: 加性 Schwarz + CG
+* as+rigid: 加性 Schwarz 和刚体运动粗空间 + CG
+* ras+rigid: 限制型加性 Schwarz 和刚体运动粗空间 + GMRES
+
+子区域的分解和求解用 nthreads 个线程, 加速比依赖于机器的核数.
+
+    python benchmark/schwarz.py
+    python benchmark/schwarz.py --n 3 --nparts 16 --nthreads 8
+"""
+import time
+import argparse
+
+import numpy as np
+from scipy.sparse.linalg import cg, gmres
+
+from fealpy.pde.linear_elasticity_model import BoxDomainData3d
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.boundarycondition import DirichletBC
+from fealpy.graph.partition import part_mesh
+from fealpy.solver.schwarz import SchwarzPreconditioner
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="加性 Schwarz 预条件子在三维线弹性问题上的效果")
+    parser.add_argument('--n', type=int, default=2, help='网格加密次数')
+    parser.add_argument('-p', type=int, default=1, help='拉格朗日元的次数')
+    parser.add_argument('--nparts', type=int, default=8, help='子区域个数')
+    parser.add_argument('--overlap', type=int, default=1, help='重叠的单元层数')
+    parser.add_argument('--nthreads', type=int, default=1, help='线程个数')
+    args = parser.parse_args()
+
+    pde = BoxDomainData3d()
+    mesh = pde.init_mesh(n=args.n)
+    space = LagrangeFiniteElementSpace(mesh, p=args.p)
+    uh = space.function(dim=3)
+    A = space.linear_elasticity_matrix(pde.lam, pde.mu)
+    F = space.source_vector(pde.source, dim=3)
+    bc = DirichletBC(space, pde.dirichlet, threshold=pde.is_dirichlet_boundary)
+    A, F = bc.apply(A, F, uh)
+    _, parts = part_mesh(mesh, nparts=args.nparts)
+    print('NDof = {}, {} subdomains\n'.format(A.shape[0], args.nparts))
+
+    methods = [
+        ('none', cg, None),
+        ('as', cg, dict()),
+        ('as+rigid', cg, dict(coarse='rigid')),
+        ('ras+rigid', gmres, dict(coarse='rigid', restricted=True))]
+
+    print('{:<10s} {:>10s} {:>10s} {:>6s} {:>10s}'.format(
+        'method', 'setup (s)', 'solve (s)', 'iter', 'residual'))
+    for name, solver, kw in methods:
+        t = time.perf_counter()
+        if kw is None:
+            M = None
+        else:
+            M = SchwarzPreconditioner(A, space.cell_to_dof(), parts,
+                    overlap=args.overlap, dim=3, nthreads=args.nthreads,
+                    points=space.interpolation_points(), **kw).preconditioner()
+        t0 = time.perf_counter() - t
+
+        count = []
+        t = time.perf_counter()
+        if solver is cg:
+            x, info = solver(A, F, M=M, tol=1e-8, callback=count.append)
+        else:
+            x, info = solver(A, F, M=M, tol=1e-8, restart=200,
+                    callback=count.append, callback_type='pr_norm')
+        t1 = time.perf_counter() - t
+        res = np.linalg.norm(F - A@x)/np.linalg.norm(F)
+        print('{:<10s} {:10.4f} {:10.4f} {:6d} {:10.2e}'.format(
+            name, t0, t1, len(count), res))
@@ -0,0 +1,18 @@
+"""
+Notes
+-----
+
+FEALPy 核心计算路径的基准测试集, 由 `benchmark/run_suite.py` 运行.
+
+每个模块中名字以 `Suite` 结尾的类是一组基准测试, 写法和 asv 相同:
+
+* params: 参数值的列表的列表, 如 [[16, 64], [1, 2, 3, 4]];
+* param_names: 参数名, 如 ['n', 'p'];
+* setup(self, *params): 准备数据, 不计时; 抛出 NotImplementedError 表示
+  在当前环境下跳过 (如缺少可选依赖);
+* time_xxx(self, *params): 被测的函数.
+
+每个 time_xxx 在每组参数下报告最短运行时间和峰值内存 (tracemalloc 统计的
+Python 和 NumPy 分配的内存相对于调用前的最大增量), 每次运行前都重新调用
+setup, 所以被测函数可以修改 setup 准备的数据 (如网格加密).
+"""
@@ -0,0 +1,91 @@
+"""
+Notes
+-----
+
+拉格朗日有限元的矩阵和向量组装, 误差计算 (`FEMeshIntegralAlg.error`), 以及
+多个有限元函数在积分点上的值和梯度.
+"""
+from fealpy.mesh import MeshFactory as MF
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.pde.poisson_3d import CosCosCosData
+from fealpy.functionspace import LagrangeFiniteElementSpace
+
+
+class LagrangeAssembly2dSuite:
+    params = [[16, 64, 128], [1, 2, 3, 4]]
+    param_names = ['n', 'p']
+
+    def setup(self, n, p):
+        self.pde = CosCosData()
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=n, ny=n, meshtype='tri')
+        self.space = LagrangeFiniteElementSpace(mesh, p=p)
+
+    def time_stiff_matrix(self, n, p):
+        self.space.stiff_matrix()
+
+    def time_mass_matrix(self, n, p):
+        self.space.mass_matrix()
+
+    def time_source_vector(self, n, p):
+        self.space.source_vector(self.pde.source)
+
+
+class LagrangeAssembly3dSuite:
+    params = [[4, 8, 16], [1, 2, 3, 4]]
+    param_names = ['n', 'p']
+
+    def setup(self, n, p):
+        self.pde = CosCosCosData()
+        mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=n, ny=n, nz=n, meshtype='tet')
+        self.space = LagrangeFiniteElementSpace(mesh, p=p)
+
+    def time_stiff_matrix(self, n, p):
+        self.space.stiff_matrix()
+
+    def time_mass_matrix(self, n, p):
+        self.space.mass_matrix()
+
+    def time_source_vector(self, n, p):
+        self.space.source_vector(self.pde.source)
+
+
+class ErrorSuite:
+    params = [[16, 64, 128], [1, 2, 3, 4]]
+    param_names = ['n', 'p']
+
+    def setup(self, n, p):
+        self.pde = CosCosData()
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=n, ny=n, meshtype='tri')
+        self.space = LagrangeFiniteElementSpace(mesh, p=p)
+        self.uh = self.space.interpolation(self.pde.solution)
+
+    def time_L2_error(self, n, p):
+        self.space.integralalg.error(self.pde.solution, self.uh)
+
+    def time_H1_semi_error(self, n, p):
+        self.space.integralalg.error(self.pde.gradient, self.uh.grad_value)
+
+    def time_fused_errors(self, n, p):
+        self.space.integralalg.errors([(self.pde.solution, self.uh, 2),
+            (self.pde.gradient, self.uh.grad_value, 2)], celltype=True)
+
+
+class BatchValueSuite:
+    params = [[64, 256], [1, 2, 3]]
+    param_names = ['n', 'p']
+
+    def setup(self, n, p):
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=n, ny=n, meshtype='tri')
+        self.space = LagrangeFiniteElementSpace(mesh, p=p)
+        self.fs = [self.space.function(), self.space.function(),
+                self.space.function(dim=2), self.space.function()]
+        self.bcs, _ = self.space.integrator.get_quadrature_points_and_weights()
+
+    def time_separate(self, n, p):
+        for f in self.fs:
+            f(self.bcs)
+            f.grad_value(self.bcs)
+
+    def time_batch(self, n, p):
+        self.space.batch_value(self.fs, self.bcs)
+        self.space.batch_grad_value(self.fs, self.bcs)
@@ -0,0 +1,56 @@
+"""
+Notes
+-----
+
+网格的构造 (拓扑数据结构) 和加密.
+"""
+import numpy as np
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh import TriangleMesh, TetrahedronMesh
+
+
+class TriangleMeshSuite:
+    params = [[32, 128, 256]]
+    param_names = ['n']
+
+    def setup(self, n):
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=n, ny=n, meshtype='tri')
+        self.node = mesh.entity('node')
+        self.cell = mesh.entity('cell')
+        self.mesh = mesh
+        NC = mesh.number_of_cells()
+        self.isMarkedCell = np.zeros(NC, dtype=np.bool_)
+        self.isMarkedCell[:NC//4] = True # 标记四分之一的单元
+
+    def time_construct(self, n):
+        TriangleMesh(self.node, self.cell)
+
+    def time_uniform_refine(self, n):
+        self.mesh.uniform_refine()
+
+    def time_bisect(self, n):
+        self.mesh.bisect(self.isMarkedCell, options={'disp': False})
+
+
+class TetrahedronMeshSuite:
+    params = [[8, 16, 24]]
+    param_names = ['n']
+
+    def setup(self, n):
+        mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=n, ny=n, nz=n, meshtype='tet')
+        self.node = mesh.entity('node')
+        self.cell = mesh.entity('cell')
+        self.mesh = mesh
+        NC = mesh.number_of_cells()
+        self.isMarkedCell = np.zeros(NC, dtype=np.bool_)
+        self.isMarkedCell[:NC//4] = True
+
+    def time_construct(self, n):
+        TetrahedronMesh(self.node, self.cell)
+
+    def time_uniform_refine(self, n):
+        self.mesh.uniform_refine()
+
+    def time_bisect(self, n):
+        self.mesh.bisect(self.isMarkedCell)
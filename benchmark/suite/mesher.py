@@ -0,0 +1,22 @@
+"""
+Notes
+-----
+
+DistMesher2d 网格生成, 迭代次数固定, 初始点的随机扰动固定随机种子.
+"""
+import numpy as np
+
+from fealpy.geometry import CircleDomain
+from fealpy.mesh.DistMesher2d import DistMesher2d
+
+
+class DistMesher2dSuite:
+    params = [[0.1, 0.05, 0.025]]
+    param_names = ['hmin']
+
+    def setup(self, hmin):
+        np.random.seed(0)
+        self.mesher = DistMesher2d(CircleDomain(), hmin, output=False)
+
+    def time_meshing(self, hmin):
+        self.mesher.meshing(maxit=100)
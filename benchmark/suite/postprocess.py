@@ -0,0 +1,26 @@
+"""
+Notes
+-----
+
+梯度重构和重构型后验误差估计.
+"""
+from fealpy.mesh import MeshFactory as MF
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.functionspace import LagrangeFiniteElementSpace
+
+
+class RecoverySuite:
+    params = [[32, 128, 256], ['simple', 'area', 'area_harmonic']]
+    param_names = ['n', 'method']
+
+    def setup(self, n, method):
+        pde = CosCosData()
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=n, ny=n, meshtype='tri')
+        self.space = LagrangeFiniteElementSpace(mesh, p=1)
+        self.uh = self.space.interpolation(pde.solution)
+
+    def time_grad_recovery(self, n, method):
+        self.space.grad_recovery(self.uh, method=method)
+
+    def time_recovery_estimate(self, n, method):
+        self.space.recovery_estimate(self.uh, method=method)
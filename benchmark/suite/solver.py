@@ -0,0 +1,83 @@
+"""
+Notes
+-----
+
+快速求解器: 基于离散正弦变换的快速 Poisson 求解器, 加性 Schwarz 预条件
+的 CG, 以及 Ruge-Stuben 代数多重网格预条件的 CG (需要 pyamg).
+"""
+import numpy as np
+from scipy.sparse.linalg import cg
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh import UniformMesh2d
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.boundarycondition import DirichletBC
+from fealpy.graph.partition import part_mesh
+from fealpy.solver import FastPoissonSolver
+from fealpy.solver.schwarz import SchwarzPreconditioner
+
+
+def poisson_system(n, p):
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=n, ny=n, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=p)
+    uh = space.function()
+    A = space.stiff_matrix()
+    F = space.source_vector(pde.source)
+    bc = DirichletBC(space, pde.dirichlet)
+    A, F = bc.apply(A, F, uh)
+    return pde, space, A, F, uh
+
+
+class FastPoissonSolverSuite:
+    params = [[128, 512, 1024]]
+    param_names = ['n']
+
+    def setup(self, n):
+        mesh = UniformMesh2d([0, n, 0, n], h=(1/n, 1/n))
+        self.solver = FastPoissonSolver(mesh)
+        self.f = np.ones(self.solver.gshape)
+
+    def time_setup(self, n):
+        FastPoissonSolver(self.solver.mesh)
+
+    def time_solve(self, n):
+        self.solver.solve(self.f)
+
+
+class SchwarzSuite:
+    params = [[32, 64, 128]]
+    param_names = ['n']
+
+    def setup(self, n):
+        _, space, self.A, self.F, _ = poisson_system(n, 1)
+        self.cell2dof = space.cell_to_dof()
+        _, self.parts = part_mesh(space.mesh, nparts=8)
+
+    def time_setup(self, n):
+        SchwarzPreconditioner(self.A, self.cell2dof, self.parts)
+
+    def time_solve(self, n):
+        M = SchwarzPreconditioner(self.A, self.cell2dof, self.parts).preconditioner()
+        cg(self.A, self.F, M=M, tol=1e-8)
+
+
+class AMGSuite:
+    params = [[64, 128, 256], [1, 2]]
+    param_names = ['n', 'p']
+
+    def setup(self, n, p):
+        try:
+            import pyamg
+        except ImportError:
+            raise NotImplementedError("pyamg is not installed")
+        self.pyamg = pyamg
+        _, _, self.A, self.F, _ = poisson_system(n, p)
+        self.ml = pyamg.ruge_stuben_solver(self.A)
+
+    def time_setup(self, n, p):
+        self.pyamg.ruge_stuben_solver(self.A)
+
+    def time_solve(self, n, p):
+        self.ml.solve(self.F, tol=1e-8, accel='cg')
@@ -0,0 +1,33 @@
+"""
+Notes
+-----
+
+多边形网格上的协调和非协调虚单元的组装.
+"""
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh import PolygonMesh
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.functionspace import ConformingVirtualElementSpace2d
+from fealpy.functionspace import NonConformingVirtualElementSpace2d
+
+
+class VEMAssemblySuite:
+    params = [[16, 64], [1, 2, 3], ['conforming', 'nonconforming']]
+    param_names = ['n', 'p', 'space']
+
+    def setup(self, n, p, space):
+        self.pde = CosCosData()
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=n, ny=n, meshtype='poly')
+        self.mesh = mesh
+        self.Space = {'conforming': ConformingVirtualElementSpace2d,
+                'nonconforming': NonConformingVirtualElementSpace2d}[space]
+        self.space = self.Space(mesh, p=p)
+
+    def time_space(self, n, p, space):
+        self.Space(self.mesh, p=p)
+
+    def time_stiff_matrix(self, n, p, space):
+        self.space.stiff_matrix()
+
+    def time_source_vector(self, n, p, space):
+        self.space.source_vector(self.pde.source)
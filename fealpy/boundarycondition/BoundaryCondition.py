@@ -37,7 +37,7 @@ class DirichletBC():
             F = F.T.flat # (gdof, GD) --> (GD*gdof, ) 把 F 按列展平
         x = uh.T.flat # 把 uh 按列展平
         F -= A@x
-        bdIdx = np.zeros(A.shape[0], dtype=np.int_)
+        bdIdx = np.zeros(A.shape[0], dtype=A.dtype) # 保持 A 的浮点类型
         bdIdx[isDDof] = 1
         Tbd = spdiags(bdIdx, 0, A.shape[0], A.shape[0])
         T = spdiags(1-bdIdx, 0, A.shape[0], A.shape[0])
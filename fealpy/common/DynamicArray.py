@@ -2,80 +2,60 @@
 Notes
 -----
 
-这里是一个动态数组
+这里是一个动态数组, 第 0 轴的长度可以变化, 其它轴的形状固定.
+
+数据存放在一个容量 (capacity) 不小于当前长度 (size) 的缓冲区中, 容量不够时
+按 2 倍增长, 所以连续地在尾部增加元素的均摊代价是 O(1). 删除元素时在原缓冲区
+中压缩存储, 并返回旧编号到新编号的映射, 用来更新引用这些元素的其它数组.
 
 References
 [1] https://github.com/maciejkula/dynarray.git
 """
+import operator
+
 import numpy as np
 
+
 class DynamicArray(object):
-    MAGIC_METHODS = ('__radd__',
-                     '__add__',
-                     '__sub__',
-                     '__rsub__',
-                     '__mul__',
-                     '__rmul__',
-                     '__div__',
-                     '__rdiv__',
-                     '__pow__',
-                     '__rpow__',
-                     '__eq__',
-                     '__len__')
-
-    class __metaclass__(type):
-        def __init__(cls, name, parents, attrs):
-            def make_delegate(name):
-                def delegate(self, *args, **kwargs):
-                    return getattr(self.data[:self.size], name)
-                return delegate
-            type.__init__(cls, name, parents, attrs)
-            for method_name in cls.MAGIC_METHODS:
-                setattr(cls, method_name, property(make_delegate(method_name)))
-
-    def __init__(self, data, dtype=None, capacity=100000, val=0):
-
-        if isinstance(data, int): 
-            self.shape = (data, )
-            self.dtype = dtype or np.int_
-            self.size = data 
-            self.capacity = max(self.size, capacity)
-            self.ndim = len(self.shape)
-            self.data = np.empty((self.capacity,) + self._get_trailing_dimensions(),
-                                  dtype=self.dtype)
-            self[:] = val
-        elif isinstance(data, tuple):
-            self.shape = data 
-            self.dtype = dtype or np.int_
-            self.size = data[0] 
-            self.capacity = max(self.size, capacity)
-            self.ndim = len(self.shape)
-            self.data = np.empty((self.capacity,) + self._get_trailing_dimensions(),
-                                  dtype=self.dtype)
-            self[:] = val
-
-        elif isinstance(data, list):
-            self.shape = (len(data), len(data[0])) if hasattr(data[0], '__len__') else (len(data), )
-            self.dtype = dtype or np.int_
-            self.size = len(data) 
-            self.capacity = max(self.size, capacity)
-            self.ndim = len(self.shape)
-            self.data = np.empty((self.capacity,) + self._get_trailing_dimensions(),
-                                  dtype=self.dtype)
-            self.data[:self.size] = data
-
-        elif isinstance(data, np.ndarray):
-            self.shape = data.shape
-            self.dtype = dtype or data.dtype
-            self.size = self.shape[0]
-            self.capacity = max(self.size, capacity)
-            self.ndim = len(self.shape)
-            self.data = np.empty((self.capacity,) + self._get_trailing_dimensions(),
-                                  dtype=self.dtype)
-            self.data[:self.size] = data
+    def __init__(self, data, dtype=None, capacity=None, val=0):
+        """
+        @param[in] data 整数或元组表示数组的形状, 也可以是列表或者数组
+        @param[in] dtype 数据类型
+        @param[in] capacity 初始容量, 默认和初始长度相同
+        @param[in] val data 为形状时数组的初始值
+        """
+        if isinstance(data, (int, np.integer, tuple)):
+            shape = (int(data), ) if isinstance(data, (int, np.integer)) else data
+            values = None
+        else:
+            values = np.asarray(data)
+            shape = values.shape
+            dtype = dtype or values.dtype
+
+        self.dtype = np.dtype(dtype or np.int_)
+        self.size = shape[0]
+        self.capacity = max(self.size, capacity or 0, 1)
+        self.data = np.empty((self.capacity,) + tuple(shape[1:]), dtype=self.dtype)
+        if values is None:
+            self.data[:self.size] = val
+        else:
+            self.data[:self.size] = values
+
+    @property
+    def shape(self):
+        return (self.size,) + self.data.shape[1:]
+
+    @property
+    def ndim(self):
+        return self.data.ndim
 
     def _get_trailing_dimensions(self):
-        return self.shape[1:]
+        return self.data.shape[1:]
+
+    def __array__(self, dtype=None):
+        if dtype is None:
+            return self.data[:self.size]
+        return self.data[:self.size].astype(dtype)
 
     def __getitem__(self, idx):
         return self.data[:self.size][idx]
@@ -83,6 +63,12 @@ class DynamicArray(object):
     def __setitem__(self, idx, value):
         self.data[:self.size][idx] = value
 
+    def __iter__(self):
+        return iter(self.data[:self.size])
+
+    def __len__(self):
+        return self.size
+
     def _as_dtype(self, value):
         if hasattr(value, 'dtype') and value.dtype == self.dtype:
             return value
@@ -93,41 +79,22 @@ class DynamicArray(object):
         return self.data[:self.size].copy()
 
     def resize(self, new_size):
-        self.data = np.resize(self.data, (new_size,) + self._get_trailing_dimensions())
+        """
+        @brief 把容量改为 new_size (不小于当前长度), 保留已有的数据
+        """
+        assert new_size >= self.size
+        data = np.empty((new_size,) + self._get_trailing_dimensions(),
+                dtype=self.dtype)
+        data[:self.size] = self.data[:self.size]
+        self.data = data
         self.capacity = new_size
 
-    def adjust_size(self, isMarkedItem, s=0):
+    def reserve(self, required_size):
         """
-
-        Notes
-        -----
-        调整存储, 标记的单元移除掉, 并在尾部增加新的元素.
+        @brief 保证容量不小于 required_size, 需要扩容时容量至少翻倍
         """
-
-        d = (~isMarkedItem).sum()
-        self.data[:d] = self.data[:self.size][~isMarkedItem]
-        if isinstance(s, int):
-            required_size = d+s
-
-            if required_size>self.capacity:
-                self.resize(max(2*self.capacity, required_size))
-
-            data = self.data[d:required_size]
-
-            self.size = required_size
-            self.shape = (self.size,) + self._get_trailing_dimensions()
-            return data
-
-        if isinstance(s, np.ndarray):
-            required_size = d+s.shape[0]
-
-            if required_size>self.capacity:
-                self.resize(max(2*self.capacity, required_size))
-
-            self.data[d:required_size] = s
-
-            self.size = required_size
-            self.shape = (self.size,) + self._get_trailing_dimensions()
+        if required_size > self.capacity:
+            self.resize(max(2*self.capacity, required_size))
 
     def increase_size(self, s):
         """
@@ -137,14 +104,9 @@ class DynamicArray(object):
             增加存储, 并返回增加部分的数组, 这里返回的是数组的视图.
         """
         required_size = self.size + s
-        if required_size >= self.capacity:
-            self.resize(max(2*self.capacity, required_size))
-
+        self.reserve(required_size)
         data = self.data[self.size:required_size]
         self.size = required_size
-
-        self.shape = (self.size,) + self._get_trailing_dimensions()
-
         return data
 
     def decrease_size(self, s):
@@ -153,48 +115,113 @@ class DynamicArray(object):
         Notes
         -----
             减少存储, 并返回减少部分的数组, 这里返回的是数组的视图.
-            TODO: 引入缩减内存的机制.
+            容量不变, 需要时可以调用 `shrink` 释放多余的内存.
         """
         assert s <= self.size
         required_size = self.size - s
         data = self.data[required_size:self.size]
         self.size = required_size
-
-        self.shape = (self.size, ) + self._get_trailing_dimensions()
-
         return data
 
-    def extend(self, values):
+    def append(self, value):
+        """
+        @brief 在尾部增加一个元素
         """
+        self.reserve(self.size + 1)
+        self.data[self.size] = value
+        self.size += 1
 
-        Notes
-        -----
+    def extend(self, values):
+        """
+        @brief 在尾部增加多个元素
         """
         values = self._as_dtype(values)
-
         required_size = self.size + values.shape[0]
-
-        if required_size >= self.capacity:
-            self.resize(max(2*self.capacity, required_size))
-
+        self.reserve(required_size)
         self.data[self.size:required_size] = values
         self.size = required_size
-        if len(self.shape)==1:
-            self.shape = (self.size,)
+
+    def delete(self, isMarkedItem):
+        """
+        @brief 删除标记的元素, 在原缓冲区中压缩存储
+
+        @param[in] isMarkedItem 长度为 size 的布尔数组, 或者要删除的元素的编号
+
+        @return idxmap 旧编号到新编号的映射, 删除的元素映射为 -1
+        """
+        isMarkedItem = np.asarray(isMarkedItem)
+        if isMarkedItem.dtype != np.bool_:
+            flag = np.zeros(self.size, dtype=np.bool_)
+            flag[isMarkedItem] = True
+            isMarkedItem = flag
+
+        idxmap = np.full(self.size, -1, dtype=np.int_)
+        isKeepItem = ~isMarkedItem
+        idx, = np.nonzero(isKeepItem)
+        d = len(idx)
+        idxmap[idx] = np.arange(d)
+
+        # 第一个被删除的元素之前的部分不需要移动
+        start = np.argmax(isMarkedItem) if d < self.size else d
+        self.data[start:d] = self.data[idx[start:]]
+        self.size = d
+        return idxmap
+
+    def adjust_size(self, isMarkedItem, s=0):
+        """
+
+        Notes
+        -----
+        调整存储, 标记的单元移除掉, 并在尾部增加新的元素.
+        s 为整数时返回新增部分的视图, s 为数组时把它放到尾部.
+        """
+        self.delete(isMarkedItem)
+        if isinstance(s, np.ndarray):
+            self.extend(s)
         else:
-            self.shape = (self.size, values.shape[1])
+            return self.increase_size(int(s))
 
     def shrink(self):
         """
         Reduce the array's capacity to its size.
         """
-        self.resize(self.size)
-
-    def __len__(self):
-        return self.shape[0]
+        self.resize(max(self.size, 1))
 
     def __repr__(self):
         return (self.data[:self.size].__repr__()
                 .replace('array',
                          'DynamicArray(size={}, capacity={})'
                          .format(self.size, self.capacity)))
+
+
+def _make_delegate(op):
+    def delegate(self, *args):
+        args = [a[:] if isinstance(a, DynamicArray) else a for a in args]
+        return op(self.data[:self.size], *args)
+    return delegate
+
+
+def _make_inplace_delegate(op):
+    def delegate(self, other):
+        if isinstance(other, DynamicArray):
+            other = other[:]
+        op(self.data[:self.size], other)
+        return self
+    return delegate
+
+
+# 算术和比较运算作用在有效的部分上, 返回 numpy 数组
+for _name in ('add', 'sub', 'mul', 'truediv', 'floordiv', 'mod', 'pow',
+        'and', 'or', 'xor', 'matmul'):
+    _op = getattr(operator, _name + '_' if _name in {'and', 'or'} else _name)
+    setattr(DynamicArray, '__{}__'.format(_name), _make_delegate(_op))
+    setattr(DynamicArray, '__r{}__'.format(_name),
+            _make_delegate(lambda a, b, _op=_op: _op(b, a)))
+    setattr(DynamicArray, '__i{}__'.format(_name),
+            _make_inplace_delegate(getattr(operator, 'i' + _name)))
+
+for _name in ('eq', 'ne', 'lt', 'le', 'gt', 'ge', 'neg', 'pos', 'abs', 'invert'):
+    setattr(DynamicArray, '__{}__'.format(_name),
+            _make_delegate(getattr(operator, _name)))
+
+DynamicArray.__hash__ = None
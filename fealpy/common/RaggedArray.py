@@ -0,0 +1,207 @@
+"""
+Notes
+-----
+
+这里是一个按 CSR 方式存储的变长数组 (ragged array), 用一个扁平的数据数组
+data 和长度为 N+1 的位置数组 location 表示 N 个长度不等的项, 第 i 项为
+
+    data[location[i]:location[i+1]]
+
+多边形网格的单元, 虚单元空间的单元自由度等都是这种结构, 这里提供分段规约,
+按长度分组后填充为稠密数组等向量化操作, 避免逐项生成 Python 对象.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class RaggedArray():
+    def __init__(self, data, location):
+        """
+        @param[in] data 扁平的数据数组, 第 0 轴为变长的方向, 可以有其它轴
+        @param[in] location 长度为 N+1 的起始位置数组
+        """
+        self.data = data
+        self.location = location
+        self._rowidx = None
+        self._buckets = None
+
+    @classmethod
+    def from_lengths(cls, data, lengths, dtype=np.int_):
+        location = np.zeros(len(lengths)+1, dtype=dtype)
+        np.cumsum(lengths, out=location[1:])
+        return cls(data, location)
+
+    @classmethod
+    def from_list(cls, arrays, dtype=None):
+        lengths = [len(a) for a in arrays]
+        if len(arrays) > 0:
+            data = np.concatenate(arrays)
+        else:
+            data = np.zeros(0, dtype=dtype or np.int_)
+        if dtype is not None:
+            data = data.astype(dtype, copy=False)
+        return cls.from_lengths(data, lengths)
+
+    @classmethod
+    def from_dense(cls, array):
+        """
+        @brief 每一项长度相同的二维数组, 数据不复制
+        """
+        N, n = array.shape[0:2]
+        location = np.arange(0, (N+1)*n, n)
+        return cls(array.reshape((N*n, ) + array.shape[2:]), location)
+
+    def __len__(self):
+        return len(self.location) - 1
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    def lengths(self):
+        return self.location[1:] - self.location[:-1]
+
+    def __getitem__(self, index):
+        """
+        @brief 取一项或者多项
+
+        整数返回该项的视图, 步长为 1 的切片返回共享数据的 RaggedArray,
+        整数数组或布尔数组返回复制后的 RaggedArray
+        """
+        location = self.location
+        if isinstance(index, (int, np.integer)):
+            return self.data[location[index]:location[index+1]]
+        elif isinstance(index, slice) and index.step in {None, 1}:
+            start, stop, _ = index.indices(len(self))
+            stop = max(start, stop)
+            loc = location[start:stop+1]
+            return RaggedArray(self.data[loc[0]:loc[-1]], loc - loc[0])
+        else:
+            index = np.arange(len(self))[index]
+            lengths = location[index+1] - location[index]
+            loc = np.zeros(len(index)+1, dtype=location.dtype)
+            np.cumsum(lengths, out=loc[1:])
+            pos = np.repeat(location[index] - loc[:-1], lengths) + np.arange(loc[-1])
+            return RaggedArray(self.data[pos], loc)
+
+    def __iter__(self):
+        location = self.location
+        for i in range(len(self)):
+            yield self.data[location[i]:location[i+1]]
+
+    def split(self):
+        """
+        @brief 每一项的视图组成的列表, 和 `np.split(data, location[1:-1])` 相同
+        """
+        return list(self)
+
+    def row_index(self):
+        """
+        @brief data 中每个元素所属的项的编号
+        """
+        if self._rowidx is None:
+            N = len(self)
+            self._rowidx = np.repeat(np.arange(N), self.lengths())
+        return self._rowidx
+
+    def local_index(self):
+        """
+        @brief data 中每个元素在所属的项中的局部编号
+        """
+        n = len(self.data)
+        return np.arange(n) - np.repeat(self.location[:-1], self.lengths())
+
+    def with_data(self, data):
+        """
+        @brief 结构相同, 数据换成 data 的变长数组
+        """
+        a = RaggedArray(data, self.location)
+        a._rowidx = self._rowidx
+        a._buckets = self._buckets
+        return a
+
+    def roll(self, shift=1):
+        """
+        @brief 每一项循环移位, 和逐项调用 `np.roll(a, shift)` 相同
+        """
+        lengths = self.lengths()
+        start = np.repeat(self.location[:-1], lengths)
+        pos = start + (self.local_index() - shift)%np.repeat(lengths, lengths)
+        return self.with_data(self.data[pos])
+
+    def reduce(self, ufunc, initial=0):
+        """
+        @brief 分段规约, 空项的结果为 initial
+
+        @param[in] ufunc 如 np.add, np.maximum, np.minimum, np.logical_or
+        """
+        lengths = self.lengths()
+        N = len(self)
+        shape = (N, ) + self.data.shape[1:]
+        isNotEmpty = lengths > 0
+        if np.all(isNotEmpty):
+            return ufunc.reduceat(self.data, self.location[:-1], axis=0)
+        val = np.full(shape, initial, dtype=self.data.dtype)
+        if np.any(isNotEmpty):
+            val[isNotEmpty] = ufunc.reduceat(self.data,
+                    self.location[:-1][isNotEmpty], axis=0)
+        return val
+
+    def sum(self):
+        return self.reduce(np.add)
+
+    def max(self, initial=-np.inf):
+        return self.reduce(np.maximum, initial=initial)
+
+    def min(self, initial=np.inf):
+        return self.reduce(np.minimum, initial=initial)
+
+    def mean(self):
+        lengths = self.lengths().reshape((-1, ) + (1, )*(self.data.ndim-1))
+        return self.sum()/lengths
+
+    def buckets(self):
+        """
+        @brief 按长度分组
+
+        @return 列表, 每一项为 (index, loc), index 为长度相同的项的编号,
+            loc[i, j] 为第 index[i] 项的第 j 个元素在 data 中的位置
+        """
+        if self._buckets is None:
+            location = self.location
+            lengths = self.lengths()
+            self._buckets = []
+            for n in np.unique(lengths):
+                index, = np.nonzero(lengths == n)
+                loc = location[index].reshape(-1, 1) + np.arange(n)
+                self._buckets.append((index, loc))
+        return self._buckets
+
+    def dense_buckets(self):
+        """
+        @brief 按长度分组, 每组的数据是一个形状为 (nc, n, ...) 的稠密数组
+
+        @return 生成 (index, val) 的迭代器
+        """
+        for index, loc in self.buckets():
+            yield index, self.data[loc]
+
+    def to_dense(self, fill=0):
+        """
+        @brief 补齐为形状为 (N, max(lengths), ...) 的稠密数组
+        """
+        lengths = self.lengths()
+        N = len(self)
+        n = lengths.max() if N > 0 else 0
+        val = np.full((N, n) + self.data.shape[1:], fill, dtype=self.data.dtype)
+        val[self.row_index(), self.local_index()] = self.data
+        return val
+
+    def to_csr(self, ncol, dtype=np.bool_):
+        """
+        @brief 把整数项看成列号, 转化为 N x ncol 的稀疏矩阵, data 和 location
+            直接作为 CSR 格式的索引 (复制一份, 以免稀疏矩阵的原地操作修改它们)
+        """
+        val = np.ones(len(self.data), dtype=dtype)
+        return csr_matrix((val, self.data.copy(), self.location.copy()),
+                shape=(len(self), ncol))
@@ -8,6 +8,22 @@ def ranges(nv, start = 0):
     id_arr[0] = start
     return id_arr.cumsum()
 
+def stack_by_group(mats, index):
+    """
+    @brief 把列表 mats 中编号为 index 的同形状数组叠成一个数组
+    """
+    return np.array([mats[i] for i in index])
+
+def split_by_group(vals, groups, N):
+    """
+    @brief stack_by_group 的逆, 把每组叠在一起的数组拆回长度为 N 的列表
+    """
+    mats = [None]*N
+    for (index, _), val in zip(groups, vals):
+        for i, v in zip(index, val):
+            mats[i] = v
+    return mats
+
 def hash2map(dec, ha):
     n = ha.shape[1]
     b = np.floor(dec.reshape(-1, 1)/2**np.arange(n))%2
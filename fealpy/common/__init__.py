@@ -1,3 +1,4 @@
 from .Tools import *
 from .block import block, block_diag
 from .DynamicArray import DynamicArray
+from .RaggedArray import RaggedArray
@@ -0,0 +1,76 @@
+"""
+Notes
+-----
+
+子包的延迟导入 (PEP 562).
+
+`fealpy.mesh`, `fealpy.functionspace` 等子包导出的类分散在很多模块中, 其中一些
+模块依赖 vtk, meshpy, pyamg 等较重的包. 这里让子包在第一次访问某个名字时才
+导入定义它的模块, 没有用到的模块不会被导入.
+
+Examples
+--------
+>> # fealpy/mesh/__init__.py
+>> from ..common.lazy_import import attach
+>> __getattr__, __dir__, __all__ = attach(__name__, {
+..     'TriangleMesh': ['TriangleMesh', 'TriangleMeshWithInfinityNode'],
+..     'PolygonMesh': ['PolygonMesh'],
+.. })
+"""
+import sys
+import types
+import importlib
+import pkgutil
+
+
+class LazyModule(types.ModuleType):
+    """
+    @brief 延迟导入的包的模块类型
+
+    导入子模块 `pkg.X` 时, Python 会把子模块对象设为包的属性 `X`. 很多子模块
+    和它定义的类同名, 这里把这种属性换成子模块中的同名对象, 和直接在
+    `__init__.py` 中写 `from .X import X` 的效果相同.
+    """
+    def __setattr__(self, name, val):
+        attr2mod = self.__dict__.get('_lazy_attr2mod', {})
+        if isinstance(val, types.ModuleType) and (name in attr2mod):
+            if val.__name__ == self.__name__ + '.' + attr2mod[name]:
+                val = getattr(val, name)
+        super().__setattr__(name, val)
+
+
+def attach(name, submod_attrs, submodules=None):
+    """
+    @brief 为包 name 设置延迟导入
+
+    @param[in] name 包的名字, 一般为 `__name__`
+    @param[in] submod_attrs 字典, 子模块名到它导出的名字列表的映射
+    @param[in] submodules 可以作为包的属性访问的子模块名, 为 'all' 时是包中
+        所有的子模块
+
+    @return `__getattr__`, `__dir__` 和 `__all__`
+    """
+    package = sys.modules[name]
+    attr2mod = {attr: mod for mod, attrs in submod_attrs.items() for attr in attrs}
+    if submodules == 'all':
+        submodules = {m.name for m in pkgutil.iter_modules(package.__path__)}
+    else:
+        submodules = set(submodules or [])
+
+    package.__dict__['_lazy_attr2mod'] = attr2mod
+    package.__class__ = LazyModule
+
+    def __getattr__(attr):
+        if attr in attr2mod:
+            module = importlib.import_module('.' + attr2mod[attr], name)
+            val = getattr(module, attr)
+            setattr(package, attr, val)
+            return val
+        elif attr in submodules:
+            return importlib.import_module('.' + attr, name)
+        raise AttributeError("module '{}' has no attribute '{}'".format(name, attr))
+
+    def __dir__():
+        return sorted(set(package.__dict__) | set(attr2mod) | submodules)
+
+    return __getattr__, __dir__, list(attr2mod)
@@ -0,0 +1,71 @@
+"""
+Notes
+-----
+
+由单元自由度映射得到整体稀疏矩阵的 CSR 结构, 以及把单元上的值累加到整体
+数组中, 供各种组装器共用.
+
+CSR 的 indptr 存放的是非零元的个数, 它的整数类型必须由非零元个数 nnz 确定,
+而不是由自由度编号 (cell2dof) 的类型确定: 自由度个数小于 2^31 时 cell2dof
+可以是 int32, 但 nnz 很容易超过 2^31, 此时 int32 的 indptr 会在累加时
+溢出, 得到错误的矩阵.
+"""
+import numpy as np
+
+
+def csr_index_dtype(nnz, shape):
+    """
+    @brief CSR 矩阵的 indptr 和 indices 的整数类型
+
+    @param[in] nnz 非零元个数
+    @param[in] shape 矩阵的形状
+    """
+    if max(nnz, shape[0], shape[1]) <= np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def cell_sparsity_pattern(cell2dof0, gdof0, cell2dof1=None, gdof1=None):
+    """
+    @brief 单元矩阵 (NC, ldof0, ldof1) 组装成的整体矩阵的 CSR 结构
+
+    @param[in] cell2dof0, gdof0 行空间的单元自由度映射和自由度个数
+    @param[in] cell2dof1, gdof1 列空间的单元自由度映射和自由度个数, 默认
+               和行空间相同
+
+    @return indptr, indices, pos, 其中 pos 的形状为 (NC, ldof0, ldof1), 是每个
+            单元矩阵元素在 data 中的位置
+    """
+    if cell2dof1 is None:
+        cell2dof1, gdof1 = cell2dof0, gdof0
+    shape = (len(cell2dof0), cell2dof0.shape[1], cell2dof1.shape[1])
+    I = np.broadcast_to(cell2dof0[:, :, None], shape)
+    J = np.broadcast_to(cell2dof1[:, None, :], shape)
+    key = I.astype(np.int64)*gdof1 + J
+    key, pos = np.unique(key, return_inverse=True)
+    indptr, indices = csr_structure(key, (gdof0, gdof1))
+    return indptr, indices, pos.reshape(shape)
+
+
+def csr_structure(key, shape):
+    """
+    @brief 由排好序的非零元编号 key = row*ncol + col 得到 indptr 和 indices
+    """
+    itype = csr_index_dtype(len(key), shape)
+    indices = (key % shape[1]).astype(itype)
+    indptr = np.zeros(shape[0] + 1, dtype=itype)
+    np.cumsum(np.bincount(key//shape[1], minlength=shape[0]), out=indptr[1:])
+    return indptr, indices
+
+
+def scatter_cell_values(cell2dof, gdof, val):
+    """
+    @brief 把单元上的值 val, (NC, ldof, ...), 累加到整体数组 (gdof, ...)
+    """
+    shape = (gdof, ) + val.shape[2:]
+    val = val.reshape(cell2dof.size, -1)
+    idx = cell2dof.reshape(-1)
+    out = np.zeros((gdof, val.shape[1]), dtype=val.dtype)
+    for i in range(val.shape[1]):
+        out[:, i] = np.bincount(idx, weights=val[:, i], minlength=gdof)
+    return out.reshape(shape)
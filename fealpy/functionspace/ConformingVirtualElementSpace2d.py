@@ -7,6 +7,7 @@ from ..quadrature import GaussLobattoQuadrature
 from ..quadrature import GaussLegendreQuadrature
 from ..quadrature import PolygonMeshIntegralAlg
 from .ScaledMonomialSpace2d import ScaledMonomialSpace2d
+from ..common import RaggedArray, stack_by_group, split_by_group
 
 
 class CVEMDof2d():
@@ -14,6 +15,9 @@ class CVEMDof2d():
         self.p = p
         self.mesh = mesh
         self.cell2dof, self.cell2dofLocation = self.cell_to_dof()
+        self.cell2dofArray = RaggedArray(self.cell2dof, self.cell2dofLocation)
+        # 局部自由度个数只依赖于多边形的顶点数, 按它分组后可以批量计算
+        self.cellgroups = self.cell2dofArray.buckets()
 
     def boundary_dof(self, threshold=None):
         idx = self.mesh.ds.boundary_edge_index()
@@ -135,10 +139,11 @@ class ConformingVirtualElementSpace2d():
         self.B = self.matrix_B()
         self.G = self.matrix_G(self.B, self.D)
 
-        self.PI1 = self.matrix_PI_1(self.G, self.B)
-        self.C = self.matrix_C(self.H, self.PI1)
-
-        self.PI0 = self.matrix_PI_0(self.H, self.C)
+        # 每组单元上的投影矩阵 (PI1, C, PI0) 只计算一次, 逐个单元的列表
+        # PI1, C, PI0 在第一次用到时才由它们拆出
+        self.projectors = [self._group_projectors(idx, loc)
+                for idx, loc in self.dof.cellgroups]
+        self._cellwise = {}
 
         self.integralalg = self.smspace.integralalg
         self.itype = self.mesh.itype
@@ -149,18 +154,17 @@ class ConformingVirtualElementSpace2d():
         """
         计算虚单元函数的积分 \int_\Omega uh dx
         """
- 
         p = self.p
         cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
         if p == 1:
-            cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-            f = lambda x: sum(uh[x[0]]*x[0, :])
-            val = sum(map(f, zip(cd, self.C)))
+            val = 0.0
+            for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+                val += np.sum(uh[cell2dof[loc]]*C[:, 0, :])
             return val
         else:
             NV = self.mesh.number_of_vertices_of_cells()
-            idx =cell2dof[cell2dofLocation[0:-1]+NV*p]
-            val = np.sum(uh[idx]*self.area)
+            idx = cell2dof[cell2dofLocation[0:-1]+NV*p]
+            val = np.sum(uh[idx]*self.cellmeasure)
             return val
 
     def project_to_smspace(self, uh):
@@ -168,13 +172,15 @@ class ConformingVirtualElementSpace2d():
         Project a conforming vem function uh into polynomial space.
         """
         dim = len(uh.shape)
-        p = self.p
+        NC = self.mesh.number_of_cells()
+        smldof = self.smspace.number_of_local_dofs()
         cell2dof = self.dof.cell2dof
-        cell2dofLocation = self.dof.cell2dofLocation
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-        g = lambda x: x[0]@uh[x[1]]
+
+        val = np.zeros((NC, smldof) + uh.shape[1:], dtype=self.ftype)
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            val[idx] = np.einsum('ijk, ik...->ij...', PI1, uh[cell2dof[loc]])
         S = self.smspace.function(dim=dim)
-        S[:] = np.concatenate(list(map(g, zip(self.PI1, cd))))
+        S[:] = val.reshape(S.shape)
         return S
 
     def grad_recovery(self, uh):
@@ -198,14 +204,9 @@ class ConformingVirtualElementSpace2d():
         sx /= h.reshape(-1, 1)
         sy /= h.reshape(-1, 1)
 
-        cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
-        NC = len(cell2dofLocation) - 1
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-        DD = np.vsplit(self.D, cell2dofLocation[1:-1])
-
-        f1 = lambda x: x[0]@x[1]
-        sx = np.concatenate(list(map(f1, zip(DD, sx))))
-        sy = np.concatenate(list(map(f1, zip(DD, sy))))
+        cell2dof = self.dof.cell2dof
+        sx = self.dof_value(sx)
+        sy = self.dof_value(sy)
 
 
         ldof = self.number_of_local_dofs()
@@ -358,105 +359,102 @@ class ConformingVirtualElementSpace2d():
         SS[:] = np.einsum('ikj, ij->ik', PI0, S[smspace.cell_to_dof()]).reshape(-1)
         return SS
 
-    def stiff_matrix(self, cfun=None):
-        area = self.smspace.cellmeasure
+    def dof_value(self, s):
+        """
+        @brief 每个单元上的缩放单项式函数在该单元的自由度上的值, 即 D_K s_K
 
-        def f(x):
-            x[0, :] = 0
-            return x
+        @param[in] s 形状为 (NC, smldof) 的系数
+        @return 和 cell2dof 对应的一维数组
+        """
+        D = self.D
+        val = np.zeros(len(self.dof.cell2dof), dtype=self.ftype)
+        for idx, loc in self.dof.cellgroups:
+            val[loc] = np.einsum('ijk, ik->ij', D[loc], s[idx])
+        return val
 
+    def stiff_matrix(self, cfun=None):
+        """
+        @brief 刚度矩阵, 顶点数相同的单元上的局部矩阵批量计算, 最后一次组装
+        """
         p = self.p
-        G = self.G
         D = self.D
-        PI1 = self.PI1
 
-        cell2dof, cell2dofLocation = self.cell_to_dof()
-        NC = len(cell2dofLocation) - 1
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-        DD = np.vsplit(D, cell2dofLocation[1:-1])
+        if cfun is not None:
+            k = cfun(self.smspace.cellbarycenter)
 
-        if p == 1:
-            tG = np.array([(0, 0, 0), (0, 1, 0), (0, 0, 1)])
-            if cfun is None:
-                def f1(x):
-                    M = np.eye(x[1].shape[1])
-                    M -= x[0]@x[1]
-                    N = x[1].shape[1]
-                    A = np.zeros((N, N))
-                    idx = np.arange(N)
-                    A[idx, idx] = 2
-                    A[idx[:-1], idx[1:]] = -1
-                    A[idx[1:], idx[:-1]] = -1
-                    A[0, -1] = -1
-                    A[-1, 0] = -1
-                    return x[1].T@tG@x[1] + M.T@A@M
-                #f1 = lambda x: x[1].T@tG@x[1] + (np.eye(x[1].shape[1]) - x[0]@x[1]).T@(np.eye(x[1].shape[1]) - x[0]@x[1])
-                K = list(map(f1, zip(DD, PI1)))
+        K = []
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            PI1T = np.swapaxes(PI1, -1, -2)
+            if p == 1:
+                tG = np.array([(0, 0, 0), (0, 1, 0), (0, 0, 1)])
             else:
-                cellbarycenter = self.smspace.cellbarycenter
-                k = cfun(cellbarycenter)
-                f1 = lambda x: (x[1].T@tG@x[1] + (np.eye(x[1].shape[1]) - x[0]@x[1]).T@(np.eye(x[1].shape[1]) - x[0]@x[1]))*x[2]
-                K = list(map(f1, zip(DD, PI1, k)))
-        else:
-            tG = list(map(f, G))
-            if cfun is None:
-                f1 = lambda x: x[1].T@x[2]@x[1] + (np.eye(x[1].shape[1]) - x[0]@x[1]).T@(np.eye(x[1].shape[1]) - x[0]@x[1])
-                K = list(map(f1, zip(DD, PI1, tG)))
+                tG = self.G[idx].copy()
+                tG[:, 0, :] = 0
+
+            M = np.eye(PI1.shape[-1]) - D[loc]@PI1
+            MT = np.swapaxes(M, -1, -2)
+            if (p == 1) and (cfun is None):
+                A = self._cyclic_stabilization(PI1.shape[-1])
+                val = PI1T@tG@PI1 + MT@A@M
             else:
-                cellbarycenter = self.smspace.cellbarycenter
-                k = cfun(cellbarycenter)
-                f1 = lambda x: (x[1].T@x[2]@x[1] + (np.eye(x[1].shape[1]) - x[0]@x[1]).T@(np.eye(x[1].shape[1]) - x[0]@x[1]))*x[3]
-                K = list(map(f1, zip(DD, PI1, tG, k)))
-
-        f2 = lambda x: np.repeat(x, x.shape[0])
-        f3 = lambda x: np.tile(x, x.shape[0])
-        f4 = lambda x: x.flatten()
-
-        I = np.concatenate(list(map(f2, cd)))
-        J = np.concatenate(list(map(f3, cd)))
-        val = np.concatenate(list(map(f4, K)))
+                val = PI1T@tG@PI1 + MT@M
+
+            if cfun is not None:
+                val *= k[idx].reshape(-1, 1, 1)
+            K.append(val)
+        return self._assemble(K)
+
+    def _cyclic_stabilization(self, N):
+        """
+        @brief 最低阶时相邻顶点之间差分形式的稳定化矩阵
+        """
+        A = np.zeros((N, N))
+        idx = np.arange(N)
+        A[idx, idx] = 2
+        A[idx[:-1], idx[1:]] = -1
+        A[idx[1:], idx[:-1]] = -1
+        A[0, -1] = -1
+        A[-1, 0] = -1
+        return A
+
+    def _assemble(self, K):
+        """
+        @brief 把每组单元上批量计算的局部矩阵一次性组装成全局稀疏矩阵
+
+        @param[in] K 列表, 和 `self.dof.cellgroups` 一一对应, 第 i 项的形状为
+            (nc, ldof, ldof)
+        """
+        cell2dof = self.dof.cell2dof
+        I = []
+        J = []
+        val = []
+        for (idx, loc), k in zip(self.dof.cellgroups, K):
+            cd = cell2dof[loc]
+            I.append(np.broadcast_to(cd[:, :, None], k.shape).reshape(-1))
+            J.append(np.broadcast_to(cd[:, None, :], k.shape).reshape(-1))
+            val.append(k.reshape(-1))
+        I = np.concatenate(I)
+        J = np.concatenate(J)
+        val = np.concatenate(val)
         gdof = self.number_of_global_dofs()
         A = csr_matrix((val, (I, J)), shape=(gdof, gdof), dtype=np.float)
         return A
 
     def mass_matrix(self, cfun=None):
         area = self.smspace.cellmeasure
-        p = self.p
-
-        PI0 = self.PI0
         D = self.D
         H = self.H
-        C = self.C
-
-        cell2dof, cell2dofLocation = self.cell_to_dof()
-        NC = len(cell2dofLocation) - 1
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-        DD = np.vsplit(D, cell2dofLocation[1:-1])
-
-        f1 = lambda x: x[0]@x[1]
-        PIS = list(map(f1, zip(DD, PI0)))
 
-        f1 = lambda x: x[0].T@x[1]@x[0] + x[3]*(np.eye(x[2].shape[1]) - x[2]).T@(np.eye(x[2].shape[1]) - x[2])
-        K = list(map(f1, zip(PI0, H, PIS, area)))
-
-        f2 = lambda x: np.repeat(x, x.shape[0])
-        f3 = lambda x: np.tile(x, x.shape[0])
-        f4 = lambda x: x.flatten()
-
-        I = np.concatenate(list(map(f2, cd)))
-        J = np.concatenate(list(map(f3, cd)))
-        val = np.concatenate(list(map(f4, K)))
-        gdof = self.number_of_global_dofs()
-        M = csr_matrix((val, (I, J)), shape=(gdof, gdof), dtype=np.float)
-        return M
+        K = []
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            PIS = D[loc]@PI0
+            M = np.eye(PIS.shape[-1]) - PIS
+            val = np.swapaxes(PI0, -1, -2)@H[idx]@PI0 + \
+                    area[idx].reshape(-1, 1, 1)*(np.swapaxes(M, -1, -2)@M)
+            K.append(val)
+        return self._assemble(K)
 
     def cross_mass_matrix(self, wh):
-        p = self.p
-        mesh = self.mesh
-
-        area = self.smspace.cellmeasure
-        PI0 = self.PI0
-
         phi = self.smspace.basis
         def u(x, index):
             val = phi(x, index=index)
@@ -464,76 +462,37 @@ class ConformingVirtualElementSpace2d():
             return np.einsum('ij, ijm, ijn->ijmn', wval, val, val)
         H = self.integralalg.integral(u, celltype=True)
 
-        cell2dof, cell2dofLocation = self.cell_to_dof()
-        NC = len(cell2dofLocation) - 1
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-
-        f1 = lambda x: x[0].T@x[1]@x[0]
-        K = list(map(f1, zip(PI0, H)))
-
-        f2 = lambda x: np.repeat(x, x.shape[0])
-        f3 = lambda x: np.tile(x, x.shape[0])
-        f4 = lambda x: x.flatten()
-
-        I = np.concatenate(list(map(f2, cd)))
-        J = np.concatenate(list(map(f3, cd)))
-        val = np.concatenate(list(map(f4, K)))
-        gdof = self.number_of_global_dofs()
-        M = csr_matrix((val, (I, J)), shape=(gdof, gdof), dtype=np.float)
-        return M
+        K = []
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            K.append(np.swapaxes(PI0, -1, -2)@H[idx]@PI0)
+        return self._assemble(K)
 
     def source_vector(self, f):
-        PI0 = self.PI0
         phi = self.smspace.basis
         def u(x, index):
             return np.einsum('ij, ijm->ijm', f(x), phi(x, index=index))
         bb = self.integralalg.integral(u, celltype=True)
-        g = lambda x: x[0].T@x[1]
-        bb = np.concatenate(list(map(g, zip(PI0, bb))))
+
+        val = np.zeros(len(self.dof.cell2dof), dtype=self.ftype)
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            val[loc] = np.einsum('ijk, ij->ik', PI0, bb[idx])
         gdof = self.number_of_global_dofs()
-        b = np.bincount(self.dof.cell2dof, weights=bb, minlength=gdof)
+        b = np.bincount(self.dof.cell2dof, weights=val, minlength=gdof)
         return b
 
     def chen_stability_term(self):
-        area = self.smspace.cellmeasure
-
-        p = self.p
-        G = self.G
         D = self.D
-        PI1 = self.PI1
-
-        cell2dof, cell2dofLocation = self.cell_to_dof()
-        NC = len(cell2dofLocation) - 1
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-        DD = np.vsplit(D, cell2dofLocation[1:-1])
-
         tG = np.array([(0, 0, 0), (0, 1, 0), (0, 0, 1)])
-        def f1(x):
-            M = np.eye(x[1].shape[1])
-            M -= x[0]@x[1]
-            N = x[1].shape[1]
-            A = np.zeros((N, N))
-            idx = np.arange(N)
-            A[idx, idx] = 2
-            A[idx[:-1], idx[1:]] = -1
-            A[idx[1:], idx[:-1]] = -1
-            A[0, -1] = -1
-            A[-1, 0] = -1
-            return x[1].T@tG@x[1],  M.T@A@M
-        K = list(map(f1, zip(DD, PI1)))
-        f2 = lambda x: np.repeat(x, x.shape[0])
-        f3 = lambda x: np.tile(x, x.shape[0])
-        f4 = lambda x: x[0].flatten()
-        f5 = lambda x: x[1].flatten()
-
-        I = np.concatenate(list(map(f2, cd)))
-        J = np.concatenate(list(map(f3, cd)))
-        val0 = np.concatenate(list(map(f4, K)))
-        val1 = np.concatenate(list(map(f5, K)))
-        gdof = self.number_of_global_dofs()
-        A = csr_matrix((val0, (I, J)), shape=(gdof, gdof), dtype=np.float)
-        S = csr_matrix((val1, (I, J)), shape=(gdof, gdof), dtype=np.float)
-        return A, S
+
+        K0 = []
+        K1 = []
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            N = PI1.shape[-1]
+            M = np.eye(N) - D[loc]@PI1
+            A = self._cyclic_stabilization(N)
+            K0.append(np.swapaxes(PI1, -1, -2)@tG@PI1)
+            K1.append(np.swapaxes(M, -1, -2)@A@M)
+        return self._assemble(K0), self._assemble(K1)
 
     def cell_to_dof(self):
         return self.dof.cell2dof, self.dof.cell2dofLocation
@@ -610,13 +569,8 @@ class ConformingVirtualElementSpace2d():
             uh = self.smspace.interpolation(u, HB)
 
             cell2dof, cell2dofLocation = self.cell_to_dof()
-            NC = len(cell2dofLocation) - 1
-            cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-            DD = np.vsplit(self.D, cell2dofLocation[1:-1])
-
             smldof = self.smspace.number_of_local_dofs()
-            f1 = lambda x: x[0]@x[1]
-            uh = np.concatenate(list(map(f1, zip(DD, uh.reshape(-1, smldof)))))
+            uh = self.dof_value(uh.reshape(-1, smldof))
 
             ldof = self.number_of_local_dofs()
             w = np.repeat(1/self.smspace.cellmeasure, ldof)
@@ -752,44 +706,80 @@ class ConformingVirtualElementSpace2d():
         if p == 1:
             G = np.array([(1, 0, 0), (0, 1, 0), (0, 0, 1)])
         else:
-            cell2dof, cell2dofLocation = self.cell_to_dof()
-            BB = np.hsplit(B, cell2dofLocation[1:-1])
-            DD = np.vsplit(D, cell2dofLocation[1:-1])
-            g = lambda x: x[0]@x[1]
-            G = list(map(g, zip(BB, DD)))
+            NC = self.mesh.number_of_cells()
+            smldof = self.smspace.number_of_local_dofs()
+            G = np.zeros((NC, smldof, smldof), dtype=np.float)
+            for idx, loc in self.dof.cellgroups:
+                G[idx] = np.transpose(B[:, loc], (1, 0, 2))@D[loc]
         return G
 
     def matrix_C(self, H, PI1):
-        p = self.p
-
-        smldof = self.smspace.number_of_local_dofs()
-        idof = (p-1)*p//2
-
-        mesh = self.mesh
-        NV = mesh.number_of_vertices_of_cells()
-        d = lambda x: x[0]@x[1]
-        C = list(map(d, zip(H, PI1)))
-        if p == 1:
-            return C
-        else:
-            l = lambda x: np.r_[
-                    '0',
-                    np.r_['1', np.zeros((idof, p*x[0])), x[1]*np.eye(idof)],
-                    x[2][idof:, :]]
-            return list(map(l, zip(NV, self.smspace.cellmeasure, C)))
+        NC = self.mesh.number_of_cells()
+        groups = self.dof.cellgroups
+        C = [self._group_C(H, stack_by_group(PI1, idx), idx, loc) for idx, loc in groups]
+        return split_by_group(C, groups, NC)
 
     def matrix_PI_0(self, H, C):
-        cell2dof, cell2dofLocation = self.cell_to_dof()
-        pi0 = lambda x: inv(x[0])@x[1]
-        return list(map(pi0, zip(H, C)))
+        NC = self.mesh.number_of_cells()
+        groups = self.dof.cellgroups
+        PI0 = [self._group_PI0(H, stack_by_group(C, idx), idx) for idx, _ in groups]
+        return split_by_group(PI0, groups, NC)
 
     def matrix_PI_1(self, G, B):
-        p = self.p
-        cell2dof, cell2dofLocation = self.cell_to_dof()
-        if p == 1:
-            return np.hsplit(B, cell2dofLocation[1:-1])
+        NC = self.mesh.number_of_cells()
+        groups = self.dof.cellgroups
+        PI1 = [self._group_PI1(G, B, idx, loc) for idx, loc in groups]
+        return split_by_group(PI1, groups, NC)
+
+    @property
+    def PI1(self):
+        return self._cellwise_projector(0)
+
+    @property
+    def C(self):
+        return self._cellwise_projector(1)
+
+    @property
+    def PI0(self):
+        return self._cellwise_projector(2)
+
+    def _cellwise_projector(self, k):
+        """
+        @brief 把分组缓存的第 k 个投影矩阵拆成逐个单元的列表
+        """
+        if k not in self._cellwise:
+            NC = self.mesh.number_of_cells()
+            vals = [P[k] for P in self.projectors]
+            self._cellwise[k] = split_by_group(vals, self.dof.cellgroups, NC)
+        return self._cellwise[k]
+
+    def _group_projectors(self, idx, loc):
+        """
+        @brief 一组顶点数相同的单元上的投影矩阵 PI1, C 和 PI0
+        """
+        PI1 = self._group_PI1(self.G, self.B, idx, loc)
+        C = self._group_C(self.H, PI1, idx, loc)
+        return PI1, C, self._group_PI0(self.H, C, idx)
+
+    def _group_PI1(self, G, B, idx, loc):
+        """
+        @brief 一组顶点数相同的单元上的投影矩阵 PI1, 形状为 (nc, smldof, ldof)
+        """
+        BB = np.transpose(B[:, loc], (1, 0, 2))
+        if self.p == 1:
+            return BB
         else:
-            BB = np.hsplit(B, cell2dofLocation[1:-1])
-            g = lambda x: inv(x[0])@x[1]
-            return list(map(g, zip(G, BB)))
+            return inv(G[idx])@BB
+
+    def _group_C(self, H, PI1, idx, loc):
+        p = self.p
+        C = H[idx]@PI1
+        if p > 1:
+            idof = (p-1)*p//2
+            NV = (loc.shape[1] - idof)//p
+            C[:, :idof, :] = 0
+            C[:, :idof, p*NV:] = self.smspace.cellmeasure[idx].reshape(-1, 1, 1)*np.eye(idof)
+        return C
 
+    def _group_PI0(self, H, C, idx):
+        return inv(H[idx])@C
@@ -16,7 +16,7 @@ class Function(np.ndarray):
     >> from fealpy.functionspace import 
     """
     def __new__(cls, space, dim=None, array=None, coordtype=None,
-            dtype=np.float64):
+            dtype=None):
         if array is None:
             self = space.array(dim=dim, dtype=dtype).view(cls)
         else:
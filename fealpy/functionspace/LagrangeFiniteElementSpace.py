@@ -15,6 +15,13 @@ from .femdof import multi_index_matrix
 from .femdof import CPLFEMDof1d, CPLFEMDof2d, CPLFEMDof3d
 from .femdof import DPLFEMDof1d, DPLFEMDof2d, DPLFEMDof3d
 
+from .lagrange_reference_tensor import lagrange_reference_tensors
+from .colored_assembly import ColoredAssembler
+
+from ..mesh.core import tabulate_lagrange_shape_function
+from ..mesh.core import tabulate_lagrange_grad_shape_function
+from ..mesh.coloring import mesh_cell_coloring
+
 from ..quadrature import FEMeshIntegralAlg
 from ..decorator import timer
 
@@ -25,8 +32,16 @@ class LagrangeFiniteElementSpace():
     * 区间网格(1d)
     * 三角形网格(2d)
     * 四面体网格(3d)
+
+    浮点类型 ftype 默认和网格相同, 可以单独设为 np.float32 以节省内存和带宽,
+    此时函数, 单元矩阵和整体矩阵都用 ftype 存储, 数值积分和向整体向量的
+    累加用 float64 计算.
+
+    给定线程数 nthreads 时, 单元矩阵和单元向量按网格的单元着色分组, 用
+    `ColoredAssembler` 多线程地累加到整体矩阵和整体向量中.
     """
-    def __init__(self, mesh, p=1, spacetype='C', q=None, dof=None):
+    def __init__(self, mesh, p=1, spacetype='C', q=None, dof=None, ftype=None,
+            nthreads=None):
         self.mesh = mesh
         self.cellmeasure = mesh.entity_measure('cell')
         self.p = p
@@ -81,7 +96,9 @@ class LagrangeFiniteElementSpace():
 
         self.spacetype = spacetype
         self.itype = mesh.itype
-        self.ftype = mesh.ftype
+        self.ftype = mesh.ftype if ftype is None else np.dtype(ftype)
+        self.nthreads = nthreads
+        self._assembler = None
 
         q = q if q is not None else p+3 
         self.integralalg = FEMeshIntegralAlg(
@@ -386,38 +403,7 @@ class LagrangeFiniteElementSpace():
             bcs[idx, ..., nmap[lidx]] = bc[..., 1]
             bcs[idx, ..., pmap[lidx]] = bc[..., 0]
 
-        p = self.p   # the degree of polynomial basis function
-        TD = self.TD
-
-        multiIndex = self.multi_index_matrix[TD](p)
-
-        c = np.arange(1, p+1, dtype=self.itype)
-        P = 1.0/np.multiply.accumulate(c)
-
-        t = np.arange(0, p)
-        shape = bcs.shape[:-1]+(p+1, TD+1)
-        A = np.ones(shape, dtype=self.ftype)
-        A[..., 1:, :] = p*bcs[..., np.newaxis, :] - t.reshape(-1, 1)
-
-        FF = np.einsum('...jk, m->...kjm', A[..., 1:, :], np.ones(p))
-        FF[..., range(p), range(p)] = p
-        np.cumprod(FF, axis=-2, out=FF)
-        F = np.zeros(shape, dtype=self.ftype)
-        F[..., 1:, :] = np.sum(np.tril(FF), axis=-1).swapaxes(-1, -2)
-        F[..., 1:, :] *= P.reshape(-1, 1)
-
-        np.cumprod(A, axis=-2, out=A)
-        A[..., 1:, :] *= P.reshape(-1, 1)
-
-        Q = A[..., multiIndex, range(TD+1)]
-        M = F[..., multiIndex, range(TD+1)]
-        ldof = self.number_of_local_dofs()
-        shape = bcs.shape[:-1]+(ldof, TD+1)
-        R = np.zeros(shape, dtype=self.ftype)
-        for i in range(TD+1):
-            idx = list(range(TD+1))
-            idx.remove(i)
-            R[..., i] = M[..., i]*np.prod(Q[..., idx], axis=-1)
+        R = tabulate_lagrange_grad_shape_function(bcs, self.p)
 
         Dlambda = self.mesh.grad_lambda()
         gphi = np.einsum('k...ij, kjm->k...im', R, Dlambda[index, :, :])
@@ -428,21 +414,9 @@ class LagrangeFiniteElementSpace():
         """
         @brief 计算 face 上的基函数在给定积分点处的函数值
         """
-        p = self.p   # the degree of polynomial basis function
-        TD = bc.shape[1] - 1
-        multiIndex = self.multi_index_matrix[TD](p)
-
-        c = np.arange(1, p+1, dtype=np.int_)
-        P = 1.0/np.multiply.accumulate(c)
-        t = np.arange(0, p)
-        shape = bc.shape[:-1]+(p+1, TD+1)
-        A = np.ones(shape, dtype=self.ftype)
-        A[..., 1:, :] = p*bc[..., np.newaxis, :] - t.reshape(-1, 1)
-        np.cumprod(A, axis=-2, out=A)
-        A[..., 1:, :] *= P.reshape(-1, 1)
-        idx = np.arange(TD+1)
-        phi = np.prod(A[..., multiIndex, idx], axis=-1)
-        return phi[..., np.newaxis, :] # (..., 1, ldof)
+        bc = np.asarray(bc, dtype=self.ftype)
+        phi = tabulate_lagrange_shape_function(bc, self.p)
+        return phi[..., np.newaxis, :].copy() # (..., 1, ldof)
 
 
     @barycentric
@@ -469,25 +443,10 @@ class LagrangeFiniteElementSpace():
         if p is None:
             p = self.p
 
-        if p == 0 and self.spacetype == 'D':
-            shape = (len(bc.shape)+1)*(1, ) 
-            print('shape:', shape)
-            phi = np.ones(shape, dtype=self.ftype)
-
-        TD = bc.shape[-1] - 1 
-        multiIndex = self.multi_index_matrix[TD](p)
-
-        c = np.arange(1, p+1, dtype=np.int_)
-        P = 1.0/np.multiply.accumulate(c)
-        t = np.arange(0, p)
-        shape = bc.shape[:-1]+(p+1, TD+1)
-        A = np.ones(shape, dtype=self.ftype)
-        A[..., 1:, :] = p*bc[..., np.newaxis, :] - t.reshape(-1, 1)
-        np.cumprod(A, axis=-2, out=A)
-        A[..., 1:, :] *= P.reshape(-1, 1)
-        idx = np.arange(TD+1)
-        phi = np.prod(A[..., multiIndex, idx], axis=-1)
-        return phi[..., np.newaxis, :] # (..., 1, ldof)
+        bc = np.asarray(bc, dtype=self.ftype)
+        phi = tabulate_lagrange_shape_function(bc, p)
+        # 缓存的表格是只读的, 返回给调用者的是可写的副本
+        return phi[..., np.newaxis, :].copy() # (..., 1, ldof)
 
     @barycentric
     def grad_basis(self, bc, index=np.s_[:], p=None):
@@ -515,40 +474,15 @@ class LagrangeFiniteElementSpace():
 
         if p is None:
             p= self.p
-        TD = self.TD
-
-        multiIndex = self.multi_index_matrix[TD](p)
-
-        c = np.arange(1, p+1, dtype=self.itype)
-        P = 1.0/np.multiply.accumulate(c)
-
-        t = np.arange(0, p)
-        shape = bc.shape[:-1]+(p+1, TD+1)
-        A = np.ones(shape, dtype=self.ftype)
-        A[..., 1:, :] = p*bc[..., np.newaxis, :] - t.reshape(-1, 1)
-
-        FF = np.einsum('...jk, m->...kjm', A[..., 1:, :], np.ones(p))
-        FF[..., range(p), range(p)] = p
-        np.cumprod(FF, axis=-2, out=FF)
-        F = np.zeros(shape, dtype=self.ftype)
-        F[..., 1:, :] = np.sum(np.tril(FF), axis=-1).swapaxes(-1, -2)
-        F[..., 1:, :] *= P.reshape(-1, 1)
 
-        np.cumprod(A, axis=-2, out=A)
-        A[..., 1:, :] *= P.reshape(-1, 1)
+        bc = np.asarray(bc, dtype=self.ftype)
+        R = tabulate_lagrange_grad_shape_function(bc, p) # (..., ldof, TD+1)
+        Dlambda = self.mesh.grad_lambda()[index] # (NC, TD+1, GD)
 
-        Q = A[..., multiIndex, range(TD+1)]
-        M = F[..., multiIndex, range(TD+1)]
-        ldof = self.number_of_local_dofs()
-        shape = bc.shape[:-1]+(ldof, TD+1)
-        R = np.zeros(shape, dtype=self.ftype)
-        for i in range(TD+1):
-            idx = list(range(TD+1))
-            idx.remove(i)
-            R[..., i] = M[..., i]*np.prod(Q[..., idx], axis=-1)
-
-        Dlambda = self.mesh.grad_lambda()
-        gphi = np.einsum('...ij, kjm->...kim', R, Dlambda[index,:,:])
+        # 一次批量的矩阵乘法, 直接写到预先分配的数组中
+        shape = bc.shape[:-1] + (len(Dlambda), R.shape[-2], Dlambda.shape[-1])
+        gphi = np.empty(shape, dtype=self.ftype)
+        np.matmul(R[..., np.newaxis, :, :], Dlambda, out=gphi)
         return gphi #(..., NC, ldof, GD)
 
     @barycentric
@@ -578,6 +512,84 @@ class LagrangeFiniteElementSpace():
         val = np.einsum(s1, gphi, uh[cell2dof[index]])
         return val
 
+    def gather_fields(self, uhs, etype='cell', index=np.s_[:]):
+        """
+        @brief 一次取出多个有限元函数在每个实体上的自由度值
+
+        @param[in] uhs 同一个空间中的有限元函数的列表 (每个的形状为 (gdof, )
+                   或 (gdof, ...)), 或者一个形状为 (gdof, ...) 的数组
+
+        @return (NE, ldof, m) 的数组, m 为所有函数的分量个数之和
+        """
+        gdof = self.number_of_global_dofs()
+        if isinstance(uhs, (list, tuple)):
+            U = np.concatenate([np.asarray(u).reshape(gdof, -1) for u in uhs], axis=1)
+        else:
+            U = np.asarray(uhs).reshape(gdof, -1)
+        e2d = self.dof.entity_to_dof(etype=etype, index=index)
+        return U[e2d]
+
+    def split_fields(self, uhs, val, tail=()):
+        """
+        @brief 把 (..., NE, m, *tail) 的批量计算结果按函数拆开, 每个函数的结果和
+               单独计算时的形状相同
+        """
+        shape = val.shape[:-len(tail)-1] if len(tail) > 0 else val.shape[:-1]
+        if not isinstance(uhs, (list, tuple)):
+            return val.reshape(shape + np.shape(uhs)[1:] + tail)
+        vals = []
+        start = 0
+        for u in uhs:
+            n = int(np.prod(np.shape(u)[1:], dtype=np.int_))
+            v = val[..., start:start+n, :] if len(tail) > 0 else val[..., start:start+n]
+            vals.append(v.reshape(shape + np.shape(u)[1:] + tail))
+            start += n
+        return vals
+
+    @barycentric
+    def batch_value(self, uhs, bc, index=np.s_[:]):
+        """
+        @brief 同一个空间中的多个有限元函数在同一组重心坐标点上的值
+
+        所有函数的单元自由度值只取一次, 和缓存的基函数表格做一次矩阵乘法,
+        不需要对每个函数重复计算基函数和 uh[cell2dof].
+
+        @param[in] uhs 有限元函数的列表, 或者形状为 (gdof, ...) 的数组
+        @param[in] bc 重心坐标, 形状为 (..., TD+1), TD 可以小于单元的维数
+
+        @return uhs 为列表时返回每个函数的值的列表, 每个和 value(uh, bc) 的
+                形状相同; 否则返回 (..., NE, ...) 的数组
+
+        Examples
+        --------
+        >> p, s = space.batch_value([ph, sh], bcs) # (NQ, NC), (NQ, NC)
+        """
+        bc = np.asarray(bc, dtype=self.ftype)
+        TD = bc.shape[-1] - 1
+        phi = tabulate_lagrange_shape_function(bc, self.p) # (..., ldof)
+        Ue = self.gather_fields(uhs, etype=TD, index=index) # (NE, ldof, m)
+        val = np.tensordot(phi, Ue, axes=(-1, 1)) # (..., NE, m)
+        return self.split_fields(uhs, val)
+
+    @barycentric
+    def batch_grad_value(self, uhs, bc, index=np.s_[:]):
+        """
+        @brief 同一个空间中的多个有限元函数在同一组重心坐标点上的梯度
+
+        先把形函数对重心坐标的导数和所有函数的单元自由度值做一次矩阵乘法,
+        再乘以重心坐标的梯度, 不需要构造 (NQ, NC, ldof, GD) 的基函数梯度数组.
+
+        @return uhs 为列表时返回每个函数的梯度的列表, 每个和 grad_value(uh, bc)
+                的形状相同; 否则返回 (..., NC, ..., GD) 的数组
+        """
+        bc = np.asarray(bc, dtype=self.ftype)
+        R = tabulate_lagrange_grad_shape_function(bc, self.p) # (..., ldof, TD+1)
+        Ue = self.gather_fields(uhs, index=index) # (NC, ldof, m)
+        Dlambda = self.mesh.grad_lambda()[index] # (NC, TD+1, GD)
+        T = np.tensordot(R, Ue, axes=(-2, 1)) # (..., TD+1, NC, m)
+        val = np.matmul(np.moveaxis(T, -3, -1), Dlambda) # (..., NC, m, GD)
+        return self.split_fields(uhs, val, tail=(val.shape[-1], ))
+
     @barycentric
     def div_value(self, uh, bc, index=np.s_[:]):
         dim = len(uh.shape)
@@ -608,9 +620,11 @@ class LagrangeFiniteElementSpace():
                 uI = u(bcs)
 
         if dtype is None:
-            return self.function(dim=dim, array=uI, dtype=uI.dtype)
-        else:
-            return self.function(dim=dim, array=uI, dtype=dtype)
+            # 和空间的浮点类型一致, 复值函数取对应精度的复数类型
+            dtype = np.result_type(self.ftype, 1j) if np.iscomplexobj(uI) else self.ftype
+        # Function 直接使用给定的数组, 类型要在这里转换
+        uI = np.asarray(uI, dtype=dtype)
+        return self.function(dim=dim, array=uI, dtype=dtype)
 
     def linear_interpolation_matrix(self):
         """
@@ -680,11 +694,12 @@ class LagrangeFiniteElementSpace():
             pass
         return uh
 
-    def function(self, dim=None, array=None, dtype=np.float64):
+    def function(self, dim=None, array=None, dtype=None):
         return Function(self, dim=dim, array=array, 
                 coordtype='barycentric', dtype=dtype)
 
-    def array(self, dim=None, dtype=np.float64):
+    def array(self, dim=None, dtype=None):
+        dtype = self.ftype if dtype is None else dtype
         gdof = self.number_of_global_dofs()
         if dim in {None, 1}:
             shape = gdof
@@ -881,7 +896,8 @@ class LagrangeFiniteElementSpace():
         cellmeasure = self.cellmeasure
         for k, (i, j) in enumerate(idx):
             Aij = np.einsum('i, ijm, ijn, j->jmn', ws, grad[..., i], grad[..., j], cellmeasure)
-            A.append(csr_matrix((Aij.flat, (I.flat, J.flat)), shape=(gdof, gdof)))
+            A.append(csr_matrix((Aij.flat, (I.flat, J.flat)), shape=(gdof, gdof),
+                dtype=self.ftype))
 
         T = csr_matrix((gdof, gdof), dtype=self.ftype)
         D = csr_matrix((gdof, gdof), dtype=self.ftype)
@@ -899,9 +915,9 @@ class LagrangeFiniteElementSpace():
                     C[i][j] = lam*A[imap[(i, j)]] + mu*A[imap[(i, j)]].T
                     C[j][i] = C[i][j].T
         if format == 'csr':
-            return bmat(C, format='csr') # format = bsr ??
+            return bmat(C, format='csr', dtype=self.ftype) # format = bsr ??
         elif format == 'bsr':
-            return bmat(C, format='bsr')
+            return bmat(C, format='bsr', dtype=self.ftype)
         elif format == 'list':
             return C
 
@@ -1000,14 +1016,120 @@ class LagrangeFiniteElementSpace():
         b = self.integralalg.construct_vector_s_s(f, self.basis, cell2dof, gdof=gdof) 
         return b
 
-    def stiff_matrix(self, c=None, q=None, isDDof=None):
+    def is_affine_simplex(self):
+        """
+        @brief 网格单元是否为仿射单纯形, 此时可以用参考张量组装矩阵
+        """
+        return (self.mesh.meshtype in {'interval', 'tri', 'tet', 'halfedge2d'}) \
+                and (self.p > 0)
+
+    def piecewise_constant_coefficient(self, c):
+        """
+        @brief 把常数或者分片常数的系数整理成逐单元的形式
+
+        @param[in] c None, 标量, 形状为 (GD, GD), (NC, ) 或者 (NC, GD, GD) 的数组
+
+        @return 逐单元的系数, 形状为 (NC, ) 或者 (NC, GD, GD), c 不是这几种
+            形式时返回 None
+        """
+        NC = self.mesh.number_of_cells()
+        GD = self.GD
+        if c is None:
+            return np.ones(NC, dtype=self.ftype)
+        elif isinstance(c, (int, float)):
+            return np.full(NC, c, dtype=self.ftype)
+        elif isinstance(c, np.ndarray):
+            if c.shape == (GD, GD):
+                return np.broadcast_to(c, (NC, GD, GD))
+            elif c.shape in {(NC, ), (NC, GD, GD)}:
+                return c
+        return None
+
+    def reference_stiff_matrix(self, c=None):
+        """
+        @brief 用参考刚度张量计算单元刚度矩阵, 不需要数值积分
+
+        @param[in] c 常数或分片常数的系数, 见 `piecewise_constant_coefficient`
+
+        @return 形状为 (NC, ldof, ldof) 的单元矩阵, 不能用参考张量时返回 None
+        """
+        c = self.piecewise_constant_coefficient(c)
+        if (c is None) or (not self.is_affine_simplex()):
+            return None
+        _, S = lagrange_reference_tensors(self.p, self.TD)
+
+        Dlambda = self.mesh.grad_lambda() # (NC, TD+1, GD)
+        if len(c.shape) == 1:
+            G = np.einsum('cid, cjd, c->cij', Dlambda, Dlambda, c*self.cellmeasure)
+        else:
+            # 和数值积分的路径一致, 计算的是 (c grad phi_k) . grad phi_m
+            G = np.einsum('cid, ced, cje, c->cij', Dlambda, c, Dlambda,
+                    self.cellmeasure, optimize=True)
+        NC = len(G)
+        ldof = S.shape[0]
+        M = G.reshape(NC, -1)@S.reshape(ldof*ldof, -1).T
+        return M.reshape(NC, ldof, ldof).astype(self.ftype, copy=False)
+
+    def reference_mass_matrix(self, c=None):
+        """
+        @brief 用参考质量张量计算单元质量矩阵, 不需要数值积分
+
+        @param[in] c 常数或分片常数的标量系数
+
+        @return 形状为 (NC, ldof, ldof) 的单元矩阵, 不能用参考张量时返回 None
+        """
+        c = self.piecewise_constant_coefficient(c)
+        if (c is None) or (len(c.shape) != 1) or (not self.is_affine_simplex()):
+            return None
+        M, _ = lagrange_reference_tensors(self.p, self.TD)
+        return np.einsum('c, km->ckm', c*self.cellmeasure, M).astype(self.ftype, copy=False)
+
+    def colored_assembler(self):
+        """
+        @brief 基于网格单元着色的多线程组装器, 缓存到 cell2dof 改变为止
+        """
+        cell2dof = self.dof.cell2dof
+        if self._assembler is None or self._assembler.cell2dof is not cell2dof:
+            gdof = self.number_of_global_dofs()
+            groups = mesh_cell_coloring(self.mesh)
+            self._assembler = ColoredAssembler(cell2dof, gdof, groups=groups,
+                    nthreads=self.nthreads)
+        self._assembler.nthreads = self.nthreads
+        return self._assembler
+
+    def assemble_cell_matrix(self, M):
+        """
+        @brief 把单元矩阵组装成整体矩阵
+        """
+        if self.nthreads is not None:
+            return self.colored_assembler().assemble_matrix(M, dtype=self.ftype)
+
         gdof = self.number_of_global_dofs()
         cell2dof = self.cell_to_dof()
-        b0 = (self.grad_basis, cell2dof, gdof)
-        A = self.integralalg.serial_construct_matrix(b0, c=c, q=q)
+        I = np.broadcast_to(cell2dof[:, :, None], shape=M.shape)
+        J = np.broadcast_to(cell2dof[:, None, :], shape=M.shape)
+        return csr_matrix((M.flat, (I.flat, J.flat)), shape=(gdof, gdof),
+                dtype=self.ftype)
+
+    def stiff_matrix(self, c=None, q=None, isDDof=None):
+        """
+        @brief 刚度矩阵
+
+        仿射单纯形网格上系数为常数或分片常数时, 用参考张量精确地计算单元
+        矩阵, 此时 q 不起作用; 其它情形用数值积分.
+        """
+        M = self.reference_stiff_matrix(c)
+        if M is not None:
+            A = self.assemble_cell_matrix(M)
+        else:
+            gdof = self.number_of_global_dofs()
+            cell2dof = self.cell_to_dof()
+            b0 = (self.grad_basis, cell2dof, gdof)
+            A = self.integralalg.serial_construct_matrix(b0, c=c, q=q)
+            A = A.astype(self.ftype, copy=False)
 
         if isDDof is not None: # 处理 D 氏边界条件
-            bdIdx = np.zeros(A.shape[0], dtype=np.int_)
+            bdIdx = np.zeros(A.shape[0], dtype=A.dtype)
             bdIdx[isDDof] = 1
             Tbd = spdiags(bdIdx, 0, A.shape[0], A.shape[0])
             T = spdiags(1-bdIdx, 0, A.shape[0], A.shape[0])
@@ -1017,12 +1139,19 @@ class LagrangeFiniteElementSpace():
         return A 
 
     def mass_matrix(self, c=None, q=None):
+        """
+        @brief 质量矩阵, 参考张量的使用条件同 `stiff_matrix`
+        """
+        M = self.reference_mass_matrix(c)
+        if M is not None:
+            return self.assemble_cell_matrix(M)
+
         gdof = self.number_of_global_dofs()
         cell2dof = self.cell_to_dof()
         b0 = (self.basis, cell2dof, gdof)
         A = self.integralalg.serial_construct_matrix(b0, c=c, q=q)
         #A.eliminate_zeros()
-        return A 
+        return A.astype(self.ftype, copy=False)
 
     def div_matrix(self, pspace, q=None):
         """
@@ -1187,16 +1316,23 @@ class LagrangeFiniteElementSpace():
                         ws, fval, phi, self.cellmeasure)
             cell2dof = self.cell_to_dof() #(NC, ldof)
 
+            # 在 float64 中累加, 最后转为 ftype
             shape = gdof if dim is None else (gdof, dim)
-            b = np.zeros(shape, dtype=bb.dtype)
-            if dim is None:
-                np.add.at(b, cell2dof, bb)
+            dtype = np.promote_types(bb.dtype, np.float64)
+            if self.nthreads is not None:
+                b = self.colored_assembler().assemble_vector(bb, dtype=dtype)
             else:
-                np.add.at(b, (cell2dof, np.s_[:]), bb)
+                b = np.zeros(shape, dtype=dtype)
+                if dim is None:
+                    np.add.at(b, cell2dof, bb)
+                else:
+                    np.add.at(b, (cell2dof, np.s_[:]), bb)
         else:
             b = np.einsum('i, ik..., k->k...', ws, fval, cellmeasure)
 
-        return b
+        if np.iscomplexobj(b):
+            return b
+        return b.astype(self.ftype, copy=False)
 
 
     def grad_component_matrix(self):
@@ -6,6 +6,7 @@ from .Function import Function
 from ..quadrature import GaussLegendreQuadrature
 from ..quadrature import PolygonMeshIntegralAlg
 from .ScaledMonomialSpace2d import ScaledMonomialSpace2d
+from ..common import RaggedArray, stack_by_group, split_by_group
 
 class NCVEMDof2d():
     """
@@ -15,6 +16,9 @@ class NCVEMDof2d():
         self.p = p
         self.mesh = mesh
         self.cell2dof, self.cell2dofLocation = self.cell_to_dof()
+        self.cell2dofArray = RaggedArray(self.cell2dof, self.cell2dofLocation)
+        # 局部自由度个数只依赖于多边形的边数, 按它分组后可以批量计算
+        self.cellgroups = self.cell2dofArray.buckets()
 
     def boundary_dof(self, threshold=None):
         idx = self.mesh.ds.boundary_edge_index()
@@ -49,7 +53,9 @@ class NCVEMDof2d():
         cell, cellLocation = mesh.entity('cell')
 
         if p == 1:
-            cell2edge, _ = mesh.ds.cell_to_edge(return_sparse=False)
+            cell2edge = mesh.ds.cell_to_edge(return_sparse=False)
+            if isinstance(cell2edge, tuple): # HalfEdgeMesh2d 同时返回 cellLocation
+                cell2edge = cell2edge[0]
             return cell2edge, cellLocation
         else:
             NC = mesh.number_of_cells()
@@ -129,109 +135,99 @@ class NonConformingVirtualElementSpace2d():
         self.B = self.matrix_B()
         self.G = self.matrix_G(self.B, self.D)
 
-        self.PI1 = self.matrix_PI_1(self.G, self.B)
-        self.C = self.matrix_C(self.H, self.PI1)
-
-        self.PI0 = self.matrix_PI_0(self.H, self.C)
+        # 每组单元上的投影矩阵 (PI1, C, PI0) 只计算一次, 逐个单元的列表
+        # PI1, C, PI0 在第一次用到时才由它们拆出
+        self.projectors = [self._group_projectors(idx, loc)
+                for idx, loc in self.dof.cellgroups]
+        self._cellwise = {}
 
     def project_to_smspace(self, uh):
         """
         Project a non conforming vem function uh into polynomial space.
         """
-        p = self.p
-        cell2dof = self.dof.cell2dof
-        cell2dofLocation = self.dof.cell2dofLocation
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-        g = lambda x: x[0]@uh[x[1]]
-        S = self.smspace.function()
-        S[:] = np.concatenate(list(map(g, zip(self.PI1, cd))))
-        return S
+        return self._project(uh, L2=False)
 
     def project_to_smspace_L2(self, uh):
         """
         Project a non conforming vem function uh into polynomial space.
         """
-        p = self.p
+        return self._project(uh, L2=True)
+
+    def _project(self, uh, L2=False):
+        NC = self.mesh.number_of_cells()
+        smldof = self.smspace.number_of_local_dofs()
         cell2dof = self.dof.cell2dof
-        cell2dofLocation = self.dof.cell2dofLocation
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-        g = lambda x: x[0]@uh[x[1]]
+        val = np.zeros((NC, smldof), dtype=np.float)
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            PI = PI0 if L2 else PI1
+            val[idx] = np.einsum('ijk, ik->ij', PI, uh[cell2dof[loc]])
         S = self.smspace.function()
-        S[:] = np.concatenate(list(map(g, zip(self.PI0, cd))))
+        S[:] = val.reshape(-1)
         return S
 
     def stiff_matrix(self):
-        p = self.p
-        G = self.G
+        """
+        @brief 刚度矩阵, 边数相同的单元上的局部矩阵批量计算, 最后一次组装
+        """
         D = self.D
-        PI1 = self.PI1
-
-        cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
-
-        DD = np.vsplit(D, cell2dofLocation[1:-1])
-
-        def f(x):
-            x[0, :] = 0
-            return x
-
-        tG = list(map(f, G))
 
-        f1 = lambda x: x[1].T@x[2]@x[1] + (np.eye(x[1].shape[1]) - x[0]@x[1]).T@(np.eye(x[1].shape[1]) - x[0]@x[1])
-        K = list(map(f1, zip(DD, PI1, tG)))
-
-        f2 = lambda x: np.repeat(x, x.shape[0])
-        f3 = lambda x: np.tile(x, x.shape[0])
-        f4 = lambda x: x.flatten()
-
-        I = np.concatenate(list(map(f2, cd)))
-        J = np.concatenate(list(map(f3, cd)))
-        val = np.concatenate(list(map(f4, K)))
-        gdof = self.number_of_global_dofs()
-        A = csr_matrix((val, (I, J)), shape=(gdof, gdof), dtype=np.float)
-        return A
+        K = []
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            tG = self.G[idx].copy()
+            tG[:, 0, :] = 0
+            M = np.eye(PI1.shape[-1]) - D[loc]@PI1
+            val = np.swapaxes(PI1, -1, -2)@tG@PI1 + np.swapaxes(M, -1, -2)@M
+            K.append(val)
+        return self._assemble(K)
 
     def mass_matrix(self):
-        p = self.p
-
-        # the projector matrix
+        area = self.smspace.cellmeasure
         D = self.D
         H = self.H
-        C = self.C
 
-        # the dof arrays
-        cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
-        cd = np.hsplit(cell2dof, cell2dofLocation[1:-1])
+        K = []
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            PIS = D[loc]@PI0
+            M = np.eye(PIS.shape[-1]) - PIS
+            val = np.swapaxes(PI0, -1, -2)@H[idx]@PI0 + \
+                    area[idx].reshape(-1, 1, 1)*(np.swapaxes(M, -1, -2)@M)
+            K.append(val)
+        return self._assemble(K)
 
-        f1 = lambda x: x[0]@x[1]
-        PI0 = self.PI0
-        DD = np.vsplit(D, cell2dofLocation[1:-1])
-        PIS = list(map(f1, zip(DD, PI0)))
-
-        f1 = lambda x: x[0].T@x[1]@x[0] + x[3]*(np.eye(x[2].shape[1]) - x[2]).T@(np.eye(x[2].shape[1]) - x[2])
-        K = list(map(f1, zip(PI0, H, PIS, self.smspace.cellmeasure)))
-
-        f2 = lambda x: np.repeat(x, x.shape[0])
-        f3 = lambda x: np.tile(x, x.shape[0])
-        f4 = lambda x: x.flatten()
+    def _assemble(self, K):
+        """
+        @brief 把每组单元上批量计算的局部矩阵一次性组装成全局稀疏矩阵
 
-        I = np.concatenate(list(map(f2, cd)))
-        J = np.concatenate(list(map(f3, cd)))
-        val = np.concatenate(list(map(f4, K)))
+        @param[in] K 列表, 和 `self.dof.cellgroups` 一一对应, 第 i 项的形状为
+            (nc, ldof, ldof)
+        """
+        cell2dof = self.dof.cell2dof
+        I = []
+        J = []
+        val = []
+        for (idx, loc), k in zip(self.dof.cellgroups, K):
+            cd = cell2dof[loc]
+            I.append(np.broadcast_to(cd[:, :, None], k.shape).reshape(-1))
+            J.append(np.broadcast_to(cd[:, None, :], k.shape).reshape(-1))
+            val.append(k.reshape(-1))
+        I = np.concatenate(I)
+        J = np.concatenate(J)
+        val = np.concatenate(val)
         gdof = self.number_of_global_dofs()
-        M = csr_matrix((val, (I, J)), shape=(gdof, gdof), dtype=np.float)
-        return M
-
+        A = csr_matrix((val, (I, J)), shape=(gdof, gdof), dtype=np.float)
+        return A
 
     def source_vector(self, f):
         phi = self.smspace.basis
         def u(x, index):
             return np.einsum('ij, ijm->ijm', f(x), phi(x, index=index))
         bb = self.integralalg.integral(u, celltype=True)
-        g = lambda x: x[0].T@x[1]
-        bb = np.concatenate(list(map(g, zip(self.PI0, bb))))
+
+        val = np.zeros(len(self.dof.cell2dof), dtype=np.float)
+        for (idx, loc), (PI1, C, PI0) in zip(self.dof.cellgroups, self.projectors):
+            val[loc] = np.einsum('ijk, ij->ik', PI0, bb[idx])
         gdof = self.number_of_global_dofs()
-        b = np.bincount(self.dof.cell2dof, weights=bb, minlength=gdof)
+        b = np.bincount(self.dof.cell2dof, weights=val, minlength=gdof)
         return b
 
     def set_dirichlet_bc(self, gD, uh, threshold=None):
@@ -456,12 +452,11 @@ class NonConformingVirtualElementSpace2d():
         return B
 
     def matrix_G(self, B, D):
-        p = self.p
-        cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
-        BB = np.hsplit(B, cell2dofLocation[1:-1])
-        DD = np.vsplit(D, cell2dofLocation[1:-1])
-        g = lambda x: x[0]@x[1]
-        G = list(map(g, zip(BB, DD)))
+        NC = self.mesh.number_of_cells()
+        smldof = self.smspace.number_of_local_dofs()
+        G = np.zeros((NC, smldof, smldof), dtype=np.float)
+        for idx, loc in self.dof.cellgroups:
+            G[idx] = np.transpose(B[:, loc], (1, 0, 2))@D[loc]
         return G
 
     def matrix_G_test(self, integralalg):
@@ -474,34 +469,69 @@ class NonConformingVirtualElementSpace2d():
 
 
     def matrix_C(self, H, PI1):
-        p = self.p
-
-        smldof = self.smspace.number_of_local_dofs()
-        idof = (p-1)*p//2
-
-        mesh = self.mesh
-        cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
-        d = lambda x: x[0]@x[1]
-        C = list(map(d, zip(H, PI1)))
-        if p == 1:
-            return C
-        else:
-            NV = mesh.number_of_vertices_of_cells()
-            l = lambda x: np.r_[
-                    '0',
-                    np.r_['1', np.zeros((idof, p*x[0])), x[1]*np.eye(idof)],
-                    x[2][idof:, :]]
-            return list(map(l, zip(NV, self.smspace.cellmeasure, C)))
+        NC = self.mesh.number_of_cells()
+        groups = self.dof.cellgroups
+        C = [self._group_C(H, stack_by_group(PI1, idx), idx, loc) for idx, loc in groups]
+        return split_by_group(C, groups, NC)
 
     def matrix_PI_0(self, H, C):
-        cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
-        pi0 = lambda x: inv(x[0])@x[1]
-        return list(map(pi0, zip(H, C)))
+        NC = self.mesh.number_of_cells()
+        groups = self.dof.cellgroups
+        PI0 = [self._group_PI0(H, stack_by_group(C, idx), idx) for idx, _ in groups]
+        return split_by_group(PI0, groups, NC)
 
     def matrix_PI_1(self, G, B):
+        NC = self.mesh.number_of_cells()
+        groups = self.dof.cellgroups
+        PI1 = [self._group_PI1(G, B, idx, loc) for idx, loc in groups]
+        return split_by_group(PI1, groups, NC)
+
+    @property
+    def PI1(self):
+        return self._cellwise_projector(0)
+
+    @property
+    def C(self):
+        return self._cellwise_projector(1)
+
+    @property
+    def PI0(self):
+        return self._cellwise_projector(2)
+
+    def _cellwise_projector(self, k):
+        """
+        @brief 把分组缓存的第 k 个投影矩阵拆成逐个单元的列表
+        """
+        if k not in self._cellwise:
+            NC = self.mesh.number_of_cells()
+            vals = [P[k] for P in self.projectors]
+            self._cellwise[k] = split_by_group(vals, self.dof.cellgroups, NC)
+        return self._cellwise[k]
+
+    def _group_projectors(self, idx, loc):
+        """
+        @brief 一组边数相同的单元上的投影矩阵 PI1, C 和 PI0
+        """
+        PI1 = self._group_PI1(self.G, self.B, idx, loc)
+        C = self._group_C(self.H, PI1, idx, loc)
+        return PI1, C, self._group_PI0(self.H, C, idx)
+
+    def _group_PI1(self, G, B, idx, loc):
+        """
+        @brief 一组边数相同的单元上的投影矩阵 PI1, 形状为 (nc, smldof, ldof)
+        """
+        BB = np.transpose(B[:, loc], (1, 0, 2))
+        return inv(G[idx])@BB
+
+    def _group_C(self, H, PI1, idx, loc):
         p = self.p
-        cell2dof, cell2dofLocation = self.dof.cell2dof, self.dof.cell2dofLocation
-        BB = np.hsplit(B, cell2dofLocation[1:-1])
-        g = lambda x: inv(x[0])@x[1]
-        return list(map(g, zip(G, BB)))
+        C = H[idx]@PI1
+        if p > 1:
+            idof = (p-1)*p//2
+            NV = (loc.shape[1] - idof)//p
+            C[:, :idof, :] = 0
+            C[:, :idof, p*NV:] = self.smspace.cellmeasure[idx].reshape(-1, 1, 1)*np.eye(idof)
+        return C
 
+    def _group_PI0(self, H, C, idx):
+        return inv(H[idx])@C
@@ -273,7 +273,21 @@ class ParametricLagrangeFiniteElementSpace:
 
         这里默认 NC 远大于 GD 和 NQ
         """
+        M = self.cell_mass_matrix(c=c, q=q) # (NC, ldof, ldof)
 
+        cell2dof = self.cell_to_dof() # (NC, ldof)
+        I = np.broadcast_to(cell2dof[:, :, None], shape=M.shape) # (NC, ldof, ldof)
+        J = np.broadcast_to(cell2dof[:, None, :], shape=M.shape) # (NC, ldof, ldof)
+
+        # 组装总矩阵
+        gdof = self.number_of_global_dofs()
+        M = csr_matrix((M.flat, (I.flat, J.flat)), shape=(gdof, gdof))
+        return M 
+
+    def cell_mass_matrix(self, c=None, q=None):
+        """
+        @brief 单元质量矩阵, (NC, ldof, ldof), c 的含义和 `mass_matrix` 相同
+        """
         # 积分公式
         qf = self.integralalg.integrator if q is None else self.mesh.integrator(q, etype='cell')
         # bcs : (NQ, ...)
@@ -311,15 +325,7 @@ class ParametricLagrangeFiniteElementSpace:
                     raise ValueError("I can not deal with c.shape!")
             else:
                 raise ValueError("c is not callable, and is not int, float, or np.ndarray")
-
-        cell2dof = self.cell_to_dof() # (NC, ldof)
-        I = np.broadcast_to(cell2dof[:, :, None], shape=M.shape) # (NC, ldof, ldof)
-        J = np.broadcast_to(cell2dof[:, None, :], shape=M.shape) # (NC, ldof, ldof)
-
-        # 组装总矩阵
-        gdof = self.number_of_global_dofs()
-        M = csr_matrix((M.flat, (I.flat, J.flat)), shape=(gdof, gdof))
-        return M 
+        return M
 
     def convection_matrix(self, c=None, q=None):
         gdof = self.number_of_global_dofs()
@@ -7,6 +7,7 @@ from .Function import Function
 
 from ..quadrature import FEMeshIntegralAlg
 from ..decorator import timer
+from .boundary_form import BoundaryFormAssembler
 
 
 class ParametricLagrangeFiniteElementSpaceOnWedgeMesh:
@@ -502,21 +503,24 @@ class ParametricLagrangeFiniteElementSpaceOnWedgeMesh:
         A, F = self.set_tri_boundary_robin_bc(gR, A, F, threshold=threshold, q=q)
         return A, F
 
-    def set_tri_boundary_robin_bc(self, gR, A, F, threshold=None, q=None):
+    def tri_boundary_form_assembler(self, threshold=None, q=None, shape=None):
         """
 
         Notes
         -----
 
-        设置 Robin 边界条件到离散系统 Ax = b 中.
+        三角形边界面上的 `BoundaryFormAssembler`. 积分点, 基函数, 面积, 法向
+        和稀疏结构只计算一次, 适合在 Newton 或 Picard 迭代中反复组装系数依赖
+        于解的 (非线性) Robin 边界项.
 
-        TODO: 考虑更多的 gR 的情况
+        shape 为矩阵的形状, 默认为 (gdof, gdof). 边界面上的自由度编号都小于
+        n 时, 可以取 (n, n) 直接组装到整体矩阵的左上角子块上.
 
+        基函数取空间的次数 p, 和 tri_face_to_dof 对应, 而不是网格的次数.
         """
         p = self.p
         mesh = self.mesh
-        dim = 1 if len(F.shape) == 1 else F.shape[1]
-        
+
         if type(threshold) is np.ndarray:
             index = threshold
         else:
@@ -536,24 +540,41 @@ class ParametricLagrangeFiniteElementSpaceOnWedgeMesh:
 
         measure = mesh.boundary_tri_face_area(index=index)
 
-        phi = self.face_basis(bcs)
+        phi = self.basis(bcs)
         pp = mesh.bc_to_point(bcs, etype='face', ftype='tri', index=index)
         n = mesh.boundary_tri_face_unit_normal(bcs, index=index)
 
-        val, kappa = gR(pp, n) # (NQ, NF, ...)
+        if shape is None:
+            gdof = self.number_of_global_dofs()
+            shape = (gdof, gdof)
+        return BoundaryFormAssembler(face2dof, phi, ws, measure, shape, pp=pp, n=n)
 
-        bb = np.einsum('m, mi..., mik, i->ik...', ws, val, phi, measure)
+    def set_tri_boundary_robin_bc(self, gR, A, F, threshold=None, q=None):
+        """
+
+        Notes
+        -----
+
+        设置 Robin 边界条件到离散系统 Ax = b 中.
+
+        TODO: 考虑更多的 gR 的情况
+
+        """
+        dim = 1 if len(F.shape) == 1 else F.shape[1]
+
+        assembler = self.tri_boundary_form_assembler(threshold=threshold, q=q,
+                shape=A.shape)
+        face2dof = assembler.face2dof
+
+        val, kappa = gR(assembler.pp, assembler.n) # (NQ, NF, ...)
+
+        bb = np.einsum('mi, mi..., mik->ik...', assembler.wm, val, assembler.phi)
         if dim == 1:
             np.add.at(F, face2dof, bb)
         else:
             np.add.at(F, (face2dof, np.s_[:]), bb)
 
-        FM = np.einsum('m, mi, mij, mik, i->ijk', ws, kappa, phi, phi, measure)
-
-        I = np.broadcast_to(face2dof[:, :, None], shape=FM.shape)
-        J = np.broadcast_to(face2dof[:, None, :], shape=FM.shape)
-
-        R = csr_matrix((FM.flat, (I.flat, J.flat)), shape=A.shape)
+        R = assembler.matrix(kappa)
         return A+R, F
 
     def set_quad_boundary_robin_bc(self, A, F, gR, threshold=None, q=None):
@@ -1,39 +1,44 @@
+from ..common.lazy_import import attach
 
-from .ScaledMonomialSpace2d import ScaledMonomialSpace2d
-from .ScaledMonomialSpace3d import ScaledMonomialSpace3d
+__getattr__, __dir__, __all__ = attach(__name__, submodules='all', submod_attrs={
+    'ScaledMonomialSpace2d': ['ScaledMonomialSpace2d'],
+    'ScaledMonomialSpace3d': ['ScaledMonomialSpace3d'],
 
-from .LagrangeFiniteElementSpace import LagrangeFiniteElementSpace
-from .BernsteinFiniteElementSpace import BernsteinFiniteElementSpace
+    'LagrangeFiniteElementSpace': ['LagrangeFiniteElementSpace'],
+    'BernsteinFiniteElementSpace': ['BernsteinFiniteElementSpace'],
+    'colored_assembly': ['ColoredAssembler'],
+    'boundary_form': ['BoundaryFormAssembler'],
 
-from .CrouzeixRaviartFiniteElementSpace import CrouzeixRaviartFiniteElementSpace
+    'CrouzeixRaviartFiniteElementSpace': ['CrouzeixRaviartFiniteElementSpace'],
 
-# H(div)
-from .RaviartThomasFiniteElementSpace2d import RaviartThomasFiniteElementSpace2d
-from .RaviartThomasFiniteElementSpace3d import RaviartThomasFiniteElementSpace3d
+    # H(div)
+    'RaviartThomasFiniteElementSpace2d': ['RaviartThomasFiniteElementSpace2d'],
+    'RaviartThomasFiniteElementSpace3d': ['RaviartThomasFiniteElementSpace3d'],
 
-# H(curl)
-from .FirstKindNedelecFiniteElementSpace2d import FirstKindNedelecFiniteElementSpace2d
-from .FirstNedelecFiniteElementSpace2d import FirstNedelecFiniteElementSpace2d
-from .FirstNedelecFiniteElementSpace3d import FirstNedelecFiniteElementSpace3d
+    # H(curl)
+    'FirstKindNedelecFiniteElementSpace2d': ['FirstKindNedelecFiniteElementSpace2d'],
+    'FirstNedelecFiniteElementSpace2d': ['FirstNedelecFiniteElementSpace2d'],
+    'FirstNedelecFiniteElementSpace3d': ['FirstNedelecFiniteElementSpace3d'],
 
-from .SecondNedelecFiniteElementSpace2d import SecondNedelecFiniteElementSpace2d
-from .SecondNedelecFiniteElementSpace3d import SecondNedelecFiniteElementSpace3d
+    'SecondNedelecFiniteElementSpace2d': ['SecondNedelecFiniteElementSpace2d'],
+    'SecondNedelecFiniteElementSpace3d': ['SecondNedelecFiniteElementSpace3d'],
 
-# PFEM
-from .ParametricLagrangeFiniteElementSpace import ParametricLagrangeFiniteElementSpace
-from .ParametricLagrangeFiniteElementSpaceOnWedgeMesh import ParametricLagrangeFiniteElementSpaceOnWedgeMesh
+    # PFEM
+    'ParametricLagrangeFiniteElementSpace': ['ParametricLagrangeFiniteElementSpace'],
+    'ParametricLagrangeFiniteElementSpaceOnWedgeMesh': ['ParametricLagrangeFiniteElementSpaceOnWedgeMesh'],
 
-# VEM
-from .ConformingVirtualElementSpace2d import CVEMDof2d, ConformingVirtualElementSpace2d
-from .NonConformingVirtualElementSpace2d import NCVEMDof2d, NonConformingVirtualElementSpace2d
-from .DivFreeNonConformingVirtualElementSpace2d import DivFreeNonConformingVirtualElementSpace2d
-from .ReducedDivFreeNonConformingVirtualElementSpace2d import ReducedDivFreeNonConformingVirtualElementSpace2d
+    # VEM
+    'ConformingVirtualElementSpace2d': ['CVEMDof2d', 'ConformingVirtualElementSpace2d'],
+    'NonConformingVirtualElementSpace2d': ['NCVEMDof2d', 'NonConformingVirtualElementSpace2d'],
+    'DivFreeNonConformingVirtualElementSpace2d': ['DivFreeNonConformingVirtualElementSpace2d'],
+    'ReducedDivFreeNonConformingVirtualElementSpace2d': ['ReducedDivFreeNonConformingVirtualElementSpace2d'],
 
-# WG
-from .WeakGalerkinSpace2d import WeakGalerkinSpace2d
+    # WG
+    'WeakGalerkinSpace2d': ['WeakGalerkinSpace2d'],
 
-from .QuadBilinearFiniteElementSpace import QuadBilinearFiniteElementSpace
+    'QuadBilinearFiniteElementSpace': ['QuadBilinearFiniteElementSpace'],
 
-#from .FourierSpace import FourierSpace
-#from .SurfaceLagrangeFiniteElementSpace import SurfaceLagrangeFiniteElementSpace
-#from .SimplexSetSpace import SimplexSetSpace
+    #'FourierSpace': ['FourierSpace'],
+    #'SurfaceLagrangeFiniteElementSpace': ['SurfaceLagrangeFiniteElementSpace'],
+    #'SimplexSetSpace': ['SimplexSetSpace'],
+})
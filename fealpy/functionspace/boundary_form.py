@@ -0,0 +1,170 @@
+"""
+Notes
+-----
+
+边界面上质量型双线性形式 <c u, v> 和线性形式 <f, v> 的组装.
+
+Robin 型边界条件 (包括系数依赖于解的非线性情形, 如辐射边界条件中的
+kappa*u^3) 在 Newton 或 Picard 迭代中每一步都要重新组装. 积分点, 基函数,
+面的测度, 面到自由度的映射和稀疏结构在迭代中都不变, `BoundaryFormAssembler`
+只计算一次, 之后每一步只需要:
+
+1. 由解计算积分点上的系数 c, (NQ, NF);
+2. 一次矩阵乘积得到所有面上的单元矩阵;
+3. 一次 bincount 把它们累加到固定稀疏结构的 data 中.
+
+给出固定部分 A (如 M + dt*S) 时, 只要 A 的稀疏结构不变, 它和边界项的稀疏结构
+的并集也只计算一次, 返回的 A + R 不需要再做稀疏矩阵的加法.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ..common.sparsity import cell_sparsity_pattern, csr_structure, scatter_cell_values
+
+
+class BoundaryFormAssembler():
+    """
+    @brief 缓存边界面数据和稀疏结构的边界项组装器
+
+    Examples
+    --------
+    >> assembler = space.tri_boundary_form_assembler(threshold=index)
+    >> u = assembler.value(uh) # (NQ, NF)
+    >> R = assembler.matrix(kappa*u**3, A=A) # A + <kappa u^3 phi_j, phi_i>
+    >> b = assembler.vector(-u**4/Phi)
+    """
+    def __init__(self, face2dof, phi, ws, measure, shape, pp=None, n=None):
+        """
+        @param[in] face2dof 边界面到自由度的映射, (NF, ldof)
+        @param[in] phi 积分点上的基函数值, (NQ, NF, ldof) 或者所有面相同时
+                   为 (NQ, 1, ldof)
+        @param[in] ws 积分权重, (NQ, )
+        @param[in] measure 面的测度, (NF, )
+        @param[in] shape 整体矩阵的形状, 边界自由度的编号都小于它时可以是
+                   整体矩阵的一个子块的形状
+        @param[in] pp 积分点的坐标, (NQ, NF, GD), 给边界条件函数使用
+        @param[in] n 积分点处的单位法向, (NQ, NF, GD)
+        """
+        NQ = len(ws)
+        NF, ldof = face2dof.shape
+        self.face2dof = face2dof
+        self.phi = phi
+        self.shape = shape
+        self.pp = pp
+        self.n = n
+        self.wm = ws[:, None]*measure # (NQ, NF)
+
+        # phi_i*phi_j 只依赖于积分点时, 单元矩阵是一次 (NF, NQ)@(NQ, ldof^2) 的乘积
+        self.phiphi = np.einsum('qfi, qfj->qfij', phi, phi).reshape(NQ, -1, ldof*ldof)
+        self._pattern = None
+        self._base = None
+
+    def value(self, uh):
+        """
+        @brief 有限元函数 uh 在边界积分点上的值, (NQ, NF)
+        """
+        return np.einsum('qfi, fi->qf', self.phi, uh[self.face2dof])
+
+    def face_matrix(self, c=None):
+        """
+        @brief 每个面上的矩阵 <c phi_j, phi_i>, (NF, ldof, ldof)
+
+        @param[in] c 积分点上的系数, 标量, (NF, ) 或 (NQ, NF)
+        """
+        NF, ldof = self.face2dof.shape
+        wc = self.wm if c is None else self.wm*c
+        wc = np.broadcast_to(wc, (len(self.wm), NF))
+        if self.phiphi.shape[1] == 1:
+            FM = wc.T@self.phiphi[:, 0, :]
+        else:
+            FM = np.einsum('qf, qfk->fk', wc, self.phiphi)
+        return FM.reshape(NF, ldof, ldof)
+
+    def face_vector(self, f):
+        """
+        @brief 每个面上的向量 <f, phi_i>, (NF, ldof)
+
+        @param[in] f 积分点上的值, (NQ, NF)
+        """
+        return np.einsum('qf, qfi->fi', self.wm*f, self.phi)
+
+    def vector(self, f, out=None):
+        """
+        @brief 整体向量 <f, phi_i>, 长度为 shape[0]; 给出 out 时累加到 out 中
+        """
+        bb = self.face_vector(f)
+        b = scatter_cell_values(self.face2dof, self.shape[0], bb)
+        if out is None:
+            return b
+        out[:len(b)] += b
+        return out
+
+    def sparsity_pattern(self):
+        """
+        @brief 边界项的 CSR 结构, 以及每个面矩阵元素在 data 中的位置
+        """
+        if self._pattern is None:
+            self._pattern = cell_sparsity_pattern(self.face2dof, self.shape[0],
+                    self.face2dof, self.shape[1])
+        return self._pattern
+
+    def set_base_matrix(self, A):
+        """
+        @brief 预先计算固定矩阵 A 和边界项稀疏结构的并集, 以及两者的元素在
+               并集的 data 中的位置
+
+        @param[in] A 去掉了重复元素的 CSR 矩阵
+        """
+        if A.shape != tuple(self.shape):
+            raise ValueError("the shape of A {} is not {}!".format(A.shape, self.shape))
+        indptr, indices, pos = self.sparsity_pattern()
+        ncol = self.shape[1]
+
+        def keys(indptr, indices):
+            row = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+            return row*ncol + indices
+
+        kA = keys(A.indptr, A.indices)
+        kR = keys(indptr, indices)
+        key = np.union1d(kA, kR)
+
+        uindptr, uindices = csr_structure(key, self.shape)
+        posA = np.searchsorted(key, kA)
+        posR = np.searchsorted(key, kR)[pos] # 单元矩阵元素在并集 data 中的位置
+        self._base = (A.indptr.copy(), A.indices.copy(), posA, uindptr, uindices, posR)
+
+    def has_base_pattern(self, A):
+        """
+        @brief 判断 A 的稀疏结构是否和缓存并集时的固定矩阵相同
+        """
+        if self._base is None:
+            return False
+        indptr, indices = self._base[:2]
+        return (A.shape == tuple(self.shape)) and (len(A.indices) == len(indices)) \
+                and np.array_equal(A.indptr, indptr) \
+                and np.array_equal(A.indices, indices)
+
+    def matrix(self, c=None, A=None):
+        """
+        @brief 组装 <c phi_j, phi_i>, 给出 A 时返回 A + <c phi_j, phi_i>
+
+        A 的稀疏结构不变时 (data 可以改变), 稀疏结构的并集只计算一次.
+        """
+        FM = self.face_matrix(c)
+        if A is None:
+            indptr, indices, pos = self.sparsity_pattern()
+            data = np.bincount(pos.reshape(-1), weights=FM.reshape(-1),
+                    minlength=len(indices))
+            return csr_matrix((data, indices, indptr), shape=self.shape)
+
+        A = csr_matrix(A)
+        if not A.has_canonical_format:
+            A = A.copy()
+            A.sum_duplicates()
+        if not self.has_base_pattern(A):
+            self.set_base_matrix(A)
+        _, _, posA, indptr, indices, pos = self._base
+        data = np.bincount(pos.reshape(-1), weights=FM.reshape(-1),
+                minlength=len(indices)).astype(np.result_type(A.dtype, FM.dtype))
+        data[posA] += A.data
+        return csr_matrix((data, indices, indptr), shape=self.shape)
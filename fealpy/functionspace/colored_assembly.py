@@ -0,0 +1,97 @@
+"""
+Notes
+-----
+
+基于单元着色的多线程组装.
+
+同一种颜色的单元没有公共的自由度, 所以它们的单元矩阵和单元向量往整体
+矩阵的 `data` 数组和整体向量中累加时不会写到同一个位置, 可以不加锁地由多个
+线程同时完成. 不同颜色依次处理, 同一种颜色的单元分块后交给线程池.
+NumPy 的花式索引和累加在计算时会释放 GIL, 所以线程可以真正地并行.
+
+整体矩阵的稀疏结构 (CSR 的 indptr, indices) 和每个单元矩阵元素在 `data`
+中的位置只依赖于 cell2dof, 在第一次组装时计算并缓存, 之后的组装只需要
+把单元矩阵累加到 `data` 中.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ..mesh.coloring import cell_coloring, color_groups
+from ..common.sparsity import cell_sparsity_pattern
+
+
+class ColoredAssembler():
+    """
+    @brief 按单元颜色分组的多线程组装器
+
+    Examples
+    --------
+    >> assembler = ColoredAssembler(cell2dof, gdof, nthreads=8)
+    >> A = assembler.assemble_matrix(M) # M: (NC, ldof, ldof)
+    >> b = assembler.assemble_vector(bb) # bb: (NC, ldof) 或 (NC, ldof, dim)
+    """
+    def __init__(self, cell2dof, gdof, groups=None, nthreads=1):
+        """
+        @param[in] cell2dof 单元到自由度的映射, (NC, ldof)
+        @param[in] gdof 自由度个数
+        @param[in] groups 每种颜色的单元编号数组构成的列表, 默认用
+                   `cell_coloring` 对 cell2dof 着色
+        @param[in] nthreads 线程个数
+        """
+        self.cell2dof = cell2dof
+        self.gdof = gdof
+        self.nthreads = nthreads
+        if groups is None:
+            groups = color_groups(cell_coloring(cell2dof, gdof=gdof))
+        self.groups = groups
+        self._pattern = None
+
+    def sparsity_pattern(self):
+        """
+        @brief 整体矩阵的 CSR 结构, 以及每个单元矩阵元素在 data 中的位置
+
+        @return indptr, indices, pos, 其中 pos 的形状为 (NC, ldof, ldof)
+        """
+        if self._pattern is None:
+            self._pattern = cell_sparsity_pattern(self.cell2dof, self.gdof)
+        return self._pattern
+
+    def scatter_add(self, out, index, val):
+        """
+        @brief out[index[i]] += val[i], 颜色依次处理, 同一颜色的单元多线程处理
+
+        @param[in] out 整体数组
+        @param[in] index 每个单元的值在 out 中的位置, 第一个轴为单元
+        @param[in] val 每个单元的值, 前几个轴和 index 相同
+        """
+        def add(idx):
+            out[index[idx]] += np.take(val, idx, axis=0)
+
+        if self.nthreads == 1:
+            for idx in self.groups:
+                add(idx)
+        else:
+            with ThreadPoolExecutor(max_workers=self.nthreads) as executor:
+                for idx in self.groups:
+                    chunks = np.array_split(idx, min(self.nthreads, len(idx)))
+                    list(executor.map(add, chunks))
+        return out
+
+    def assemble_matrix(self, M, dtype=None):
+        """
+        @brief 把单元矩阵 M (NC, ldof, ldof) 组装成 CSR 格式的整体矩阵
+        """
+        indptr, indices, pos = self.sparsity_pattern()
+        data = np.zeros(len(indices), dtype=M.dtype if dtype is None else dtype)
+        self.scatter_add(data, pos, M)
+        return csr_matrix((data, indices, indptr), shape=(self.gdof, self.gdof))
+
+    def assemble_vector(self, bb, dtype=None):
+        """
+        @brief 把单元向量 bb (NC, ldof) 或 (NC, ldof, dim) 组装成整体向量
+        """
+        shape = (self.gdof, ) + bb.shape[2:]
+        b = np.zeros(shape, dtype=bb.dtype if dtype is None else dtype)
+        return self.scatter_add(b, self.cell2dof, bb)
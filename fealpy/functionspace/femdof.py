@@ -2,6 +2,8 @@ import numpy as np
 import operator as op
 from functools import reduce
 
+from ..mesh.core import index_dtype
+
 def multi_index_matrix0d(p):
     multiIndex = 1
     return multiIndex 
@@ -39,6 +41,12 @@ def multi_index_matrix3d(p):
 
 multi_index_matrix = [multi_index_matrix0d, multi_index_matrix1d, multi_index_matrix2d, multi_index_matrix3d]
 
+def dof_index_dtype(mesh, gdof):
+    """
+    @brief 自由度编号的整数类型, 至少和网格的编号类型一样宽, 并且能存下 gdof
+    """
+    return np.promote_types(getattr(mesh, 'itype', np.int_), index_dtype(gdof))
+
 
 class CPLFEMDof1d():
     def __init__(self, mesh, p):
@@ -145,6 +153,7 @@ class CPLFEMDof2d():
         self.mesh = mesh
         self.p = p
         self.multiIndex = multi_index_matrix2d(p)
+        self.itype = dof_index_dtype(mesh, self.number_of_global_dofs())
         self.cell2dof = self.cell_to_dof()
 
     def is_on_node_local_dof(self):
@@ -209,7 +218,7 @@ class CPLFEMDof2d():
         NN = mesh.number_of_nodes()
 
         edge = mesh.entity('edge')
-        edge2dof = np.zeros((NE, p+1), dtype=np.int_)
+        edge2dof = np.zeros((NE, p+1), dtype=self.itype)
         edge2dof[:, [0, -1]] = edge
         if p > 1:
             edge2dof[:, 1:-1] = NN + np.arange(NE*(p-1)).reshape(NE, p-1)
@@ -230,7 +239,7 @@ class CPLFEMDof2d():
             cell2dof = cell
 
         if p > 1:
-            cell2dof = np.zeros((NC, ldof), dtype=np.int_)
+            cell2dof = np.zeros((NC, ldof), dtype=self.itype)
 
             isEdgeDof = self.is_on_edge_local_dof()
             edge2dof = self.edge_to_dof()
@@ -318,6 +327,7 @@ class CPLFEMDof3d():
         self.p = p
         self.multiIndex = multi_index_matrix3d(p)
         self.multiIndex2d = multi_index_matrix2d(p)
+        self.itype = dof_index_dtype(mesh, self.number_of_global_dofs())
         self.cell2dof = self.cell_to_dof()
 
     def is_on_node_local_dof(self):
@@ -361,7 +371,7 @@ class CPLFEMDof3d():
 
         base = N
         edge = mesh.ds.edge
-        edge2dof = np.zeros((NE, p+1), dtype=np.int_)
+        edge2dof = np.zeros((NE, p+1), dtype=self.itype)
         edge2dof[:, [0, -1]] = edge
         if p > 1:
             edge2dof[:,1:-1] = base + np.arange(NE*(p-1)).reshape(NE, p-1)
@@ -387,7 +397,7 @@ class CPLFEMDof3d():
 
         edge2dof = self.edge_to_dof()
 
-        face2dof = np.zeros((NF, fdof), dtype=np.int_)
+        face2dof = np.zeros((NF, fdof), dtype=self.itype)
         faceIdx = self.multiIndex2d
         isEdgeDof = (faceIdx == 0)
 
@@ -459,7 +469,7 @@ class CPLFEMDof3d():
 
         cell2face = mesh.ds.cell_to_face()
 
-        cell2dof = np.zeros((NC, ldof), dtype=np.int_)
+        cell2dof = np.zeros((NC, ldof), dtype=self.itype)
 
         face2dof = self.face_to_dof()
         isFaceDof = self.is_on_face_local_dof()
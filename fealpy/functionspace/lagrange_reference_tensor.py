@@ -0,0 +1,93 @@
+"""
+Notes
+-----
+
+单纯形上拉格朗日基函数的参考张量.
+
+仿射单纯形 K 上, 拉格朗日基函数是重心坐标 lambda 的多项式, 且 grad lambda_i
+在单元上是常数, 所以
+
+    \\int_K phi_k phi_m dx = |K| M[k, m],
+    \\int_K C grad phi_k . grad phi_m dx = |K| \\sum_{i, j} S[k, m, i, j] G_K[i, j],
+
+其中 G_K[i, j] = C grad lambda_i . grad lambda_j, 而
+
+    M[k, m] = 1/|K| \\int_K phi_k phi_m dx,
+    S[k, m, i, j] = 1/|K| \\int_K (d phi_k/d lambda_i) (d phi_m/d lambda_j) dx
+
+只和次数 p 及拓扑维数 TD 有关. 这里把基函数展开成重心坐标的单项式, 用公式
+
+    1/|K| \\int_K lambda^a dx = TD! a! / (|a| + TD)!
+
+精确地计算这两个张量, 不需要数值积分.
+"""
+from math import factorial
+from functools import lru_cache, reduce
+
+import numpy as np
+
+from .femdof import multi_index_matrix
+
+
+def _univariate_coefficients(p):
+    """
+    @brief 一元多项式 \\prod_{j<a} (p x - j)/(j+1), a = 0, 1, ..., p 的系数
+
+    @return 形状为 (p+1, p+1) 的数组, 第 a 行是第 a 个多项式按升幂排列的系数
+    """
+    P = np.zeros((p+1, p+1), dtype=np.float64)
+    P[0, 0] = 1.0
+    for a in range(1, p+1):
+        # 乘以 (p x - (a-1))/a
+        P[a, 1:] = p*P[a-1, :-1]
+        P[a] -= (a-1)*P[a-1]
+        P[a] /= a
+    return P
+
+
+@lru_cache(maxsize=None)
+def lagrange_reference_tensors(p, TD):
+    """
+    @brief p 次拉格朗日元在 TD 维单纯形上的参考质量张量和参考刚度张量
+
+    @return M 形状为 (ldof, ldof), S 形状为 (ldof, ldof, TD+1, TD+1), 两者都是
+        只读的, 局部自由度的编号和 `multi_index_matrix[TD](p)` 一致
+    """
+    multiIndex = multi_index_matrix[TD](p)
+    n = TD + 1
+
+    P = _univariate_coefficients(p)
+    dP = np.zeros_like(P)
+    dP[:, :-1] = P[:, 1:]*np.arange(1, p+1)
+
+    # 基函数及其对 lambda_i 的偏导数在单项式 lambda^e 下的系数,
+    # 单项式按 np.indices((p+1, )*n) 的顺序排列, 每个变量的次数不超过 p
+    F = np.array([reduce(np.kron, P[alpha]) for alpha in multiIndex])
+    DF = []
+    for i in range(n):
+        DF.append(np.array([reduce(np.kron,
+            [dP[a] if j == i else P[a] for j, a in enumerate(alpha)])
+            for alpha in multiIndex]))
+
+    # 只保留总次数不超过 p 的单项式, 其它单项式的系数都是零
+    e = np.indices((p+1, )*n).reshape(n, -1).T
+    flag = np.sum(e, axis=-1) <= p
+    e = e[flag]
+    F = F[:, flag]
+    DF = [D[:, flag] for D in DF]
+
+    # 单项式两两乘积的平均值
+    f = np.array([factorial(k) for k in range(n*2*p + TD + 1)], dtype=np.float64)
+    d = e[:, None, :] + e[None, :, :]
+    W = factorial(TD)*np.prod(f[d], axis=-1)/f[np.sum(d, axis=-1) + TD]
+
+    M = F@W@F.T
+    S = np.zeros((len(multiIndex), )*2 + (n, n), dtype=np.float64)
+    for i in range(n):
+        DW = DF[i]@W
+        for j in range(n):
+            S[..., i, j] = DW@DF[j].T
+
+    M.setflags(write=False)
+    S.setflags(write=False)
+    return M, S
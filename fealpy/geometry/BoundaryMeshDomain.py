@@ -0,0 +1,63 @@
+import numpy as np
+
+from .sizing_function import huniform
+from .boundary_distance import BoundaryDistance
+
+
+class BoundaryMeshDomain():
+    """
+    @brief 由离散边界 (二维多边形或三维三角形曲面) 描述的区域, 用于
+           DistMesher2d 和 DistMesher3d
+
+    符号距离和投影都由 `BoundaryDistance` 精确地计算, 网格生成器不再需要用
+    差分近似符号距离函数的梯度来把点拉回边界.
+    """
+    def __init__(self, node, cell, fh=huniform, fixed=None, angle=np.pi/6):
+        """
+        @param[in] node 边界节点
+        @param[in] cell 边界上的边 (二维) 或三角形 (三维)
+        @param[in] fh 尺寸函数, 以 fh(p, domain) 的形式调用
+        @param[in] fixed 网格中的固定点, 二维时默认取转角大于 angle 的顶点
+        @param[in] angle 判断角点的转角阈值
+        """
+        self.node = np.asarray(node, dtype=np.float64)
+        self.cell = np.asarray(cell)
+        self.fh = fh
+        self.distance = BoundaryDistance(self.node, self.cell)
+
+        pmin = self.node.min(axis=0)
+        pmax = self.node.max(axis=0)
+        m = (pmax - pmin)/10
+        self.box = np.c_[pmin - m, pmax + m].flatten().tolist()
+
+        GD = self.node.shape[1]
+        if fixed is None and GD == 2:
+            # 相邻两条边的单位法向之和的长度为 2cos(转角/2)
+            nn = self.distance.nodenormal
+            l = np.sqrt(np.sum(nn**2, axis=-1))
+            isCorner = (l < 2*np.cos(angle/2))
+            isCorner &= (np.bincount(self.cell.flat, minlength=len(node)) > 0)
+            fixed = self.node[isCorner]
+
+        if GD == 2:
+            self.facets = {0:fixed, 1:self.cell}
+        else:
+            self.facets = {0:fixed, 1:None, 2:self.cell}
+
+    def __call__(self, p):
+        """
+        @brief 符号距离函数
+        """
+        return self.distance(p)
+
+    def signed_dist_function(self, p):
+        return self(p)
+
+    def sizing_function(self, p):
+        return self.fh(p, self)
+
+    def projection(self, p):
+        return self.distance.project(p)
+
+    def facet(self, dim):
+        return self.facets[dim]
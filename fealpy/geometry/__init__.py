@@ -39,6 +39,7 @@ from .implicit_curve import CircleCurve as Circle
 # Domain 
 from .CircleDomain import CircleDomain
 from .RectangleDomain import RectangleDomain
+from .BoundaryMeshDomain import BoundaryMeshDomain
 
 from .CuboidDomain import CuboidDomain
 from .SphereDomain import SphereDomain
@@ -0,0 +1,281 @@
+"""
+Notes
+-----
+
+到离散边界 (二维折线或三维三角形曲面) 的符号距离和投影.
+
+直接计算每个点到每条边 (或每个三角形) 的距离需要 O(NP*NE) 的计算量和
+内存. 这里对边界单元的重心建立 KD 树, 对每个点:
+
+1. 用最近的重心对应的边界单元给出距离的上界 d0;
+2. 和点的距离不超过 d0 的边界单元, 其重心到点的距离不超过 d0 + R, R 是
+   单元外接球 (以重心为球心) 的半径, 所以只需在半径 d0 + R 的球内查找候选
+   单元, 再精确地计算到这些候选单元的距离.
+
+边界单元按 R 的大小分组, 每组一棵 KD 树, 用各组自己的最大 R, 使得局部
+加密的边界上候选单元也不会太多. 点按块处理, 内存只和块的大小有关.
+
+最近点落在单元内部, 边上或顶点上时, 分别用单元, 边或顶点的角度加权伪法向
+(Baerentzen, Aanaes, 2005) 判断符号, 边界外部为正, 内部为负. 这要求边界
+是封闭的, 且各个单元的定向一致; 如果整体的有向面积 (体积) 为负, 就把所有
+法向反过来.
+"""
+from itertools import chain
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# SciPy 1.6 之前 KD 树查询的线程数参数叫 n_jobs
+try:
+    cKDTree(np.zeros((1, 1))).query(np.zeros((1, 1)), workers=1)
+    _WORKERS = 'workers'
+except TypeError:
+    _WORKERS = 'n_jobs'
+
+
+class BoundaryDistance():
+    """
+    @brief 到离散边界的符号距离, 最近点和投影
+
+    Examples
+    --------
+    >> fd = BoundaryDistance(node, edge) # 二维多边形, edge: (NE, 2)
+    >> fd = BoundaryDistance(node, face) # 三维三角形曲面, face: (NF, 3)
+    >> d = fd(p) # 符号距离
+    >> q = fd.project(p) # 边界上的最近点
+    """
+    def __init__(self, node, cell, chunksize=2**14, workers=1):
+        """
+        @param[in] node 边界节点, (NN, GD)
+        @param[in] cell 边界单元, 二维时为边 (NE, 2), 三维时为三角形 (NE, 3)
+        @param[in] chunksize 每块处理的点数
+        @param[in] workers KD 树查询的线程数, -1 表示使用所有的核
+        """
+        self.node = np.asarray(node, dtype=np.float64)
+        self.cell = np.asarray(cell)
+        self.chunksize = chunksize
+        self.workers = workers
+
+        NN, GD = self.node.shape
+        NE, NV = self.cell.shape
+        if NV == 3:
+            self.init_triangle_data()
+        elif NV == 2:
+            self.init_segment_data()
+        else:
+            raise ValueError("the boundary cell should be an edge or a triangle!")
+
+        v = self.node[self.cell]
+        c = v.mean(axis=1)
+        R = np.sqrt(np.max(np.sum((v - c[:, None, :])**2, axis=-1), axis=-1))
+
+        # 按外接球半径分组, 相邻两组的半径相差一倍
+        Rmin = max(R.min(), np.finfo(np.float64).tiny)
+        level = np.floor(np.log2(np.maximum(R, Rmin)/Rmin)).astype(np.int_)
+        self.trees = []
+        for l in np.unique(level):
+            idx, = np.nonzero(level == l)
+            self.trees.append((cKDTree(c[idx]), idx, R[idx].max()))
+
+    def init_segment_data(self):
+        """
+        @brief 二维折线的单位法向和顶点伪法向
+        """
+        node = self.node
+        edge = self.cell
+        v = node[edge[:, 1]] - node[edge[:, 0]]
+        n = np.c_[v[:, 1], -v[:, 0]]
+        # 有向面积为负时整体反向
+        area = np.sum(node[edge[:, 0], 0]*node[edge[:, 1], 1]
+                - node[edge[:, 1], 0]*node[edge[:, 0], 1])
+        if area < 0:
+            n *= -1
+        n /= np.sqrt(np.sum(n**2, axis=-1, keepdims=True))
+
+        nn = np.zeros_like(node)
+        np.add.at(nn, edge, n[:, None, :])
+        self.cellnormal = n
+        self.nodenormal = nn
+
+    def init_triangle_data(self):
+        """
+        @brief 三角形曲面的单位法向, 边和顶点的伪法向
+        """
+        node = self.node
+        face = self.cell
+        NF = len(face)
+        localEdge = np.array([(0, 1), (0, 2), (1, 2)])
+        totalEdge = np.sort(face[:, localEdge].reshape(-1, 2), axis=1)
+        _, face2edge = np.unique(totalEdge, axis=0, return_inverse=True)
+        self.face2edge = face2edge.reshape(NF, 3)
+
+        v0 = node[face[:, 1]] - node[face[:, 0]]
+        v1 = node[face[:, 2]] - node[face[:, 0]]
+        n = np.cross(v0, v1)
+        if np.sum(n*node[face[:, 0]]) < 0: # 有向体积为负时整体反向
+            n *= -1
+        n /= np.sqrt(np.sum(n**2, axis=-1, keepdims=True))
+
+        en = np.zeros((self.face2edge.max() + 1, 3), dtype=np.float64)
+        np.add.at(en, self.face2edge, n[:, None, :])
+
+        # 顶点伪法向按三角形在该顶点的内角加权
+        v = node[face]
+        angle = np.zeros((NF, 3), dtype=np.float64)
+        for i in range(3):
+            a = v[:, (i+1)%3] - v[:, i]
+            b = v[:, (i+2)%3] - v[:, i]
+            cos = np.sum(a*b, axis=-1)/np.sqrt(
+                    np.sum(a**2, axis=-1)*np.sum(b**2, axis=-1))
+            angle[:, i] = np.arccos(np.clip(cos, -1, 1))
+        nn = np.zeros_like(node)
+        np.add.at(nn, face, angle[..., None]*n[:, None, :])
+
+        self.cellnormal = n
+        self.edgenormal = en
+        self.nodenormal = nn
+
+    def closest_point(self, p, idx):
+        """
+        @brief 点 p[i] 到边界单元 idx[i] 的最近点及其所在位置的伪法向
+
+        @return d2 距离的平方, q 最近点, n 伪法向
+        """
+        if self.cell.shape[1] == 2:
+            return self._closest_point_on_segment(p, idx)
+        else:
+            return self._closest_point_on_triangle(p, idx)
+
+    def _closest_point_on_segment(self, p, idx):
+        edge = self.cell[idx]
+        a = self.node[edge[:, 0]]
+        ab = self.node[edge[:, 1]] - a
+        t = np.sum((p - a)*ab, axis=-1)/np.sum(ab**2, axis=-1)
+        t = np.clip(t, 0.0, 1.0)
+        q = a + t[:, None]*ab
+
+        n = self.cellnormal[idx]
+        isA = (t == 0.0)
+        isB = (t == 1.0)
+        n[isA] = self.nodenormal[edge[isA, 0]]
+        n[isB] = self.nodenormal[edge[isB, 1]]
+        return np.sum((p - q)**2, axis=-1), q, n
+
+    def _closest_point_on_triangle(self, p, idx):
+        """
+        @brief 按 Ericson (Real-Time Collision Detection, 5.1.5) 的方法判断
+               最近点落在三角形的哪个区域
+        """
+        face = self.cell[idx]
+        f2e = self.face2edge[idx]
+        a = self.node[face[:, 0]]
+        b = self.node[face[:, 1]]
+        c = self.node[face[:, 2]]
+        ab = b - a
+        ac = c - a
+
+        def dot(u, v):
+            return np.sum(u*v, axis=-1)
+
+        ap = p - a
+        bp = p - b
+        cp = p - c
+        d1, d2 = dot(ab, ap), dot(ac, ap)
+        d3, d4 = dot(ab, bp), dot(ac, bp)
+        d5, d6 = dot(ab, cp), dot(ac, cp)
+        va = d3*d6 - d5*d4
+        vb = d5*d2 - d1*d6
+        vc = d1*d4 - d3*d2
+
+        # 默认在三角形内部
+        with np.errstate(divide='ignore', invalid='ignore'):
+            denom = 1/(va + vb + vc)
+            v = vb*denom
+            w = vc*denom
+            q = a + v[:, None]*ab + w[:, None]*ac
+            n = self.cellnormal[idx]
+            done = np.zeros(len(p), dtype=np.bool_)
+
+            # 按顺序判断各个区域, 前面的区域优先
+            regions = [
+                ((d1 <= 0) & (d2 <= 0), lambda: a, self.nodenormal[face[:, 0]]),
+                ((d3 >= 0) & (d4 <= d3), lambda: b, self.nodenormal[face[:, 1]]),
+                ((vc <= 0) & (d1 >= 0) & (d3 <= 0),
+                    lambda: a + (d1/(d1 - d3))[:, None]*ab, self.edgenormal[f2e[:, 0]]),
+                ((d6 >= 0) & (d5 <= d6), lambda: c, self.nodenormal[face[:, 2]]),
+                ((vb <= 0) & (d2 >= 0) & (d6 <= 0),
+                    lambda: a + (d2/(d2 - d6))[:, None]*ac, self.edgenormal[f2e[:, 1]]),
+                ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0),
+                    lambda: b + ((d4 - d3)/((d4 - d3) + (d5 - d6)))[:, None]*(c - b),
+                    self.edgenormal[f2e[:, 2]]),
+                ]
+            for flag, point, normal in regions:
+                flag &= ~done
+                if np.any(flag):
+                    q[flag] = point()[flag]
+                    n[flag] = normal[flag]
+                done |= flag
+        return np.sum((p - q)**2, axis=-1), q, n
+
+    def _query(self, p):
+        """
+        @brief 一块点的最近点查询
+        """
+        NP = len(p)
+
+        # 最近的重心对应的单元给出距离的上界
+        d2 = np.full(NP, np.inf)
+        for tree, idx, R in self.trees:
+            _, j = tree.query(p, k=1, **{_WORKERS: self.workers})
+            d2 = np.minimum(d2, self.closest_point(p, idx[j])[0])
+        d = np.sqrt(d2)
+
+        I = []
+        J = []
+        for tree, idx, R in self.trees:
+            r = d + R + 1e-12*(1 + d)
+            lists = tree.query_ball_point(p, r, **{_WORKERS: self.workers})
+            n = np.fromiter(map(len, lists), dtype=np.int_, count=NP)
+            J.append(idx[np.fromiter(chain.from_iterable(lists), dtype=np.int_,
+                count=n.sum())])
+            I.append(np.repeat(np.arange(NP), n))
+        I = np.concatenate(I)
+        J = np.concatenate(J)
+
+        d2, q, n = self.closest_point(p[I], J)
+        order = np.lexsort((d2, I))
+        isFirst = np.r_[True, I[order[1:]] != I[order[:-1]]]
+        k = order[isFirst] # 每个点距离最小的候选单元, I[k] 为 0, 1, ..., NP-1
+        return np.sqrt(d2[k]), q[k], n[k], J[k]
+
+    def query(self, p):
+        """
+        @brief 最近点查询
+
+        @return d 无符号距离, q 最近点, n 最近点处的伪法向, idx 最近的边界单元
+        """
+        p = np.asarray(p, dtype=np.float64)
+        shape = p.shape[:-1]
+        p = p.reshape(-1, p.shape[-1])
+        cs = self.chunksize
+        result = [self._query(p[i:i+cs]) for i in range(0, len(p), cs)]
+        d, q, n, idx = [np.concatenate(r) for r in zip(*result)]
+        return (d.reshape(shape), q.reshape(shape + q.shape[-1:]),
+                n.reshape(shape + n.shape[-1:]), idx.reshape(shape))
+
+    def signed_distance(self, p):
+        """
+        @brief 符号距离, 外部为正, 内部为负
+        """
+        d, q, n, _ = self.query(p)
+        s = np.sign(np.sum((np.asarray(p) - q)*n, axis=-1))
+        return s*d
+
+    def project(self, p):
+        """
+        @brief 边界上离 p 最近的点
+        """
+        return self.query(p)[1]
+
+    def __call__(self, p):
+        return self.signed_distance(p)
@@ -1,5 +1,6 @@
 import numpy as np
 from .geoalg import project
+from .boundary_distance import BoundaryDistance
 
 
 class PolygonCurve():
@@ -7,40 +8,34 @@ class PolygonCurve():
 
     Notes
     -----
-    用于描述一个多边形区域的边界。目前假设区域内部没有内部边界，即区域是连通的。
-
-    TODO
-    ----
-    1. 考虑区域有内部边界的情形
+    用于描述一个多边形区域的边界, 边界可以由多个封闭的环组成 (外边界逆时针,
+    内边界顺时针). 距离用 `BoundaryDistance` 计算, 只需要查找点附近的边.
     """
     def __init__(self, node, edge, edge2subdomain=None):
         self.node = node
         self.edge = edge
         self.edge2subdomain = edge2subdomain
+        self.distance = BoundaryDistance(node, edge)
 
     def __call__(self, p):
         """
 
         Notes
         -----
-        给定点集 p， 计算它们到多边形边界的距离。
+        给定点集 p， 计算它们到多边形边界的符号距离, 内部为负.
         """
+        return self.distance(p)
+
+    def value(self, p):
+        return self(p)
 
-        node = self.node
-        edge = self.edge
-
-        NE = len(edge)
-        NP = len(p) # 这里假设 p 是二维数组 TODO：考虑只有一个点的情形
-        v = node[edge[:, 1]] - node[edge[:, 2]]
-        l = np.sqrt(np.sum(v**2, axis=1))
-        v /= l.reshape(-1, 1)
-        w = np.array([(0,-1),(1,0)])
-        n = v@w
-
-        # 计算符号距离
-        # (NP, 2) - (NE, 2)->(NP, NE, 2), (NE, 2) -> (NP, NE)  
-        d = np.sum((p[..., None, :] - node[edge[:, 0]])*n, axis=-1)
-        return d
+    def project(self, p):
+        """
+        @brief 把点投影到多边形边界上
+        """
+        d, q, n, _ = self.distance.query(p)
+        s = np.sign(np.sum((p - q)*n, axis=-1))
+        return q, s*d
 
 class CircleCurve():
     def __init__(self, center=np.array([0.0, 0.0]), radius=1.0):
@@ -1,5 +1,8 @@
+from functools import lru_cache
+
 import numpy as np
 from .geoalg import project
+from .boundary_distance import BoundaryDistance
 
 class DistDomain2d():
     def __init__(self, fd, fh, bbox, pfix=None, *args):
@@ -37,8 +40,24 @@ def dcurve(p, curve, maxit=200, tol=1e-12):
     _, d, _= project(curve, p, maxit=200, tol=1e-8, returngrad=True, returnd=True)
     return d
 
+@lru_cache(maxsize=16)
+def _poly_distance(key, NV):
+    """
+    @brief 多边形的 `BoundaryDistance` 对象, 按顶点坐标缓存, 网格生成的每一步
+           调用 dpoly 时不用重新建 KD 树
+    """
+    poly = np.frombuffer(key, dtype=np.float64).reshape(NV, 2).copy()
+    edge = np.c_[np.arange(NV), (np.arange(NV) + 1)%NV]
+    return BoundaryDistance(poly, edge)
+
 def dpoly(p, poly):
-    pass
+    """
+    @brief 多边形上的符号距离函数
+
+    @param[in] poly 多边形的顶点, (NV, 2), 按顺序连成封闭的折线
+    """
+    poly = np.ascontiguousarray(poly, dtype=np.float64)
+    return _poly_distance(poly.tobytes(), len(poly))(p)
 
 def ddiff(d0, d1):
     return np.maximum(d0, -d1)
@@ -0,0 +1,272 @@
+"""
+Notes
+-----
+
+不依赖 METIS 的网格剖分, 只用 NumPy 和 SciPy.
+
+* 'rcb': 递归坐标二分, 每次沿包围盒最长的坐标轴按权重的比例切开
+* 'hilbert', 'morton': 把实体重心映射到 Hilbert 或 Morton 空间填充曲线上,
+  按曲线的顺序把权重均匀地分成 nparts 段
+* 'spectral': 递归谱二分, 每次按图拉普拉斯矩阵的 Fiedler 向量排序后按权重
+  的比例切开
+
+nparts 不必是 2 的幂, 每次二分时左右两部分的权重之比等于它们包含的子区域
+个数之比. `part_mesh` 的返回值和 `metis.part_mesh` 相同, 可以直接替换:
+
+    from fealpy.graph.partition import part_mesh
+    edgecuts, parts = part_mesh(mesh, nparts=8, entity='cell', method='hilbert')
+"""
+import numpy as np
+from scipy.sparse import csr_matrix, coo_matrix, identity
+from scipy.sparse.csgraph import laplacian
+from scipy.sparse.linalg import eigsh, splu, LinearOperator
+
+
+def entity_graph(mesh, entity='cell'):
+    """
+    @brief 实体的邻接图, 不含自环的对称稀疏矩阵
+
+    单元通过公共的边 (2d) 或面 (3d) 相邻, 节点通过边相邻.
+    """
+    if entity == 'cell':
+        graph = mesh.ds.cell_to_cell(return_sparse=True, return_boundary=False)
+    elif entity == 'node':
+        graph = mesh.ds.node_to_node()
+    else:
+        raise ValueError("the entity `{}` is not supported!".format(entity))
+    graph = coo_matrix(graph)
+    flag = graph.row != graph.col
+    NN = graph.shape[0]
+    graph = csr_matrix((np.ones(flag.sum()), (graph.row[flag], graph.col[flag])),
+            shape=(NN, NN))
+    graph.data[:] = 1.0
+    return graph
+
+
+def entity_points(mesh, entity='cell'):
+    """
+    @brief 几何剖分方法使用的实体坐标, 单元取重心
+    """
+    if entity == 'cell':
+        return mesh.entity_barycenter('cell')
+    elif entity == 'node':
+        return mesh.entity('node')
+    else:
+        raise ValueError("the entity `{}` is not supported!".format(entity))
+
+
+def edge_cut(graph, parts):
+    """
+    @brief 两端属于不同子区域的图边的条数
+    """
+    graph = coo_matrix(graph)
+    return int(np.count_nonzero(parts[graph.row] != parts[graph.col])//2)
+
+
+def imbalance(parts, nparts=None, weights=None):
+    """
+    @brief 负载不平衡度, 最重子区域的权重除以平均权重, 完全平衡时为 1
+    """
+    nparts = parts.max() + 1 if nparts is None else nparts
+    w = np.bincount(parts, weights=weights, minlength=nparts)
+    return w.max()/w.mean()
+
+
+def _quantize(points, nbits):
+    """
+    @brief 把坐标映射到 [0, 2^nbits) 上的整数, 各个方向用相同的比例
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 1:
+        points = points[:, None]
+    pmin = points.min(axis=0)
+    h = (points.max(axis=0) - pmin).max()
+    h = 1.0 if h == 0 else h
+    n = (1 << nbits) - 1
+    return np.rint((points - pmin)*(n/h)).astype(np.uint64)
+
+
+def _interleave(X, nbits):
+    """
+    @brief 交错各个坐标的二进制位, 第 i 个坐标的第 b 位放到 b*d + d-1-i 位
+    """
+    d = X.shape[1]
+    key = np.zeros(len(X), dtype=np.uint64)
+    one = np.uint64(1)
+    for b in range(nbits):
+        for i in range(d):
+            bit = (X[:, i] >> np.uint64(b)) & one
+            key |= bit << np.uint64(b*d + d - 1 - i)
+    return key
+
+
+def morton_index(points, nbits=None):
+    """
+    @brief 点在 Morton (Z 序) 曲线上的编号
+    """
+    d = 1 if np.ndim(points) == 1 else np.shape(points)[1]
+    nbits = 63//d if nbits is None else nbits
+    return _interleave(_quantize(points, nbits), nbits)
+
+
+def hilbert_index(points, nbits=None):
+    """
+    @brief 点在 Hilbert 曲线上的编号
+
+    用 Skilling 的算法 (AIP Conf. Proc. 707, 2004) 把坐标变为 Hilbert 编号
+    的转置形式, 再交错各个坐标的二进制位, 适用于任意维数.
+    """
+    d = 1 if np.ndim(points) == 1 else np.shape(points)[1]
+    nbits = 63//d if nbits is None else nbits
+    X = _quantize(points, nbits)
+
+    Q = 1 << (nbits - 1)
+    while Q > 1:
+        P = np.uint64(Q - 1)
+        for i in range(d):
+            flag = (X[:, i] & np.uint64(Q)) != 0
+            X[flag, 0] ^= P
+            t = (X[~flag, 0] ^ X[~flag, i]) & P
+            X[~flag, 0] ^= t
+            X[~flag, i] ^= t
+        Q >>= 1
+
+    for i in range(1, d): # Gray 编码
+        X[:, i] ^= X[:, i-1]
+    t = np.zeros(len(X), dtype=np.uint64)
+    Q = 1 << (nbits - 1)
+    while Q > 1:
+        flag = (X[:, d-1] & np.uint64(Q)) != 0
+        t[flag] ^= np.uint64(Q - 1)
+        Q >>= 1
+    X ^= t[:, None]
+    return _interleave(X, nbits)
+
+
+def curve_partition(key, nparts, weights=None):
+    """
+    @brief 按 key 排序后把权重均匀地分成 nparts 段
+    """
+    N = len(key)
+    weights = np.ones(N) if weights is None else np.asarray(weights, dtype=np.float64)
+    order = np.argsort(key, kind='stable')
+    cw = np.cumsum(weights[order])
+    # 每个实体按它的权重中点落在哪一段来划分
+    mid = (cw - 0.5*weights[order])/cw[-1]
+    parts = np.empty(N, dtype=np.int_)
+    parts[order] = np.minimum((mid*nparts).astype(np.int_), nparts - 1)
+    return parts
+
+
+def _split(w, ratio):
+    """
+    @brief 排好序的权重 w 的切分位置 i, 使 w[:i] 的和最接近总和的 ratio 倍
+    """
+    cw = np.cumsum(w)
+    i = np.argmin(np.abs(cw - ratio*cw[-1])) + 1
+    return min(max(i, 1), len(w) - 1)
+
+
+def recursive_bisection(N, nparts, key, weights=None):
+    """
+    @brief 递归二分
+
+    @param[in] N 实体个数
+    @param[in] nparts 子区域个数
+    @param[in] key key(idx) 返回实体 idx 在二分时的排序值
+    @param[in] weights 实体的权重
+    """
+    weights = np.ones(N) if weights is None else np.asarray(weights, dtype=np.float64)
+    parts = np.zeros(N, dtype=np.int_)
+
+    def bisect(idx, k, offset):
+        if k == 1 or len(idx) < 2:
+            parts[idx] = offset
+            return
+        k0 = k//2
+        order = idx[np.argsort(key(idx), kind='stable')]
+        i = _split(weights[order], k0/k)
+        bisect(order[:i], k0, offset)
+        bisect(order[i:], k - k0, offset + k0)
+
+    bisect(np.arange(N), nparts, 0)
+    return parts
+
+
+def recursive_coordinate_bisection(points, nparts, weights=None):
+    """
+    @brief 递归坐标二分, 每次沿当前点集包围盒最长的坐标轴切开
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 1:
+        points = points[:, None]
+
+    def key(idx):
+        p = points[idx]
+        axis = np.argmax(p.max(axis=0) - p.min(axis=0))
+        return p[:, axis]
+
+    return recursive_bisection(len(points), nparts, key, weights=weights)
+
+
+def fiedler_vector(graph):
+    """
+    @brief 图拉普拉斯矩阵第二小特征值对应的特征向量
+
+    小规模的图直接求稠密矩阵的特征分解, 否则用位移 sigma 略小于 0 的
+    shift-invert Lanczos 方法. L - sigma I 是对称矩阵, 用 A^T + A 的最小度
+    排序做 LU 分解, 三维网格上比默认的 COLAMD 快数倍.
+    """
+    N = graph.shape[0]
+    L = laplacian(csr_matrix(graph, dtype=np.float64))
+    if N <= 256:
+        w, v = np.linalg.eigh(L.toarray())
+    else:
+        sigma = -1e-8*L.diagonal().max()
+        lu = splu((L - sigma*identity(N)).tocsc(), permc_spec='MMD_AT_PLUS_A')
+        OPinv = LinearOperator((N, N), matvec=lu.solve, dtype=np.float64)
+        v0 = 1.0 + np.arange(N)/N # 固定初值, 使结果是确定的
+        w, v = eigsh(L, k=2, sigma=sigma, which='LM', v0=v0, OPinv=OPinv)
+        v = v[:, np.argsort(w)]
+    return v[:, 1]
+
+
+def spectral_bisection(graph, nparts, weights=None):
+    """
+    @brief 递归谱二分, 每次按子图的 Fiedler 向量排序后切开
+    """
+    graph = csr_matrix(graph)
+
+    def key(idx):
+        return fiedler_vector(graph[idx][:, idx])
+
+    return recursive_bisection(graph.shape[0], nparts, key, weights=weights)
+
+
+def part_mesh(mesh, entity='cell', nparts=2, method='rcb', weights=None):
+    """
+    @brief 剖分网格实体, 和 `metis.part_mesh` 有相同的返回值
+
+    @param[in] mesh 网格
+    @param[in] entity 'cell' 或 'node'
+    @param[in] nparts 子区域个数
+    @param[in] method 'rcb', 'hilbert', 'morton' 或 'spectral'
+    @param[in] weights 实体的权重, 默认都为 1
+
+    @return edgecuts, parts, 其中 edgecuts 是邻接图被切断的边数, parts 是
+            每个实体所属的子区域编号
+    """
+    graph = entity_graph(mesh, entity=entity)
+    if method == 'rcb':
+        points = entity_points(mesh, entity=entity)
+        parts = recursive_coordinate_bisection(points, nparts, weights=weights)
+    elif method in {'hilbert', 'morton'}:
+        points = entity_points(mesh, entity=entity)
+        index = hilbert_index if method == 'hilbert' else morton_index
+        parts = curve_partition(index(points), nparts, weights=weights)
+    elif method == 'spectral':
+        parts = spectral_bisection(graph, nparts, weights=weights)
+    else:
+        raise ValueError("the partition method `{}` is not supported!".format(method))
+    parts = parts.astype(mesh.itype)
+    return edge_cut(graph, parts), parts
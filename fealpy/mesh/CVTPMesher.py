@@ -3,7 +3,6 @@ from scipy.spatial import KDTree
 import pdb
 from scipy.spatial import Voronoi
 from .PolygonMesh import PolygonMesh
-import matplotlib.pyplot as plt
 from fealpy.mesh import TriangleMesh
 
 class CVTPMesher:
@@ -366,6 +365,7 @@ class CVTPMesher:
         #node = self.inode[2]
         print(node)
         self.inode = node
+        import matplotlib.pyplot as plt
         plt.figure()
         plt.scatter(node[:,0],node[:,1])
         plt.show()
@@ -442,6 +442,7 @@ class CVTPMesher:
             if len(locate) == len(set(locate)):
                 break
             tmesh.uniform_refine()
+        import matplotlib.pyplot as plt
         fig = plt.figure()
         axes = fig.gca()
         tmesh.add_plot(axes)
@@ -1,6 +1,5 @@
 import numpy as np
 from scipy.spatial import Delaunay
-import matplotlib.pyplot as plt
 
 from .TriangleMesh import TriangleMesh 
 
@@ -177,7 +176,8 @@ class DistMesher2d():
             if mmove > self.ttol*self.hmin:
                 edge = self.construct_edge(node)
                 self.NT += 1
-                print("第 %05d 次三角化"%(self.NT))
+                if self.output:
+                    print("第 %05d 次三角化"%(self.NT))
 
             md = self.move(node, edge)
 
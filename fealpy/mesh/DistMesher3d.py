@@ -1,6 +1,5 @@
 import numpy as np
 from scipy.spatial import Delaunay
-import matplotlib.pyplot as plt
 
 from .TetrahedronMesh import TetrahedronMesh 
 
@@ -263,6 +262,11 @@ class DistMesher3d():
             n = len(fnode)
             isBdNode[0:n] = False
 
+        if hasattr(self.domain, 'projection'):
+            # 区域给出了精确的投影时直接使用, 差分梯度在棱和角点处为零
+            node[isBdNode] = self.domain.projection(node[isBdNode])
+            return mesh
+
         depsx = np.array([self.deps, 0, 0])
         depsy = np.array([0, self.deps, 0])
         depsz = np.array([0, 0, self.deps])
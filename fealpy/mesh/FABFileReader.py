@@ -1,132 +1,162 @@
+"""
+Notes
+-----
 
-import sys
-import numpy as np
-import scipy.io as sio
+FracMan .fab 裂缝文件的流式读取.
 
-import matplotlib.pyplot as plt
+FRACTURE 段由若干裂缝组成, 每条裂缝先是一行头部 (编号, 顶点个数, 属性组数,
+...), 然后是顶点坐标行和属性行. 这一段按字节块读入, 每块用 `parse_lines`
+一次解析成数值和每行的数值个数, 只在裂缝之间有一个整数层面的循环, 坐标和
+属性直接写入按 FORMAT 段中给出的个数预先分配好的数组. 块末尾不完整的裂缝
+留到下一块处理.
+"""
+import numpy as np
 
+from .TextBlockReader import TextBlockReader, parse_lines
 from .TriangleMesh import TriangleMesh
 
+
 class FABFileReader:
-    def __init__(self, fname):
-        try:
-            with open(fname, 'r') as f:
-                self.lines = f.read().split('\n')
-        except EnvironmentError:
-            print("Warning! open file failed!")
-        self.cline = 0
+    """
+    @brief FracMan .fab 文件读取器
 
-    def read(self):
-        NL = len(self.lines)
-        while self.cline < NL:
-            line = self.lines[self.cline]
-            words = [word.replace(' ', '') for word in line.split(' ')]
-            if words[0] == 'BEGIN':
-                if words[1] == 'FORMAT':
-                    self.read_format()
-                elif words[1] == 'PROPERTIES':
-                    self.read_properties()
-                elif words[1] == 'SETS':
-                    self.read_sets()
-                elif words[1] == 'FRACTURE':
-                    self.read_fracture()
-                elif words[1] == 'TESSFRACTURE':
-                    self.read_tessfracture()
-                elif words[1] == 'ROCKBLOCK':
-                    self.read_rockblock()
-                else:
-                    raise ValueError('I do not code for {}!'.format(words[1]))
-            else:
-                self.cline += 1
+    读取后的数据:
 
-    def read_format(self):
-        self.cline += 1
-        line = self.lines[self.cline]
-        self.format = {}
-        while line.find('END') == -1:
-            words = line.split()
-            assert words[1] == '='
-            self.format[words[0]] = words[2]
-            self.cline += 1
-            line = self.lines[self.cline]
+    * format, properties, sets: 对应段中的 key = value
+    * node: (NN, 3) 所有裂缝的顶点坐标
+    * fracture: (NN, ) 顶点编号
+    * fractureLocation: (NF+1, ) 第 i 条裂缝的顶点为
+      node[fractureLocation[i]:fractureLocation[i+1]]
+    * unknown: (NF, 3) 裂缝头部的第 4 到第 6 个数
+    * prop: (NPG, NP) 所有裂缝的属性行, propLocation: (NF+1, ) 和顶点类似
 
-    def read_properties(self):
-        self.cline += 1
-        line = self.lines[self.cline]
+    Examples
+    --------
+    >> reader = FABFileReader('dfn.fab', progress=True)
+    >> reader.read()
+    >> mesh = reader.to_mesh()
+    """
+    def __init__(self, fname, chunksize=2**24, progress=None):
+        """
+        @param[in] fname 文件名
+        @param[in] chunksize 每次读入的字节数
+        @param[in] progress 进度回调函数 progress(nread, total), True 表示
+                   在标准错误输出上打印进度
+        """
+        self.fname = fname
+        self.chunksize = chunksize
+        self.progress = progress
+        self.format = {}
         self.properties = {}
-        while line.find('END') == -1:
-            words = line.split()
+        self.sets = {}
+
+    def read(self):
+        with TextBlockReader(self.fname, chunksize=self.chunksize,
+                progress=self.progress) as reader:
+            while True:
+                line = reader.readline()
+                if line is None:
+                    break
+                words = line.split()
+                if len(words) < 2 or words[0] != b'BEGIN':
+                    continue
+                section = words[1].decode()
+                if section == 'FORMAT':
+                    self.format = self.read_dict(reader)
+                elif section == 'PROPERTIES':
+                    self.properties = self.read_dict(reader)
+                elif section == 'SETS':
+                    self.sets = self.read_dict(reader)
+                elif section == 'FRACTURE':
+                    self.read_fracture(reader)
+                elif section in {'TESSFRACTURE', 'ROCKBLOCK'}:
+                    for block in reader.blocks_until(b'END'):
+                        pass
+                else:
+                    raise ValueError('I do not code for {}!'.format(section))
+        return self
+
+    def read_dict(self, reader):
+        d = {}
+        while True:
+            line = reader.readline()
+            if line is None or line.find(b'END') > -1:
+                return d
+            words = line.decode().split()
+            if len(words) == 0:
+                continue
             assert words[1] == '='
-            self.properties[words[0]] = words[2]
-            self.cline += 1
-            line = self.lines[self.cline]
+            d[words[0]] = words[2]
 
-    def read_fracture(self):
+    def read_fracture(self, reader):
         NF = int(self.format['No_Fractures']) # 裂缝个数
         NN = int(self.format['No_Nodes']) # 节点个数
         NP = int(self.format['No_Properties']) # 性质个数
-        self.unknown = np.zeros((NF, 3), dtype=np.float) # 未知属性
-        self.node = np.zeros((NN, 3), dtype=np.float)
-        self.fracture = np.zeros(NN, dtype=np.int)
-        self.fractureLocation = np.zeros(NF+1, dtype=np.int)
-        self.prop = [] 
-        start = 0
-        for i in range(NF):
-            self.cline += 1 # 移到下一行
-            line = self.lines[self.cline]
-            words = line.split()
-            index = words[0] # index of the fracture
-            self.unknown[i, 0] = float(words[3])
-            self.unknown[i, 1] = float(words[4])
-            self.unknown[i, 2] = float(words[5])
-
-            NV = int(words[1]) 
-            n = int(words[2]) # 属性组数
-
-            for j in range(NV):
-                self.cline += 1
-                line = self.lines[self.cline]
-                words = line.split()
-                self.node[start, 0] = float(words[1]) # drop words[0]
-                self.node[start, 1] = float(words[2])
-                self.node[start, 2] = float(words[3])
-                self.fracture[start] = start
-                start += 1
-            self.fractureLocation[i+1] = self.fractureLocation[i] + NV
-
-            prop = np.zeros((n, NP), dtype=np.float)
-            for j in range(n):
-                self.cline += 1
-                line = self.lines[self.cline]
-                words = line.split()
-                prop[j, 0] = float(words[1])
-                prop[j, 1] = float(words[2])
-                prop[j, 2] = float(words[3])
-            self.prop.append(prop)
-
-    def read_sets(self):
-        self.cline += 1
-        line = self.lines[self.cline]
-        self.sets = {}
-        while line.find('END') == -1:
-            words = line.split()
-            assert words[1] == '='
-            self.sets[words[0]] = words[2]
-            self.cline += 1
-            line = self.lines[self.cline]
+        self.unknown = np.zeros((NF, 3), dtype=np.float64) # 未知属性
+        self.node = np.zeros((NN, 3), dtype=np.float64)
+        self.fracture = np.arange(NN)
+        self.fractureLocation = np.zeros(NF+1, dtype=np.int_)
+        self.propLocation = np.zeros(NF+1, dtype=np.int_)
+        props = []
 
-    def read_tessfracture(self):
-        self.cline += 1
-        line = self.lines[self.cline]
-        self.format = {}
-        while line.find('END') == -1:
-            self.cline += 1
-            line = self.lines[self.cline]
+        f = 0 # 已经读入的裂缝个数
+        rest = b''
+        for block in reader.blocks_until(b'END'):
+            block = rest + block
+            values, counts, starts = parse_lines(block)
+            offset = np.r_[0, np.cumsum(counts)] # 每一行的第一个数在 values 中的位置
+            NL = len(counts)
 
-    def read_rockblock(self):
-        self.cline += 1
-        line = self.lines[self.cline]
-        self.format = {}
-        while line.find('END') == -1:
-            self.cline += 1
-            line = self.lines[self.cline]
+            # 只在整数层面循环, 确定每条完整的裂缝的头部所在的行
+            heads = []
+            i = 0
+            while i < NL:
+                NV = int(values[offset[i] + 1])
+                n = int(values[offset[i] + 2]) # 属性组数
+                if i + 1 + NV + n > NL:
+                    break
+                heads.append((i, NV, n))
+                i += 1 + NV + n
+            rest = block[starts[i]:] if i < NL else b''
+            if len(heads) == 0:
+                continue
+
+            heads = np.array(heads, dtype=np.int_)
+            h, NV, n = heads.T
+            nf = len(heads)
+            self.unknown[f:f+nf] = values[offset[h][:, None] + np.arange(3, 6)]
+
+            # 顶点行: 丢掉每行的第一个数
+            line = np.repeat(h + 1, NV) + (np.arange(NV.sum()) - np.repeat(np.cumsum(NV) - NV, NV))
+            s = self.fractureLocation[f]
+            self.node[s:s+len(line)] = values[offset[line][:, None] + np.arange(1, 4)]
+            self.fractureLocation[f+1:f+nf+1] = s + np.cumsum(NV)
+
+            # 属性行
+            line = np.repeat(h + 1 + NV, n) + (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n))
+            k = min(NP, counts[line].min() - 1) if len(line) > 0 else 0
+            prop = np.zeros((len(line), NP), dtype=np.float64)
+            prop[:, :k] = values[offset[line][:, None] + np.arange(1, k+1)]
+            props.append(prop)
+            self.propLocation[f+1:f+nf+1] = self.propLocation[f] + np.cumsum(n)
+            f += nf
+
+        if len(rest.strip()) > 0 or f != NF:
+            raise ValueError("only {} of {} fractures are read!".format(f, NF))
+        self.prop = np.concatenate(props) if len(props) > 0 else np.zeros((0, NP))
+
+    def to_mesh(self):
+        """
+        @brief 把每条裂缝多边形从第一个顶点出发剖分成三角形, 得到三维空间中的
+               三角形网格, 单元数据 'fracture' 为每个三角形所属的裂缝编号
+        """
+        loc = self.fractureLocation
+        NV = np.diff(loc)
+        NT = np.maximum(NV - 2, 0)
+        fid = np.repeat(np.arange(len(NV)), NT)
+        k = np.arange(NT.sum()) - np.repeat(np.cumsum(NT) - NT, NT) # 裂缝内的三角形序号
+        s = loc[fid]
+        cell = np.c_[s, s + k + 1, s + k + 2]
+        mesh = TriangleMesh(self.node, cell)
+        mesh.celldata['fracture'] = fid
+        return mesh
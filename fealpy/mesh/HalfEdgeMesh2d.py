@@ -11,7 +11,6 @@ Authors
 
 import time
 import numpy as np
-import matplotlib.pyplot as plt
 from scipy.sparse import coo_matrix, csc_matrix, csr_matrix, spdiags, eye, tril, triu
 from scipy.sparse.csgraph import minimum_spanning_tree
 
@@ -19,7 +18,7 @@ from ..quadrature import TriangleQuadrature, QuadrangleQuadrature, GaussLegendre
 from .Mesh2d import Mesh2d
 from .adaptive_tools import mark
 from .mesh_tools import show_halfedge_mesh
-from ..common import DynamicArray
+from ..common import DynamicArray, RaggedArray
 from .TriangleMesh import TriangleMesh
 
 
@@ -765,28 +764,19 @@ class HalfEdgeMesh2d(Mesh2d):
         self.deletenode, = np.where(isRNode)
         self.deletenode2edge = nex[isMainHEdge[nex]]
 
-        #更新节点
-        node.adjust_size(isRNode)
-        nn = (~isRNode).sum()
-        nidxmap = np.arange(NN)
-        nidxmap[~isRNode] = range(nn)
-        halfedge[:, 0] = nidxmap[halfedge[:, 0]]
-
         # 更新半边层
         hlevel[nex]-=1
-        hlevel.adjust_size(isMarkedHEdge)
+        hlevel.delete(isMarkedHEdge)
 
-        # 对半边重新编号
+        # 删除半边并重新编号
         ne = np.sum(~isMarkedHEdge)//2
-        L = len(isMarkedHEdge)
-        l = (~isMarkedHEdge).sum()
-        idxmap = np.arange(L)
-        idxmap[~isMarkedHEdge] = np.arange(l)
+        idxmap = halfedge.delete(isMarkedHEdge)
         halfedge[:, 2:] = idxmap[halfedge[:, 2:]]
         self.deletnode2edge = idxmap[self.deletenode2edge]
 
-        # 更新halfedge
-        halfedge.adjust_size(isMarkedHEdge)
+        #更新节点
+        nidxmap = node.delete(isRNode)
+        halfedge[:, 0] = nidxmap[halfedge[:, 0]]
 
         #更新起始边
         hcell[halfedge[:, 1]] = range(len(halfedge))
@@ -902,8 +892,9 @@ class HalfEdgeMesh2d(Mesh2d):
             hedge.extend(np.arange(NE*2, NE*2+NC1))
 
             #更新subdomain
+            subdomain1 = subdomain[cidx]
             subdomainNew = subdomain.adjust_size(isMarkedCell, int(NC1))
-            subdomainNew[:] = subdomain[cidx]
+            subdomainNew[:] = subdomain1
 
             #更新起始边
             hcell.increase_size(NC2-NC)
@@ -1242,14 +1233,13 @@ class HalfEdgeMesh2d(Mesh2d):
             flag2 = isMarkedHEdge[pre]
             halfedge[flag2, 3] = pre[opp[pre[flag2]]]
 
-            # 对半边重新编号
-            self.adjust_number(isMarkedHEdge, method='halfedge')
-
-            #更新节点编号
-            self.adjust_number(isRNode, method='node')
+            # 删除半边并重新编号
+            idxmap = halfedge.delete(isMarkedHEdge)
+            halfedge[:, 2:] = idxmap[halfedge[:, 2:]]
 
-            # 更新halfedge
-            halfedge.adjust_size(isMarkedHEdge)
+            #删除节点并重新编号
+            nidxmap = node.delete(isRNode)
+            halfedge[:, 0] = nidxmap[halfedge[:, 0]]
 
             #更新起始边
             hcell.decrease_size(NC-nn-nc)
@@ -1260,10 +1250,7 @@ class HalfEdgeMesh2d(Mesh2d):
             hedge[:], = np.where(isMainHEdge[~isMarkedHEdge])
 
             # 更新半边层
-            hlevel.adjust_size(isMarkedHEdge)
-
-            #更新节点
-            node.adjust_size(isRNode)
+            hlevel.delete(isMarkedHEdge)
 
             self.ds.NN = self.node.size
             self.ds.NC = (subdomain[:]>0).sum()
@@ -1309,20 +1296,18 @@ class HalfEdgeMesh2d(Mesh2d):
 
             #更新subdomain
             flag = cidxmap!=np.arange(NC)
-            subdomain.adjust_size(flag)
+            subdomain.delete(flag)
 
             #更新单元层
             clevel[isRCell]-=1
-            clevel.adjust_size(flag)
+            clevel.delete(flag)
 
             #更新半边层
-            hlevel.adjust_size(isMarkedHEdge)
+            hlevel.delete(isMarkedHEdge)
 
-            # 对半边重新编号
-            self.adjust_number(isMarkedHEdge, method='halfedge')
-
-            # 更新halfedge
-            halfedge.adjust_size(isMarkedHEdge)
+            # 删除半边并重新编号
+            idxmap = halfedge.delete(isMarkedHEdge)
+            halfedge[:, 2:] = idxmap[halfedge[:, 2:]]
 
             #更新起始边
             hcell.decrease_size(NC-len(cell0))
@@ -1369,7 +1354,7 @@ class HalfEdgeMesh2d(Mesh2d):
     def coarsen_poly(self, isMarkedCell, i=0, options={'disp': True}):
 
         NC = self.number_of_all_cells()
-        NN = self.number_of_nodes().copy()
+        NN = self.number_of_nodes()
         NE = self.number_of_edges()
         hlevel = self.halfedgedata['level']
         clevel = self.celldata['level']
@@ -1381,7 +1366,7 @@ class HalfEdgeMesh2d(Mesh2d):
         isMainHEdge = self.ds.main_halfedge_flag()
 
         # 可以移除的网格节点
-        isRNode = np.ones(NN, dtype=np.bool)
+        isRNode = np.ones(NN, dtype=np.bool_)
         flag = (hlevel == hlevel[halfedge[:, 4]])
         np.logical_and.at(isRNode, halfedge[:, 0], flag)
         flag = (clevel[halfedge[:, 1]]>0)
@@ -1508,7 +1493,7 @@ class HalfEdgeMesh2d(Mesh2d):
         isMainHEdge = self.ds.main_halfedge_flag()
 
         # 可以移除的网格节点
-        isRNode = np.ones(NN, dtype=np.bool)
+        isRNode = np.ones(NN, dtype=np.bool_)
         flag = (hlevel == hlevel[halfedge[:, 4]])
         np.logical_and.at(isRNode, halfedge[:, 0], flag)
         flag = (clevel[halfedge[:, 1]]>0)
@@ -1751,6 +1736,9 @@ class HalfEdgeMesh2d(Mesh2d):
             l = node[halfedge[:, 0]]-node[halfedge[pre, 0]]
             l = np.linalg.norm(l, axis=1)
             color[(l>l[nex]) & (l>l[pre])] = 1
+
+        if not isinstance(color, DynamicArray):
+            color = DynamicArray(color)
             self.hedgecolor = color
 
         cstart = self.ds.cellstart
@@ -1783,12 +1771,11 @@ class HalfEdgeMesh2d(Mesh2d):
             isMarkedHEdge = np.r_[isMarkedHEdge, np.zeros(NE1+NE2*2, dtype=np.bool_)]
 
             #修改半边颜色
-            color = np.r_[color, np.zeros(NE1, dtype=np.int)]
+            color.increase_size(NE1)[:] = 0
             color[flag]=0
             color[halfedge[flag, 2]] = 1
             color[halfedge[halfedge[flag, 3], 3]] = 1
-            color = np.r_[color, np.zeros(NE2*2, dtype=np.int)]
-            self.hedgecolor = color
+            color.increase_size(NE2*2)[:] = 0
 
             self.refine_cell(isNewCell, flag, method='tri', options=options)
 
@@ -1804,6 +1791,9 @@ class HalfEdgeMesh2d(Mesh2d):
         color = self.hedgecolor
         if color is None:
             return 
+        if not isinstance(color, DynamicArray):
+            color = DynamicArray(color)
+            self.hedgecolor = color
         node = self.entity('node')
         halfedge = self.entity('halfedge')
         cstart = self.ds.cellstart
@@ -1819,7 +1809,7 @@ class HalfEdgeMesh2d(Mesh2d):
         isMarkedHEdge = self.coarsen_cell(isMarkedCell, isMarkedHEdge, method='tri')
 
         #修改颜色
-        color = color[~isMarkedHEdge]
+        color.delete(isMarkedHEdge)
         flag = (color==1) & (color==1)[halfedge[:, 2]]
         color[flag] = 0
         color[halfedge[flag, 2]] = 0
@@ -1837,7 +1827,7 @@ class HalfEdgeMesh2d(Mesh2d):
         self.coarsen_halfedge(flag)
 
         #修改颜色
-        color = color[~flag]
+        color.delete(flag)
 
         #生成新的单元
         NV = self.ds.number_of_vertices_of_all_cells()
@@ -1847,10 +1837,9 @@ class HalfEdgeMesh2d(Mesh2d):
 
         #修改半边颜色
         color[flag] = 0
-        color = np.r_[color, np.zeros(NC1*2, dtype=np.int_)]
+        color.increase_size(NC1*2)[:] = 0
         color[halfedge[flag, 2]] = 1
         color[halfedge[halfedge[flag, 3], 3]] = 1
-        self.hedgecolor = color
 
         self.refine_cell(isNewCell, flag, method='tri', options=options)
 
@@ -2372,21 +2361,21 @@ class HalfEdgeMesh2dDataStructure():
             return cell2node
         elif self.NV is None: # polygon mesh
             NV = self.number_of_vertices_of_cells()
-            cellLocation = np.zeros(NC+1, dtype=self.itype)
-            cellLocation[1:] = np.cumsum(NV)
-            cell2node = np.zeros(cellLocation[-1], dtype=self.itype)
-            current = self.hcell[cstart:].copy()
-            idx = cellLocation[:-1].copy()
+            cell = RaggedArray.from_lengths(
+                    np.zeros(NV.sum(), dtype=self.itype), NV, dtype=self.itype)
+            cell2node = cell.data
+
+            # 按顶点数从多到少排序, 第 k 步只需处理排在前面的顶点数大于 k 的单元
+            order = np.argsort(-NV, kind='stable')
+            sNV = NV[order]
+            current = self.hcell[cstart:][order]
+            idx = cell.location[order]
             cell2node[idx] = halfedge[halfedge[current, 3], 0]
-            NV0 = np.ones(NC, dtype=self.itype)
-            isNotOK = NV0 < NV
-            while np.any(isNotOK):
-               idx[isNotOK] += 1
-               NV0[isNotOK] += 1
-               cell2node[idx[isNotOK]] = halfedge[current[isNotOK], 0]
-               current[isNotOK] = halfedge[current[isNotOK], 2]
-               isNotOK = (NV0 < NV)
-            return cell2node, cellLocation
+            for k in range(1, sNV[0] if NC > 0 else 0):
+                n = np.searchsorted(-sNV, -k, side='left')
+                cell2node[idx[:n] + k] = halfedge[current[:n], 0]
+                current[:n] = halfedge[current[:n], 2]
+            return cell2node, cell.location
         elif self.NV == 3: # tri mesh
             cell2node = np.zeros([NC, 3], dtype = np.int_)
             current = halfedge[self.hcell[cstart:], 2]
@@ -1,19 +1,241 @@
+"""
+Notes
+-----
+
+Abaqus .inp 网格文件的流式读取.
+
+只处理扁平的 (没有 *Part, *Instance 嵌套编号的) 输入文件中的 *NODE 和
+*ELEMENT 数据块, 其它关键字的数据块被整块跳过. 数据块按字节块读入, 逗号
+换成空格后直接用 `np.fromstring` 解析, 单元跨行 (以逗号结尾的续行) 时也能
+正确处理.
+"""
+import re
+
 import numpy as np
 
+from .TextBlockReader import TextBlockReader
+from .TriangleMesh import TriangleMesh
+from .QuadrangleMesh import QuadrangleMesh
+from .TetrahedronMesh import TetrahedronMesh
+from .HexahedronMesh import HexahedronMesh
+
+
+def element_family(etype):
+    """
+    @brief Abaqus 单元类型对应的网格类型, 单元节点数和顶点数
+
+    @return (family, nnode, nvertex), 不支持的类型返回 None
+    """
+    etype = etype.upper()
+    if etype.startswith('STRI65'):
+        return ('tri', 6, 3)
+    m = re.match(r'([A-Z]+(?:[23]D|AX)?)(\d+)', etype)
+    if m is None:
+        return None
+    prefix, n = m.group(1), int(m.group(2))
+    if prefix in {'C3D', 'DC3D', 'AC3D', 'DCC3D'}:
+        table = {4: 'tet', 10: 'tet', 8: 'hex', 20: 'hex', 27: 'hex'}
+    elif prefix in {'CPS', 'CPE', 'CPEG', 'CAX', 'CGAX', 'S', 'SC', 'M3D',
+            'DC2D', 'DCAX', 'R3D', 'SFM3D', 'STRI', 'AC2D', 'ACAX'}:
+        table = {3: 'tri', 6: 'tri', 4: 'quad', 8: 'quad', 9: 'quad'}
+    else:
+        return None
+    if n not in table:
+        return None
+    nv = {'tri': 3, 'quad': 4, 'tet': 4, 'hex': 8}[table[n]]
+    return (table[n], n, nv)
+
 
 class InpFileReader():
+    """
+    @brief Abaqus .inp 文件读取器
+
+    Examples
+    --------
+    >> reader = InpFileReader('part.inp', progress=True)
+    >> reader.read()
+    >> mesh = reader.to_mesh()
+    """
+    def __init__(self, fname, chunksize=2**24, progress=None):
+        """
+        @param[in] fname 文件名
+        @param[in] chunksize 每次读入的字节数
+        @param[in] progress 进度回调函数 progress(nread, total), True 表示
+                   在标准错误输出上打印进度
+        """
+        self.fname = fname
+        self.chunksize = chunksize
+        self.progress = progress
+
+        self.nodeid = None # (NN, ) 节点编号
+        self.node = None # (NN, GD) 节点坐标
+        self.elements = {} # 单元类型 -> (单元编号, 单元的节点编号)
+        self.elset = {} # 单元集合名 -> (单元类型, 该类型中的单元序号)
+
+    @staticmethod
+    def parse_keyword(line):
+        """
+        @brief 解析关键字行, 如 b'*Element, type=C3D4, elset=EALL'
+
+        @return 大写的关键字和参数字典, 参数名为大写
+        """
+        words = [w.strip() for w in line.decode('latin-1').split(',')]
+        keyword = words[0][1:].strip().upper()
+        param = {}
+        for w in words[1:]:
+            if len(w) == 0:
+                continue
+            key, _, value = w.partition('=')
+            param[key.strip().upper()] = value.strip()
+        return keyword, param
+
+    def read(self):
+        nodes = []
+        elements = {}
+        with TextBlockReader(self.fname, chunksize=self.chunksize,
+                progress=self.progress) as reader:
+            while True:
+                line = reader.readline()
+                if line is None:
+                    break
+                if not line.startswith(b'*') or line.startswith(b'**'):
+                    continue
+                keyword, param = self.parse_keyword(line)
+                if keyword == 'NODE':
+                    nodes.append(self.read_rows(reader, None, np.float64))
+                elif keyword == 'ELEMENT':
+                    etype = param.get('TYPE', '').upper()
+                    family = element_family(etype)
+                    ncol = None if family is None else 1 + family[1]
+                    data = self.read_rows(reader, ncol, np.int64)
+                    start = sum(len(d) for d in elements.get(etype, []))
+                    elements.setdefault(etype, []).append(data)
+                    if 'ELSET' in param:
+                        idx = np.arange(start, start + len(data))
+                        name = param['ELSET']
+                        if name in self.elset and self.elset[name][0] == etype:
+                            idx = np.r_[self.elset[name][1], idx]
+                        self.elset[name] = (etype, idx)
+                else:
+                    for block in reader.blocks_until(b'*'):
+                        pass
+
+        if len(nodes) == 0:
+            raise ValueError("there is no *NODE block in {}!".format(self.fname))
+        GD = max(d.shape[1] for d in nodes) - 1
+        node = np.zeros((sum(len(d) for d in nodes), GD + 1), dtype=np.float64)
+        start = 0
+        for d in nodes:
+            node[start:start+len(d), :d.shape[1]] = d
+            start += len(d)
+        self.nodeid = node[:, 0].astype(np.int64)
+        self.node = node[:, 1:]
+
+        for etype, data in elements.items():
+            data = np.concatenate(data)
+            self.elements[etype] = (data[:, 0], data[:, 1:])
+        return self
+
+    def read_rows(self, reader, ncol, dtype):
+        """
+        @brief 读取关键字行之后的数据块, 每 ncol 个数为一行
+
+        ncol 为 None 时按第一行的数的个数确定, 此时不允许续行. 数据块中的
+        注释行 (以 ** 开头) 被跳过.
+        """
+        rows = []
+        rest = np.zeros(0, dtype=dtype)
+        for block in reader.blocks_until(b'*', skip=b'**'):
+            values = np.fromstring(block.replace(b',', b' '), dtype=dtype, sep=' ')
+            if ncol is None:
+                first = block.lstrip()
+                first = first[:first.find(b'\n')].strip()
+                if first.endswith(b','):
+                    raise ValueError("can not determine the number of nodes "
+                            "of the unknown element type!")
+                ncol = len(np.fromstring(first.replace(b',', b' '), dtype=dtype, sep=' '))
+            values = np.r_[rest, values]
+            n = len(values)//ncol*ncol
+            rows.append(values[:n].reshape(-1, ncol))
+            rest = values[n:]
+        if len(rest) > 0:
+            raise ValueError("the data block is incomplete!")
+        if len(rows) == 0:
+            return np.zeros((0, 1 if ncol is None else ncol), dtype=dtype)
+        return np.concatenate(rows)
+
+    def to_mesh(self):
+        """
+        @brief 用最高维的单元构造网格, 二次单元只保留顶点
+
+        四面体和三角形的定向被调整为体积 (面积) 为正. 没有被这些单元用到的
+        节点 (如二次单元的边中点) 被去掉.
+        """
+        if self.node is None:
+            self.read()
+        cells = {}
+        for etype, (_, conn) in self.elements.items():
+            family = element_family(etype)
+            if family is not None:
+                cells.setdefault(family[0], []).append(conn[:, :family[2]])
+
+        if 'tet' in cells or 'hex' in cells:
+            if 'tet' in cells and 'hex' in cells:
+                raise ValueError("mixed tetrahedron and hexahedron meshes are not supported!")
+            family = 'tet' if 'tet' in cells else 'hex'
+        elif 'tri' in cells or 'quad' in cells:
+            if 'tri' in cells and 'quad' in cells:
+                raise ValueError("mixed triangle and quadrangle meshes are not supported!")
+            family = 'tri' if 'tri' in cells else 'quad'
+        else:
+            raise ValueError("there are no supported elements in {}!".format(self.fname))
+        cell = np.concatenate(cells[family])
+
+        # 节点编号到节点序号
+        NN = len(self.nodeid)
+        if np.all(self.nodeid == np.arange(1, NN + 1)):
+            if cell.size > 0 and (cell.min() < 1 or cell.max() > NN):
+                raise ValueError("some elements refer to undefined nodes!")
+            cell = cell - 1
+        else:
+            order = np.argsort(self.nodeid, kind='stable')
+            pos = np.searchsorted(self.nodeid[order], cell)
+            pos = np.minimum(pos, NN - 1)
+            if np.any(self.nodeid[order[pos]] != cell):
+                raise ValueError("some elements refer to undefined nodes!")
+            cell = order[pos]
+
+        isUsed = np.zeros(NN, dtype=np.bool_)
+        isUsed[cell] = True
+        node = self.node[isUsed]
+        idxmap = np.zeros(NN, dtype=np.int_)
+        idxmap[isUsed] = np.arange(isUsed.sum())
+        cell = idxmap[cell]
+
+        if family in {'tri', 'quad'} and node.shape[1] == 3 and np.all(node[:, 2] == 0):
+            node = node[:, :2]
+
+        if family == 'tet':
+            v = node[cell[:, 1:]] - node[cell[:, [0]]]
+            flag = np.einsum('ci, ci->c', np.cross(v[:, 0], v[:, 1]), v[:, 2]) < 0
+            cell[flag, 1:3] = cell[flag, 2:0:-1]
+            return TetrahedronMesh(node, cell)
+        elif family == 'hex':
+            return HexahedronMesh(node, cell)
+        elif family == 'tri':
+            if node.shape[1] == 2:
+                v = node[cell[:, 1:]] - node[cell[:, [0]]]
+                flag = np.cross(v[:, 0], v[:, 1]) < 0
+                cell[flag, 1:3] = cell[flag, 2:0:-1]
+            return TriangleMesh(node, cell)
+        else:
+            return QuadrangleMesh(node, cell)
 
-    def __init__(self, fname):
-        with open(fname, 'r') as f:
-            contents = f.read() 
-        contents = re.sub('**.*\n', '', contents) 
-        contents = contents.split('\n')
-        self.contents = contents
-        self.cline = 0
 
 if __name__ == '__main__':
     import sys
 
     fname = sys.argv[1]
-    reader = InpFileReader(fname)
-    reader.read()
+    reader = InpFileReader(fname, progress=True)
+    mesh = reader.read().to_mesh()
+    print(mesh.__class__.__name__, mesh.number_of_nodes(), mesh.number_of_cells())
@@ -0,0 +1,415 @@
+"""
+Notes
+-----
+
+线性 (linear) 四叉树和八叉树: 只存储叶子单元, 每个叶子单元用它的层数 level
+和锚点 (左下角) 在最细层网格上的整数坐标 coord 表示, 并按锚点坐标的 Morton
+(Z-order) 编码 key 排序. 和 `Quadtree`/`Octree` 不同, 这里不保存祖先单元和
+parent/child 表, 所有操作都只涉及叶子单元:
+
+1. 加密时每个被标记的叶子在原位置被 2^GD 个孩子替换, 孩子按 Morton 序排列,
+   所以不需要重新排序; 粗化时连续的 2^GD 个兄弟合并为父单元
+2. 点定位和邻居查找都是 key 的运算: 叶子单元的 key 区间互不相交, 包含某一点
+   的叶子就是 key 不超过该点 key 的最后一个叶子
+3. 2:1 平衡, 叶子网格和悬挂点约束的导出都只用到叶子单元
+
+根单元是矩形 (长方体) 区域上 n[0] x n[1] (x n[2]) 的均匀网格.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .QuadrangleMesh import QuadrangleMesh
+from .HexahedronMesh import HexahedronMesh
+from .PolygonMesh import PolygonMesh
+
+
+class LinearTree():
+    def __init__(self, box, n, maxlevel=None):
+        """
+        @param[in] box 区域 [x0, x1, y0, y1(, z0, z1)]
+        @param[in] n 每个方向上根单元的个数
+        @param[in] maxlevel 最大加密层数
+        """
+        GD = len(n)
+        self.GD = GD
+        self.nbit = 63//GD # 每个方向上坐标的二进制位数
+        self.box = np.array(box, dtype=np.float64)
+        self.n = np.array(n, dtype=np.int64)
+
+        nr = int(np.ceil(np.log2(self.n.max() + 1)))
+        if maxlevel is None:
+            maxlevel = self.nbit - nr
+        if maxlevel + nr > self.nbit:
+            raise ValueError("maxlevel {} is too large for {} root cells!".format(
+                maxlevel, self.n))
+        self.maxlevel = maxlevel
+
+        self.origin = self.box[0::2]
+        self.h0 = (self.box[1::2] - self.box[0::2])/self.n # 根单元的尺寸
+
+        # 孩子的局部编号 c 的第 d 位是第 d 个方向上的偏移, 这样孩子按 Morton 序排列
+        self.corner = (np.arange(2**GD).reshape(-1, 1) >> np.arange(GD)) & 1
+
+        idx = np.indices(self.n).reshape(GD, -1).T
+        coord = idx << maxlevel
+        key = self.morton(coord)
+        order = np.argsort(key)
+        self.coord = coord[order]
+        self.key = key[order]
+        self.level = np.zeros(len(key), dtype=np.int_)
+
+    def morton(self, coord):
+        """
+        @brief 整数坐标的 Morton 编码, 第 d 个方向坐标的第 b 位在编码的第 GD*b+d 位
+        """
+        GD = self.GD
+        coord = np.asarray(coord, dtype=np.int64)
+        key = np.zeros(coord.shape[:-1], dtype=np.int64)
+        for b in range(self.nbit):
+            for d in range(GD):
+                key |= ((coord[..., d] >> b) & 1) << (GD*b + d)
+        return key
+
+    def number_of_leaves(self):
+        return len(self.key)
+
+    def number_of_cells(self):
+        return len(self.key)
+
+    def geo_dimension(self):
+        return self.GD
+
+    def leaf_size(self, index=np.s_[:]):
+        """
+        @brief 叶子单元在最细层网格上的整数边长
+        """
+        return np.left_shift(1, self.maxlevel - self.level[index])
+
+    def cell_size(self, index=np.s_[:]):
+        """
+        @brief 叶子单元各个方向的边长, 形状为 (NC, GD)
+        """
+        return self.h0/2.0**self.level[index, None]
+
+    def entity_barycenter(self, etype='cell', index=np.s_[:]):
+        if etype not in {'cell', self.GD}:
+            raise ValueError("only the barycenters of leaf cells are available!")
+        s = self.leaf_size(index)
+        return self.coord_to_point(self.coord[index] + s[:, None]/2)
+
+    def coord_to_point(self, coord):
+        hmin = self.h0/2**self.maxlevel
+        return self.origin + coord*hmin
+
+    def point_to_coord(self, p):
+        hmin = self.h0/2**self.maxlevel
+        c = np.floor((p - self.origin)/hmin).astype(np.int64)
+        return np.clip(c, 0, (self.n << self.maxlevel) - 1)
+
+    def is_in_domain(self, coord):
+        return np.all((coord >= 0) & (coord < (self.n << self.maxlevel)), axis=-1)
+
+    def locate_coord(self, coord):
+        """
+        @brief 包含最细层网格点 coord 的叶子单元编号, 区域外的点为 -1
+        """
+        flag = self.is_in_domain(coord)
+        idx = np.searchsorted(self.key, self.morton(coord), side='right') - 1
+        idx[~flag] = -1
+        return idx
+
+    def locate(self, points):
+        """
+        @brief 包含每个点的叶子单元编号
+        """
+        return self.locate_coord(self.point_to_coord(points))
+
+    def neighbor(self, offset, index=np.s_[:]):
+        """
+        @brief 通过 key 的运算查找邻居
+
+        @param[in] offset 长度为 GD 的偏移, 每个分量为 -1, 0 或 1, 例如二维中
+            (1, 0) 表示右边的邻居, (1, 1) 表示右上角的邻居
+        @return 包含与叶子单元同样大小的相邻区域中的一点 (靠近锚点) 的叶子编号,
+            区域外为 -1. 若返回的叶子层数不超过当前叶子, 它就是唯一的邻居,
+            否则该方向上有多个更细的邻居
+        """
+        offset = np.asarray(offset)
+        coord = self.coord[index]
+        s = self.leaf_size(index)[:, None]
+        c = coord + np.where(offset > 0, s, offset)
+        return self.locate_coord(c)
+
+    def offsets(self, full=True):
+        """
+        @brief 所有的邻居方向, full 为 False 时只包括面 (二维为边) 邻居
+        """
+        GD = self.GD
+        off = np.indices((3, )*GD).reshape(GD, -1).T - 1
+        off = off[np.any(off != 0, axis=1)]
+        if not full:
+            off = off[np.sum(off != 0, axis=1) == 1]
+        return off
+
+    def refine(self, isMarkedCell=None, data=None, balance=True):
+        """
+        @brief 加密被标记的叶子单元
+
+        @param[in] isMarkedCell 叶子单元上的布尔数组, None 表示一致加密
+        @param[in, out] data 叶子单元上的数据组成的字典, 孩子继承父单元的值
+        @param[in] balance 是否继续加密以保持相邻叶子单元层数之差不超过 1
+        """
+        NC = self.number_of_leaves()
+        if isMarkedCell is None:
+            isMarkedCell = np.ones(NC, dtype=np.bool_)
+        isMarkedCell = isMarkedCell & (self.level < self.maxlevel)
+        self._split(isMarkedCell, data)
+
+        if balance:
+            self.balance(data=data)
+
+    def _split(self, isMarkedCell, data=None):
+        nc = 2**self.GD
+        NC = self.number_of_leaves()
+        num = np.where(isMarkedCell, nc, 1)
+        src = np.repeat(np.arange(NC), num)
+        start = np.repeat(np.cumsum(num) - num, num)
+        local = np.arange(len(src)) - start # 孩子的局部编号, 未加密的单元为 0
+
+        isChild = isMarkedCell[src]
+        level = self.level[src] + isChild
+        s = np.left_shift(1, self.maxlevel - level)
+        coord = self.coord[src] + self.corner[local]*s[:, None]*isChild[:, None]
+
+        self.level = level
+        self.coord = coord
+        self.key = self.morton(coord)
+
+        if data is not None:
+            for key, value in data.items():
+                data[key] = value[src]
+
+    def balance(self, full=True, data=None):
+        """
+        @brief 2:1 平衡, 加密比某个邻居粗两层以上的叶子单元, 直到不再有这样的单元
+
+        @param[in] full 为 True 时考虑所有共享顶点的邻居, 否则只考虑面 (边) 邻居
+        """
+        offsets = self.offsets(full=full)
+        while True:
+            NC = self.number_of_leaves()
+            isMarkedCell = np.zeros(NC, dtype=np.bool_)
+            for off in offsets:
+                idx = self.neighbor(off)
+                flag = idx >= 0
+                i = idx[flag]
+                isMarkedCell[i[self.level[i] < self.level[flag] - 1]] = True
+            if not np.any(isMarkedCell):
+                break
+            self._split(isMarkedCell, data)
+
+    def coarsen(self, isMarkedCell, data=None, balance=True):
+        """
+        @brief 把 2^GD 个都被标记的兄弟叶子合并为父单元
+
+        @param[in, out] data 叶子单元上的数据组成的字典, 父单元取孩子的平均值
+        @param[in] balance 为 True 时不做会破坏 2:1 平衡的合并
+        @return 被合并的父单元个数
+        """
+        GD = self.GD
+        nc = 2**GD
+        NC = self.number_of_leaves()
+        level = self.level
+        s = self.leaf_size()
+        pcoord = self.coord - self.coord%(2*s[:, None]) # 父单元的锚点
+
+        # 兄弟单元在叶子序列中是连续的, 第一个孩子的锚点和父单元的相同
+        first, = np.nonzero(np.all(self.coord == pcoord, axis=1) &
+                (level > 0) & (np.arange(NC) + nc <= NC))
+        sib = first[:, None] + np.arange(nc)
+        flag = np.all(level[sib] == level[first, None], axis=1)
+        flag &= np.all(np.all(pcoord[sib] == pcoord[first, None], axis=-1), axis=1)
+        flag &= np.all(isMarkedCell[sib], axis=1)
+        first = first[flag]
+        sib = sib[flag]
+
+        if balance and len(first) > 0:
+            # 合并后父单元比它的孩子粗一层, 孩子在父单元外的同样大小的相邻区域
+            # 中不能有更细的叶子
+            isOK = np.ones(len(first), dtype=np.bool_)
+            c = sib.reshape(-1)
+            start = np.repeat(first, nc)
+            for off in self.offsets():
+                idx = self.neighbor(off, index=c)
+                out = (idx >= 0) & ((idx < start) | (idx >= start + nc))
+                bad = out & (self.level[np.maximum(idx, 0)] > self.level[c])
+                isOK &= ~np.any(bad.reshape(-1, nc), axis=1)
+            first = first[isOK]
+            sib = sib[isOK]
+
+        if len(first) == 0:
+            return 0
+
+        isRemove = np.zeros(NC, dtype=np.bool_)
+        isRemove[sib[:, 1:]] = True
+        isRemain = ~isRemove
+
+        if data is not None:
+            for key, value in data.items():
+                value = value.copy()
+                value[first] = np.mean(value[sib], axis=1)
+                data[key] = value[isRemain]
+
+        self.level[first] -= 1
+        self.level = self.level[isRemain]
+        self.coord = self.coord[isRemain]
+        self.key = self.key[isRemain]
+        return len(first)
+
+    def uniform_refine(self, n=1):
+        for i in range(n):
+            self.refine(balance=False)
+
+    def _nodes(self):
+        """
+        @brief 叶子单元的顶点, 整数坐标相同的顶点只保留一个
+
+        @return nkey 排好序的顶点 key, ncoord 顶点整数坐标, cell 叶子单元的顶点编号
+        """
+        s = self.leaf_size()
+        c = self.coord[:, None, :] + self.corner*s[:, None, None]
+        key = self.morton(c)
+        nkey, i, j = np.unique(key.reshape(-1), return_index=True, return_inverse=True)
+        ncoord = c.reshape(-1, self.GD)[i]
+        cell = j.reshape(key.shape)
+        return nkey, ncoord, cell
+
+    def _node_index(self, nkey, coord):
+        """
+        @brief 整数坐标为 coord 的顶点编号, 不是顶点时为 -1
+        """
+        key = self.morton(coord)
+        idx = np.searchsorted(nkey, key)
+        idx = np.minimum(idx, len(nkey) - 1)
+        idx[nkey[idx] != key] = -1
+        return idx
+
+    def hanging_node_constraints(self):
+        """
+        @brief 叶子网格上的悬挂点约束, 节点编号和 `to_mesh` 相同
+
+        悬挂点是叶子单元的顶点, 同时位于某个更粗的叶子单元的边 (或者面) 的
+        内部. 它的值由那条边 (或那个面) 的顶点上的值线性 (多线性) 插值得到.
+
+        @return isHangingNode, P, 其中 P 是 NN x NN 的稀疏矩阵, 非悬挂点对应
+            单位矩阵的行, 悬挂点对应的行只在非悬挂点上有非零元, 即协调的
+            连续分片多线性函数在所有节点上的值为 P@u
+        """
+        GD = self.GD
+        nkey, ncoord, cell = self._nodes()
+        NN = len(nkey)
+
+        # 叶子单元边界上的半步长格点, 至少一个坐标是中点
+        lattice = np.indices((3, )*GD).reshape(GD, -1).T
+        isMid = (lattice == 1)
+        isBd = np.any(lattice != 1, axis=1)
+        lattice = lattice[np.any(isMid, axis=1) & isBd]
+        isMid = (lattice == 1)
+
+        index, = np.nonzero(self.level < self.maxlevel)
+        s = self.leaf_size(index)
+        I = []
+        J = []
+        val = []
+        for p, m in zip(lattice, isMid):
+            c = self.coord[index] + p*s[:, None]//2
+            h = self._node_index(nkey, c)
+            flag = h >= 0
+            if not np.any(flag):
+                continue
+            # 父顶点: 中点方向上取两个端点
+            nm = np.sum(m)
+            q = np.where(m, 0, p//2)
+            corners = np.indices((2, )*nm).reshape(nm, -1).T
+            for t in corners:
+                q1 = q.copy()
+                q1[m] = t
+                pc = self.coord[index[flag]] + q1*s[flag, None]
+                I.append(h[flag])
+                J.append(self._node_index(nkey, pc))
+                val.append(np.full(flag.sum(), 1/2**nm))
+
+        isHangingNode = np.zeros(NN, dtype=np.bool_)
+        if len(I) > 0:
+            I = np.concatenate(I)
+            J = np.concatenate(J)
+            val = np.concatenate(val)
+            # 同一个悬挂点可能被几个单元找到, 只保留一次
+            _, k = np.unique(I*NN + J, return_index=True)
+            I = I[k]
+            J = J[k]
+            val = val[k]
+            isHangingNode[I] = True
+
+        free, = np.nonzero(~isHangingNode)
+        I = np.r_[free, I]
+        J = np.r_[free, J]
+        val = np.r_[np.ones(len(free)), val]
+        P0 = csr_matrix((val, (I, J)), shape=(NN, NN))
+
+        # 悬挂点的父顶点可能也是悬挂点, 反复代入直到只依赖非悬挂点
+        P = P0
+        while P[isHangingNode][:, isHangingNode].nnz > 0:
+            P = P0@P
+        P.eliminate_zeros()
+        return isHangingNode, P
+
+    def to_mesh(self):
+        """
+        @brief 叶子单元组成的网格, 悬挂点作为普通节点
+        """
+        nkey, ncoord, cell = self._nodes()
+        node = self.coord_to_point(ncoord)
+        return self.Mesh(node, cell[:, self.localCell])
+
+
+class LinearQuadtree(LinearTree):
+    Mesh = QuadrangleMesh
+    # Morton 序的顶点 (0, 0), (1, 0), (0, 1), (1, 1) 到逆时针顺序
+    localCell = np.array([0, 1, 3, 2], dtype=np.int_)
+
+    def __init__(self, box, nx, ny, maxlevel=None):
+        super().__init__(box, (nx, ny), maxlevel=maxlevel)
+
+    def to_pmesh(self):
+        """
+        @brief 叶子单元组成的多边形网格, 边上的悬挂点作为多边形的顶点
+        """
+        nkey, ncoord, cell = self._nodes()
+        NC = self.number_of_leaves()
+        s = self.leaf_size()
+
+        # 逆时针: 顶点 0, 边 0 的中点, 顶点 1, ...
+        mid = np.array([(1, 0), (2, 1), (1, 2), (0, 1)], dtype=np.int64)
+        table = -np.ones((NC, 8), dtype=np.int_)
+        table[:, 0::2] = cell[:, self.localCell]
+        for i in range(4):
+            c = self.coord + mid[i]*s[:, None]//2
+            table[:, 2*i+1] = self._node_index(nkey, c)
+        table[self.level == self.maxlevel, 1::2] = -1 # 最细层的单元没有悬挂点
+
+        flag = table >= 0
+        pcell = table[flag]
+        cellLocation = np.zeros(NC+1, dtype=np.int_)
+        cellLocation[1:] = np.cumsum(flag.sum(axis=1))
+        node = self.coord_to_point(ncoord)
+        return PolygonMesh(node, pcell, cellLocation)
+
+
+class LinearOctree(LinearTree):
+    Mesh = HexahedronMesh
+    # Morton 序的顶点到 `HexahedronMesh` 的顶点顺序
+    localCell = np.array([0, 1, 3, 2, 4, 5, 7, 6], dtype=np.int_)
+
+    def __init__(self, box, nx, ny, nz, maxlevel=None):
+        super().__init__(box, (nx, ny, nz), maxlevel=maxlevel)
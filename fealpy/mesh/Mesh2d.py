@@ -2,6 +2,7 @@ import numpy as np
 from scipy.sparse import coo_matrix, csc_matrix, csr_matrix, spdiags, eye, tril, triu
 from .mesh_tools import unique_row, find_node, find_entity, show_mesh_2d
 from ..common import ranges
+from .core import index_dtype
 from types import ModuleType
 
 class Mesh2d(object):
@@ -248,7 +249,10 @@ class Mesh2dDataStructure():
     def reinit(self, NN, cell):
         self.NN = NN
         self.NC = cell.shape[0]
-        self.cell = cell
+        # 加密后规模变大时必要的话改用更宽的整数类型
+        self.itype = np.promote_types(getattr(self, 'itype', cell.dtype),
+                index_dtype(max(NN, self.NEC*self.NC)))
+        self.cell = cell.astype(self.itype, copy=False)
         self.construct()
 
     def clear(self):
@@ -4,6 +4,7 @@ from types import ModuleType
 from scipy.sparse import coo_matrix, csc_matrix, csr_matrix, spdiags, eye, tril, triu
 from .mesh_tools import unique_row, find_entity, show_mesh_3d, find_node
 from ..common import ranges
+from .core import index_dtype
 
 
 class Mesh3d():
@@ -182,7 +183,10 @@ class Mesh3dDataStructure():
     def reinit(self, NN, cell):
         self.NN = NN
         self.NC = cell.shape[0]
-        self.cell = cell
+        # 加密后规模变大时必要的话改用更宽的整数类型
+        self.itype = np.promote_types(getattr(self, 'itype', cell.dtype),
+                index_dtype(max(NN, self.NEC*self.NC)))
+        self.cell = cell.astype(self.itype, copy=False)
         self.construct()
 
     def clear(self):
@@ -246,7 +250,7 @@ class Mesh3dDataStructure():
                 return_inverse=True,
                 axis=0)
         NEC = self.NEC
-        self.cell2edge = np.reshape(j, (NC, NEC))
+        self.cell2edge = np.reshape(j, (NC, NEC)).astype(self.itype)
         self.NE = self.edge.shape[0]
 
     def cell_to_node(self, return_sparse=False):
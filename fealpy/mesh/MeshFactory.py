@@ -99,10 +99,20 @@ def meshpy2d(points, facets, h, hole_points=None, facet_markers=None, point_mark
         pnode, pcell, pcellLocation = mesh.to_polygonmesh()
         return PolygonMesh(pnode, pcell, pcellLocation)
 
-def split_mesh(mesh, entity='cell'):
-    from fealpy.graph import metis
-    edgecuts, parts = metis.part_mesh(tmesh, nparts=n, entity=entity)
-    return edgecuts, parts
+def split_mesh(mesh, nparts=2, entity='cell', method='metis'):
+    """
+
+    Notes
+    -----
+    剖分网格实体, method 为 'metis' 时调用 METIS, 否则调用不依赖 METIS 的
+    `fealpy.graph.partition.part_mesh`, 可选 'rcb', 'hilbert', 'morton',
+    'spectral'.
+    """
+    if method == 'metis':
+        from fealpy.graph import metis
+        return metis.part_mesh(mesh, nparts=nparts, entity=entity)
+    from fealpy.graph import partition
+    return partition.part_mesh(mesh, nparts=nparts, entity=entity, method=method)
 
 def delete_cell(node, cell, threshold):
     """
@@ -1,62 +1,94 @@
+"""
+Notes
+-----
+
+Triangle 的 .poly 文件 (平面直线图) 的流式读取.
+
+去掉 `#` 开始的注释后, .poly 文件就是一个数的序列, 各段的头部给出了后面
+数据的个数, 所以用 `TextBlockReader.read_tokens` 按块解析, 直接得到预先
+分配好大小的数组.
+"""
 import numpy as np
-import re
+
+from .TextBlockReader import TextBlockReader
+
 
 class PolyFileReader():
-    def __init__(self, fname):
-        with open(fname, 'r') as f:
-            contents = f.read() 
-        contents = re.sub('#.*\n', '', contents) 
-        contents = contents.split('\n')
-        self.contents = contents
-        self.cline = 0
+    """
+    @brief Triangle .poly 文件读取器
+
+    Examples
+    --------
+    >> reader = PolyFileReader('A.poly')
+    >> data = reader.read()
+    >> data['vertices']['xy'], data['segments']['endpoint']
+    """
+    def __init__(self, fname, chunksize=2**24, progress=None):
+        """
+        @param[in] fname 文件名
+        @param[in] chunksize 每次读入的字节数
+        @param[in] progress 进度回调函数 progress(nread, total), True 表示
+                   在标准错误输出上打印进度
+        """
+        self.fname = fname
+        self.chunksize = chunksize
+        self.progress = progress
         self.data = {'vertices':None, 'segments':None, 'holes':None,
                 'regions':None}
 
     def read(self):
-        self.read_vertices()
-        self.read_segments()
-        self.read_holes()
-        self.contents = None
-        print(self.data)
+        with TextBlockReader(self.fname, chunksize=self.chunksize,
+                progress=self.progress, comment=b'#') as reader:
+            self.reader = reader
+            self.read_vertices()
+            self.read_segments()
+            self.read_holes()
+            self.read_regions()
+            self.reader = None
+        return self.data
 
     def read_vertices(self):
-        head = np.fromstring(self.contents[self.cline], np.int, sep=' ')
-        NV = head[0]
-        nc = 3 + head[2] + head[3]
-        data = np.zeros((NV, nc), dtype=np.float)
-        self.read_data(data)
-        self.data['vertices'] = {'index': data[:, 0].astype(np.int), 'xy': data[:, 1:3]} 
-        self.data['vertices']['attribute'] = data[:, 3:3+head[2]] if head[2] > 0 else None
-        self.data['vertices']['bdmarker'] = data[:, 3+head[2]:].astype(np.int) if head[3] == 1 else None
+        NV, dim, nattr, nbm = self.reader.read_tokens(4, dtype=np.int_)
+        if NV == 0:
+            raise ValueError("the vertices in a separate .node file are not supported!")
+        nc = 1 + dim + nattr + nbm
+        data = self.reader.read_tokens(NV*nc).reshape(NV, nc)
+        index = data[:, 0].astype(np.int_)
+        self.base = index[0] # 编号从 0 或 1 开始
+        self.data['vertices'] = {'index': index, 'xy': data[:, 1:1+dim]}
+        self.data['vertices']['attribute'] = data[:, 1+dim:1+dim+nattr] if nattr > 0 else None
+        self.data['vertices']['bdmarker'] = data[:, 1+dim+nattr:].astype(np.int_) if nbm == 1 else None
 
     def read_segments(self):
-        head = np.fromstring(self.contents[self.cline], np.int, sep=' ')
-        NS = head[0]
-        nc = 3 + head[1]
-        data = np.zeros((NS, nc), dtype=np.int)
-        self.read_data(data)
-        self.data['segments'] = {'index': data[:, 0], 'endpoint': data[:, 1:3]-1}
-        self.data['segments']['bdmarker'] = data[:, 3:] if head[1] == 1 else None
+        NS, nbm = self.reader.read_tokens(2, dtype=np.int_)
+        nc = 3 + nbm
+        data = self.reader.read_tokens(NS*nc, dtype=np.int_).reshape(NS, nc)
+        self.data['segments'] = {'index': data[:, 0], 'endpoint': data[:, 1:3] - self.base}
+        self.data['segments']['bdmarker'] = data[:, 3:] if nbm == 1 else None
 
     def read_holes(self):
-        head = np.fromstring(self.contents[self.cline], np.int, sep=' ')
-        NH = head[0]
-        nc = 3
+        NH, = self.reader.read_tokens(1, dtype=np.int_)
         if NH > 0:
-            data = np.zeros((NH, nc), dtype=np.float)
-            self.read_data(data)
-            self.data['holes']={'index': data[:, 0].astype(np.int), 'xy':data[:, 1:]}
+            data = self.reader.read_tokens(NH*3).reshape(NH, 3)
+            self.data['holes'] = {'index': data[:, 0].astype(np.int_), 'xy': data[:, 1:]}
+
+    def read_regions(self):
+        """
+        @brief 可选的区域属性段, 每行为编号, 坐标, 属性和最大面积
+        """
+        try:
+            NR, = self.reader.read_tokens(1, dtype=np.int_)
+        except ValueError:
+            return
+        if NR > 0:
+            data = self.reader.read_tokens(NR*5).reshape(NR, 5)
+            self.data['regions'] = {'index': data[:, 0].astype(np.int_),
+                    'xy': data[:, 1:3], 'attribute': data[:, 3], 'maxarea': data[:, 4]}
 
-    def read_data(self, data):
-        N = data.shape[0]
-        self.cline += 1
-        for i in range(N):
-            data[i, :] = np.fromstring(self.contents[self.cline + i], np.float, sep=' ')
-        self.cline += N
 
 if __name__ == '__main__':
     import sys
 
     fname = sys.argv[1]
     reader = PolyFileReader(fname)
-    reader.read()
+    print(reader.read())
@@ -1,6 +1,6 @@
 import numpy as np
 from scipy.sparse import coo_matrix, csc_matrix, csr_matrix, spdiags, eye, tril, triu
-from ..common import ranges
+from ..common import RaggedArray
 from .mesh_tools import unique_row, find_entity, show_mesh_2d
 from ..quadrature import TriangleQuadrature
 from .Mesh2d import Mesh2d
@@ -93,9 +93,7 @@ class PolygonMesh(Mesh2d):
         dim = self.geo_dimension()
 
         if etype in {'cell', 2}:
-            cell2node = self.ds.cell_to_node()
-            NV = self.number_of_vertices_of_cells().reshape(-1,1)
-            bc = cell2node*node/NV
+            bc = self.ds.cellArray.with_data(node[self.ds.cell]).mean()
         elif etype in {'edge', 1}:
             edge = self.ds.edge
             bc = np.sum(node[edge, :], axis=1).reshape(-1, dim)/edge.shape[1]
@@ -106,15 +104,9 @@ class PolygonMesh(Mesh2d):
     def angle(self):
         node = self.node
         cell = self.ds.cell
-        cellLocation = self.ds.cellLocation
-
-        idx1 = np.zeros(cell.shape[0], dtype=np.int_)
-        idx2 = np.zeros(cell.shape[0], dtype=np.int_)
 
-        idx1[0:-1] = cell[1:]
-        idx1[cellLocation[1:]-1] = cell[cellLocation[:-1]]
-        idx2[1:] = cell[0:-1]
-        idx2[cellLocation[:-1]] = cell[cellLocation[1:]-1]
+        idx1 = self.ds.cellArray.roll(-1).data # 下一个顶点
+        idx2 = self.ds.cellArray.roll(1).data # 上一个顶点
         a = node[idx1] - node[cell]
         b = node[idx2] - node[cell]
         la = np.sum(a**2, axis=1)
@@ -124,15 +116,9 @@ class PolygonMesh(Mesh2d):
 
     def node_normal(self):
         node = self.node
-        cell, cellLocation = self.entity('cell')
-
-        idx1 = np.zeros(cell.shape[0], dtype=np.int)
-        idx2 = np.zeros(cell.shape[0], dtype=np.int)
 
-        idx1[0:-1] = cell[1:]
-        idx1[cellLocation[1:]-1] = cell[cellLocation[:-1]]
-        idx2[1:] = cell[0:-1]
-        idx2[cellLocation[:-1]] = cell[cellLocation[1:]-1]
+        idx1 = self.ds.cellArray.roll(-1).data
+        idx2 = self.ds.cellArray.roll(1).data
 
         w = np.array([(0,-1),(1,0)])
         d = node[idx1] - node[idx2]
@@ -196,7 +182,7 @@ class PolygonMesh(Mesh2d):
         NC = len(cell2edge)
         node = np.r_['0', self.node, bc]
         cell = np.zeros((NC, 3), dtype=self.itype)
-        cell[:, 0] = np.repeat(range(NN, NN + len(bc)), NV)
+        cell[:, 0] = NN + self.ds.cellArray.row_index()
         cell[:, 1:] = edge[cell2edge]
         return node, cell
 
@@ -267,13 +253,14 @@ class PolygonMeshDataStructure():
 
         self.cell = cell
         self.cellLocation = cellLocation
+        self.cellArray = RaggedArray(cell, cellLocation)
 
         if topdata is None:
             self.construct()
         else:
             self.edge = topdata[0]
             self.edge2cell = topdata[1]
-            self.NE = len(edge)
+            self.NE = len(self.edge)
 
     def reinit(self, NN, cell, cellLocation):
         self.NN = NN
@@ -281,6 +268,7 @@ class PolygonMeshDataStructure():
 
         self.cell = cell
         self.cellLocation = cellLocation
+        self.cellArray = RaggedArray(cell, cellLocation)
         self.construct()
 
     def clear(self):
@@ -301,24 +289,13 @@ class PolygonMeshDataStructure():
 
     def total_edge(self):
         cell = self.cell
-        cellLocation = self.cellLocation
-
-        NN = self.NN
-        NC = self.NC
-        NV = self.number_of_nodes_of_cells()
-
-        totalEdge = np.zeros((cell.shape[0], 2), dtype=np.int)
+        totalEdge = np.zeros((cell.shape[0], 2), dtype=cell.dtype)
         totalEdge[:, 0] = cell
-        totalEdge[:-1, 1] = cell[1:]
-        totalEdge[cellLocation[1:] - 1, 1] = cell[cellLocation[:-1]]
+        totalEdge[:, 1] = self.cellArray.roll(-1).data
         return totalEdge
 
     def construct(self):
-        NC = self.NC
-
         cell = self.cell
-        cellLocation = self.cellLocation
-        NV = self.number_of_vertices_of_cells()
 
         totalEdge = self.total_edge()
         _, i0, j = np.unique(np.sort(totalEdge, axis=1),
@@ -334,48 +311,38 @@ class PolygonMeshDataStructure():
 
         self.edge = totalEdge[i0]
 
-        cellIdx = np.repeat(range(NC), NV)
- 
-        localIdx = ranges(NV)
+        cellIdx = self.cellArray.row_index()
+        localIdx = self.cellArray.local_index()
 
         self.edge2cell[:, 0] = cellIdx[i0]
         self.edge2cell[:, 1] = cellIdx[i1]
         self.edge2cell[:, 2] = localIdx[i0]
         self.edge2cell[:, 3] = localIdx[i1]
 
-    def cell_to_node(self):
-        NN = self.NN
-        NC = self.NC
-        NE = self.NE
-
-        cell = self.cell
-        cellLocation = self.cellLocation
-        NV = self.number_of_vertices_of_cells()
-        I = np.repeat(range(NC), NV)
-        J = cell
-
-        val = np.ones(len(cell), dtype=np.bool)
-        cell2node = csr_matrix((val, (I, J)), shape=(NC, NN), dtype=np.bool)
-        return cell2node
+    def cell_to_node(self, return_sparse=True):
+        """
+        @brief 单元到节点的关系, 稀疏矩阵或者 `RaggedArray`
+        """
+        if return_sparse:
+            return self.cellArray.to_csr(self.NN)
+        else:
+            return self.cellArray
 
     def cell_to_edge(self, return_sparse=False):
+        """
+        @brief 单元到边的关系, 稀疏矩阵或者和 cell 对齐, 由 cellLocation 划分
+               的一维数组 (第 i 个单元的第 j 条边从第 j 个顶点出发)
+        """
         NE = self.NE
-        NC = self.NC
-
         edge2cell = self.edge2cell
-        cell = self.cell
         cellLocation = self.cellLocation
 
+        cell2edge = np.zeros(len(self.cell), dtype=self.cell.dtype)
+        cell2edge[cellLocation[edge2cell[:, 0]] + edge2cell[:, 2]] = range(NE)
+        cell2edge[cellLocation[edge2cell[:, 1]] + edge2cell[:, 3]] = range(NE)
         if return_sparse:
-            J = np.arange(NE)
-            val = np.ones((NE,), dtype=np.bool)
-            cell2edge = coo_matrix((val, (edge2cell[:,0], J)), shape=(NC, NE), dtype=np.bool)
-            cell2edge += coo_matrix((val, (edge2cell[:,1], J)), shape=(NC, NE), dtype=np.bool)
-            return cell2edge.tocsr()
+            return self.cellArray.with_data(cell2edge).to_csr(NE)
         else:
-            cell2edge = np.zeros(cell.shape[0], dtype=np.int)
-            cell2edge[cellLocation[edge2cell[:, 0]] + edge2cell[:, 2]] = range(NE)
-            cell2edge[cellLocation[edge2cell[:, 1]] + edge2cell[:, 3]] = range(NE)
             return cell2edge
 
     def cell_to_edge_sign(self, return_sparse=True):
@@ -461,16 +428,7 @@ class PolygonMeshDataStructure():
         return node2edge.tocsr()
 
     def node_to_cell(self):
-        NN = self.NN
-        NC = self.NC
-
-        cell = self.cell
-        NV = self.number_of_vertices_of_cells()
-        I = cell
-        J = np.repeat(range(NC), NV)
-        val = np.ones(cell.shape[0], dtype=np.bool)
-        node2cell = csr_matrix((val, (I, J)), shape=(NN, NC), dtype=np.bool)
-        return node2cell
+        return self.cell_to_node().T.tocsr()
 
     def boundary_edge_to_edge(self):
         NN = self.NN
@@ -0,0 +1,193 @@
+import numpy as np
+from functools import reduce
+from scipy.sparse import diags, kron, csr_matrix
+from scipy.sparse.linalg import LinearOperator
+
+
+class StencilOperator():
+    """
+    @brief 结构网格节点上的常系数模板 (stencil) 算子
+
+    模板用字典表示, 键为各方向上的偏移, 值为对应的系数, 例如二维五点差分格式
+    {(0, 0): 4, (1, 0): -1, (-1, 0): -1, (0, 1): -1, (0, -1): -1}.
+    落在网格外部的邻居直接舍去, 和逐项组装的稀疏矩阵一致.
+
+    算子可以直接用数组切片作用到网格函数上, 也可以转化为 `LinearOperator`
+    或者需要时一次性构造出 CSR 矩阵.
+    """
+    def __init__(self, shape, stencil, dtype=np.float64):
+        """
+        @param[in] shape 节点网格的形状, 如 (nx+1, ny+1)
+        @param[in] stencil 偏移到系数的字典
+        """
+        self.gshape = tuple(shape)
+        self.stencil = {tuple(k): v for k, v in stencil.items()}
+        self.dtype = dtype
+
+        N = int(np.prod(self.gshape))
+        self.shape = (N, N)
+
+    @classmethod
+    def laplace(cls, shape, h, dtype=np.float64):
+        """
+        @brief 负 Laplace 算子 -\\Delta_h 的 2*GD+1 点差分模板, 各方向步长可以不同
+        """
+        GD = len(shape)
+        c = [1/h[k]**2 for k in range(GD)]
+        stencil = {(0, )*GD: 2*sum(c)}
+        for k in range(GD):
+            for s in (-1, 1):
+                off = [0]*GD
+                off[k] = s
+                stencil[tuple(off)] = -c[k]
+        return cls(shape, stencil, dtype=dtype)
+
+    def _slices(self, off):
+        """
+        @brief 返回偏移 off 对应的目标切片和源切片, 即 v[dst] += c*u[src]
+        """
+        dst = []
+        src = []
+        for o, n in zip(off, self.gshape):
+            if o >= 0:
+                dst.append(slice(0, n-o))
+                src.append(slice(o, n))
+            else:
+                dst.append(slice(-o, n))
+                src.append(slice(0, n+o))
+        return tuple(dst), tuple(src)
+
+    def apply(self, u, out=None):
+        """
+        @brief 用数组切片计算 v = A u, 不构造矩阵
+
+        @param[in] u 网格函数, 形状为 gshape 或者展平后的 (N, )
+        """
+        U = u.reshape(self.gshape)
+        if out is None:
+            V = np.zeros(self.gshape, dtype=np.result_type(self.dtype, u.dtype))
+        else:
+            V = out.reshape(self.gshape)
+            V[:] = 0
+        for off, c in self.stencil.items():
+            dst, src = self._slices(off)
+            V[dst] += c*U[src]
+        return V.reshape(u.shape)
+
+    def __matmul__(self, u):
+        return self.apply(u)
+
+    def diagonal(self):
+        GD = len(self.gshape)
+        c = self.stencil.get((0, )*GD, 0)
+        return np.full(self.shape[0], c, dtype=self.dtype)
+
+    def linear_operator(self):
+        """
+        @brief 无矩阵的 scipy `LinearOperator`, 可直接用于 cg, gmres 等
+        """
+        return LinearOperator(self.shape, matvec=self.apply, dtype=self.dtype)
+
+    def to_csr(self):
+        """
+        @brief 用 `scipy.sparse.diags` 一次性构造 CSR 矩阵
+        """
+        N = self.shape[0]
+        GD = len(self.gshape)
+        strides = [int(np.prod(self.gshape[k+1:])) for k in range(GD)]
+
+        data = {}
+        for off, c in self.stencil.items():
+            s = sum(o*t for o, t in zip(off, strides))
+            dst, _ = self._slices(off)
+            val = np.zeros(self.gshape, dtype=self.dtype)
+            val[dst] = c
+            val = val.reshape(-1)
+            val = val[:N-s] if s >= 0 else val[-s:]
+            if s in data:
+                data[s] = data[s] + val
+            else:
+                data[s] = val
+        offsets = list(data.keys())
+        return diags([data[s] for s in offsets], offsets,
+                shape=self.shape, format='csr', dtype=self.dtype)
+
+
+class TensorProductOperator():
+    """
+    @brief 张量积网格上的算子 A = \\sum_t A_t^0 \\otimes A_t^1 [\\otimes A_t^2]
+
+    其中 A_t^k 是第 k 个方向上的一维矩阵 (如一维有限元的质量和刚度矩阵),
+    作用到网格函数上时只需沿各个方向依次乘一维矩阵.
+    """
+    def __init__(self, terms, dtype=np.float64):
+        """
+        @param[in] terms 列表, 每一项是各方向一维矩阵组成的元组
+        """
+        self.terms = [tuple(term) for term in terms]
+        self.gshape = tuple(A.shape[0] for A in self.terms[0])
+        self.dtype = dtype
+
+        N = int(np.prod(self.gshape))
+        self.shape = (N, N)
+
+    def apply(self, u, out=None):
+        """
+        @brief 计算 v = A u, 不构造全局矩阵
+        """
+        U = u.reshape(self.gshape)
+        if out is None:
+            V = np.zeros(self.gshape, dtype=np.result_type(self.dtype, u.dtype))
+        else:
+            V = out.reshape(self.gshape)
+            V[:] = 0
+        for term in self.terms:
+            W = U
+            for k, A in enumerate(term):
+                W = np.moveaxis(W, k, 0)
+                s = W.shape
+                W = (A@W.reshape(s[0], -1)).reshape(s)
+                W = np.moveaxis(W, 0, k)
+            V += W
+        return V.reshape(u.shape)
+
+    def __matmul__(self, u):
+        return self.apply(u)
+
+    def diagonal(self):
+        d = 0
+        for term in self.terms:
+            d = d + reduce(np.multiply.outer, [A.diagonal() for A in term])
+        return np.asarray(d, dtype=self.dtype).reshape(-1)
+
+    def linear_operator(self):
+        return LinearOperator(self.shape, matvec=self.apply, dtype=self.dtype)
+
+    def to_csr(self):
+        """
+        @brief 用 Kronecker 积一次性构造 CSR 矩阵
+        """
+        A = csr_matrix(self.shape, dtype=self.dtype)
+        for term in self.terms:
+            A += reduce(lambda x, y: kron(x, y, format='csr'), term)
+        return A.tocsr()
+
+
+def interval_mass_matrix(n, h, dtype=np.float64):
+    """
+    @brief 一维均匀网格 (n 段) 上线性元的质量矩阵
+    """
+    d = np.full(n+1, 4*h/6, dtype=dtype)
+    d[[0, -1]] = 2*h/6
+    e = np.full(n, h/6, dtype=dtype)
+    return diags([e, d, e], [-1, 0, 1], format='csr', dtype=dtype)
+
+
+def interval_stiff_matrix(n, h, dtype=np.float64):
+    """
+    @brief 一维均匀网格 (n 段) 上线性元的刚度矩阵
+    """
+    d = np.full(n+1, 2/h, dtype=dtype)
+    d[[0, -1]] = 1/h
+    e = np.full(n, -1/h, dtype=dtype)
+    return diags([e, d, e], [-1, 0, 1], format='csr', dtype=dtype)
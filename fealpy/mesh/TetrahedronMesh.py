@@ -4,6 +4,7 @@ from scipy.sparse import spdiags, eye, tril, triu, bmat
 from scipy.spatial import KDTree
 from .mesh_tools import unique_row
 from .Mesh3d import Mesh3d, Mesh3dDataStructure
+from .core import index_dtype
 from ..quadrature import TetrahedronQuadrature, TriangleQuadrature, GaussLegendreQuadrature
 from ..decorator import timer
 
@@ -47,15 +48,18 @@ class TetrahedronMeshDataStructure(Mesh3dDataStructure):
 
 
 class TetrahedronMesh(Mesh3d):
-    def __init__(self, node, cell, showmemory=False):
+    def __init__(self, node, cell, showmemory=False, itype=None):
+        """
+        @param[in] itype 编号数组的整数类型, 默认在规模允许时用 int32
+        """
         self.node = node
         NN = node.shape[0]
-        self.ds = TetrahedronMeshDataStructure(NN, cell)
+        itype = index_dtype(max(NN, 6*len(cell)), itype)
+        self.ds = TetrahedronMeshDataStructure(NN, cell.astype(itype, copy=False))
 
         self.meshtype = 'tet'
         self.p = 1  
 
-        self.itype = cell.dtype
         self.ftype = node.dtype
 
         self.celldata = {}
@@ -80,6 +84,10 @@ class TetrahedronMesh(Mesh3d):
             print("memory size of cell2edge array (GB): ", c2esize)
             print("Total memory size (GB): ",  total)
 
+    @property
+    def itype(self):
+        return self.ds.itype
+
     def integrator(self, q, etype=3):
         """
         @brief 获取不同维度网格实体上的积分公式 
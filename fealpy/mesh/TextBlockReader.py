@@ -0,0 +1,190 @@
+"""
+Notes
+-----
+
+按块读取大型文本网格文件的工具.
+
+文件按固定字节数的块读入, 数值块直接用 `np.fromstring` 解析成 NumPy 数组,
+不会为每一行或每一个数生成 Python 对象, 内存只和块的大小以及最终的数组
+有关. `InpFileReader`, `FABFileReader` 和 `PolyFileReader` 都基于它实现.
+"""
+import os
+import re
+import sys
+
+import numpy as np
+
+
+def print_progress(nread, total):
+    """
+    @brief 在标准错误输出上打印读取进度
+    """
+    sys.stderr.write('\r{:6.1f}% ({} / {} bytes)'.format(
+        100*nread/max(total, 1), nread, total))
+    if nread >= total:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+
+def parse_lines(block, dtype=np.float64, delimiter=None):
+    """
+    @brief 解析只包含数值的若干完整行
+
+    @param[in] block 以换行结尾的字节串
+    @param[in] delimiter 除空白以外的分隔符, 如 b','
+
+    @return values 所有数值, counts 每一行的数值个数, starts 每一行在 block
+            中的起始字节位置, 空行被去掉
+    """
+    if delimiter is not None:
+        block = block.replace(delimiter, b' ')
+    a = np.frombuffer(block, dtype=np.uint8)
+    isSpace = (a == 32) | (a == 9) | (a == 10) | (a == 13)
+    isStart = ~isSpace
+    isStart[1:] &= isSpace[:-1]
+
+    nl = np.flatnonzero(a == 10)
+    if len(nl) == 0 or nl[-1] != len(a) - 1:
+        nl = np.r_[nl, len(a)]
+    line = np.searchsorted(nl, np.flatnonzero(isStart))
+    counts = np.bincount(line, minlength=len(nl))
+    starts = np.r_[0, nl[:-1] + 1]
+    isNonEmpty = counts > 0
+
+    values = np.fromstring(block, dtype=dtype, sep=' ')
+    if len(values) != len(line):
+        raise ValueError("the block contains non-numeric data!")
+    return values, counts[isNonEmpty], starts[isNonEmpty]
+
+
+class TextBlockReader():
+    """
+    @brief 按块读取文本文件, 支持逐行读取关键字行和成块读取数值行
+
+    Examples
+    --------
+    >> with TextBlockReader(fname, progress=True) as reader:
+    >>     line = reader.readline()
+    >>     for block in reader.blocks_until(b'*'):
+    >>         values = np.fromstring(block.replace(b',', b' '), sep=' ')
+    """
+    def __init__(self, fname, chunksize=2**24, progress=None, comment=None):
+        """
+        @param[in] fname 文件名
+        @param[in] chunksize 每次读入的字节数
+        @param[in] progress 进度回调函数 progress(nread, total), True 表示
+                   使用 `print_progress`
+        @param[in] comment 行内注释的开始字符, 如 b'#', 到行尾的内容会被去掉
+        """
+        self.file = open(fname, 'rb')
+        self.total = os.fstat(self.file.fileno()).st_size
+        self.nread = 0
+        self.chunksize = chunksize
+        self.progress = print_progress if progress is True else progress
+        self.comment = None if comment is None else re.compile(
+                re.escape(comment) + rb'[^\n]*')
+        self.buf = b''
+        self.tail = b''
+        self.pos = 0
+        self.eof = False
+        self.tokens = np.zeros(0, dtype=np.float64) # `read_tokens` 多解析出的数
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def fill(self):
+        """
+        @brief 再读入一块, 返回是否读到了新的数据
+
+        缓冲区中只保留完整的行, 块末尾不完整的行留到下一次读入时拼接.
+        """
+        if self.eof:
+            return False
+        data = self.file.read(self.chunksize)
+        self.nread += len(data)
+        data = self.tail + data
+        if self.nread >= self.total:
+            self.eof = True
+            if len(data) > 0 and data[-1:] != b'\n':
+                data += b'\n'
+            self.tail = b''
+        else:
+            i = data.rfind(b'\n') + 1
+            self.tail = data[i:]
+            data = data[:i]
+        if self.comment is not None:
+            data = self.comment.sub(b'', data)
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        if self.progress is not None:
+            self.progress(self.nread, self.total)
+        return True
+
+    def readline(self):
+        """
+        @brief 读一行, 不含换行符, 到文件末尾时返回 None
+        """
+        while True:
+            i = self.buf.find(b'\n', self.pos)
+            if i >= 0:
+                line = self.buf[self.pos:i]
+                self.pos = i + 1
+                return line.rstrip(b'\r')
+            if not self.fill():
+                return None
+
+    def blocks_until(self, marker, skip=None):
+        """
+        @brief 依次返回由完整的行组成的数据块, 直到以 marker 开头的行 (该行
+               不被读取) 或者文件末尾
+
+        @param[in] skip 以 skip 开头的行 (如 Abaqus 的注释行 b'**') 被丢弃,
+                   不结束数据块
+        """
+        while True:
+            if self.buf.startswith(marker, self.pos):
+                if skip is None or not self.buf.startswith(skip, self.pos):
+                    return
+                self.pos = self.buf.find(b'\n', self.pos) + 1 # 缓冲区中只有完整的行
+                continue
+            i = self.buf.find(b'\n' + marker, self.pos)
+            if i >= 0:
+                yield self.buf[self.pos:i+1]
+                self.pos = i + 1
+                if skip is None or not self.buf.startswith(skip, self.pos):
+                    return
+                continue
+            if self.pos < len(self.buf):
+                yield self.buf[self.pos:]
+                self.pos = len(self.buf)
+            if not self.fill():
+                return
+
+    def read_tokens(self, n, dtype=np.float64):
+        """
+        @brief 把文件看成空白分隔的数的序列, 读取接下来的 n 个数
+
+        已经读入缓冲区的数全部被解析, 多余的留给下一次调用, 所以不能和
+        `readline`, `blocks_until` 混用.
+        """
+        out = np.zeros(n, dtype=dtype)
+        m = min(n, len(self.tokens))
+        out[:m] = self.tokens[:m]
+        self.tokens = self.tokens[m:]
+        while m < n:
+            if self.pos < len(self.buf):
+                values = np.fromstring(self.buf[self.pos:], dtype=np.float64, sep=' ')
+                self.pos = len(self.buf)
+                k = min(n - m, len(values))
+                out[m:m+k] = values[:k]
+                self.tokens = values[k:]
+                m += k
+            if m < n and not self.fill():
+                raise ValueError("unexpected end of file, {} of {} numbers read!".format(m, n))
+        return out
@@ -2,6 +2,9 @@ import numpy as np
 from scipy.sparse import coo_matrix, csc_matrix, csr_matrix, spdiags, bmat, eye
 from scipy.spatial import KDTree
 from .Mesh2d import Mesh2d, Mesh2dDataStructure
+from .core import index_dtype
+from .core import tabulate_lagrange_shape_function
+from .core import tabulate_lagrange_grad_shape_function
 from ..quadrature import TriangleQuadrature
 from ..quadrature import GaussLegendreQuadrature
 from fealpy.mesh.TriangleMeshData import gphigphiphi,phiphi,gphigphi,gphiphi,phigphiphi,phiphiphi
@@ -28,10 +31,12 @@ class TriangleMeshDataStructure(Mesh2dDataStructure):
         super().__init__(NN,cell)
 
 class TriangleMesh(Mesh2d):
-    def __init__(self, node, cell):
+    def __init__(self, node, cell, itype=None):
         """
         @brief TriangleMesh 对象的构造函数
 
+        @param[in] itype 编号数组的整数类型, 默认在规模允许时用 int32
+
         @note Magic function
         """
 
@@ -39,14 +44,14 @@ class TriangleMesh(Mesh2d):
 
         self.node = node
         NN = node.shape[0]
-        self.ds = TriangleMeshDataStructure(NN, cell)
+        itype = index_dtype(max(NN, 3*len(cell)), itype)
+        self.ds = TriangleMeshDataStructure(NN, cell.astype(itype, copy=False))
 
         if node.shape[1] == 2:
             self.meshtype = 'tri'
         elif node.shape[1] == 3:
             self.meshtype = 'stri'
 
-        self.itype = cell.dtype
         self.ftype = node.dtype
         self.p = 1 # 平面三角形
 
@@ -56,6 +61,10 @@ class TriangleMesh(Mesh2d):
         self.facedata = self.edgedata
         self.meshdata = {}
 
+    @property
+    def itype(self):
+        return self.ds.itype
+
     def integrator(self, q, etype='cell'):
         """
         @brief 获取不同维度网格实体上的积分公式 
@@ -98,59 +107,21 @@ class TriangleMesh(Mesh2d):
         """
         @brief 
         """
-        TD = bc.shape[-1] - 1 
-        multiIndex = self.multi_index_matrix(p)
-        c = np.arange(1, p+1, dtype=np.int_)
-        P = 1.0/np.multiply.accumulate(c)
-        t = np.arange(0, p)
-        shape = bc.shape[:-1]+(p+1, TD+1)
-        A = np.ones(shape, dtype=self.ftype)
-        A[..., 1:, :] = p*bc[..., np.newaxis, :] - t.reshape(-1, 1)
-        np.cumprod(A, axis=-2, out=A)
-        A[..., 1:, :] *= P.reshape(-1, 1)
-        idx = np.arange(TD+1)
-        phi = np.prod(A[..., multiIndex, idx], axis=-1)
-        return phi
+        bc = np.asarray(bc, dtype=self.ftype)
+        # 缓存的表格是只读的, 返回给调用者的是可写的副本
+        return tabulate_lagrange_shape_function(bc, p).copy()
 
     def grad_shape_function(self, bc, index=np.s_[:], p=None):
 
         if p is None:
             p= self.p
 
-        TD = self.top_dimension()
-
-        multiIndex = self.multi_index_matrix(p)
-
-        c = np.arange(1, p+1, dtype=self.itype)
-        P = 1.0/np.multiply.accumulate(c)
-
-        t = np.arange(0, p)
-        shape = bc.shape[:-1]+(p+1, TD+1)
-        A = np.ones(shape, dtype=self.ftype)
-        A[..., 1:, :] = p*bc[..., np.newaxis, :] - t.reshape(-1, 1)
-
-        FF = np.einsum('...jk, m->...kjm', A[..., 1:, :], np.ones(p))
-        FF[..., range(p), range(p)] = p
-        np.cumprod(FF, axis=-2, out=FF)
-        F = np.zeros(shape, dtype=self.ftype)
-        F[..., 1:, :] = np.sum(np.tril(FF), axis=-1).swapaxes(-1, -2)
-        F[..., 1:, :] *= P.reshape(-1, 1)
-
-        np.cumprod(A, axis=-2, out=A)
-        A[..., 1:, :] *= P.reshape(-1, 1)
-
-        Q = A[..., multiIndex, range(TD+1)]
-        M = F[..., multiIndex, range(TD+1)]
-        ldof = self.number_of_local_ipoints(p)
-        shape = bc.shape[:-1]+(ldof, TD+1)
-        R = np.zeros(shape, dtype=self.ftype)
-        for i in range(TD+1):
-            idx = list(range(TD+1))
-            idx.remove(i)
-            R[..., i] = M[..., i]*np.prod(Q[..., idx], axis=-1)
-
-        Dlambda = self.grad_lambda()
-        gphi = np.einsum('...ij, kjm->...kim', R, Dlambda[index])
+        bc = np.asarray(bc, dtype=self.ftype)
+        R = tabulate_lagrange_grad_shape_function(bc, p) # (..., ldof, TD+1)
+        Dlambda = self.grad_lambda()[index]
+        shape = bc.shape[:-1] + (len(Dlambda), R.shape[-2], Dlambda.shape[-1])
+        gphi = np.empty(shape, dtype=self.ftype)
+        np.matmul(R[..., np.newaxis, :, :], Dlambda, out=gphi)
         return gphi #(..., NC, ldof, GD)
 
     def grad_lambda(self):
@@ -5,6 +5,9 @@ from scipy.sparse import coo_matrix, csr_matrix
 from scipy.sparse.linalg import spsolve
 from .Mesh2d import Mesh2d
 from .StructureMesh2dDataStructure import StructureMesh2dDataStructure
+from .level_set_redistance import redistance
+from .StencilOperator import StencilOperator, TensorProductOperator
+from .StencilOperator import interval_mass_matrix, interval_stiff_matrix
 
 from ..geometry import project
 
@@ -210,42 +213,29 @@ class UniformMesh2d(Mesh2d):
 
         return idxMap
 
-    def mass_matrix(self):
-        h = self.h
-        Mc = np.array([[4., 2., 2., 1.],
-                       [2., 4., 1., 2.],
-                       [2., 1., 4., 2.],
-                       [1., 2., 2., 4.]], dtype=np.float_)*h[0]*h[1]/36
-        cell2node = self.entity('cell')
-        NN = self.number_of_nodes()
-        NC = self.number_of_cells()
+    def mass_operator(self):
+        r"""
+        @brief 双线性元质量矩阵的张量积表示 M = M_x \otimes M_y, 可以无矩阵地作用
+        """
+        Mx = interval_mass_matrix(self.ds.nx, self.h[0], dtype=self.ftype)
+        My = interval_mass_matrix(self.ds.ny, self.h[1], dtype=self.ftype)
+        return TensorProductOperator([(Mx, My)], dtype=self.ftype)
 
-        data = np.broadcast_to(Mc, (NC, 4, 4))
-        I = np.broadcast_to(cell2node[..., None], (NC, 4, 4))
-        J = np.broadcast_to(cell2node[:, None, :], (NC, 4, 4))
-        M = csr_matrix((data.flat, (I.flat, J.flat)), shape=(NN, NN))
-        return M
+    def stiff_operator(self):
+        r"""
+        @brief 双线性元刚度矩阵的张量积表示 S = S_x \otimes M_y + M_x \otimes S_y
+        """
+        Mx = interval_mass_matrix(self.ds.nx, self.h[0], dtype=self.ftype)
+        My = interval_mass_matrix(self.ds.ny, self.h[1], dtype=self.ftype)
+        Sx = interval_stiff_matrix(self.ds.nx, self.h[0], dtype=self.ftype)
+        Sy = interval_stiff_matrix(self.ds.ny, self.h[1], dtype=self.ftype)
+        return TensorProductOperator([(Sx, My), (Mx, Sy)], dtype=self.ftype)
 
-    def stiff_matrix(self):
-        h = self.h
-        S0c = np.array([[ 2.,  1., -2., -1.],
-                        [ 1.,  2., -1., -2.],
-                        [-2., -1.,  2.,  1.],
-                        [-1., -2.,  1.,  2.]], dtype=np.float_)*h[1]/h[0]/6
-        S1c = np.array([[ 2., -2.,  1., -1.],
-                        [-2.,  2., -1.,  1.],
-                        [ 1., -1.,  2., -2.],
-                        [-1.,  1., -2.,  2.]], dtype=np.float_)*h[0]/h[1]/6
-        Sc = S0c + S1c
-        cell2node = self.entity('cell')
-        NN = self.number_of_nodes()
-        NC = self.number_of_cells()
+    def mass_matrix(self):
+        return self.mass_operator().to_csr()
 
-        data = np.broadcast_to(Sc, (NC, 4, 4))
-        I = np.broadcast_to(cell2node[..., None], (NC, 4, 4))
-        J = np.broadcast_to(cell2node[:, None, :], (NC, 4, 4))
-        S = csr_matrix((data.flat, (I.flat, J.flat)), shape=(NN, NN))
-        return S
+    def stiff_matrix(self):
+        return self.stiff_operator().to_csr()
 
     def nabla_2_matrix(self):
         h = self.h
@@ -398,34 +388,19 @@ class UniformMesh2d(Mesh2d):
         fyx,fyy = np.gradient(fy, hy, edge_order=order)
         return fxx + fyy 
 
+    def laplace_stencil(self):
+        """
+        @brief 笛卡尔网格上负 Laplace 算子的五点差分模板, 可以无矩阵地作用
+        """
+        shape = (self.ds.nx + 1, self.ds.ny + 1)
+        return StencilOperator.laplace(shape, self.h, dtype=self.ftype)
+
     def laplace_operator(self):
         """
         @brief 构造笛卡尔网格上的 Laplace 离散算子，其中 x 方向和 y
         方向都均匀剖分，但步长可以不一样
         """
-
-        n0 = self.ds.nx + 1
-        n1 = self.ds.ny + 1
-        cx = 1/(self.hx**2)
-        cy = 1/(self.hy**2)
-        NN = self.number_of_nodes()
-        k = np.arange(NN).reshape(n0, n1)
-
-        A = diags([2*(cx+cy)], [0], shape=(NN, NN), format='csr')
-
-        val = np.broadcast_to(-cx, (NN-n1, ))
-        I = k[1:, :].flat
-        J = k[0:-1, :].flat
-        A += csr_matrix((val, (I, J)), shape=(NN, NN), dtype=self.ftype)
-        A += csr_matrix((val, (J, I)), shape=(NN, NN), dtype=self.ftype)
-
-        val = np.broadcast_to(-cy, (NN-n0, ))
-        I = k[:, 1:].flat
-        J = k[:, 0:-1].flat
-        A += csr_matrix((val, (I, J)), shape=(NN, NN), dtype=self.ftype)
-        A += csr_matrix((val, (J, I)), shape=(NN, NN), dtype=self.ftype)
-
-        return A
+        return self.laplace_stencil().to_csr()
 
     def show_function(self, plot, uh, cmap='jet'):
         """
@@ -497,89 +472,30 @@ class UniformMesh2d(Mesh2d):
         return filename
 
     def fast_sweeping_method(self, phi0):
-    	"""
+        """
         @brief 均匀网格上的 fast sweeping method
         @param[in] phi 是一个离散的水平集函数
 
-        @note 注意，我们这里假设 x 和 y 方向剖分的段数相等
-    	"""
-    	m = 2
-    	nx = self.ds.nx
-    	ny = self.ds.ny
-    	k = nx/ny
-    	ns = ny
-    	h = self.h[0]
-    	
-    	phi = self.function(ex=1)
-    	isNearNode = self.function(dtype=np.bool_, ex=1)
-    	
-    	# 把水平集函数转化为离散的网格函数
-    	node = self.entity('node')
-    	phi[1:-1, 1:-1] = phi0
-    	sign = np.sign(phi[1:-1, 1:-1])
-    	
-    	# 标记界面附近的点
-    	isNearNode[1:-1, 1:-1] = np.abs(phi[1:-1, 1:-1]) < 2*h
-    	lsfun = UniformMesh2dFunction(self, phi[1:-1, 1:-1])
-    	_, d = lsfun.project(node[isNearNode[1:-1, 1:-1]])
-    	phi[isNearNode] = np.abs(d) #界面附近的点用精确值
-    	phi[~isNearNode] = m  # 其它点用一个比较大的值
-    	
-    	
-    	
-    	a = np.zeros(ns+1, dtype=np.float64)
-    	b = np.zeros(ns+1, dtype=np.float64)
-    	c = np.zeros(ns+1, dtype=np.float64)
-    	d = np.zeros(int(k*ns+1), dtype=np.float64)
-    	e = np.zeros(int(k*ns+1), dtype=np.float64)
-    	f = np.zeros(int(k*ns+1), dtype=np.float64)
-    	
-    	
-    	n = 0
-    	for i in range(1, int(k*ns+2)):
-    	    a[:] = np.minimum(phi[i-1, 1:-1], phi[i+1, 1:-1])
-    	    b[:] = np.minimum(phi[i, 0:ns+1], phi[i, 2:])
-    	    flag = np.abs(a-b) >= h
-    	    c[flag] = np.minimum(a[flag], b[flag]) + h
-    	    c[~flag] = (a[~flag] + b[~flag] + np.sqrt(2*h*h - (a[~flag] - b[~flag])**2))/2
-    	    phi[i, 1:-1] = np.minimum(c, phi[i, 1:-1])
-    	    n += 1
-    	    
-    	    
-    	for i in range(int(k*ns+1), 0, -1):
-    	    a[:] = np.minimum(phi[i-1, 1:-1], phi[i+1, 1:-1])
-    	    b[:] = np.minimum(phi[i, 0:ns+1], phi[i, 2:])
-    	    flag = np.abs(a-b) >= h 
-    	    c[flag] = np.minimum(a[flag], b[flag]) + h
-    	    c[~flag] = (a[~flag] + b[~flag] + np.sqrt(2*h*h - (a[~flag] - b[~flag])**2))/2
-    	    phi[i, 1:-1] = np.minimum(c, phi[i, 1:-1])
-    	    n += 1
-    	    
-    	    
-    	for j in range(1, ns+2):
-    	    d[:] = np.minimum(phi[0:int(k*ns+1), j], phi[2:, j])
-    	    e[:] = np.minimum(phi[1:-1, j-1], phi[1:-1, j+1])
-    	    flag = np.abs(d-e) >= h 
-    	    f[flag] = np.minimum(d[flag], e[flag]) + h
-    	    f[~flag] = (d[~flag] + e[~flag] + np.sqrt(2*h*h - (d[~flag] - e[~flag])**2))/2
-    	    phi[1:-1, j] = np.minimum(f, phi[1:-1, j])
-    	    n += 1
-    	    
-    	    
-    	for j in range(ns+1, 0, -1):
-    	    d[:] = np.minimum(phi[0:int(k*ns+1), j], phi[2:, j])
-    	    e[:] = np.minimum(phi[1:-1, j-1], phi[1:-1, j+1])
-    	    flag = np.abs(d-e) >= h
-    	    f[flag] = np.minimum(d[flag], e[flag]) + h
-    	    f[~flag] = (d[~flag] + e[~flag] + np.sqrt(2*h*h - (d[~flag] - e[~flag])**2))/2
-    	    phi[1:-1, j] = np.minimum(f, phi[1:-1, j])
-    	    n += 1
-    	    
-    	return sign*phi[1:-1, 1:-1]
-        
-    
-        
-    
+        @return 重新初始化后的符号距离函数, 不修改 phi0
+        """
+        phi = np.array(phi0, dtype=self.ftype)
+        self.redistance(phi, method='fsm')
+        return phi
+
+    def redistance(self, phi, method='fmm', **kwargs):
+        """
+        @brief 把网格节点上的水平集函数原地重新初始化为符号距离函数
+
+        @param[in, out] phi 形状为 (nx+1, ny+1) 的节点网格函数
+        @param[in] method 'fmm' 为窄带快速行进法, 'fsm' 为快速扫描法
+
+        @return info 记录迭代次数和运行时间的字典
+
+        @note 见 `level_set_redistance` 模块, x 和 y 方向的剖分段数和步长可以不同
+        """
+        assert phi.shape == (self.ds.nx+1, self.ds.ny+1)
+        return redistance(phi, self.h, method=method, **kwargs)
+
     def interpolation_with_sample_points(self, x, y, alpha=[10, 0.001, 0.01, 0.1]):
         '''!
         @brief 将 x, y 插值为网格函数
@@ -5,6 +5,8 @@ from scipy.sparse import csr_matrix, diags
 from .Mesh3d import Mesh3d
 from .StructureMesh3dDataStructure import StructureMesh3dDataStructure
 from .mesh_tools import show_mesh_3d
+from .level_set_redistance import redistance
+from .StencilOperator import StencilOperator
 
 from ..geometry import project
 
@@ -391,49 +393,20 @@ class UniformMesh3d(Mesh3d):
         fzx, fzy, fzz = np.gradient(fz, hx, hy ,hz, edge_order=order)
         return fxx + fyy + fzz
 
+    def laplace_stencil(self):
+        """
+        @brief 笛卡尔网格上负 Laplace 算子的七点差分模板, 可以无矩阵地作用
+        """
+        shape = (self.ds.nx + 1, self.ds.ny + 1, self.ds.nz + 1)
+        return StencilOperator.laplace(shape, self.h, dtype=self.ftype)
+
     def laplace_operator(self):
         """
         @brief 构造笛卡尔网格上的 Laplace 离散算子，其中 x, y, z
         三个方向都是均匀剖分，但各自步长可以不一样
         @todo 处理带系数的情形
         """
-
-        n0 = self.ds.nx + 1
-        n1 = self.ds.ny + 1
-        n2 = self.ds.nz + 1
-
-        hx = self.h[0]
-        hy = self.h[1]
-        hz = self.h[2]
-
-        cx = 1 / (hx ** 2)
-        cy = 1 / (hy ** 2)
-        cz = 1 / (hz ** 2)
-
-        NN = self.number_of_nodes()
-        k = np.arange(NN).reshape(n0, n1, n2)
-
-        A = diags([2 * (cx + cy + cz)], [0], shape=(NN, NN), format='csr')
-
-        val = np.broadcast_to(-cx, (NN - n1 * n2,))
-        I = k[1:, :, :].flat
-        J = k[0:-1, :, :].flat
-        A += csr_matrix((val, (I, J)), shape=(NN, NN), dtype=self.ftype)
-        A += csr_matrix((val, (J, I)), shape=(NN, NN), dtype=self.ftype)
-
-        val = np.broadcast_to(-cy, (NN - n0 * n2,))
-        I = k[:, 1:, :].flat
-        J = k[:, 0:-1, :].flat
-        A += csr_matrix((val, (I, J)), shape=(NN, NN), dtype=self.ftype)
-        A += csr_matrix((val, (J, I)), shape=(NN, NN), dtype=self.ftype)
-
-        val = np.broadcast_to(-cz, (NN - n0 * n1,))
-        I = k[:, :, 1:].flat
-        J = k[:, :, 0:-1].flat
-        A += csr_matrix((val, (I, J)), shape=(NN, NN), dtype=self.ftype)
-        A += csr_matrix((val, (J, I)), shape=(NN, NN), dtype=self.ftype)
-
-        return A
+        return self.laplace_stencil().to_csr()
 
     def show_function(self, plot, uh, cmap='jet'):
         """
@@ -523,6 +496,18 @@ class UniformMesh3d(Mesh3d):
 
         return n0.astype('int64'), n1.astype('int64'), n2.astype('int64')
 
+    def redistance(self, phi, method='fmm', **kwargs):
+        """
+        @brief 把网格节点上的水平集函数原地重新初始化为符号距离函数
+
+        @param[in, out] phi 形状为 (nx+1, ny+1, nz+1) 的节点网格函数
+        @param[in] method 'fmm' 为窄带快速行进法, 'fsm' 为快速扫描法
+
+        @return info 记录迭代次数和运行时间的字典
+        """
+        assert phi.shape == (self.ds.nx+1, self.ds.ny+1, self.ds.nz+1)
+        return redistance(phi, self.h, method=method, **kwargs)
+
     def to_vtk_file(self, filename, celldata=None, nodedata=None):
         """
         @brief 输出为 vtk 数据格式
@@ -1,21 +1,22 @@
 
 import numpy as np
-import vtk
-import vtk.util.numpy_support as vnp
 
 
 class VTKMeshReader():
     def __init__(self, fname):
+        import vtk
         reader = vtk.vtkXMLUnstructuredGridReader()
         reader.SetFileName(fname)
         reader.Update()
         self.vtkmesh = reader.GetOutput()
 
     def get_point(self):
+        import vtk.util.numpy_support as vnp
         node = vnp.vtk_to_numpy(self.vtkmesh.GetPoints().GetData())
         return node
 
     def get_cell(self):
+        import vtk.util.numpy_support as vnp
         cell = vnp.vtk_to_numpy(self.vtkmesh.GetCells().GetData())
         return cell
 
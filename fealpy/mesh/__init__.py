@@ -4,55 +4,62 @@ mesh
 
 This module provide mesh 
 
+子模块在第一次访问其中的名字时才导入, 见 `fealpy.common.lazy_import`.
 '''
+from ..common.lazy_import import attach
 
-# 结构化网格
-from .UniformMesh1d import UniformMesh1d
-from .UniformMesh2d import UniformMesh2d,UniformMesh2dFunction
-from .UniformMesh3d import UniformMesh3d,UniformMesh3dFunction
-from .StructureIntervalMesh import StructureIntervalMesh
-from .StructureQuadMesh import StructureQuadMesh
-from .StructureHexMesh import StructureHexMesh
+__getattr__, __dir__, __all__ = attach(__name__, submodules='all', submod_attrs={
+    # 结构化网格
+    'UniformMesh1d': ['UniformMesh1d'],
+    'UniformMesh2d': ['UniformMesh2d', 'UniformMesh2dFunction'],
+    'UniformMesh3d': ['UniformMesh3d', 'UniformMesh3dFunction'],
+    'StructureIntervalMesh': ['StructureIntervalMesh'],
+    'StructureQuadMesh': ['StructureQuadMesh'],
+    'StructureHexMesh': ['StructureHexMesh'],
+    'StencilOperator': ['StencilOperator', 'TensorProductOperator'],
 
-from .TriangleMesh import TriangleMesh, TriangleMeshWithInfinityNode
-from .PolygonMesh import PolygonMesh
-from .QuadrangleMesh import QuadrangleMesh
-from .TetrahedronMesh import TetrahedronMesh
-from .IntervalMesh import IntervalMesh
-from .HexahedronMesh import HexahedronMesh
-from .TrussMesh import TrussMesh
+    'TriangleMesh': ['TriangleMesh', 'TriangleMeshWithInfinityNode'],
+    'PolygonMesh': ['PolygonMesh'],
+    'QuadrangleMesh': ['QuadrangleMesh'],
+    'TetrahedronMesh': ['TetrahedronMesh'],
+    'IntervalMesh': ['IntervalMesh'],
+    'HexahedronMesh': ['HexahedronMesh'],
+    'TrussMesh': ['TrussMesh'],
 
-from .SurfaceTriangleMesh import SurfaceTriangleMesh
-from .PrismMesh import PrismMesh
+    'SurfaceTriangleMesh': ['SurfaceTriangleMesh'],
+    'PrismMesh': ['PrismMesh'],
 
-from .LagrangeTriangleMesh import LagrangeTriangleMesh
-from .LagrangeQuadrangleMesh import LagrangeQuadrangleMesh
-from .LagrangeHexahedronMesh import LagrangeHexahedronMesh
-from .LagrangeWedgeMesh import LagrangeWedgeMesh
+    'LagrangeTriangleMesh': ['LagrangeTriangleMesh'],
+    'LagrangeQuadrangleMesh': ['LagrangeQuadrangleMesh'],
+    'LagrangeHexahedronMesh': ['LagrangeHexahedronMesh'],
+    'LagrangeWedgeMesh': ['LagrangeWedgeMesh'],
 
-from .Tritree import Tritree
-from .Quadtree import Quadtree
-from .Octree import Octree
+    'Tritree': ['Tritree'],
+    'Quadtree': ['Quadtree'],
+    'Octree': ['Octree'],
+    'LinearTree': ['LinearQuadtree', 'LinearOctree'],
 
-from .QuadtreeForest import QuadtreeMesh, QuadtreeForest
+    'QuadtreeForest': ['QuadtreeMesh', 'QuadtreeForest'],
 
+    'distmesh': ['DistMesh2d'],
+    'mesh_tools': ['find_node', 'find_entity', 'show_halfedge_mesh',
+        'show_mesh_1d', 'show_mesh_2d', 'show_mesh_3d', 'unique_row',
+        'show_point', 'show_mesh_quality', 'show_mesh_angle', 'show_solution'],
 
-from .distmesh import DistMesh2d
-from .mesh_tools import *
+    'HalfEdgeDomain': ['HalfEdgeDomain'],
+    'HalfEdgeMesh2d': ['HalfEdgeMesh2d'],
+    'DartMesh3d': ['DartMesh3d'],
 
+    'PolyFileReader': ['PolyFileReader'],
+    'InpFileReader': ['InpFileReader'],
+    'CCGMeshReader': ['CCGMeshReader'],
+    'FABFileReader': ['FABFileReader'],
+    'TextBlockReader': ['TextBlockReader'],
 
-from .HalfEdgeDomain import HalfEdgeDomain
-from .HalfEdgeMesh2d import HalfEdgeMesh2d
-from .DartMesh3d import DartMesh3d
+    'meshio': ['load_mat_mesh'],
 
-from .PolyFileReader import PolyFileReader
-from .InpFileReader import InpFileReader
-from .CCGMeshReader import CCGMeshReader
-from .FABFileReader import FABFileReader
-
-from .meshio import load_mat_mesh
-
-# Mesher
-from .DistMesher2d import DistMesher2d
-from .DistMesher3d import DistMesher3d
-from .CVTPMesher import CVTPMesher, VoroAlgorithm
+    # Mesher
+    'DistMesher2d': ['DistMesher2d'],
+    'DistMesher3d': ['DistMesher3d'],
+    'CVTPMesher': ['CVTPMesher', 'VoroAlgorithm'],
+})
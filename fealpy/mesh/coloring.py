@@ -2,11 +2,11 @@
 import numpy as np 
 
 def coloring(mesh, method='random', etype='node'):
-    if method is 'random':
+    if method == 'random':
         c = randomcoloring(mesh)
-    if method is 'random1':
+    if method == 'random1':
         c = randomcoloring1(mesh)
-    if method is 'random2':
+    if method == 'random2':
         c = randomcoloring2(mesh)
     return c
 
@@ -23,7 +23,7 @@ def opt_coloring(mesh, c):
 
     edge = mesh.ds.edge
 
-    nc = np.zeros((NN, mc), dtype=np.bool)
+    nc = np.zeros((NN, mc), dtype=np.bool_)
     np.add.at(nc, (edge[:, 0], c[edge[:, 1]]-1), True)
     np.add.at(nc, (edge[:, 1], c[edge[:, 0]]-1), True)
 
@@ -34,7 +34,7 @@ def randomcoloring(mesh):
 
     edge = mesh.ds.edge
 
-    c = np.zeros(NN, dtype=np.int)
+    c = np.zeros(NN, dtype=np.int_)
 
     isUnColor = (c == 0) 
     color = 0
@@ -86,7 +86,7 @@ def randomcoloring1(mesh):
     NN = mesh.number_of_nodes()
     edge = mesh.ds.edge
 
-    c = np.zeros(NN, dtype=np.int)
+    c = np.zeros(NN, dtype=np.int_)
 
     isUnColor = (c == 0) 
 
@@ -115,7 +115,7 @@ def randomcoloring2(mesh):
 
     edge = mesh.ds.edge
 
-    c = np.zeros(N, dtype=np.int)
+    c = np.zeros(N, dtype=np.int_)
 
     isUnColor = (c == 0) 
     color = 1
@@ -135,10 +135,76 @@ def randomcoloring2(mesh):
     c[isUnColor] = color
     return c
 
+def cell_coloring(cell2dof, gdof=None, seed=0):
+    """
+    @brief 单元着色, 同一种颜色的单元没有公共的自由度
 
+    每种颜色由若干轮选取组成: 每一轮中, 候选单元在它的每个自由度上比较随机
+    优先级, 在所有自由度上都最大的单元取这种颜色, 然后把和它们有公共自由度
+    的单元移出候选集, 直到没有候选单元为止, 再开始下一种颜色.
 
+    @param[in] cell2dof 单元到自由度的映射, (NC, ldof)
+    @param[in] gdof 自由度个数, 默认为 cell2dof.max() + 1
+    @param[in] seed 随机优先级的种子, 固定种子时着色是确定的
 
+    @return 每个单元的颜色, 从 0 开始编号
+    """
+    NC = len(cell2dof)
+    if gdof is None:
+        gdof = cell2dof.max() + 1 if NC > 0 else 0
 
-    
-
+    r = np.random.default_rng(seed).permutation(NC) # 互不相同的优先级
+    c = np.full(NC, -1, dtype=np.int_)
+    color = 0
+    isUnColor = np.ones(NC, dtype=np.bool_)
+    while np.any(isUnColor):
+        isBlocked = np.zeros(gdof, dtype=np.bool_)
+        idx, = np.nonzero(isUnColor)
+        while len(idx) > 0:
+            c2d = cell2dof[idx]
+            rmax = np.full(gdof, -1, dtype=r.dtype)
+            np.maximum.at(rmax, c2d, r[idx, None])
+            isMax = np.all(rmax[c2d] == r[idx, None], axis=1)
+            c[idx[isMax]] = color
+            isBlocked[c2d[isMax]] = True
+            idx = idx[~isMax]
+            idx = idx[~np.any(isBlocked[cell2dof[idx]], axis=1)]
+        isUnColor = (c < 0)
+        color += 1
+    return c
 
+def is_valid_cell_coloring(cell2dof, c):
+    """
+    @brief 检查同一种颜色的单元是否有公共的自由度
+    """
+    for color in range(c.max() + 1 if len(c) > 0 else 0):
+        dof = cell2dof[c == color].flat
+        if len(np.unique(dof)) != len(dof):
+            return False
+    return True
+
+def color_groups(c):
+    """
+    @brief 按颜色把单元编号分组, 返回每种颜色的单元编号数组构成的列表
+    """
+    idx = np.argsort(c, kind='stable')
+    count = np.bincount(c)
+    return np.split(idx, np.cumsum(count)[:-1])
+
+def mesh_cell_coloring(mesh):
+    """
+    @brief 网格单元的着色, 缓存在网格上
+
+    用单元的顶点着色: 有公共自由度的两个单元一定有公共的顶点, 所以这个着色
+    对网格上任意次的协调或间断拉格朗日空间都适用. 网格加密后单元数组被替换,
+    缓存随之失效.
+
+    @return 每种颜色的单元编号数组构成的列表
+    """
+    cell = mesh.entity('cell')
+    cache = getattr(mesh, '_cell_coloring', None)
+    if cache is None or cache[0] is not cell:
+        NN = mesh.number_of_nodes()
+        cache = (cell, color_groups(cell_coloring(cell, gdof=NN)))
+        mesh._cell_coloring = cache
+    return cache[1]
@@ -4,6 +4,10 @@ Notes
 -----
    网格模块的核心部分，涉及编号，形函数等内容。 
 
+   形函数在一组固定的积分点处的值只和 p, TD 及积分点有关, 
+   `tabulate_lagrange_shape_function` 等函数把它们制成表格缓存起来, 同一组
+   积分点重复调用时不再重新计算.
+
 Authors
 -------
 
@@ -11,6 +15,8 @@ Huayi Wei, weihuayi@xtu.edu.cn
 
 """
 import numpy as np 
+from functools import lru_cache
+from collections import OrderedDict
 
 class LinearMeshDataStructure():
 
@@ -135,8 +141,33 @@ def multi_index_matrix3d(p):
     multiIndex[:, 0] = p - np.sum(multiIndex[:, 1:], axis=1)
     return multiIndex
 
+def index_dtype(n, itype=None):
+    """
+    @brief 选择能存下 0, 1, ..., n 的整数类型
+
+    编号数组 (cell, edge2cell, cell2dof 等) 在规模允许时用 int32 存储, 内存
+    只有 int64 的一半.
+
+    @param[in] n 最大的编号
+    @param[in] itype 指定的整数类型, 不为 None 时直接使用它
+    """
+    if itype is not None:
+        return np.dtype(itype)
+    if n <= np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
 multi_index_matrix = [multi_index_matrix0d, multi_index_matrix1d, multi_index_matrix2d, multi_index_matrix3d]
 
+@lru_cache(maxsize=None)
+def cached_multi_index_matrix(p, TD):
+    """
+    @brief 缓存的多重指标矩阵 `multi_index_matrix[TD](p)`, 返回的数组是只读的
+    """
+    multiIndex = multi_index_matrix[TD](p)
+    multiIndex.setflags(write=False)
+    return multiIndex
+
 def lagrange_shape_function(bc, p, n=0):
     """
 
@@ -151,7 +182,7 @@ def lagrange_shape_function(bc, p, n=0):
     assert n <= p
 
     TD = bc.shape[-1] - 1
-    multiIndex = multi_index_matrix[TD](p) 
+    multiIndex = cached_multi_index_matrix(p, TD)
     ldof = multiIndex.shape[0] # p 次 Lagrange 形函数的个数 
 
     c = np.arange(1, p+1, dtype=np.int_)
@@ -204,8 +235,7 @@ def lagrange_grad_shape_function(bc, p):
     """
 
     TD = bc.shape[-1] - 1
-    multiIndex = multi_index_matrix[TD](p) 
-    ldof = multiIndex.shape[0] # p 次 Lagrange 形函数的个数
+    multiIndex = cached_multi_index_matrix(p, TD)
 
     c = np.arange(1, p+1)
     P = 1.0/np.multiply.accumulate(c)
@@ -228,10 +258,49 @@ def lagrange_grad_shape_function(bc, p):
     Q = A[..., multiIndex, range(TD+1)]
     M = F[..., multiIndex, range(TD+1)]
 
-    shape = bc.shape[:-1]+(ldof, TD+1)
-    R = np.zeros(shape, dtype=bc.dtype)
-    for i in range(TD+1):
-        idx = list(range(TD+1))
-        idx.remove(i)
-        R[..., i] = M[..., i]*np.prod(Q[..., idx], axis=-1)
-    return R # (..., ldof, TD+1)
+    # R[..., i] = M[..., i]*\prod_{j != i} Q[..., j], 用前缀积和后缀积计算
+    L = np.ones_like(Q)
+    np.cumprod(Q[..., :-1], axis=-1, out=L[..., 1:])
+    U = np.ones_like(Q)
+    np.cumprod(Q[..., :0:-1], axis=-1, out=U[..., -2::-1])
+    return M*L*U # (..., ldof, TD+1)
+
+
+# 缓存的形函数表格的最大个数
+SHAPE_FUNCTION_CACHE_SIZE = 64
+_shape_function_tables = OrderedDict()
+
+def _tabulate(fun, bc, p):
+    bc = np.asarray(bc)
+    if bc.ndim > 2: # 每个实体上的点都不同, 不缓存
+        return fun(bc, p)
+
+    key = (fun.__name__, p, bc.dtype.str, bc.shape, bc.tobytes())
+    val = _shape_function_tables.get(key)
+    if val is None:
+        val = fun(bc, p)
+        val.setflags(write=False)
+        _shape_function_tables[key] = val
+        if len(_shape_function_tables) > SHAPE_FUNCTION_CACHE_SIZE:
+            _shape_function_tables.popitem(last=False)
+    else:
+        _shape_function_tables.move_to_end(key)
+    return val
+
+def tabulate_lagrange_shape_function(bc, p):
+    """
+    @brief 和 `lagrange_shape_function(bc, p)` 相同, 但 bc 的形状为 (TD+1, )
+        或 (NQ, TD+1) 时结果会被缓存, 此时返回只读的数组
+
+    @return 形状为 bc.shape[:-1] + (ldof, ) 的数组
+    """
+    return _tabulate(lagrange_shape_function, bc, p)
+
+def tabulate_lagrange_grad_shape_function(bc, p):
+    """
+    @brief 和 `lagrange_grad_shape_function(bc, p)` 相同, 缓存规则同
+        `tabulate_lagrange_shape_function`
+
+    @return 形状为 bc.shape[:-1] + (ldof, TD+1) 的数组
+    """
+    return _tabulate(lagrange_grad_shape_function, bc, p)
@@ -0,0 +1,263 @@
+"""
+
+Notes
+-----
+均匀网格上水平集函数的重新初始化 (redistancing) 算法, 适用于
+`UniformMesh2d` 和 `UniformMesh3d` 上的节点网格函数, 各方向步长可以不相同.
+
+1. fast_marching_method: 基于堆的窄带快速行进法, 复杂度 O(N log N)
+2. fast_sweeping_method: 多方向交替扫描直到收敛的快速扫描法, 每次更新一个超平面
+
+两个算法都原地修改输入的网格函数, 并返回一个记录迭代次数和运行时间的字典.
+"""
+
+import heapq
+from math import sqrt
+from timeit import default_timer as dtimer
+
+import numpy as np
+
+
+def interface_distance(phi, h):
+    """
+    @brief 用线性插值计算界面附近节点到界面的距离
+
+    @param[in] phi 网格节点上的水平集函数, 形状为 (n0+1, n1+1[, n2+1])
+    @param[in] h 各方向的网格步长
+
+    @return d 界面附近的节点为到界面的距离, 其它节点为 np.inf
+    """
+    GD = phi.ndim
+    inv = np.zeros(phi.shape, dtype=np.float64) # 各方向 1/d_k^2 之和
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for k in range(GD):
+            s0 = [slice(None)]*GD
+            s1 = [slice(None)]*GD
+            s0[k] = slice(0, -1)
+            s1[k] = slice(1, None)
+            s0 = tuple(s0)
+            s1 = tuple(s1)
+
+            p0 = phi[s0]
+            p1 = phi[s1]
+            flag = (p0*p1 <= 0) & (p0 != p1)
+            theta = np.where(flag, p0/(p0 - p1), np.inf)
+
+            dk = np.full(phi.shape, np.inf, dtype=np.float64)
+            dk[s0] = np.minimum(dk[s0], theta*h[k])
+            dk[s1] = np.minimum(dk[s1], np.where(flag, (1 - theta)*h[k], np.inf))
+            inv += 1/dk**2
+        d = 1/np.sqrt(inv)
+    return d
+
+
+def eikonal_update(a, h):
+    """
+    @brief 批量求解 |grad u| = 1 的 Godunov 迎风格式局部问题
+
+    @param[in] a 形状为 (..., GD), 每个方向上两侧邻居的最小值
+    @param[in] h 各方向的网格步长, 形状为 (GD, )
+
+    @note 把 a 从小到大排序后, 依次加入方向 k 并求解
+        \\sum_k ((u - a_k)/h_k)^2 = 1,
+        直到 u <= a_{k+1} 为止.
+    """
+    GD = a.shape[-1]
+    idx = np.argsort(a, axis=-1)
+    a = np.take_along_axis(a, idx, axis=-1)
+    h = np.take_along_axis(np.broadcast_to(np.asarray(h, dtype=np.float64), a.shape), idx, axis=-1)
+    w = 1/h**2
+
+    u = a[..., 0] + h[..., 0]
+    A = w[..., 0].copy()
+    B = a[..., 0]*w[..., 0]
+    C = a[..., 0]**2*w[..., 0]
+    with np.errstate(invalid='ignore'):
+        for k in range(1, GD):
+            flag = u > a[..., k]
+            A = np.where(flag, A + w[..., k], A)
+            B = np.where(flag, B + a[..., k]*w[..., k], B)
+            C = np.where(flag, C + a[..., k]**2*w[..., k], C)
+            disc = np.maximum(B**2 - A*(C - 1), 0)
+            u = np.where(flag, (B + np.sqrt(disc))/A, u)
+    return u
+
+
+def _local_solve(a, h):
+    """
+    @brief 单个节点上的局部问题求解, 供快速行进法使用
+    """
+    pairs = sorted(zip(a, h))
+    u = pairs[0][0] + pairs[0][1]
+    A = B = C = 0.0
+    for ak, hk in pairs:
+        if u <= ak:
+            break
+        wk = 1/hk**2
+        A += wk
+        B += ak*wk
+        C += ak*ak*wk
+        u = (B + sqrt(max(B*B - A*(C - 1), 0.0)))/A
+    return u
+
+
+def fast_sweeping_method(phi, h, tol=1e-10, maxit=100):
+    """
+    @brief 快速扫描法, 原地把水平集函数 phi 重新初始化为符号距离函数
+
+    @param[in, out] phi 网格节点上的水平集函数, 形状为 (n0+1, n1+1[, n2+1])
+    @param[in] h 各方向的网格步长
+    @param[in] tol 两次完整扫描之间最大变化量的收敛阈值
+    @param[in] maxit 完整扫描 (每个方向正反各一次) 的最大次数
+
+    @return info 字典, 包含完整扫描次数 `niter`, 最后一次的变化量 `error`
+        和运行时间 `time`
+
+    @note 每次沿着某个坐标方向逐个超平面地更新 (超平面内向量化),
+        重复沿所有方向正反扫描直到收敛, 因此不要求各方向剖分段数相同.
+    """
+    start = dtimer()
+    GD = phi.ndim
+    sign = np.sign(phi)
+
+    d0 = interface_distance(phi, h)
+    isFixed = np.pad(np.isfinite(d0), 1, constant_values=True)
+    d = np.pad(d0, 1, constant_values=np.inf)
+
+    niter = 0
+    error = np.inf
+    while niter < maxit:
+        niter += 1
+        error = 0.0
+        for k in range(GD):
+            n = d.shape[k]
+            for order in (range(1, n-1), range(n-2, 0, -1)):
+                for i in order:
+                    err = _sweep_plane(d, isFixed, h, k, i)
+                    error = max(error, err)
+        if error < tol:
+            break
+
+    interior = (slice(1, -1), )*GD
+    phi[:] = sign*d[interior]
+    end = dtimer()
+    return {'niter': niter, 'error': error, 'time': end - start}
+
+
+def _sweep_plane(d, isFixed, h, k, i):
+    """
+    @brief 更新扩展数组 d 中沿第 k 个方向的第 i 个超平面, 返回最大变化量
+    """
+    GD = d.ndim
+
+    def plane(j):
+        s = [slice(1, -1)]*GD
+        s[k] = j
+        return tuple(s)
+
+    p = plane(i)
+    a = np.empty(d[p].shape + (GD, ), dtype=np.float64)
+    a[..., k] = np.minimum(d[plane(i-1)], d[plane(i+1)])
+
+    # 超平面内其它方向上的邻居
+    full = [slice(1, -1)]*GD
+    full[k] = i
+    for m in range(GD):
+        if m == k:
+            continue
+        s0 = list(full)
+        s1 = list(full)
+        s0[m] = slice(0, -2)
+        s1[m] = slice(2, None)
+        a[..., m] = np.minimum(d[tuple(s0)], d[tuple(s1)])
+
+    old = d[p].copy()
+    u = eikonal_update(a, h)
+    new = np.where(isFixed[p], old, np.minimum(old, u))
+    d[p] = new
+    flag = np.isfinite(new)
+    if np.any(flag):
+        change = np.where(np.isfinite(old[flag]), old[flag] - new[flag], np.inf)
+        return np.max(change)
+    else:
+        return 0.0
+
+
+def fast_marching_method(phi, h, band=None):
+    """
+    @brief 基于堆的窄带快速行进法, 原地把水平集函数 phi 重新初始化为符号距离函数
+
+    @param[in, out] phi 网格节点上的水平集函数, 形状为 (n0+1, n1+1[, n2+1])
+    @param[in] h 各方向的网格步长
+    @param[in] band 窄带宽度, 距离大于 band 的节点不再计算, 其值截断为 band.
+        默认为 None, 表示计算整个区域
+
+    @return info 字典, 包含被接受的节点个数 `niter` 和运行时间 `time`
+    """
+    start = dtimer()
+    GD = phi.ndim
+    sign = np.sign(phi)
+    band = np.inf if band is None else band
+
+    d0 = interface_distance(phi, h)
+    d = np.pad(d0, 1, constant_values=np.inf)
+    shape = d.shape
+
+    # 0: 远处节点, 1: 试探节点, 2: 已接受节点, 3: 扩展的虚拟节点
+    status = np.zeros(shape, dtype=np.int8)
+    status[np.pad(np.isfinite(d0), 1, constant_values=False)] = 2
+    status[np.pad(np.zeros(d0.shape, dtype=np.bool_), 1, constant_values=True)] = 3
+
+    strides = [int(np.prod(shape[k+1:])) for k in range(GD)]
+    d = d.reshape(-1)
+    status = status.reshape(-1)
+
+    heap = []
+
+    def push_neighbors(idx):
+        for s in strides:
+            for j in (idx - s, idx + s):
+                if status[j] < 2:
+                    a = [min(d[j - t] if status[j - t] == 2 else np.inf,
+                             d[j + t] if status[j + t] == 2 else np.inf)
+                         for t in strides]
+                    u = _local_solve(a, h)
+                    if u < d[j]:
+                        d[j] = u
+                        status[j] = 1
+                        heapq.heappush(heap, (u, j))
+
+    for idx in np.nonzero(status == 2)[0]:
+        push_neighbors(idx)
+
+    niter = 0
+    while heap:
+        u, idx = heapq.heappop(heap)
+        if status[idx] == 2 or u > d[idx]: # 过期的堆元素
+            continue
+        if u > band:
+            break
+        status[idx] = 2
+        niter += 1
+        push_neighbors(idx)
+
+    d[(status < 2) | (d > band)] = band
+
+    interior = (slice(1, -1), )*GD
+    phi[:] = sign*d.reshape(shape)[interior]
+    end = dtimer()
+    return {'niter': niter, 'time': end - start}
+
+
+def redistance(phi, h, method='fmm', **kwargs):
+    """
+    @brief 水平集函数重新初始化的统一入口
+
+    @param[in] method 'fmm' 为快速行进法, 'fsm' 为快速扫描法
+    """
+    if method in {'fmm', 'fast_marching'}:
+        return fast_marching_method(phi, h, **kwargs)
+    elif method in {'fsm', 'fast_sweeping'}:
+        return fast_sweeping_method(phi, h, **kwargs)
+    else:
+        raise ValueError("the method `{}` is not implemented!".format(method))
@@ -1,20 +1,14 @@
 import numpy as np
 
-import matplotlib.pyplot as plt
-import mpl_toolkits.mplot3d as a3
-from mpl_toolkits.mplot3d.art3d import Line3DCollection
-import matplotlib.colors as colors
-from matplotlib.tri import Triangulation
-
-from matplotlib.collections import PolyCollection, LineCollection, PatchCollection
-import matplotlib.cm as cm
-from matplotlib.patches import Polygon
+# matplotlib 只在画图的函数中导入, 以免导入网格模块时付出它的导入时间
 
 
 def find_node(
         axes, node, index=None,
         showindex=False, color='r',
         markersize=20, fontsize=24, fontcolor='k', multiindex=None):
+    import matplotlib.colors as colors
+    import matplotlib.cm as cm
 
     if len(node.shape) == 1:
         GD = 1
@@ -101,6 +95,10 @@ def find_entity(
         index=None, showindex=False,
         color='r', markersize=20,
         fontsize=24, fontcolor='k', multiindex=None):
+    import matplotlib.colors as colors
+    import matplotlib.cm as cm
+    from matplotlib.collections import LineCollection
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
     GD = mesh.geo_dimension()
     bc = mesh.entity_barycenter(entity).reshape(-1, GD)
@@ -286,6 +284,9 @@ def show_mesh_1d(
         aspect='equal',
         linewidths=1, markersize=20,
         showaxis=False):
+    from matplotlib.collections import LineCollection
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
     axes.set_aspect(aspect)
     if showaxis == False:
         axes.set_axis_off()
@@ -319,6 +320,11 @@ def show_mesh_2d(
         cellcolor='grey', aspect='equal',
         linewidths=1, markersize=20,
         showaxis=False, showcolorbar=False, cmax=None, cmin=None, colorbarshrink=None, cmap='jet', box=None):
+    import matplotlib.colors as colors
+    import matplotlib.cm as cm
+    import mpl_toolkits.mplot3d as a3
+    from matplotlib.collections import PolyCollection, PatchCollection
+    from matplotlib.patches import Polygon
 
     try:
         axes.set_aspect(aspect)
@@ -406,6 +412,9 @@ def show_mesh_3d(
         aspect='equal',
         linewidths=0.5, markersize=0,
         showaxis=False, alpha=0.8, shownode=False, showedge=False, threshold=None):
+    import matplotlib.colors as colors
+    import matplotlib.cm as cm
+    import mpl_toolkits.mplot3d as a3
 
     try:
         axes.set_aspect(aspect)
@@ -520,6 +529,8 @@ def show_mesh_angle(axes, mesh, angle=None):
     return mina, maxa, meana
 
 def show_solution(axes, mesh, u):
+    from matplotlib.tri import Triangulation
+
     points = mesh.points
     cells = mesh.cells
     tri = Triangulation(points[:,0], points[:,1], cells)
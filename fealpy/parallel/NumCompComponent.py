@@ -27,7 +27,6 @@ class NumCompComponent():
         rank = comm.Get_rank()
         for r in ct.neighbor: 
             data = array[ct.sds[r]]
-            print("rank: ", rank, "data: ", len(ct.sds[r]), len(ct.rds[r]), "r: ", r)
             comm.Isend(data, dest=r, tag=rank) 
 
         for r in ct.neighbor:  
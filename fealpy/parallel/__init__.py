@@ -3,3 +3,6 @@ from .CommToplogy import CommToplogy
 from .CommToplogy import CSRMatrixCommToplogy
 
 from .NumCompComponent import NumCompComponent
+
+from .transport import SharedMemoryTransport, MPITransport
+from .distributed_mesh import DistributedMesh, HaloExchange, DistributedOperator
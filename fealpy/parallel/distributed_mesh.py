@@ -0,0 +1,231 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ..graph.partition import part_mesh
+from ..functionspace import LagrangeFiniteElementSpace
+
+
+class LocalMesh():
+    """
+    @brief 一个子区域的局部网格
+
+    局部单元的前 NCO 个是本进程拥有的单元, 之后是一层幽灵单元, 即和拥有的
+    单元有公共顶点的其它单元. 拥有的单元上的任何自由度所在的单元都在局部网格
+    中, 所以在局部网格的全部单元上组装时, 拥有的自由度对应的行是完整的.
+    """
+    def __init__(self, rank, mesh, cell_global, node_global, NCO):
+        self.rank = rank
+        self.mesh = mesh
+        self.cell_global = cell_global # 局部单元的全局编号
+        self.node_global = node_global # 局部节点的全局编号
+        self.NCO = NCO
+
+    def number_of_owned_cells(self):
+        return self.NCO
+
+    def number_of_ghost_cells(self):
+        return self.mesh.number_of_cells() - self.NCO
+
+
+class DofMap():
+    """
+    @brief 局部拉格朗日空间的自由度映射和通信拓扑
+
+    send[q] 是要发给进程 q 的拥有的自由度的局部编号, recv[q] 是由进程 q
+    拥有的幽灵自由度的局部编号, 它们都按全局编号排序, 所以 send[q] 和进程 q
+    的 recv[rank] 一一对应.
+    """
+    def __init__(self, rank, l2g, owner, send, recv):
+        self.rank = rank
+        self.l2g = l2g # 局部自由度的全局编号
+        self.owner = owner # 局部自由度所属的进程
+        self.isOwned = (owner == rank)
+        self.send = send
+        self.recv = recv
+
+    def neighbors(self):
+        return sorted(set(self.send) | set(self.recv))
+
+
+class DistributedMesh():
+    """
+    @brief 把 TriangleMesh 或 TetrahedronMesh 剖分成带一层幽灵单元的子区域
+
+    剖分和通信拓扑都在主进程中建立, 然后把每个子区域的 `LocalMesh` 和
+    `DofMap` 发给对应的进程, 各个进程之间只需要交换幽灵自由度上的值.
+
+    Examples
+    --------
+    >> dmesh = DistributedMesh(mesh, nparts=4)
+    >> dofmaps = dmesh.dof_maps(p=2)
+    >> # 在进程 rank 中
+    >> space = LagrangeFiniteElementSpace(dmesh.local[rank].mesh, p=2)
+    """
+    def __init__(self, mesh, nparts, parts=None, method='rcb'):
+        """
+        @param[in] mesh 全局网格
+        @param[in] nparts 子区域个数
+        @param[in] parts 每个单元所属的子区域, 默认用
+                   `fealpy.graph.partition.part_mesh` 剖分
+        @param[in] method 剖分方法
+        """
+        self.mesh = mesh
+        self.nparts = nparts
+        if parts is None:
+            _, parts = part_mesh(mesh, entity='cell', nparts=nparts, method=method)
+        self.parts = np.asarray(parts)
+        self.local = [self.local_mesh(rank) for rank in range(nparts)]
+
+    def local_mesh(self, rank):
+        mesh = self.mesh
+        NN = mesh.number_of_nodes()
+        node = mesh.entity('node')
+        cell = mesh.entity('cell')
+
+        isOwnedCell = (self.parts == rank)
+        isOwnedNode = np.zeros(NN, dtype=np.bool_)
+        isOwnedNode[cell[isOwnedCell]] = True
+        isGhostCell = ~isOwnedCell & np.any(isOwnedNode[cell], axis=1)
+
+        cidx = np.r_[np.nonzero(isOwnedCell)[0], np.nonzero(isGhostCell)[0]]
+        nidx, lcell = np.unique(cell[cidx], return_inverse=True)
+        lcell = lcell.reshape(-1, cell.shape[1]).astype(cell.dtype)
+        lmesh = mesh.__class__(node[nidx], lcell)
+        return LocalMesh(rank, lmesh, cidx, nidx, isOwnedCell.sum())
+
+    def dof_maps(self, p=1):
+        """
+        @brief 每个子区域上 p 次拉格朗日空间的 `DofMap`
+
+        自由度属于包含它的单元所在子区域中编号最小的那个.
+        """
+        nparts = self.nparts
+        gspace = LagrangeFiniteElementSpace(self.mesh, p=p)
+        gdof = gspace.number_of_global_dofs()
+        cell2dof = gspace.cell_to_dof()
+
+        owner = np.full(gdof, nparts, dtype=np.int_)
+        np.minimum.at(owner, cell2dof, self.parts[:, None])
+
+        l2g = []
+        for local in self.local:
+            space = LagrangeFiniteElementSpace(local.mesh, p=p)
+            idx = np.zeros(space.number_of_global_dofs(), dtype=cell2dof.dtype)
+            idx[space.cell_to_dof()] = cell2dof[local.cell_global]
+            l2g.append(idx)
+
+        g2l = np.full(gdof, -1, dtype=np.int_)
+        recv = [{} for rank in range(nparts)]
+        send = [{} for rank in range(nparts)]
+        for rank in range(nparts):
+            lowner = owner[l2g[rank]]
+            isGhost = (lowner != rank)
+            for q in np.unique(lowner[isGhost]):
+                idx, = np.nonzero(lowner == q)
+                idx = idx[np.argsort(l2g[rank][idx])]
+                recv[rank][q] = idx
+
+                g2l[l2g[q]] = np.arange(len(l2g[q]))
+                send[q][rank] = g2l[l2g[rank][idx]]
+                g2l[l2g[q]] = -1
+
+        return [DofMap(rank, l2g[rank], owner[l2g[rank]], send[rank], recv[rank])
+                for rank in range(nparts)]
+
+    def message_counts(self, dofmaps):
+        """
+        @brief 每对进程之间消息的最大元素个数, 用于 `SharedMemoryTransport.create`
+
+        正向交换时 rank 发送 send[q], 反向累加时发送 recv[q].
+        """
+        counts = {}
+        for dm in dofmaps:
+            for q in dm.neighbors():
+                n = max(len(dm.send.get(q, [])), len(dm.recv.get(q, [])))
+                counts[(dm.rank, q)] = n
+        return counts
+
+
+class HaloExchange():
+    """
+    @brief 幽灵自由度上的数据交换
+
+    mode 为 'insert' 时, 拥有者把值发给持有幽灵副本的进程, 覆盖幽灵自由度上
+    的值; mode 为 'add' 时反过来, 幽灵自由度上的值累加到拥有者上.
+
+    begin 发出所有的非阻塞发送和接收后立即返回, 在 end 之前可以做不依赖幽灵
+    自由度的计算, 使通信和计算重叠.
+    """
+    def __init__(self, dofmap, transport):
+        self.dofmap = dofmap
+        self.transport = transport
+        self._pending = None
+
+    def begin(self, u, mode='insert'):
+        dm = self.dofmap
+        t = self.transport
+        if mode == 'insert':
+            sidx, ridx = dm.send, dm.recv
+        elif mode == 'add':
+            sidx, ridx = dm.recv, dm.send
+        else:
+            raise ValueError("the mode `{}` is not supported!".format(mode))
+
+        recvs = []
+        for q, idx in ridx.items():
+            buf = np.empty((len(idx), ) + u.shape[1:], dtype=u.dtype)
+            recvs.append((t.irecv(buf, source=q), idx, buf))
+        sends = [t.isend(u[idx], dest=q) for q, idx in sidx.items()]
+        self._pending = (mode, sends, recvs)
+
+    def end(self, u):
+        mode, sends, recvs = self._pending
+        for req in sends:
+            req.wait()
+        for req, idx, buf in recvs:
+            req.wait()
+            if mode == 'insert':
+                u[idx] = buf
+            else:
+                u[idx] += buf
+        self._pending = None
+        return u
+
+    def update(self, u, mode='insert'):
+        self.begin(u, mode=mode)
+        return self.end(u)
+
+
+class DistributedOperator():
+    """
+    @brief 按行分布的局部矩阵和向量的乘积, 通信和内部行的计算重叠
+
+    局部矩阵 A 在局部网格的全部单元上组装, 只有拥有的自由度对应的行是完整
+    的. 不涉及幽灵自由度的行在幽灵数据到达之前计算, 其余的行在之后计算.
+    """
+    def __init__(self, A, exchange):
+        self.A = csr_matrix(A)
+        self.exchange = exchange
+        dm = exchange.dofmap
+
+        isGhost = ~dm.isOwned
+        A = self.A
+        row = np.repeat(np.arange(A.shape[0]), np.diff(A.indptr))
+        isBdRow = np.zeros(A.shape[0], dtype=np.bool_)
+        isBdRow[row[isGhost[A.indices]]] = True
+        self.interior, = np.nonzero(dm.isOwned & ~isBdRow)
+        self.boundary, = np.nonzero(dm.isOwned & isBdRow)
+        self.AI = A[self.interior]
+        self.AB = A[self.boundary]
+
+    def matvec(self, x):
+        """
+        @brief y = A x, x 只需要拥有的自由度上的值是正确的, 返回的 y 在幽灵
+               自由度上为 0
+        """
+        self.exchange.begin(x)
+        y = np.zeros_like(x)
+        y[self.interior] = self.AI@x
+        self.exchange.end(x)
+        y[self.boundary] = self.AB@x
+        return y
@@ -0,0 +1,138 @@
+import numpy as np
+import multiprocessing as mp
+
+
+def _shared_memory():
+    """
+    @brief 导入 multiprocessing.shared_memory, 它在 Python 3.8 中才加入
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise RuntimeError("SharedMemoryTransport needs Python 3.8 or newer "
+                "(multiprocessing.shared_memory), use MPITransport instead!")
+    return shared_memory
+
+
+class Request():
+    """
+    @brief 非阻塞通信的请求, wait 返回时通信完成
+
+    data 是通信完成前必须保持有效的缓冲区.
+    """
+    def __init__(self, wait=None, data=None):
+        self._wait = wait
+        self.data = data
+
+    def wait(self):
+        if self._wait is not None:
+            self._wait()
+            self._wait = None
+        self.data = None
+
+
+class SharedMemoryTransport():
+    """
+    @brief 单机多进程之间基于共享内存的点对点通信
+
+    每个有序进程对 (src, dst) 有一块共享内存作为消息缓冲区, 以及两个信号量:
+    full 表示缓冲区中有未读取的消息, empty 表示缓冲区可以写入. 所以同一对进程
+    之间的消息按发送的顺序到达, 每个方向上同时最多有一条未读取的消息.
+
+    `create` 在主进程中建立所有的缓冲区, 返回每个进程的通信对象, 作为参数
+    传给子进程. 所有子进程结束后主进程调用 `close` 释放共享内存.
+
+    Examples
+    --------
+    >> transports = SharedMemoryTransport.create(4, {(0, 1): 100, (1, 0): 100})
+    >> # 在进程 rank 中
+    >> t = transports[rank]
+    >> t.isend(a, dest=1)
+    >> t.irecv(b, source=1).wait()
+    """
+    def __init__(self, rank, size, channels):
+        self.rank = rank
+        self.size = size
+        self.channels = channels
+
+    @classmethod
+    def create(cls, size, counts, itemsize=8, ctx=None):
+        """
+        @param[in] size 进程个数
+        @param[in] counts 字典, counts[(src, dst)] 是从 src 发送到 dst 的
+                   消息的最大元素个数
+        @param[in] itemsize 每个元素的最大字节数
+        @param[in] ctx multiprocessing 的上下文, 默认为 mp.get_context()
+        """
+        shared_memory = _shared_memory()
+        ctx = mp.get_context() if ctx is None else ctx
+        channels = {}
+        for key, n in counts.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(n*itemsize, 1))
+            channels[key] = (shm, ctx.Semaphore(0), ctx.Semaphore(1))
+        return [cls(rank, size, channels) for rank in range(size)]
+
+    def isend(self, array, dest, tag=0):
+        """
+        @brief 把 array 复制到发往 dest 的缓冲区, 只有上一条消息还没被读取时
+               才会等待
+        """
+        shm, full, empty = self.channels[(self.rank, dest)]
+        array = np.ascontiguousarray(array)
+        if array.nbytes > shm.size:
+            raise ValueError("the message size {} is larger than the buffer size {}!".format(
+                array.nbytes, shm.size))
+        empty.acquire()
+        buf = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        buf[:] = array
+        del buf
+        full.release()
+        return Request()
+
+    def irecv(self, array, source, tag=0):
+        """
+        @brief 从 source 接收消息到 array 中, 在返回的请求的 wait 中完成
+        """
+        shm, full, empty = self.channels[(source, self.rank)]
+
+        def wait():
+            full.acquire()
+            buf = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+            array[:] = buf
+            del buf
+            empty.release()
+
+        return Request(wait)
+
+    def close(self):
+        """
+        @brief 释放共享内存, 由创建它们的主进程调用
+        """
+        for shm, _, _ in self.channels.values():
+            shm.close()
+            shm.unlink()
+
+
+class MPITransport():
+    """
+    @brief 基于 mpi4py 的点对点通信, 接口和 `SharedMemoryTransport` 相同
+    """
+    def __init__(self, comm=None):
+        if comm is None:
+            from mpi4py import MPI
+            comm = MPI.COMM_WORLD
+        self.comm = comm
+        self.rank = comm.Get_rank()
+        self.size = comm.Get_size()
+
+    def isend(self, array, dest, tag=0):
+        array = np.ascontiguousarray(array)
+        req = self.comm.Isend(array, dest=dest, tag=tag)
+        return Request(req.Wait, data=array)
+
+    def irecv(self, array, source, tag=0):
+        req = self.comm.Irecv(array, source=source, tag=tag)
+        return Request(req.Wait, data=array)
+
+    def close(self):
+        pass
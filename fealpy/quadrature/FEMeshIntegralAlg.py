@@ -3,6 +3,7 @@ from scipy.sparse import csr_matrix, coo_matrix
 import multiprocessing as mp
 from multiprocessing.pool import ThreadPool as Pool
 from ..decorator import timer
+from .fused_error import FusedErrorAccumulator, accepts_index
 
 
 class FEMeshIntegralAlg():
@@ -88,6 +89,65 @@ class FEMeshIntegralAlg():
             e = np.power(np.sum(e, axis=tuple(range(1, len(e.shape)))), 1/power)
         return e # float or (NC, )
 
+    def errors(self, terms, celltype=False, q=None, chunksize=None, memory=2**26):
+        """
+        @brief 一次积分扫描计算多个误差或范数
+
+        @param[in] terms 误差项的列表, 每一项为 (u, v, power) 或者
+                   (u, v, power, c), 见 `fused_error`. 函数按 coordtype 用
+                   积分点的重心坐标或者笛卡尔坐标计算, 接受 index 参数的函数
+                   (如有限元函数 uh 和 uh.grad_value) 只计算当前块中的单元
+        @param[in] celltype 为真时同时返回每个单元上的误差
+        @param[in] chunksize 每块的单元个数, 默认由 memory 确定
+        @param[in] memory 每块计算中函数值等临时数组的字节数上限
+
+        @return 每一项的整体误差, (NT, ); celltype 为真时返回整体误差和每个
+                单元上的误差 (NT, NC)
+
+        Examples
+        --------
+        >> e = integralalg.errors([
+               (pde.solution, uh, 2), # L2 误差
+               (pde.gradient, uh.grad_value, 2), # H1 半范误差
+               (pde.solution, uh, 4), # L4 误差
+               (pde.solution, uh, np.inf), # 积分点上的最大误差
+               (uh, None, 2)]) # uh 的 L2 范数
+        """
+        mesh = self.mesh
+        NC = mesh.number_of_cells()
+        qf = self.integrator if q is None else mesh.integrator(q, etype='cell')
+        bcs, ws = qf.get_quadrature_points_and_weights()
+
+        acc = FusedErrorAccumulator(terms, NC)
+        fs = acc.functions()
+        n = 1024 if chunksize is None else chunksize
+        start = 0
+        while start < NC:
+            index = np.s_[start:min(start + n, NC)]
+            ps = None
+            value = {}
+            for f in fs:
+                if getattr(f, 'coordtype', 'cartesian') == 'barycentric':
+                    x = bcs
+                else:
+                    if ps is None:
+                        ps = mesh.bc_to_point(bcs, index=index)
+                    x = ps
+                if accepts_index(f):
+                    value[id(f)] = f(x, index=index)
+                elif x is bcs: # 只能在所有单元上计算的函数
+                    value[id(f)] = f(bcs)[:, index]
+                else:
+                    value[id(f)] = f(x)
+            nbytes = acc.add(value, ws, self.cellmeasure[index], index)
+            if ps is not None:
+                nbytes += ps.nbytes
+            m = index.stop - index.start
+            start = index.stop
+            if chunksize is None: # 按这一块的内存用量调整块的大小
+                n = max(1, int(memory/max(nbytes, 1)*m))
+        return acc.result(celltype=celltype)
+
     def mesh_integral(self, u, etype='cell', q=None, power=None):
         """
         @brief 计算函数 u 在指定网格实体上的整体积分。
@@ -1,6 +1,7 @@
 import numpy as np
 from .GaussLobattoQuadrature import GaussLobattoQuadrature
 from .GaussLegendreQuadrature import GaussLegendreQuadrature
+from .fused_error import FusedErrorAccumulator, accepts_index
 
 class PolygonMeshIntegralAlg():
     def __init__(self, mesh, q, cellmeasure=None, cellbarycenter=None):
@@ -139,6 +140,62 @@ class PolygonMeshIntegralAlg():
             e = np.power(np.sum(e, axis=tuple(range(1, len(e.shape)))), 1/power)
         return e
 
+    def errors(self, terms, celltype=False, q=None, chunksize=None, memory=2**26):
+        """
+        @brief 一次积分扫描计算多个误差或范数
+
+        每个多边形由重心和它的边剖分成子三角形, 按子三角形分块积分. 每一项
+        为 (u, v, power) 或者 (u, v, power, c), 见 `fused_error`; 接受 index
+        参数的函数 (如缩放单项式空间中的函数) 用 f(x, index=index) 计算,
+        index 为每个积分点所在的单元, 其它函数用 f(x) 计算.
+
+        @param[in] celltype 为真时同时返回每个单元上的误差
+        @param[in] chunksize 每块的子三角形个数, 默认由 memory 确定
+        @param[in] memory 每块计算中函数值等临时数组的字节数上限
+
+        @return 每一项的整体误差, (NT, ); celltype 为真时返回整体误差和每个
+                单元上的误差 (NT, NC)
+        """
+        mesh = self.mesh
+        node = mesh.entity('node')
+        edge = mesh.entity('edge')
+        edge2cell = mesh.ds.edge_to_cell()
+        bc = self.cellbarycenter
+        NC = mesh.number_of_cells()
+
+        qf = self.cellintegrator if q is None else self.mesh.integrator(q)
+        bcs, ws = qf.quadpts, qf.weights
+
+        # 所有子三角形: 所在单元和三个顶点, 保证逆时针方向
+        isInEdge = (edge2cell[:, 0] != edge2cell[:, 1])
+        cell = np.r_[edge2cell[:, 0], edge2cell[isInEdge, 1]]
+        v1 = np.r_[edge[:, 0], edge[isInEdge, 1]]
+        v2 = np.r_[edge[:, 1], edge[isInEdge, 0]]
+
+        acc = FusedErrorAccumulator(terms, NC)
+        fs = acc.functions()
+        NT = len(cell)
+        n = 1024 if chunksize is None else chunksize
+        start = 0
+        while start < NT:
+            s = np.s_[start:min(start + n, NT)]
+            index = cell[s]
+            tri = [bc[index], node[v1[s]], node[v2[s]]]
+            a = self.triangle_measure(tri)
+            pp = np.einsum('ij, jkm->ikm', bcs, tri)
+            value = {}
+            for f in fs:
+                if accepts_index(f):
+                    value[id(f)] = f(pp, index=index)
+                else:
+                    value[id(f)] = f(pp)
+            nbytes = acc.add(value, ws, a, index) + pp.nbytes
+            m = s.stop - s.start
+            start = s.stop
+            if chunksize is None: # 按这一块的内存用量调整块的大小
+                n = max(1, int(memory/max(nbytes, 1)*m))
+        return acc.result(celltype=celltype)
+
     def L1_error(self, u, uh, celltype=False, q=None):
         def f(x, index):
             return np.abs(u(x) - uh(x, index))
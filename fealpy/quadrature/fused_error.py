@@ -0,0 +1,161 @@
+"""
+Notes
+-----
+
+一次积分扫描计算多个误差 (范数) 的累加器, 由 `FEMeshIntegralAlg.errors`
+和 `PolygonMeshIntegralAlg.errors` 使用.
+
+每一项为 (u, v, power) 或 (u, v, power, c), 对应
+
+    (\\int c |u - v|^power dx)^{1/power},
+
+其中 v 可以为 None 或 0 (计算 u 的范数), power 可以为 np.inf. c 为矩阵值系数时,
+被积函数为 (u-v)^T c (u-v) (能量范数, power 只能为 2). 向量和张量值函数
+的 |u - v|^power 对所有分量求和, 和 `error` 一致.
+
+c 可以是函数, 标量, 常数矩阵 (GD, GD), 或者分片常数的数组: 形状为 (NC, )
+的标量系数和 (NC, GD, GD) 的矩阵系数, 后两者在每一块中按单元取出.
+
+积分按单元分块进行, 每一块中积分点的坐标只计算一次, 被多个项用到的同一个
+函数 (如 u 同时出现在 L2 和 Lp 误差中) 只计算一次, 块的大小由内存上限确定.
+"""
+import inspect
+
+import numpy as np
+
+
+def accepts_index(f):
+    """
+    @brief 函数 f 是否接受 index 参数 (如有限元函数和它的导数)
+    """
+    if not inspect.isroutine(f): # 可调用的对象, 如 Function
+        f = type(f).__call__
+    try:
+        sig = inspect.signature(f)
+    except (TypeError, ValueError):
+        return False
+    for p in sig.parameters.values():
+        if p.name == 'index' or p.kind == p.VAR_KEYWORD:
+            return True
+    return False
+
+
+class FusedErrorAccumulator():
+    """
+    @brief 逐块累加各项误差在每个单元上的积分
+    """
+    def __init__(self, terms, NC):
+        """
+        @param[in] terms 误差项的列表, 每一项为 (u, v, power) 或者
+                   (u, v, power, c)
+        @param[in] NC 单元个数
+        """
+        self.terms = []
+        for t in terms:
+            if len(t) == 3:
+                t = tuple(t) + (None, )
+            elif len(t) != 4:
+                raise ValueError("an error term should be (u, v, power) or (u, v, power, c)!")
+            c = t[3]
+            if c is not None and not callable(c):
+                c = np.asarray(c)
+                if c.ndim not in {0, 1, 2, 3}:
+                    raise ValueError("the coefficient array should have the shape "
+                            "(), (NC, ), (GD, GD) or (NC, GD, GD)!")
+                if c.ndim in {1, 3} and len(c) != NC:
+                    raise ValueError("the cellwise coefficient has {} cells, "
+                            "but the mesh has {}!".format(len(c), NC))
+                t = t[:3] + (c, )
+            self.terms.append(t)
+        self.NC = NC
+        self.e = np.zeros((len(self.terms), NC), dtype=np.float64)
+
+    def functions(self):
+        """
+        @brief 所有项中互不相同的函数
+        """
+        fs = {}
+        for u, v, _, c in self.terms:
+            for f in (u, v, c):
+                if callable(f):
+                    fs[id(f)] = f
+        return list(fs.values())
+
+    def add(self, value, ws, measure, index):
+        """
+        @brief 累加一块积分点上的贡献
+
+        @param[in] value 函数到它在这一块积分点上的值的映射, 以 id(f) 为键
+        @param[in] ws 积分权重, (NQ, )
+        @param[in] measure 这一块中每个积分区域的测度, (n, )
+        @param[in] index 积分区域所在的单元, 切片或者长度为 n 的整数数组,
+                   数组中可以有重复的单元 (如多边形的子三角形)
+
+        @return 这一块计算中用到的数组的字节数
+        """
+        def get(f):
+            return value[id(f)] if callable(f) else f
+
+        def coef(c):
+            if callable(c):
+                return value[id(c)]
+            if c.ndim in {1, 3}: # 分片常数的系数, 取出这一块的单元
+                return c[index]
+            return c
+
+        nbytes = sum(v.nbytes for v in value.values() if isinstance(v, np.ndarray))
+        for k, (u, v, power, c) in enumerate(self.terms):
+            d = get(u) - get(v) if v is not None else get(u)
+            d = np.asarray(d)
+            cc = None if c is None else coef(c)
+            isMatrix = (c is not None) and (d.ndim >= 3) and (np.ndim(cc) == d.ndim + 1
+                    or (not callable(c) and c.ndim in {2, 3}))
+            if isMatrix:
+                if power != 2:
+                    raise ValueError("the energy norm with a matrix coefficient needs power=2!")
+                f = np.einsum('...i, ...ij, ...j->...', d, cc, d)
+            else:
+                f = np.abs(d)
+                if power != np.inf:
+                    f = f**power
+                if f.ndim > 2:
+                    # 向量和张量值函数对所有分量求和 (无穷范数时取最大值)
+                    axis = tuple(range(2, f.ndim))
+                    f = f.max(axis=axis) if power == np.inf else f.sum(axis=axis)
+                if c is not None:
+                    f = cc*f
+            f = np.broadcast_to(f, (len(ws), len(measure)))
+            nbytes += f.nbytes
+
+            if power == np.inf:
+                val = f.max(axis=0)
+                if isinstance(index, slice):
+                    np.maximum(self.e[k, index], val, out=self.e[k, index])
+                else:
+                    np.maximum.at(self.e[k], index, val)
+            else:
+                val = np.einsum('q, qc, c->c', ws, f, measure)
+                if isinstance(index, slice):
+                    self.e[k, index] += val
+                else:
+                    self.e[k] += np.bincount(index, weights=val, minlength=self.NC)
+        return nbytes
+
+    def result(self, celltype=False):
+        """
+        @return 每一项的整体误差, (NT, ); celltype 为真时同时返回每个单元上的
+                误差, (NT, NC)
+        """
+        eta = np.zeros_like(self.e)
+        e = np.zeros(len(self.terms), dtype=np.float64)
+        for k, (_, _, power, _) in enumerate(self.terms):
+            if power == np.inf:
+                eta[k] = self.e[k]
+                e[k] = self.e[k].max() if self.NC > 0 else 0.0
+            else:
+                eta[k] = self.e[k]**(1/power)
+                e[k] = self.e[k].sum()**(1/power)
+        if celltype:
+            return e, eta
+        else:
+            return e
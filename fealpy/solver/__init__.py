@@ -1,21 +1,20 @@
-import platform
+from ..common.lazy_import import attach
 
-from .solve import solve, active_set_solver
-from .amg import AMGSolver
+__getattr__, __dir__, __all__ = attach(__name__, submodules='all', submod_attrs={
+    'solve': ['solve', 'active_set_solver'],
+    'amg': ['AMGSolver'],
+    # 需要安装 matlab 和 transplant
+    'matlab_solver': ['MatlabSolver'],
+    #'petsc_solver': ['PETScSolver'],
 
-try:
-    from .matlab_solver import MatlabSolver
-except ImportError:
-    print('I do not find matlab installed on this system!, so you can not use it')
+    'fast_solver': ['HighOrderLagrangeFEMFastSolver', 'SaddlePointFastSolver',
+        'LinearElasticityLFEMFastSolver', 'LevelSetFEMFastSolver'],
+    'fast_poisson_solver': ['FastPoissonSolver'],
+    'direct_solver': ['DirectSolver'],
+    'mixed_precision': ['MixedPrecisionSolver'],
+    'schwarz': ['SchwarzPreconditioner'],
+    'explicit_dynamics': ['MassMatrixSolver', 'CellOperator', 'hrz_lumped_mass'],
+    'block_split': ['BlockSplit'],
 
-#try:
-#    from .petsc_solver import PETScSolver
-#except ImportError:
-#    print('I do not find petsc and petsc4py installed on this system!, so you can not use it')
-
-from .fast_solver import HighOrderLagrangeFEMFastSolver
-from .fast_solver import SaddlePointFastSolver
-from .fast_solver import LinearElasticityLFEMFastSolver 
-from .fast_solver import LevelSetFEMFastSolver 
-
-from .LinearElasticityRLFEMFastSolver import LinearElasticityRLFEMFastSolver
+    'LinearElasticityRLFEMFastSolver': ['LinearElasticityRLFEMFastSolver'],
+})
@@ -0,0 +1,70 @@
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+
+class BlockSplit():
+    """
+    @brief 把稀疏结构固定的 CSR 矩阵分成 2x2 块
+
+    前 n 个自由度为第 0 块, 其余为第 1 块. 每一块的 CSR 结构和它的元素在
+    原矩阵 data 中的位置只计算一次, 之后对任何相同稀疏结构的矩阵 (如同一个
+    空间上的刚度矩阵和质量矩阵) 取子块只需要一次 data 的花式索引, 而且可以
+    先组合 data 再取子块, 如 M01 + dt*S01 = block(M.data + dt*S.data, 0, 1).
+
+    Examples
+    --------
+    >> split = BlockSplit(S, n)
+    >> (S00, S01), (S10, S11) = split.split(S)
+    >> B = split.block(M.data + dt*S.data, 0, 1)
+    """
+    def __init__(self, A, n):
+        """
+        @param[in] A 稀疏结构的样板矩阵, 重复的元素需要已经合并
+        @param[in] n 第 0 块的自由度个数
+        """
+        A = csr_matrix(A)
+        self.shape = A.shape
+        self.indptr = A.indptr
+        self.indices = A.indices
+        self.n = n
+
+        N = A.shape[0]
+        row = np.repeat(np.arange(N), np.diff(A.indptr))
+        col = A.indices
+        isRow0 = row < n
+        isCol0 = col < n
+        self.blocks = {}
+        for i in range(2):
+            for j in range(2):
+                flag = (isRow0 == (i == 0)) & (isCol0 == (j == 0))
+                idx, = np.nonzero(flag)
+                r0 = 0 if i == 0 else n
+                c0 = 0 if j == 0 else n
+                nr = n if i == 0 else N - n
+                nc = n if j == 0 else A.shape[1] - n
+                indptr = np.zeros(nr + 1, dtype=A.indptr.dtype)
+                np.cumsum(np.bincount(row[idx] - r0, minlength=nr), out=indptr[1:])
+                indices = (col[idx] - c0).astype(A.indices.dtype)
+                self.blocks[(i, j)] = (idx, indptr, indices, (nr, nc))
+
+    def has_same_pattern(self, A):
+        A = csr_matrix(A)
+        return (A.shape == self.shape) and np.array_equal(A.indptr, self.indptr) \
+                and np.array_equal(A.indices, self.indices)
+
+    def block(self, A, i, j):
+        """
+        @brief 第 (i, j) 块
+
+        @param[in] A 和样板矩阵稀疏结构相同的矩阵, 或者它的 data 数组
+        """
+        if issparse(A):
+            if not self.has_same_pattern(A):
+                raise ValueError("the sparsity pattern of A is different from the template!")
+            A = csr_matrix(A).data
+        idx, indptr, indices, shape = self.blocks[(i, j)]
+        return csr_matrix((A[idx], indices, indptr), shape=shape)
+
+    def split(self, A):
+        return [[self.block(A, 0, 0), self.block(A, 0, 1)],
+                [self.block(A, 1, 0), self.block(A, 1, 1)]]
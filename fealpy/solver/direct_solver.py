@@ -0,0 +1,216 @@
+import numpy as np
+from scipy.sparse import csc_matrix, isspmatrix_csc
+from scipy.sparse.linalg import splu, LinearOperator
+
+
+class DirectSolver():
+    """
+    @brief 可以重复使用分解的稀疏直接求解器
+
+    Picard/Newton 迭代和时间推进中系数矩阵的稀疏模式通常是固定的, 这里按照
+    稀疏模式缓存符号分析 (填充最小化的列排序), 模式不变时只做数值分解,
+    数值也不变时直接复用已有的分解. 另外可以把当前的分解冻结若干次, 作为
+    简化 Newton 方法中的近似逆或者 Krylov 方法的预条件子.
+
+    后端:
+    * 'scipy': SuperLU (`scipy.sparse.linalg.splu`), 列排序只在第一次分解时计算
+    * 'mumps': 需要 pymumps 的 `DMumpsContext`, 分析 (job=1) 只在稀疏模式
+      改变时执行, 之后只做分解 (job=2) 和求解 (job=3)
+
+    Examples
+    --------
+    >> solver = DirectSolver()
+    >> for i in range(maxit):
+    ..     A, F = assemble(uh)
+    ..     uh[:] = solver.solve(A, F)
+    """
+    def __init__(self, backend='scipy', ctx=None, permc_spec='COLAMD'):
+        """
+        @param[in] backend 'scipy' 或 'mumps'
+        @param[in] ctx 后端为 'mumps' 时的 `DMumpsContext`
+        @param[in] permc_spec 第一次分解时 SuperLU 使用的列排序方法
+        """
+        if backend == 'scipy':
+            self.backend = _SuperLUBackend(permc_spec)
+        elif backend == 'mumps':
+            self.backend = _MUMPSBackend(ctx)
+        else:
+            raise ValueError("the backend `{}` is not supported!".format(backend))
+
+        self.nfrozen = 0
+        self.stat = {'nanalysis': 0, 'nfactor': 0, 'nsolve': 0, 'nreuse': 0}
+
+    def freeze(self, n=1):
+        """
+        @brief 接下来的 n 次 `solve` 忽略传入的矩阵, 直接用当前的分解 (简化 Newton)
+        """
+        self.nfrozen = n
+
+    def unfreeze(self):
+        self.nfrozen = 0
+
+    def factorize(self, A):
+        """
+        @brief 分解 A, 必要时才做符号分析和数值分解
+        """
+        if self.nfrozen > 0 and self.backend.is_factorized():
+            self.nfrozen -= 1
+            self.stat['nreuse'] += 1
+            return
+        status = self.backend.factorize(A)
+        if status == 'analysis':
+            self.stat['nanalysis'] += 1
+            self.stat['nfactor'] += 1
+        elif status == 'factor':
+            self.stat['nfactor'] += 1
+        else:
+            self.stat['nreuse'] += 1
+
+    def solve(self, A, b):
+        """
+        @brief 求解 A x = b
+
+        @param[in] A 稀疏矩阵, 冻结时可以为 None
+        @param[in] b 右端向量或矩阵 (每列一个右端项)
+        """
+        self.factorize(A)
+        self.stat['nsolve'] += 1
+        return self.backend.solve(b)
+
+    def preconditioner(self):
+        """
+        @brief 把当前的分解作为 `LinearOperator` 形式的预条件子
+        """
+        n = self.backend.n
+        return LinearOperator((n, n), matvec=self.backend.solve, dtype=np.float64)
+
+
+def _canonical_csc(A):
+    A = A if isspmatrix_csc(A) else csc_matrix(A)
+    if not A.has_canonical_format:
+        A = A.copy()
+        A.sum_duplicates()
+    return A
+
+
+class _SuperLUBackend():
+    def __init__(self, permc_spec):
+        self.permc_spec = permc_spec
+        self.n = None
+        self.indptr = None
+        self.indices = None
+        self.data = None
+        self.lu = None
+        self.permuted = False
+
+        self.perm = None     # 列排序
+        self.dataperm = None # 列排序后的矩阵的数据在原矩阵数据中的位置
+        self.pindptr = None
+        self.pindices = None
+
+    def is_factorized(self):
+        return self.lu is not None
+
+    def same_pattern(self, A):
+        return (self.indptr is not None) and (A.shape[0] == self.n) and \
+                np.array_equal(A.indptr, self.indptr) and \
+                np.array_equal(A.indices, self.indices)
+
+    def factorize(self, A):
+        A = _canonical_csc(A)
+        if self.same_pattern(A):
+            if np.array_equal(A.data, self.data):
+                return 'reuse'
+            self.data = A.data.copy()
+            Ap = csc_matrix((A.data[self.dataperm], self.pindices, self.pindptr),
+                    shape=A.shape)
+            self.lu = splu(Ap, permc_spec='NATURAL')
+            self.permuted = True
+            return 'factor'
+
+        self.n = A.shape[0]
+        self.indptr = A.indptr.copy()
+        self.indices = A.indices.copy()
+        self.data = A.data.copy()
+        lu = splu(A, permc_spec=self.permc_spec)
+        self.perm = np.argsort(lu.perm_c) # perm_c[j] 是原来的第 j 列排序后的位置
+
+        self.lu = lu
+        self.permuted = False
+
+        # 缓存列排序后的稀疏模式和数据的置换 (数据从 1 开始编号, 避免 0 被删掉)
+        B = csc_matrix((np.arange(1, A.nnz+1, dtype=np.float64), A.indices, A.indptr),
+                shape=A.shape)[:, self.perm]
+        B.sort_indices()
+        self.dataperm = B.data.astype(np.int_) - 1
+        self.pindptr = B.indptr
+        self.pindices = B.indices
+        return 'analysis'
+
+    def solve(self, b):
+        b = np.asarray(b, dtype=np.float64)
+        if not self.permuted:
+            return self.lu.solve(b)
+        y = self.lu.solve(b)
+        x = np.empty_like(y)
+        x[self.perm] = y
+        return x
+
+
+class _MUMPSBackend():
+    def __init__(self, ctx):
+        if ctx is None:
+            from mumps import DMumpsContext
+            ctx = DMumpsContext()
+            ctx.set_silent()
+        self.ctx = ctx
+        self.n = None
+        self.indptr = None
+        self.indices = None
+        self.data = None
+        self.factorized = False
+
+    def is_factorized(self):
+        return self.factorized
+
+    def factorize(self, A):
+        ctx = self.ctx
+        status = None
+        if ctx.myid == 0:
+            A = A.tocsr()
+            if not A.has_canonical_format:
+                A = A.copy()
+                A.sum_duplicates()
+            if (self.indptr is not None) and (A.shape[0] == self.n) and \
+                    np.array_equal(A.indptr, self.indptr) and \
+                    np.array_equal(A.indices, self.indices):
+                status = 'reuse' if np.array_equal(A.data, self.data) else 'factor'
+            else:
+                status = 'analysis'
+                self.n = A.shape[0]
+                self.indptr = A.indptr.copy()
+                self.indices = A.indices.copy()
+            if status != 'reuse':
+                self.data = A.data.copy()
+        if hasattr(ctx, 'comm'):
+            status = ctx.comm.bcast(status, root=0)
+
+        if status == 'analysis':
+            if ctx.myid == 0:
+                ctx.set_centralized_sparse(A)
+            ctx.run(job=4) # Analysis + Factorization
+        elif status == 'factor':
+            if ctx.myid == 0:
+                ctx.set_centralized_assembled_values(A.tocoo().data)
+            ctx.run(job=2) # Factorization
+        self.factorized = True
+        return status
+
+    def solve(self, b):
+        ctx = self.ctx
+        x = None
+        if ctx.myid == 0:
+            x = np.array(b, dtype=np.float64)
+            ctx.set_rhs(x) # Modified in place
+        ctx.run(job=3) # Solve
+        return x
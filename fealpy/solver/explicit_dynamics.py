@@ -0,0 +1,161 @@
+"""
+Notes
+-----
+
+显式时间推进中反复用到的质量矩阵求解和单元算子.
+
+在 Lagrange 坐标下, 质量矩阵 M = (rho_0 phi_i, phi_j) 不随时间变化, 每个
+时间步只需要求解 M x = b. `MassMatrixSolver` 在构造时做一次 LU 分解, 之后
+每次求解只有回代; 也可以使用集中质量矩阵, 求解变为逐个分量相除:
+
+* 'rowsum': 行和集中, 保持总质量, 但二次及以上的拉格朗日元在顶点上可能
+  得到零或负的质量
+* 'hrz': Hinton-Rock-Zienkiewicz 集中, 取单元质量矩阵的对角元并缩放到单元
+  的总质量, 对角元总是正的, 见 `hrz_lumped_mass`
+
+`CellOperator` 把 (NC, ldof0, ldof1) 的单元矩阵当作整体矩阵来用: K@u,
+v@K 和 K@one 直接在单元上计算后累加到整体向量中, 不需要组装稀疏矩阵; 确实
+需要 CSR 矩阵时, 稀疏结构只在第一次计算并缓存.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix, csc_matrix
+from scipy.sparse.linalg import splu
+
+from ..common.sparsity import cell_sparsity_pattern, scatter_cell_values
+
+
+def hrz_lumped_mass(M, cell2dof, gdof):
+    """
+    @brief HRZ 集中质量矩阵的对角元
+
+    @param[in] M 单元质量矩阵, (NC, ldof, ldof)
+    @param[in] cell2dof 单元到自由度的映射, (NC, ldof)
+    @param[in] gdof 自由度个数
+    """
+    d = np.einsum('cii->ci', M)
+    d = d*(M.sum(axis=(1, 2))/d.sum(axis=1))[:, None]
+    return np.bincount(cell2dof.flat, weights=d.flat, minlength=gdof)
+
+
+class MassMatrixSolver():
+    """
+    @brief 不随时间变化的质量矩阵的求解器
+
+    Examples
+    --------
+    >> solver = MassMatrixSolver(space.mass_matrix(c=rho))
+    >> x = solver.solve(b) # b: (gdof, ) 或 (gdof, m)
+    >> # 集中质量
+    >> solver = MassMatrixSolver(M, lumped='rowsum')
+    >> d = hrz_lumped_mass(space.cell_mass_matrix(c=rho), cell2dof, gdof)
+    >> solver = MassMatrixSolver(M, lumped=d)
+    """
+    def __init__(self, M, lumped=None):
+        """
+        @param[in] M 质量矩阵
+        @param[in] lumped None 表示用 M 的 LU 分解求解, 'rowsum' 表示行和集中,
+                   或者给出集中质量矩阵的对角元
+        """
+        self.M = csr_matrix(M)
+        if lumped is None:
+            self.lu = splu(csc_matrix(self.M))
+            self.diag = None
+        else:
+            self.lu = None
+            if isinstance(lumped, str):
+                if lumped == 'rowsum':
+                    lumped = np.asarray(self.M.sum(axis=1)).reshape(-1)
+                else:
+                    raise ValueError("the lumping method `{}` is not supported!".format(lumped))
+            self.diag = np.asarray(lumped, dtype=self.M.dtype)
+
+    def solve(self, b):
+        """
+        @brief 求解 M x = b, b 的每一列是一个右端
+        """
+        if self.diag is None:
+            return self.lu.solve(np.asarray(b, dtype=self.M.dtype))
+        d = self.diag.reshape((-1, ) + (1, )*(np.ndim(b) - 1))
+        return b/d
+
+    def __call__(self, b):
+        return self.solve(b)
+
+
+class CellOperator():
+    """
+    @brief 由单元矩阵直接作用的整体算子
+
+    单元矩阵 K 的形状为 (NC, ldof0, ldof1), 它代表的整体矩阵为
+    sum_c P0_c^T K_c P1_c, 形状为 (gdof0, gdof1), 其中 P0_c, P1_c 是单元 c
+    上的自由度选择矩阵.
+
+    Examples
+    --------
+    >> op = CellOperator(cspace.cell_to_dof(), cgdof, dspace.cell_to_dof(), dgdof)
+    >> f = op.row_sum(K) # K@one
+    >> g = op.rmatvec(K, v) # v@K
+    >> A = op.tocsr(K) # 缓存稀疏结构
+    """
+    def __init__(self, cell2dof0, gdof0, cell2dof1=None, gdof1=None):
+        """
+        @param[in] cell2dof0, gdof0 行空间的单元自由度映射和自由度个数
+        @param[in] cell2dof1, gdof1 列空间的单元自由度映射和自由度个数, 默认
+                   和行空间相同
+        """
+        self.cell2dof0 = cell2dof0
+        self.gdof0 = gdof0
+        self.cell2dof1 = cell2dof0 if cell2dof1 is None else cell2dof1
+        self.gdof1 = gdof0 if gdof1 is None else gdof1
+        self._pattern = None
+
+    @property
+    def shape(self):
+        return (self.gdof0, self.gdof1)
+
+    @staticmethod
+    def scatter(cell2dof, gdof, val):
+        """
+        @brief 把单元上的值 val, (NC, ldof, ...), 累加到整体数组 (gdof, ...)
+        """
+        return scatter_cell_values(cell2dof, gdof, val)
+
+    def row_sum(self, K):
+        """
+        @brief 整体矩阵的行和 K@one, K 可以有多余的尾轴, 如 (NC, ldof0, ldof1, GD)
+        """
+        return self.scatter(self.cell2dof0, self.gdof0, K.sum(axis=2))
+
+    def matvec(self, K, u):
+        """
+        @brief K@u, u 的形状为 (gdof1, ) 或 (gdof1, m)
+        """
+        val = np.einsum('cij, cj...->ci...', K, u[self.cell2dof1])
+        return self.scatter(self.cell2dof0, self.gdof0, val)
+
+    def rmatvec(self, K, v):
+        """
+        @brief v@K, 即 K^T v, v 的形状为 (gdof0, ) 或 (gdof0, m)
+        """
+        val = np.einsum('cij, ci...->cj...', K, v[self.cell2dof0])
+        return self.scatter(self.cell2dof1, self.gdof1, val)
+
+    def sparsity_pattern(self):
+        """
+        @brief 整体矩阵的 CSR 结构, 以及每个单元矩阵元素在 data 中的位置
+
+        @return indptr, indices, pos, 其中 pos 的形状为 (NC, ldof0, ldof1)
+        """
+        if self._pattern is None:
+            self._pattern = cell_sparsity_pattern(self.cell2dof0, self.gdof0,
+                    self.cell2dof1, self.gdof1)
+        return self._pattern
+
+    def tocsr(self, K):
+        """
+        @brief 把单元矩阵 K 组装成 CSR 格式的整体矩阵, 只需一次 bincount
+        """
+        indptr, indices, pos = self.sparsity_pattern()
+        data = np.bincount(pos.reshape(-1), weights=K.reshape(-1),
+                minlength=len(indices))
+        return csr_matrix((data, indices, indptr), shape=self.shape)
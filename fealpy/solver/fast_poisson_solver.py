@@ -0,0 +1,80 @@
+import numpy as np
+from scipy.fft import dstn, idstn, fftn, ifftn
+
+
+class FastPoissonSolver():
+    """
+    @brief 矩形区域上 `UniformMesh2d/3d` 的快速 Poisson 求解器
+
+    离散格式为 `mesh.laplace_stencil()` 给出的 2*GD+1 点差分格式
+        -\\Delta_h u = f,
+    对 Dirichlet 边界条件用 I 型离散正弦变换 (DST) 对角化, 对周期边界条件用 FFT
+    对角化, 每次求解的计算量为 O(N log N), 不需要构造任何矩阵.
+    """
+    def __init__(self, mesh, bc='dirichlet'):
+        """
+        @param[in] mesh `UniformMesh2d` 或者 `UniformMesh3d`
+        @param[in] bc 'dirichlet' 或者 'periodic'
+        """
+        self.mesh = mesh
+        self.bc = bc
+        self.L = mesh.laplace_stencil()
+        self.gshape = self.L.gshape
+
+        GD = len(self.gshape)
+        h = mesh.h
+        lam = 0
+        for k in range(GD):
+            n = self.gshape[k] - 1 # 第 k 个方向剖分的段数
+            if bc == 'dirichlet':
+                j = np.arange(1, n)
+                lk = 4/h[k]**2*np.sin(j*np.pi/(2*n))**2
+            elif bc == 'periodic':
+                j = np.arange(n)
+                lk = 4/h[k]**2*np.sin(j*np.pi/n)**2
+            else:
+                raise ValueError("the boundary condition `{}` is not supported!".format(bc))
+            s = [1]*GD
+            s[k] = -1
+            lam = lam + lk.reshape(s)
+
+        if bc == 'periodic':
+            lam.flat[0] = 1.0 # 零模态单独处理, 解取均值为零
+        self.lam = lam
+
+    def solve(self, f, uh=None):
+        """
+        @brief 求解 -\\Delta_h u = f
+
+        @param[in] f 网格节点上的右端项, 形状为 (nx+1, ny+1[, nz+1])
+        @param[in, out] uh 对 Dirichlet 问题, 调用前在边界节点上存放边界值,
+            求解后内部节点被原地更新. 默认为 None, 表示齐次边界条件
+
+        @return uh
+        """
+        if uh is None:
+            uh = np.zeros(self.gshape, dtype=self.L.dtype)
+
+        GD = len(self.gshape)
+        if self.bc == 'dirichlet':
+            interior = (slice(1, -1), )*GD
+            # 把已知的边界值移到右端
+            uh[interior] = 0
+            r = f[interior] - self.L.apply(uh)[interior]
+            r = dstn(r, type=1)
+            r /= self.lam
+            uh[interior] = idstn(r, type=1)
+        else:
+            unique = (slice(0, -1), )*GD
+            r = fftn(f[unique])
+            r /= self.lam
+            r.flat[0] = 0.0
+            uh[unique] = np.real(ifftn(r))
+            # 周期延拓到最后一层节点
+            for k in range(GD):
+                s0 = [slice(None)]*GD
+                s1 = [slice(None)]*GD
+                s0[k] = -1
+                s1[k] = 0
+                uh[tuple(s0)] = uh[tuple(s1)]
+        return uh
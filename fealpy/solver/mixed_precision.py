@@ -0,0 +1,135 @@
+import warnings
+
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
+from scipy.sparse.linalg import splu, LinearOperator
+
+
+class MixedPrecisionSolver():
+    """
+    @brief 混合精度的迭代加细求解器
+
+    大规模问题的瓶颈通常是内存带宽, 这里用 float32 存储矩阵的分解或者迭代中
+    的矩阵, 求出修正量的近似值, 而残量 r = b - A x 和解的更新在 float64 中
+    计算, 所以最终解的精度和 float64 的求解器相同:
+
+        x_{k+1} = x_k + inner(b - A x_k)
+
+    内层求解器:
+    * 'lu': float32 的 SuperLU 分解, 分解只做一次
+    * 'cg': float32 的 Jacobi 预条件共轭梯度法, 要求 A 对称正定, 内层只需
+      把残量降低 inner_tol 倍
+
+    内层为 'lu' 时它是固定的线性算子, 可以通过 `preconditioner` 作为 float64
+    Krylov 方法的预条件子.
+
+    Examples
+    --------
+    >> solver = MixedPrecisionSolver(A, inner='lu')
+    >> x = solver.solve(b)
+    >> solver.residuals # 每次迭代的相对残量
+    >> solver.info # 0 表示收敛, 否则为没有收敛时的迭代次数
+    """
+    def __init__(self, A, inner='lu', tol=1e-12, maxit=50, inner_tol=1e-3,
+            inner_maxit=1000, permc_spec='COLAMD'):
+        """
+        @param[in] A float64 的稀疏矩阵
+        @param[in] inner 内层求解器, 'lu' 或 'cg'
+        @param[in] tol 外层迭代的相对残量
+        @param[in] maxit 外层迭代的最大次数
+        @param[in] inner_tol 内层 CG 的相对残量
+        @param[in] inner_maxit 内层 CG 的最大迭代次数
+        @param[in] permc_spec SuperLU 使用的列排序方法
+        """
+        self.A = csr_matrix(A, dtype=np.float64)
+        self.A.sum_duplicates()
+        self.tol = tol
+        self.maxit = maxit
+        self.residuals = []
+        self.info = 0
+
+        if inner == 'lu':
+            self.lu = splu(csc_matrix(self.A, dtype=np.float32),
+                    permc_spec=permc_spec)
+            self.inner = self._lu_solve
+        elif inner == 'cg':
+            self.A32 = self.A.astype(np.float32)
+            d = self.A32.diagonal()
+            self.dinv = np.ones_like(d)
+            self.dinv[d != 0] = 1/d[d != 0]
+            self.inner_tol = inner_tol
+            self.inner_maxit = inner_maxit
+            self.inner = self._cg_solve
+        else:
+            raise ValueError("the inner solver `{}` is not supported!".format(inner))
+
+    def _lu_solve(self, r):
+        return self.lu.solve(r.astype(np.float32)).astype(np.float64)
+
+    def _cg_solve(self, r):
+        """
+        @brief float32 的 Jacobi 预条件 CG, 初值为零
+        """
+        A = self.A32
+        r = r.astype(np.float32)
+        x = np.zeros_like(r)
+        z = self.dinv*r
+        p = z.copy()
+        rz = np.dot(r, z)
+        r0 = np.linalg.norm(r)
+        for i in range(self.inner_maxit):
+            Ap = A@p
+            alpha = rz/np.dot(p, Ap)
+            x += alpha*p
+            r -= alpha*Ap
+            if np.linalg.norm(r) <= self.inner_tol*r0:
+                break
+            z = self.dinv*r
+            rz, rz0 = np.dot(r, z), rz
+            p *= rz/rz0
+            p += z
+        return x.astype(np.float64)
+
+    def solve(self, b, x0=None):
+        """
+        @brief 求解 A x = b, 残量在 float64 中计算
+
+        相对残量小于 tol, 或者一次迭代后残量下降不到一半时停止. 后一种情形
+        以及达到 maxit 时没有收敛, 和 scipy 的迭代法一样把 info 设为迭代次数,
+        并给出 RuntimeWarning.
+
+        @param[in] b 右端向量
+        @param[in] x0 初值, 默认为零
+        """
+        A = self.A
+        b = np.asarray(b, dtype=np.float64)
+        x = np.zeros_like(b) if x0 is None else np.array(x0, dtype=np.float64)
+        nb = np.linalg.norm(b)
+        self.info = 0
+        if nb == 0:
+            self.residuals = [0.0]
+            return np.zeros_like(b)
+
+        r = b - A@x
+        self.residuals = [np.linalg.norm(r)/nb]
+        for i in range(self.maxit):
+            if self.residuals[-1] <= self.tol:
+                break
+            x += self.inner(r)
+            r = b - A@x
+            self.residuals.append(np.linalg.norm(r)/nb)
+            if self.residuals[-1] > 0.5*self.residuals[-2]:
+                break # 残量不再明显下降, 已经到了 float64 能达到的精度
+        if self.residuals[-1] > self.tol:
+            self.info = len(self.residuals) - 1
+            warnings.warn("MixedPrecisionSolver did not converge: the relative "
+                    "residual {:.3e} is above tol={:.1e} after {} iterations".format(
+                        self.residuals[-1], self.tol, self.info), RuntimeWarning)
+        return x
+
+    def preconditioner(self):
+        """
+        @brief 把 float32 的内层求解器作为 `LinearOperator` 形式的预条件子
+        """
+        n = self.A.shape[0]
+        return LinearOperator((n, n), matvec=self.inner, dtype=np.float64)
@@ -1,4 +1,7 @@
 import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse import issparse, csc_matrix, identity
+from scipy.sparse.linalg import factorized
 
 
 class ODESolver():
@@ -10,6 +13,7 @@ class ODESolver():
         """
         while t < tf:
             self.step(x, t, dt)
+            t += dt
 
 
 class ForwardEulerSovler(ODESolver):
@@ -186,3 +190,376 @@ class RK4Solver(ODESolver):
         t += dt
 
 
+
+
+class AdaptiveODESolver(ODESolver):
+    """
+    @brief 带误差控制的变步长 ODE 求解器的基类
+
+    子类实现 `attempt(x, t, dt)`: 尝试从 t 走一步 dt, 把结果存到 self.xnew,
+    并返回加权的误差范数 err (err <= 1 时接受该步), 以及 `accept()`.
+    """
+    order = 1 # 误差估计的阶, 步长公式中的指数为 1/(order + 1)
+
+    def __init__(self, f, rtol=1e-6, atol=1e-8,
+            safety=0.9, facmin=0.2, facmax=5.0, maxreject=50):
+        self.f = f
+        self.rtol = rtol
+        self.atol = atol
+        self.safety = safety
+        self.facmin = facmin
+        self.facmax = facmax
+        self.maxreject = maxreject
+        self.stat = {'naccept': 0, 'nreject': 0, 'nfev': 0, 'njev': 0, 'nlu': 0}
+
+    def error_norm(self, e, x, xnew):
+        """
+        @brief 加权均方根误差范数
+        """
+        w = self.atol + self.rtol*np.maximum(np.abs(x), np.abs(xnew))
+        return np.sqrt(np.mean((e/w)**2))
+
+    def new_step_length(self, dt, err):
+        if err == 0:
+            fac = self.facmax
+        else:
+            fac = self.safety*err**(-1.0/(self.order + 1))
+        return dt*min(self.facmax, max(self.facmin, fac))
+
+    def accept(self, x, t, dt):
+        x[:] = self.xnew
+
+    def reset(self):
+        """
+        @brief 开始一次新的积分前清空跨步保存的状态
+        """
+        pass
+
+    def run(self, x, t, dt, tf, timeline=None):
+        """
+        @brief 从时刻 t 到 tf 自适应时间积分
+
+        @param[in, out] x 初值, 计算结束时为 tf 时刻的解
+        @param[in] dt 初始步长
+        @param[in] timeline `NonUniformTimeLine`, 记录被接受的时间步,
+            默认为 None, 表示新建一个
+
+        @return timeline
+        """
+        from ..timeintegratoralg import NonUniformTimeLine
+        if timeline is None:
+            timeline = NonUniformTimeLine(t, tf, dt=dt)
+        self.reset()
+        while not timeline.stop():
+            t = timeline.current_time_level()
+            dt = timeline.current_time_step_length()
+            for i in range(self.maxreject):
+                err = self.attempt(x, t, dt)
+                if err <= 1.0:
+                    break
+                self.stat['nreject'] += 1
+                dt = self.new_step_length(dt, err)
+            else:
+                raise RuntimeError("too many rejected steps at t = {}".format(t))
+            self.accept(x, t, dt)
+            self.stat['naccept'] += 1
+            timeline.advance(dt)
+            timeline.set_time_step_length(self.next_step_length(dt, err))
+        return timeline
+
+    def next_step_length(self, dt, err):
+        return self.new_step_length(dt, err)
+
+
+class EmbeddedRKSolver(AdaptiveODESolver):
+    """
+    @brief 嵌入式显式 Runge-Kutta 方法, 由 Butcher 表确定
+
+    高阶解用于推进, 高低阶解之差用于误差估计. 若最后一级与下一步的第一级相同
+    (First Same As Last, FSAL), 则被接受的步可以少算一次右端项.
+    """
+    A = None
+    b = None
+    bhat = None
+    c = None
+    fsal = False
+
+    def __init__(self, f, **kwargs):
+        super().__init__(f, **kwargs)
+        s = len(self.c)
+        self.k = np.zeros((s, f.shape[0]), dtype=f.dtype)
+        self.y = np.zeros(f.shape[0], dtype=f.dtype)
+        self.xnew = np.zeros(f.shape[0], dtype=f.dtype)
+        self.e = np.zeros(f.shape[0], dtype=f.dtype)
+        self.isFirstStageValid = False
+
+    def attempt(self, x, t, dt):
+        f = self.f
+        k = self.k
+        y = self.y
+        A = self.A
+        if not self.isFirstStageValid:
+            f.set_time(t)
+            f.mv(x, k[0])
+            self.stat['nfev'] += 1
+            self.isFirstStageValid = True
+
+        for i in range(1, len(self.c)):
+            y[:] = x + dt*(A[i][:i]@k[:i])
+            f.set_time(t + self.c[i]*dt)
+            f.mv(y, k[i])
+            self.stat['nfev'] += 1
+
+        self.xnew[:] = x + dt*(self.b@k)
+        self.e[:] = dt*((self.b - self.bhat)@k)
+        return self.error_norm(self.e, x, self.xnew)
+
+    def reset(self):
+        self.isFirstStageValid = False
+
+    def accept(self, x, t, dt):
+        x[:] = self.xnew
+        if self.fsal:
+            self.k[0] = self.k[-1]
+        else:
+            self.isFirstStageValid = False
+
+
+class DormandPrinceSolver(EmbeddedRKSolver):
+    """
+    @brief Dormand-Prince 5(4) 方法, 七级, FSAL
+    """
+    order = 4
+    fsal = True
+    c = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+    A = [np.array([]),
+         np.array([1/5]),
+         np.array([3/40, 9/40]),
+         np.array([44/45, -56/15, 32/9]),
+         np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+         np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]),
+         np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])]
+    b = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+    bhat = np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200,
+        187/2100, 1/40])
+
+
+class BogackiShampineSolver(EmbeddedRKSolver):
+    """
+    @brief Bogacki-Shampine 3(2) 方法, 四级, FSAL
+    """
+    order = 2
+    fsal = True
+    c = np.array([0, 1/2, 3/4, 1])
+    A = [np.array([]),
+         np.array([1/2]),
+         np.array([0, 3/4]),
+         np.array([2/9, 1/3, 4/9])]
+    b = np.array([2/9, 1/3, 4/9, 0])
+    bhat = np.array([7/24, 1/4, 1/3, 1/8])
+
+
+def _factorize(A):
+    """
+    @brief 对稀疏或稠密矩阵做 LU 分解, 返回求解函数
+    """
+    if issparse(A):
+        return factorized(csc_matrix(A))
+    else:
+        lu = lu_factor(A)
+        return lambda b: lu_solve(lu, b)
+
+
+class LinearlyImplicitSolver(AdaptiveODESolver):
+    """
+    @brief 需要 Jacobi 矩阵的变步长隐式求解器的基类, 求解
+        M x' = f(x, t)
+
+    其中 f 除了 `set_time` 和 `mv` 外还要提供 `jacobian(x)`. Jacobi 矩阵在
+    多个时间步之间重复使用, 只在步被拒绝、Newton 迭代收敛慢或者使用次数超过
+    `maxage` 时才重新计算; 步长的相对变化在 [1, hysteresis] 内时保持步长不变,
+    从而可以继续使用已有的 LU 分解.
+    """
+    def __init__(self, f, M=None, maxage=20, hysteresis=1.2, **kwargs):
+        super().__init__(f, **kwargs)
+        n = f.shape[0]
+        self.M = identity(n, dtype=f.dtype, format='csr') if M is None else M
+        self.maxage = maxage
+        self.hysteresis = hysteresis
+        self.J = None
+        self.age = 0
+        self.lu = None
+        self.luKey = None # 当前 LU 分解对应的 (J 的编号, 系数)
+        self.jid = 0
+        self.xnew = np.zeros(n, dtype=f.dtype)
+        self.fx = np.zeros(n, dtype=f.dtype)
+
+    def update_jacobian(self, x, t):
+        self.f.set_time(t)
+        self.J = self.f.jacobian(x)
+        self.stat['njev'] += 1
+        self.age = 0
+        self.jid += 1
+
+    def solver(self, a):
+        """
+        @brief 返回 (M - a*J) 的 LU 分解, 系数 a 和 Jacobi 矩阵都不变时重复使用
+        """
+        key = (self.jid, a)
+        if self.luKey != key:
+            self.lu = _factorize(self.M - a*self.J)
+            self.luKey = key
+            self.stat['nlu'] += 1
+        return self.lu
+
+    def next_step_length(self, dt, err):
+        dtnew = self.new_step_length(dt, err)
+        if 1.0 <= dtnew/dt <= self.hysteresis:
+            return dt
+        return dtnew
+
+
+class RosenbrockSolver(LinearlyImplicitSolver):
+    """
+    @brief 二阶 L 稳定的 Rosenbrock (ROS2) 方法, 嵌入一阶的线性隐式 Euler 方法
+    做误差估计
+
+        (M - gamma*dt*J) k1 = f(x, t)
+        (M - gamma*dt*J) k2 = f(x + dt*k1, t + dt) - 2*M*k1
+        x_{n+1} = x + 3/2*dt*k1 + 1/2*dt*k2,  gamma = 1 + 1/sqrt(2)
+
+    它是 W 方法, J 不是精确的 Jacobi 矩阵时仍然是二阶的, 所以可以放心地
+    在多个时间步中重复使用 J 和 LU 分解.
+    """
+    order = 1
+    gamma = 1 + 1/np.sqrt(2)
+
+    def __init__(self, f, M=None, **kwargs):
+        super().__init__(f, M=M, **kwargs)
+        n = f.shape[0]
+        self.k1 = np.zeros(n, dtype=f.dtype)
+        self.k2 = np.zeros(n, dtype=f.dtype)
+        self.rejected = False
+
+    def attempt(self, x, t, dt):
+        f = self.f
+        if (self.J is None) or (self.rejected and self.age > 0) or (self.age >= self.maxage):
+            self.update_jacobian(x, t)
+        solve = self.solver(self.gamma*dt)
+
+        f.set_time(t)
+        f.mv(x, self.fx)
+        self.k1[:] = solve(self.fx)
+
+        f.set_time(t + dt)
+        f.mv(x + dt*self.k1, self.fx)
+        self.k2[:] = solve(self.fx - 2*(self.M@self.k1))
+        self.stat['nfev'] += 2
+
+        self.xnew[:] = x + 1.5*dt*self.k1 + 0.5*dt*self.k2
+        err = self.error_norm(0.5*dt*(self.k1 + self.k2), x, self.xnew)
+        self.rejected = err > 1.0
+        return err
+
+    def accept(self, x, t, dt):
+        x[:] = self.xnew
+        self.age += 1
+
+
+class BDFSolver(LinearlyImplicitSolver):
+    """
+    @brief 变步长的二阶向后差分 (BDF2) 方法, 第一步用向后 Euler 方法
+
+    记 w = dt_n/dt_{n-1}, 格式为
+        (1+2w)/(1+w) M x_{n+1} - (1+w) M x_n + w^2/(1+w) M x_{n-1} = dt_n f(x_{n+1}, t_{n+1})
+    非线性方程用简化 Newton 迭代求解 (Jacobi 矩阵跨步重复使用), 局部截断误差
+    用经过前三个时间层的二次外插预测值来估计.
+    """
+    order = 2
+
+    def __init__(self, f, M=None, maxnewton=4, newtontol=1e-2, **kwargs):
+        super().__init__(f, M=M, **kwargs)
+        self.maxnewton = maxnewton
+        self.newtontol = newtontol
+        self.history = [] # 最近的 (t, x)
+        self.xp = np.zeros(f.shape[0], dtype=f.dtype)
+
+    def predictor(self, x, t, dt):
+        """
+        @brief 返回预测值和误差估计的系数 C/(C + Cp)
+        """
+        if len(self.history) < 3:
+            # 显式 Euler 预测, 向后 Euler 的误差约为 (x - p)/2
+            self.f.set_time(t)
+            self.f.mv(x, self.fx)
+            self.stat['nfev'] += 1
+            self.xp[:] = x + dt*self.fx
+            return 0.5
+        (t0, x0), (t1, x1), (t2, x2) = self.history[-3:]
+        t3 = t2 + dt
+        l0 = (t3 - t1)*(t3 - t2)/((t0 - t1)*(t0 - t2))
+        l1 = (t3 - t0)*(t3 - t2)/((t1 - t0)*(t1 - t2))
+        l2 = (t3 - t0)*(t3 - t1)/((t2 - t0)*(t2 - t1))
+        self.xp[:] = l0*x0 + l1*x1 + l2*x2
+        h0 = t1 - t0
+        h1 = t2 - t1
+        C = dt**2*(dt + h1)**2/(6*(2*dt + h1))
+        Cp = dt*(dt + h1)*(dt + h1 + h0)/6
+        return C/(C + Cp)
+
+    def attempt(self, x, t, dt):
+        f = self.f
+        M = self.M
+        if len(self.history) == 0:
+            self.history.append((t, x.copy()))
+
+        fac = self.predictor(x, t, dt)
+        if len(self.history) < 3:
+            alpha = 1.0
+            beta = -(M@x)
+        else:
+            t1, x1 = self.history[-2]
+            w = dt/(t - t1)
+            alpha = (1 + 2*w)/(1 + w)
+            beta = M@(-(1 + w)*x + w**2/(1 + w)*x1)
+
+        if (self.J is None) or (self.age >= self.maxage):
+            self.update_jacobian(x, t)
+
+        xnew = self.xnew
+        converged = False
+        for trial in range(2):
+            xnew[:] = self.xp
+            solve = self.solver(dt/alpha)
+            f.set_time(t + dt)
+            for i in range(self.maxnewton):
+                f.mv(xnew, self.fx)
+                self.stat['nfev'] += 1
+                r = (alpha*(M@xnew) + beta - dt*self.fx)/alpha
+                dx = solve(-r)
+                xnew += dx
+                w = self.atol + self.rtol*np.abs(xnew)
+                if np.sqrt(np.mean((dx/w)**2)) < self.newtontol:
+                    converged = True
+                    break
+            if converged or self.age == 0:
+                break
+            self.update_jacobian(x, t) # Jacobi 矩阵过旧, 更新后再试一次
+
+        if not converged:
+            return np.inf
+        return self.error_norm(fac*(xnew - self.xp), x, xnew)
+
+    def reset(self):
+        self.history = []
+
+    def accept(self, x, t, dt):
+        x[:] = self.xnew
+        self.history.append((t + dt, x.copy()))
+        del self.history[:-3]
+        self.age += 1
+
+    def new_step_length(self, dt, err):
+        if not np.isfinite(err):
+            return dt*self.facmin
+        return super().new_step_length(dt, err)
@@ -0,0 +1,176 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.sparse import csr_matrix, csc_matrix
+from scipy.sparse.linalg import splu, LinearOperator
+
+
+class SchwarzPreconditioner():
+    """
+    @brief 基于单元剖分的重叠型加性 Schwarz 预条件子
+
+    每个子区域由剖分中的一块单元向外扩展 overlap 层 (通过公共自由度相邻的)
+    单元得到, 它的自由度集合记为 D_k, 局部矩阵 A_k = A[D_k, D_k] 只分解
+    一次. 预条件子为
+
+        M^{-1} r = \\sum_k R_k^T A_k^{-1} R_k r + P (P^T A P)^{-1} P^T r,
+
+    其中第二项是可选的粗空间校正. restricted=True 时是限制型加性 Schwarz
+    (RAS), 延拓时每个自由度只取它所属的子区域的局部解, 通常收敛更快, 但
+    预条件子不再对称, 需要配合 GMRES 使用; 否则预条件子对称正定, 可用于 CG.
+
+    各子区域的分解和求解交给线程池, SuperLU 在分解和回代时释放 GIL.
+
+    向量型问题 (如线弹性) 的自由度按分量排列, 第 j 个分量的第 i 个自由度
+    的编号为 j*gdof + i, 用 dim 指定分量个数.
+
+    Examples
+    --------
+    >> _, parts = part_mesh(mesh, nparts=8)
+    >> P = SchwarzPreconditioner(A, space.cell_to_dof(), parts, dim=3,
+    ..         coarse='rigid', points=space.interpolation_points())
+    >> x, info = cg(A, b, M=P.preconditioner())
+    """
+    def __init__(self, A, cell2dof, parts, overlap=1, dim=None,
+            restricted=False, coarse=None, points=None, nthreads=None):
+        """
+        @param[in] A 整体矩阵, 已经处理过 D 氏边界条件
+        @param[in] cell2dof 单元到标量自由度的映射
+        @param[in] parts 每个单元所属的子区域编号, 如 `part_mesh` 的返回值
+        @param[in] overlap 重叠的单元层数
+        @param[in] dim 向量型问题的分量个数, 默认为标量问题
+        @param[in] restricted 是否使用限制型加性 Schwarz
+        @param[in] coarse 粗空间, None, 'nicolaides' (每个子区域上每个分量
+                   取常数), 'rigid' (每个子区域上的刚体运动, 需要 points)
+                   或者延拓矩阵 P, 形状为 (A.shape[0], NCoarse)
+        @param[in] points 标量自由度的坐标, coarse 为 'rigid' 时使用
+        @param[in] nthreads 线程个数, 默认为 1
+        """
+        self.A = csr_matrix(A)
+        self.restricted = restricted
+        self.nthreads = 1 if nthreads is None else nthreads
+
+        NC = len(cell2dof)
+        gdof = self.A.shape[0] if dim is None else self.A.shape[0]//dim
+        nparts = parts.max() + 1
+
+        # 单元和自由度的关联矩阵
+        ldof = cell2dof.shape[1]
+        C = csr_matrix((np.ones(NC*ldof, dtype=np.bool_),
+            (np.repeat(np.arange(NC), ldof), cell2dof.flat)), shape=(NC, gdof))
+        CT = C.T.tocsr()
+
+        # 每个自由度属于包含它的单元所在子区域中编号最小的那个
+        owner = np.full(gdof, nparts, dtype=np.int_)
+        np.minimum.at(owner, cell2dof, parts[:, None])
+
+        offset = 0 if dim is None else gdof*np.arange(dim)[:, None]
+        self.index = []
+        self.owned = []
+        for k in range(nparts):
+            isCell = (parts == k)
+            isDof = CT@isCell
+            for i in range(overlap):
+                isCell = C@isDof
+                isDof = CT@isCell
+            idx, = np.nonzero(isDof)
+            isOwned = (owner[idx] == k)
+            if dim is not None:
+                idx = (idx + offset).flat[:]
+                isOwned = np.tile(isOwned, dim)
+            self.index.append(idx)
+            self.owned.append(isOwned)
+
+        def factorize(idx):
+            return splu(csc_matrix(self.A[idx][:, idx]))
+
+        self.lu = self._map(factorize, self.index)
+
+        if coarse is None:
+            self.P = None
+        else:
+            if coarse == 'nicolaides':
+                coarse = self.nicolaides_space(owner, nparts, dim)
+            elif coarse == 'rigid':
+                coarse = self.rigid_body_space(points, owner, nparts)
+            elif isinstance(coarse, str):
+                raise ValueError("the coarse space `{}` is not supported!".format(coarse))
+            self.P = csr_matrix(coarse)
+            self.coarse_lu = splu(csc_matrix(self.P.T@self.A@self.P))
+
+    @staticmethod
+    def nicolaides_space(owner, nparts, dim=None):
+        """
+        @brief Nicolaides 粗空间, 每个子区域上每个分量为常数的函数
+        """
+        gdof = len(owner)
+        if dim is None:
+            return csr_matrix((np.ones(gdof), (np.arange(gdof), owner)),
+                    shape=(gdof, nparts))
+        I = np.arange(dim*gdof)
+        J = (np.arange(dim)[:, None]*nparts + owner).flat
+        return csr_matrix((np.ones(dim*gdof), (I, J)), shape=(dim*gdof, dim*nparts))
+
+    @staticmethod
+    def rigid_body_space(points, owner, nparts):
+        """
+        @brief 线弹性问题的粗空间, 每个子区域上的刚体运动 (平移和转动)
+
+        @param[in] points 标量自由度的坐标, 如 `space.interpolation_points()`
+        @param[in] owner 每个标量自由度所属的子区域
+        """
+        gdof, GD = points.shape
+        x = points - points.mean(axis=0) # 避免转动模式中出现大的平移分量
+        # 每个刚体运动模式在各个分量上的值, 形状 (nm, GD, gdof)
+        if GD == 2:
+            modes = [[1, 0], [0, 1], [-x[:, 1], x[:, 0]]]
+        else:
+            zero = np.zeros(gdof)
+            modes = [[1, 0, 0], [0, 1, 0], [0, 0, 1],
+                    [-x[:, 1], x[:, 0], zero],
+                    [zero, -x[:, 2], x[:, 1]],
+                    [x[:, 2], zero, -x[:, 0]]]
+        nm = len(modes)
+        V = np.array([[np.broadcast_to(v, gdof) for v in m] for m in modes])
+
+        I = np.broadcast_to(np.arange(GD*gdof).reshape(GD, gdof), V.shape)
+        J = np.broadcast_to(owner*nm, V.shape) + np.arange(nm)[:, None, None]
+        P = csr_matrix((V.flat, (I.flat, J.flat)), shape=(GD*gdof, nm*nparts))
+        P.eliminate_zeros()
+        return P
+
+    def _map(self, f, args):
+        if self.nthreads == 1:
+            return list(map(f, args))
+        with ThreadPoolExecutor(max_workers=self.nthreads) as executor:
+            return list(executor.map(f, args))
+
+    def number_of_subdomains(self):
+        return len(self.index)
+
+    def solve(self, r):
+        """
+        @brief 作用预条件子 z = M^{-1} r
+        """
+        def local_solve(k):
+            return self.lu[k].solve(r[self.index[k]])
+
+        ys = self._map(local_solve, range(len(self.index)))
+
+        z = np.zeros_like(r)
+        for idx, isOwned, y in zip(self.index, self.owned, ys):
+            if self.restricted:
+                z[idx[isOwned]] += y[isOwned]
+            else:
+                z[idx] += y
+
+        if self.P is not None:
+            z += self.P@self.coarse_lu.solve(self.P.T@r)
+        return z
+
+    def preconditioner(self):
+        """
+        @brief 以 `LinearOperator` 的形式返回预条件子, 用于 cg 或 gmres
+        """
+        n = self.A.shape[0]
+        return LinearOperator((n, n), matvec=self.solve, dtype=self.A.dtype)
@@ -5,6 +5,8 @@ from scipy.sparse.linalg import spsolve
 from scipy.sparse import spdiags
 from timeit import default_timer as timer
 
+from .direct_solver import DirectSolver
+
 try:
     import pyamg
 except ImportError:
@@ -110,6 +112,11 @@ def solve(dmodel, uh, dirichlet=None, solver='direct'):
         start = timer()
         uh[:] = spsolve(AD, b)
         end = timer()
+    elif isinstance(solver, DirectSolver):
+        # 多次调用时复用分析和分解
+        start = timer()
+        uh[:] = solver.solve(AD, b)
+        end = timer()
     else:
         raise ValueError("We don't support solver `{}`! ".format(solver))
 
@@ -0,0 +1,365 @@
+import os
+import glob
+import queue
+import threading
+import traceback
+import multiprocessing
+
+import numpy as np
+
+
+def _as_dict(data):
+    """
+    @brief 把待求解的数据统一表示成名字到数组的字典 (数组与 data 共享内存)
+    """
+    if isinstance(data, np.ndarray):
+        return {'data': data}
+    elif isinstance(data, dict):
+        return data
+    elif isinstance(data, (list, tuple)):
+        return {'data_{}'.format(i): d for i, d in enumerate(data)}
+    else:
+        raise ValueError("the type `{}` of data is not supported!".format(type(data)))
+
+
+def _form(data):
+    if isinstance(data, np.ndarray):
+        return 'array'
+    elif isinstance(data, dict):
+        return 'dict'
+    else:
+        return 'list'
+
+
+def _as_data(arrays, form):
+    """
+    @brief 把字典形式的快照还原成和原始数据一样的组织形式
+    """
+    if form == 'array':
+        return arrays['data']
+    elif form == 'dict':
+        return arrays
+    else:
+        return [arrays['data_{}'.format(i)] for i in range(len(arrays))]
+
+
+def write_checkpoint(path, step, arrays, state, mesh=None, keep=3):
+    """
+    @brief 原子地写入一个重启文件, 并只保留最新的 keep 个
+
+    @param[in] path 重启文件所在的目录
+    @param[in] step 当前时间层的编号
+    @param[in] arrays 名字到数组的字典
+    @param[in] state 时间层的状态, 见 `UniformTimeLine.state`
+    @param[in] mesh 名字到数组的字典, 如网格的节点和单元
+    """
+    fname = os.path.join(path, 'checkpoint_{}.npz'.format(str(step).zfill(10)))
+    tmp = fname + '.tmp'
+    content = {'solution/' + k: v for k, v in arrays.items()}
+    content.update({'timeline/' + k: np.asarray(v) for k, v in state.items()})
+    if mesh is not None:
+        content.update({'mesh/' + k: v for k, v in mesh.items()})
+    with open(tmp, 'wb') as f:
+        np.savez(f, **content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, fname)
+
+    if keep is not None:
+        for old in list_checkpoints(path)[:-keep]:
+            os.remove(old)
+    return fname
+
+
+def list_checkpoints(path):
+    """
+    @brief 按时间层顺序列出目录中所有完整的重启文件
+    """
+    return sorted(glob.glob(os.path.join(path, 'checkpoint_*.npz')))
+
+
+def read_checkpoint(fname):
+    """
+    @brief 读入重启文件
+
+    @return arrays, state, mesh 三个字典
+    """
+    arrays = {}
+    state = {}
+    mesh = {}
+    with np.load(fname) as f:
+        for key in f.files:
+            group, name = key.split('/', 1)
+            if group == 'solution':
+                arrays[name] = f[key]
+            elif group == 'timeline':
+                state[name] = f[key][()]
+            else:
+                mesh[name] = f[key]
+    return arrays, state, mesh
+
+
+def _shared_memory():
+    """
+    @brief 导入 multiprocessing.shared_memory, 它在 Python 3.8 中才加入
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise RuntimeError("worker='process' needs Python 3.8 or newer "
+                "(multiprocessing.shared_memory), use worker='thread' instead!")
+    return shared_memory
+
+
+def _do_task(task, arrays, form, output, path, keep):
+    kind, tag, state, mesh = task
+    if kind == 'output':
+        output(_as_data(arrays, form), tag)
+    else:
+        write_checkpoint(path, state['current'], arrays, state, mesh=mesh, keep=keep)
+
+
+def _process_worker(tasks, free, errors, layout, form, output, path, keep):
+    """
+    @brief 后台进程: 从共享内存中的快照读数据, 做输出或写重启文件
+    """
+    shared_memory = _shared_memory()
+    shms = []
+    slots = []
+    for slot in layout:
+        arrays = {}
+        for key, (name, shape, dtype) in slot.items():
+            shm = shared_memory.SharedMemory(name=name)
+            shms.append(shm)
+            arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        slots.append(arrays)
+
+    while True:
+        item = tasks.get()
+        if item is None:
+            break
+        i, task = item
+        try:
+            _do_task(task, slots[i], form, output, path, keep)
+        except Exception:
+            errors.put(traceback.format_exc())
+        finally:
+            free.put(i)
+
+    del slots
+    for shm in shms:
+        shm.close()
+
+
+class TimeIntegrationDriver():
+    """
+    @brief 带异步输出和重启功能的时间积分驱动
+
+    每一步调用 `dmodel.solve(data, timeline)` 求解下一个时间层 (和
+    `UniformTimeLine.time_integration` 的约定相同). 需要输出或写重启文件时,
+    把当前的解复制到一个快照缓冲区中, 交给后台的线程或进程处理, 主进程立即
+    开始下一步的计算. 快照缓冲区的个数是有限的, 后台处理不过来时主进程等待.
+    快照缓冲区会被重复使用, 所以 output 不能保留对传入数组的引用.
+
+    后台进程模式下快照放在 `multiprocessing.shared_memory` 中, 此时 output
+    必须是可以 pickle 的函数.
+
+    Examples
+    --------
+    >> driver = TimeIntegrationDriver(timeline, dmodel, output=writer,
+    ..         path='restart', interval=100, keep=3)
+    >> driver.run(uh, resume=True)
+    """
+    def __init__(self, timeline, dmodel, output=None, output_interval=1,
+            path=None, interval=10, keep=3, mesh=None,
+            worker='thread', nbuffer=2):
+        """
+        @param[in] timeline 时间层对象, 需要提供 `state` 和 `set_state`
+        @param[in] dmodel 离散模型, 提供 `solve(data, timeline)`
+        @param[in] output 输出函数 `output(data, nameflag)`, 在后台执行
+        @param[in] output_interval 每隔多少个时间层输出一次
+        @param[in] path 重启文件目录, 为 None 时不写重启文件
+        @param[in] interval 每隔多少个时间层写一次重启文件
+        @param[in] keep 保留最新的重启文件个数
+        @param[in] mesh 网格, 其节点和单元一起写入重启文件
+        @param[in] worker 'thread' 或者 'process'
+        @param[in] nbuffer 快照缓冲区个数
+        """
+        self.timeline = timeline
+        self.dmodel = dmodel
+        self.output = output
+        self.output_interval = output_interval
+        self.path = path
+        self.interval = interval
+        self.keep = keep
+        self.mesh = mesh
+        self.worker = worker
+        self.nbuffer = nbuffer
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def mesh_arrays(self):
+        if self.mesh is None:
+            return None
+        return {'node': np.array(self.mesh.entity('node')),
+                'cell': np.array(self.mesh.entity('cell'))}
+
+    def latest_checkpoint(self):
+        if self.path is None:
+            return None
+        fnames = list_checkpoints(self.path)
+        return fnames[-1] if len(fnames) > 0 else None
+
+    def restore(self, data, fname=None):
+        """
+        @brief 从重启文件中原地恢复解, 时间层状态和网格节点
+
+        @return 恢复的时间层编号, 没有重启文件时返回 None
+        """
+        fname = self.latest_checkpoint() if fname is None else fname
+        if fname is None:
+            return None
+        arrays, state, mesh = read_checkpoint(fname)
+        for key, val in _as_dict(data).items():
+            np.copyto(val, arrays[key])
+        self.timeline.set_state(state)
+        if (self.mesh is not None) and ('node' in mesh):
+            node = self.mesh.entity('node')
+            if node.shape == mesh['node'].shape:
+                node[:] = mesh['node']
+        return self.timeline.current
+
+    def run(self, data, resume=False):
+        """
+        @brief 执行时间积分
+
+        @param[in, out] data 待求解的量, 数组, 数组的列表或者字典
+        @param[in] resume 为 True 时从最新的重启文件继续计算
+
+        @return info 字典, 包含开始的时间层 `start`, 计算的步数 `nstep`,
+            输出次数 `noutput` 和重启文件个数 `ncheckpoint`
+        """
+        timeline = self.timeline
+        timeline.reset()
+        start = None
+        if resume:
+            start = self.restore(data)
+        if start is None:
+            start = timeline.current
+
+        arrays = _as_dict(data)
+        pool = _SnapshotPool(arrays, _form(data), self.nbuffer, self.worker,
+                self.output, self.path, self.keep)
+        info = {'start': start, 'nstep': 0, 'noutput': 0, 'ncheckpoint': 0}
+        try:
+            if (self.output is not None) and (not resume or start == 0):
+                pool.submit(('output', str(timeline.current).zfill(10), None, None))
+                info['noutput'] += 1
+
+            while not timeline.stop():
+                self.dmodel.solve(data, timeline)
+                timeline.current += 1
+                info['nstep'] += 1
+                step = timeline.current
+                if (self.output is not None) and (step % self.output_interval == 0):
+                    pool.submit(('output', str(step).zfill(10), None, None))
+                    info['noutput'] += 1
+                if (self.path is not None) and \
+                        (step % self.interval == 0 or timeline.stop()):
+                    pool.submit(('checkpoint', None, timeline.state(), self.mesh_arrays()))
+                    info['ncheckpoint'] += 1
+        except BaseException:
+            # 求解出错时不让后台的错误覆盖原来的异常
+            pool.close(quiet=True)
+            raise
+        pool.close()
+        timeline.reset()
+        return info
+
+
+class _SnapshotPool():
+    """
+    @brief 有限个快照缓冲区和一个后台工作线程 (或进程)
+    """
+    def __init__(self, arrays, form, nbuffer, worker, output, path, keep):
+        self.arrays = arrays
+        self.form = form
+        self.worker = worker
+        self.errors = []
+
+        if worker == 'thread':
+            self.slots = [{k: np.empty_like(v) for k, v in arrays.items()}
+                    for i in range(nbuffer)]
+            self.tasks = queue.Queue()
+            self.free = queue.Queue()
+            self.thread = threading.Thread(target=self._thread_worker,
+                    args=(output, path, keep), daemon=True)
+            self.thread.start()
+        elif worker == 'process':
+            shared_memory = _shared_memory()
+            ctx = multiprocessing.get_context()
+            self.shms = []
+            self.slots = []
+            layout = []
+            for i in range(nbuffer):
+                slot = {}
+                desc = {}
+                for k, v in arrays.items():
+                    shm = shared_memory.SharedMemory(create=True, size=max(v.nbytes, 1))
+                    self.shms.append(shm)
+                    slot[k] = np.ndarray(v.shape, dtype=v.dtype, buffer=shm.buf)
+                    desc[k] = (shm.name, v.shape, v.dtype.str)
+                self.slots.append(slot)
+                layout.append(desc)
+            self.tasks = ctx.Queue()
+            self.free = ctx.Queue()
+            self.error_queue = ctx.Queue()
+            self.process = ctx.Process(target=_process_worker,
+                    args=(self.tasks, self.free, self.error_queue, layout,
+                        form, output, path, keep), daemon=True)
+            self.process.start()
+        else:
+            raise ValueError("the worker `{}` is not supported!".format(worker))
+
+        for i in range(nbuffer):
+            self.free.put(i)
+
+    def _thread_worker(self, output, path, keep):
+        while True:
+            item = self.tasks.get()
+            if item is None:
+                break
+            i, task = item
+            try:
+                _do_task(task, self.slots[i], self.form, output, path, keep)
+            except Exception:
+                self.errors.append(traceback.format_exc())
+            finally:
+                self.free.put(i)
+
+    def submit(self, task):
+        i = self.free.get() # 没有空闲的缓冲区时等待
+        for k, v in self.arrays.items():
+            np.copyto(self.slots[i][k], v)
+        self.tasks.put((i, task))
+
+    def close(self, quiet=False):
+        """
+        @brief 等待后台任务完成并释放缓冲区
+
+        @param[in] quiet 为 True 时不报告后台任务中的错误
+        """
+        self.tasks.put(None)
+        if self.worker == 'thread':
+            self.thread.join()
+        else:
+            self.process.join()
+            while not self.error_queue.empty():
+                self.errors.append(self.error_queue.get())
+            self.slots = None
+            for shm in self.shms:
+                shm.close()
+                shm.unlink()
+        if (not quiet) and (len(self.errors) > 0):
+            raise RuntimeError("the background worker failed:\n" + self.errors[0])
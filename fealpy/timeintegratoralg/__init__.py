@@ -1,3 +1,5 @@
 
 from .timeline import UniformTimeLine
+from .timeline import NonUniformTimeLine
 from .timeline import ChebyshevTimeLine
+from .TimeIntegrationDriver import TimeIntegrationDriver
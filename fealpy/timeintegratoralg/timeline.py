@@ -76,6 +76,29 @@ class UniformTimeLine():
         elif order == 'backward':
             self.current = self.NL - 1
 
+    def state(self):
+        """
+
+        Notes
+        -----
+        返回时间层的状态, 用于写入重启 (checkpoint) 文件
+        """
+        return {'T0': self.T0, 'T1': self.T1, 'NL': self.NL, 'dt': self.dt,
+                'current': self.current}
+
+    def set_state(self, state):
+        """
+
+        Notes
+        -----
+        从重启文件中恢复时间层的状态
+        """
+        self.T0 = float(state['T0'])
+        self.T1 = float(state['T1'])
+        self.NL = int(state['NL'])
+        self.dt = float(state['dt'])
+        self.current = int(state['current'])
+
     def time_integration(self, data, dmodel, queue=None):
 
         options = self.options
@@ -98,6 +121,102 @@ class UniformTimeLine():
             dmodel.output(data, '', queue, status='stop')
         timeline.reset()
 
+class NonUniformTimeLine():
+    def __init__(self, T0, T1, dt=None, options={'Output':False}):
+        """
+        Parameter
+        ---------
+        T0: the initial time
+        T1: the end time
+        dt: the initial (proposed) time step length
+
+        Notes
+        -----
+        步长可变的时间层, 只记录被接受的时间层, 供自适应时间积分使用
+        """
+        self.T0 = T0
+        self.T1 = T1
+        self.dt = (T1 - T0)/100 if dt is None else dt
+        self.time = [T0]
+        self.current = int(0)
+        self.options = options
+
+    def number_of_time_levels(self):
+        return len(self.time)
+
+    def all_time_levels(self):
+        return np.array(self.time)
+
+    def all_time_step_lengths(self):
+        return np.diff(self.time)
+
+    def current_time_level_index(self):
+        return self.current
+
+    def current_time_level(self):
+        return self.time[self.current]
+
+    def next_time_level(self):
+        return self.current_time_level() + self.current_time_step_length()
+
+    def prev_time_level(self):
+        return self.time[self.current - 1]
+
+    def current_time_step_length(self):
+        """
+
+        Notes
+        -----
+        返回下一步的步长, 最后一步截断到 T1
+        """
+        return min(self.dt, self.T1 - self.current_time_level())
+
+    def set_time_step_length(self, dt):
+        self.dt = dt
+
+    def stop(self, order='forward'):
+        if order == 'forward':
+            eps = 1e-12*max(abs(self.T1), abs(self.T1 - self.T0))
+            return self.current_time_level() >= self.T1 - eps
+        elif order == 'backward':
+            return self.current <= 0
+
+    def advance(self, dt=None):
+        """
+
+        Notes
+        -----
+        接受一个长度为 dt 的时间步, 默认为当前步长
+        """
+        dt = self.current_time_step_length() if dt is None else dt
+        t = self.current_time_level() + dt
+        del self.time[self.current+1:]
+        self.time.append(t)
+        self.current += 1
+
+    def forward(self):
+        self.current += 1
+
+    def backward(self):
+        self.current -= 1
+
+    def reset(self, order='forward'):
+        if order == 'forward':
+            self.current = 0
+        elif order == 'backward':
+            self.current = len(self.time) - 1
+
+    def state(self):
+        return {'T0': self.T0, 'T1': self.T1, 'dt': self.dt,
+                'time': np.array(self.time), 'current': self.current}
+
+    def set_state(self, state):
+        self.T0 = float(state['T0'])
+        self.T1 = float(state['T1'])
+        self.dt = float(state['dt'])
+        self.time = list(np.asarray(state['time']))
+        self.current = int(state['current'])
+
 class ChebyshevTimeLine():
     def __init__(self, T0, T1, NT, options={'Output':False}):
         """
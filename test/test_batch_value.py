@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+
+
+@pytest.mark.parametrize("meshtype, p", [('tri', 1), ('tri', 3), ('tet', 2)])
+def test_batch_value(meshtype, p):
+    if meshtype == 'tri':
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=3, ny=3, meshtype='tri')
+    else:
+        mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=2, ny=2, nz=2, meshtype='tet')
+    GD = mesh.geo_dimension()
+    space = LagrangeFiniteElementSpace(mesh, p=p)
+    fs = [space.function(), space.function(dim=GD), space.function()]
+    for f in fs:
+        f[:] = np.random.rand(*f.shape)
+    bcs, ws = space.integrator.get_quadrature_points_and_weights()
+
+    vals = space.batch_value(fs, bcs)
+    grads = space.batch_grad_value(fs, bcs)
+    for f, v, g in zip(fs, vals, grads):
+        assert np.allclose(v, f(bcs))
+        assert np.allclose(g, f.grad_value(bcs))
+
+    # 单个点和部分单元
+    index = np.array([0, 2, 3])
+    for f, g in zip(fs, space.batch_grad_value(fs, bcs[0], index=index)):
+        assert np.allclose(g, f.grad_value(bcs[0], index=index))
+
+    # (gdof, m) 的数组
+    U = np.random.rand(space.number_of_global_dofs(), 4)
+    assert np.allclose(space.batch_value(U, bcs), space.value(U, bcs))
+    assert np.allclose(space.batch_grad_value(U, bcs), space.grad_value(U, bcs))
+
+
+def test_batch_value_on_edges():
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=3, ny=3, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=2)
+    fs = [space.function(), space.function(dim=2)]
+    for f in fs:
+        f[:] = np.random.rand(*f.shape)
+    bcs = np.array([[0.2, 0.8], [0.5, 0.5]])
+    for f, v in zip(fs, space.batch_value(fs, bcs)):
+        assert np.allclose(v, f(bcs))
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from matplotlib.path import Path
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh import DistMesher2d, DistMesher3d
+from fealpy.geometry import dpoly, BoundaryMeshDomain
+from fealpy.geometry.signed_distance_function import _poly_distance
+from fealpy.geometry.boundary_distance import BoundaryDistance
+from fealpy.geometry.implicit_curve import PolygonCurve
+
+
+def brute_force_segment_distance(p, node, edge):
+    a = node[edge[:, 0]]
+    ab = node[edge[:, 1]] - a
+    t = np.einsum('ped, ed->pe', p[:, None] - a, ab)/np.sum(ab**2, axis=1)
+    q = a + np.clip(t, 0, 1)[..., None]*ab
+    return np.sqrt(np.sum((p[:, None] - q)**2, axis=-1)).min(axis=1)
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_polygon_distance(reverse):
+    # 边长变化很大的星形多边形, 检查按外接球半径分组的查找
+    n = 300
+    t = np.sort(np.random.rand(n))*2*np.pi
+    r = 1 + 0.3*np.sin(5*t)
+    node = np.c_[r*np.cos(t), r*np.sin(t)]
+    edge = np.c_[np.arange(n), (np.arange(n) + 1)%n]
+    if reverse:
+        edge = edge[:, ::-1]
+    fd = BoundaryDistance(node, edge, chunksize=1000)
+
+    p = np.random.rand(5000, 2)*3 - 1.5
+    d = fd(p)
+    d0 = brute_force_segment_distance(p, node, edge)
+    assert np.allclose(np.abs(d), d0, atol=1e-14)
+
+    isIn = Path(node).contains_points(p)
+    isClear = d0 > 1e-10
+    assert np.all((d[isClear] < 0) == isIn[isClear])
+
+    q = fd.project(p)
+    assert np.allclose(np.abs(fd(q)), 0, atol=1e-12)
+
+
+def test_dpoly():
+    poly = np.array([(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2)], dtype=np.float64)
+    p = np.array([(0.5, 0.5), (1.5, 1.5), (1.0, 0.5), (-1.0, 0.0), (2.0, 2.0)])
+    d = dpoly(p, poly)
+    assert np.allclose(d, [-0.5, 0.5, -0.5, 1.0, 1.0])
+
+    # 同一个多边形的 KD 树只建一次
+    hits = _poly_distance.cache_info().hits
+    assert np.allclose(dpoly(p, poly.tolist()), d)
+    assert _poly_distance.cache_info().hits == hits + 1
+
+    curve = PolygonCurve(poly, np.c_[np.arange(6), (np.arange(6) + 1)%6])
+    assert np.allclose(curve(p), d)
+    q, dq = curve.project(p)
+    assert np.allclose(dq, d)
+    assert np.allclose(q[1], [1.5, 1.0])
+
+
+def test_triangle_surface_distance():
+    # 立方体的边界三角形, 包含棱和顶点处的伪法向
+    mesh = MF.boxmesh3d([-1, 1, -1, 1, -1, 1], nx=6, ny=6, nz=6, meshtype='tet')
+    isBdFace = mesh.ds.boundary_face_flag()
+    face = mesh.entity('face')[isBdFace]
+    node = mesh.entity('node')
+    fd = BoundaryDistance(node, face)
+
+    p = np.random.rand(4000, 3)*3 - 1.5
+    d = fd(p)
+    # 立方体的精确符号距离
+    q = np.abs(p) - 1
+    dout = np.sqrt(np.sum(np.maximum(q, 0)**2, axis=1))
+    din = np.minimum(np.max(q, axis=1), 0)
+    assert np.allclose(d, dout + din, atol=1e-12)
+
+    # 法向整体反向时结果不变
+    assert np.allclose(BoundaryDistance(node, face[:, ::-1])(p), d, atol=1e-12)
+
+
+def test_distmesher2d():
+    poly = np.array([(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2)], dtype=np.float64)
+    edge = np.c_[np.arange(6), (np.arange(6) + 1)%6]
+    domain = BoundaryMeshDomain(poly, edge)
+    assert len(domain.facet(0)) == 6
+
+    # 尺寸函数和其它区域一样以 fh(p, domain) 的形式调用
+    args = []
+    def fh(p, *a):
+        args.append(a)
+        return np.ones(len(p))
+    assert np.all(BoundaryMeshDomain(poly, edge, fh=fh).sizing_function(poly) == 1)
+    assert len(args[0]) == 1 and isinstance(args[0][0], BoundaryMeshDomain)
+
+    np.random.seed(0)
+    mesher = DistMesher2d(domain, 0.2, output=False)
+    mesh = mesher.meshing(maxit=100)
+    assert np.isclose(mesh.entity_measure('cell').sum(), 3.0)
+
+
+def test_distmesher3d():
+    cube = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=1, ny=1, nz=1, meshtype='tet')
+    node = cube.entity('node')
+    face = cube.entity('face')[cube.ds.boundary_face_flag()]
+    domain = BoundaryMeshDomain(node, face, fixed=node)
+    np.random.seed(0)
+    mesh = DistMesher3d(domain, 0.25).meshing(maxit=200)
+    node = mesh.entity('node')
+    assert np.all(np.isfinite(node))
+    assert np.all((node > -1e-12) & (node < 1 + 1e-12))
+    # 边界点都被投影到了边界上
+    isBdNode = mesh.ds.boundary_node_flag()
+    assert np.allclose(domain(node[isBdNode]), 0, atol=1e-12)
+    assert np.isclose(np.abs(mesh.entity_measure('cell')).sum(), 1.0, rtol=0.02)
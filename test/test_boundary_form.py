@@ -0,0 +1,174 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix, random as sprandom
+
+from fealpy.functionspace import BoundaryFormAssembler
+from fealpy.solver import BlockSplit
+from fealpy.common.sparsity import csr_index_dtype
+
+
+def random_assembler(NF=20, ldof=3, NQ=4, gdof=30, shared=True, seed=0):
+    rng = np.random.default_rng(seed)
+    face2dof = np.array([rng.choice(gdof, ldof, replace=False) for i in range(NF)])
+    phi = rng.random((NQ, 1 if shared else NF, ldof))
+    ws = rng.random(NQ)
+    measure = rng.random(NF)
+    a = BoundaryFormAssembler(face2dof, phi, ws, measure, (gdof, gdof))
+    return a, face2dof, phi, ws, measure
+
+
+def direct_matrix(face2dof, phi, ws, measure, c, gdof):
+    phi = np.broadcast_to(phi, (len(ws), len(measure), phi.shape[-1]))
+    FM = np.einsum('q, qf, qfi, qfj, f->fij', ws, c, phi, phi, measure)
+    I = np.broadcast_to(face2dof[:, :, None], shape=FM.shape)
+    J = np.broadcast_to(face2dof[:, None, :], shape=FM.shape)
+    return csr_matrix((FM.flat, (I.flat, J.flat)), shape=(gdof, gdof))
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_matrix_and_vector(shared):
+    a, face2dof, phi, ws, measure = random_assembler(shared=shared)
+    gdof = a.shape[0]
+    uh = np.random.rand(gdof)
+    u = a.value(uh)
+    c = u**3
+    R = direct_matrix(face2dof, phi, ws, measure, c, gdof)
+    assert np.allclose(a.matrix(c).toarray(), R.toarray())
+
+    phib = np.broadcast_to(phi, (len(ws), len(measure), phi.shape[-1]))
+    bb = np.einsum('q, qf, qfi, f->fi', ws, u, phib, measure)
+    b = np.zeros(gdof)
+    np.add.at(b, face2dof, bb)
+    assert np.allclose(a.vector(u), b)
+    out = np.ones(gdof + 5)
+    a.vector(u, out=out)
+    assert np.allclose(out[:gdof], b + 1)
+    assert np.allclose(out[gdof:], 1)
+
+
+def test_matrix_with_base():
+    a, face2dof, phi, ws, measure = random_assembler()
+    gdof = a.shape[0]
+    A = sprandom(gdof, gdof, density=0.1, format='csr', random_state=1)
+    for k in range(3): # 同一个 A 重复使用缓存的稀疏结构
+        c = np.random.rand(len(ws), len(measure))
+        R = direct_matrix(face2dof, phi, ws, measure, c, gdof)
+        assert np.allclose(a.matrix(c, A=A).toarray(), (A + R).toarray())
+    # 并集的 indptr 类型由非零元个数确定, 而不是沿用 face2dof 的类型
+    _, _, _, indptr, indices, _ = a._base
+    assert indptr.dtype == indices.dtype == csr_index_dtype(len(indices), a.shape)
+
+    # 稀疏结构相同的矩阵重复使用并集, data 每次都从 A 中读取
+    base = a._base
+    B = 2*A
+    R = direct_matrix(face2dof, phi, ws, measure, c, gdof)
+    assert np.allclose(a.matrix(c, A=B).toarray(), (B + R).toarray())
+    assert a._base is base
+    B.data[:] = np.random.rand(len(B.data))
+    assert np.allclose(a.matrix(c, A=B).toarray(), (B + R).toarray())
+    assert a._base is base
+
+    # 形状和非零元个数相同但稀疏结构不同的矩阵重新计算并集
+    C = B.copy()
+    C.indices = (C.indices + 1)%gdof
+    C = csr_matrix(C.toarray())
+    assert C.shape == B.shape
+    assert np.allclose(a.matrix(c, A=C).toarray(), (C + R).toarray())
+    assert a._base is not base
+
+    with pytest.raises(ValueError):
+        a.matrix(c, A=csr_matrix((gdof + 1, gdof + 1)))
+
+
+def test_block_split():
+    n, N = 7, 20
+    A = sprandom(N, N, density=0.3, format='csr', random_state=2)
+    A.sum_duplicates()
+    B = A.copy()
+    B.data = np.random.rand(len(B.data))
+    split = BlockSplit(A, n)
+    assert split.has_same_pattern(B)
+
+    s = [slice(0, n), slice(n, N)]
+    blocks = split.split(A)
+    for i in range(2):
+        for j in range(2):
+            assert np.allclose(blocks[i][j].toarray(), A[s[i], s[j]].toarray())
+            C = split.block(A.data + 2*B.data, i, j)
+            assert np.allclose(C.toarray(), (A + 2*B)[s[i], s[j]].toarray())
+
+    with pytest.raises(ValueError):
+        split.block(A + sprandom(N, N, density=0.3, format='csr', random_state=3), 0, 0)
+
+
+def test_wedge_robin_bc():
+    from fealpy.geometry import SphereSurface
+    from fealpy.mesh import LagrangeTriangleMesh, LagrangeWedgeMesh
+    from fealpy.functionspace import ParametricLagrangeFiniteElementSpaceOnWedgeMesh
+
+    node, cell = SphereSurface().init_mesh(meshtype='tri', returnnc=True, p=1)
+    mesh = LagrangeTriangleMesh(node*10, cell, p=1)
+    mesh = LagrangeWedgeMesh(mesh, 0.1, 3, p=1)
+    space = ParametricLagrangeFiniteElementSpaceOnWedgeMesh(mesh, p=1)
+    gdof = space.number_of_global_dofs()
+    rdof = mesh.ds.NN//4
+    index = mesh.ds.exterior_boundary_tface_index()
+
+    a = space.tri_boundary_form_assembler(threshold=index, q=3)
+    b = space.tri_boundary_form_assembler(threshold=index, q=3, shape=(rdof, rdof))
+    assert np.all(a.face2dof < rdof)
+
+    # 常系数时 <1, 1> 为外边界的面积
+    area = mesh.boundary_tri_face_area(index=index).sum()
+    one = np.ones(gdof)
+    assert np.isclose(a.matrix()@one@one, area)
+    assert np.isclose(a.vector(np.ones_like(a.wm)).sum(), area)
+
+    uh = np.random.rand(gdof)
+    c = b.value(uh)**3
+    A = space.mass_matrix()[:rdof, :rdof]
+    assert np.allclose(b.matrix(c, A=A).toarray(),
+            (A + a.matrix(c)[:rdof, :rdof]).toarray())
+
+
+def test_wedge_robin_bc_space_degree(monkeypatch):
+    # 空间的次数和网格的次数不同时, 边界项用空间次数的基函数
+    from fealpy.geometry import SphereSurface
+    from fealpy.mesh import LagrangeTriangleMesh, LagrangeWedgeMesh
+    from fealpy.functionspace import ParametricLagrangeFiniteElementSpaceOnWedgeMesh
+
+    node, cell = SphereSurface().init_mesh(meshtype='tri', returnnc=True, p=2)
+    mesh = LagrangeTriangleMesh(node*10, cell, p=2)
+    mesh = LagrangeWedgeMesh(mesh, 0.1, 2, p=2)
+    space = ParametricLagrangeFiniteElementSpaceOnWedgeMesh(mesh, p=1)
+
+    # 连续空间的自由度管理还不支持 p != mesh.p, 这里用二次面的角点作为一次
+    # 元的自由度
+    tface = mesh.entity('face')[0]
+    face2dof = tface[:, [0, 3, 5]]
+    gdof = mesh.number_of_nodes()
+    monkeypatch.setattr(space, 'tri_face_to_dof', lambda index=np.s_[:]: face2dof)
+    monkeypatch.setattr(space, 'number_of_global_dofs', lambda: gdof)
+
+    index = mesh.ds.exterior_boundary_tface_index()
+    def gR(p, n):
+        return p[..., 0], 1 + p[..., 1]**2
+
+    q = 4
+    A = csr_matrix((gdof, gdof))
+    F = np.zeros(gdof)
+    A, F = space.set_tri_boundary_robin_bc(gR, A, F, threshold=index, q=q)
+
+    qf = mesh.integrator(q, 'tface')
+    bcs, ws = qf.get_quadrature_points_and_weights()
+    phi = bcs[:, None, :] # 一次元的基函数就是重心坐标
+    measure = mesh.boundary_tri_face_area(index=index)
+    pp = mesh.bc_to_point(bcs, etype='face', ftype='tri', index=index)
+    kappa = 1 + pp[..., 1]**2
+    R = direct_matrix(face2dof[index], phi, ws, measure, kappa, gdof)
+    assert np.allclose(A.toarray(), R.toarray())
+
+    bb = np.einsum('q, qf, qi, f->fi', ws, pp[..., 0], bcs, measure)
+    b = np.zeros(gdof)
+    np.add.at(b, face2dof[index], bb)
+    assert np.allclose(F, b)
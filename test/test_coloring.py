@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh.coloring import cell_coloring, is_valid_cell_coloring
+from fealpy.mesh.coloring import mesh_cell_coloring
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.functionspace.colored_assembly import ColoredAssembler
+from fealpy.pde.poisson_2d import CosCosData
+
+
+def test_cell_coloring():
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=8, ny=8, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=3)
+    cell2dof = space.cell_to_dof()
+    c = cell_coloring(cell2dof)
+    assert np.all(c >= 0)
+    assert is_valid_cell_coloring(cell2dof, c)
+    assert not is_valid_cell_coloring(cell2dof, np.zeros_like(c))
+
+    groups = mesh_cell_coloring(mesh)
+    assert groups is mesh_cell_coloring(mesh) # 缓存
+    c = np.zeros(mesh.number_of_cells(), dtype=np.int_)
+    for i, idx in enumerate(groups):
+        c[idx] = i
+    assert is_valid_cell_coloring(cell2dof, c)
+
+    mesh.uniform_refine()
+    assert sum(len(idx) for idx in mesh_cell_coloring(mesh)) == mesh.number_of_cells()
+
+
+@pytest.mark.parametrize("meshtype, p", [('tri', 1), ('tri', 3), ('tet', 2)])
+@pytest.mark.parametrize("nthreads", [1, 4])
+def test_colored_assembly(meshtype, p, nthreads):
+    if meshtype == 'tri':
+        mesh = MF.boxmesh2d([0, 1, 0, 1], nx=8, ny=8, meshtype='tri')
+    else:
+        mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=2, ny=2, nz=2, meshtype='tet')
+    s0 = LagrangeFiniteElementSpace(mesh, p=p)
+    s1 = LagrangeFiniteElementSpace(mesh, p=p, nthreads=nthreads)
+
+    A0 = s0.stiff_matrix()
+    A1 = s1.stiff_matrix()
+    assert A1.has_canonical_format
+    assert np.allclose(A0.toarray(), A1.toarray(), atol=1e-13)
+    assert np.allclose(s0.mass_matrix().toarray(), s1.mass_matrix().toarray(),
+            atol=1e-15)
+
+    if meshtype == 'tri':
+        pde = CosCosData()
+        assert np.allclose(s0.source_vector(pde.source),
+                s1.source_vector(pde.source), atol=1e-15)
+
+
+def test_colored_assembler_vector():
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=4, ny=4, meshtype='tri')
+    cell2dof = mesh.entity('cell')
+    NN = mesh.number_of_nodes()
+    bb = np.random.rand(len(cell2dof), 3, 2)
+    b = np.zeros((NN, 2))
+    np.add.at(b, (cell2dof, np.s_[:]), bb)
+    assembler = ColoredAssembler(cell2dof, NN, nthreads=3)
+    assert np.allclose(assembler.assemble_vector(bb), b)
+
+
+def test_sparsity_pattern_index_dtype():
+    from fealpy.common.sparsity import csr_index_dtype, csr_structure
+
+    # indptr 的类型由非零元个数确定, 和 cell2dof 的类型无关
+    imax = np.iinfo(np.int32).max
+    assert csr_index_dtype(imax, (10, 10)) == np.int32
+    assert csr_index_dtype(imax + 1, (10, 10)) == np.int64
+    assert csr_index_dtype(10, (10, imax + 1)) == np.int64
+
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=4, ny=4, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=2)
+    cell2dof = space.cell_to_dof().astype(np.int64)
+    gdof = space.number_of_global_dofs()
+    indptr, indices, pos = ColoredAssembler(cell2dof, gdof).sparsity_pattern()
+    assert indptr.dtype == csr_index_dtype(len(indices), (gdof, gdof))
+    assert indptr[-1] == len(indices)
+
+    key = np.array([0, 3, imax + 5], dtype=np.int64) # 列数超过 int32 的范围
+    indptr, indices = csr_structure(key, (2, imax + 2))
+    assert indptr.dtype == np.int64
+    assert np.all(indices == [0, 3, 3]) and np.all(indptr == [0, 2, 3])
@@ -0,0 +1,29 @@
+import numpy as np
+from scipy.sparse import eye
+
+from fealpy.mesh import UniformMesh2d
+from fealpy.solver.direct_solver import DirectSolver
+
+
+def test_factorization_reuse():
+    mesh = UniformMesh2d([0, 20, 0, 20], h=(1/20, 1/20))
+    A = mesh.laplace_operator() + eye(mesh.number_of_nodes())
+    b = np.random.rand(A.shape[0])
+
+    solver = DirectSolver()
+    x = solver.solve(A, b)
+    assert np.allclose(A@x, b)
+
+    x = solver.solve(A, 2*b) # 数值没有变化, 复用分解
+    assert np.allclose(A@x, 2*b)
+
+    B = A.copy()
+    B.data *= 1 + np.random.rand(B.nnz)
+    x = solver.solve(B, b) # 稀疏模式没有变化, 只做数值分解
+    assert np.allclose(B@x, b)
+    assert solver.stat == {'nanalysis': 1, 'nfactor': 2, 'nsolve': 3, 'nreuse': 1}
+
+    solver.freeze(1)
+    x = solver.solve(A, b) # 冻结时仍然使用 B 的分解
+    assert np.allclose(B@x, b)
+    assert solver.stat['nfactor'] == 2
@@ -0,0 +1,94 @@
+import sys
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.parallel import DistributedMesh, HaloExchange, DistributedOperator
+from fealpy.parallel import SharedMemoryTransport
+
+
+def test_distributed_mesh():
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=8, ny=8, meshtype='tri')
+    dmesh = DistributedMesh(mesh, nparts=4)
+    NC = mesh.number_of_cells()
+    owned = np.concatenate([l.cell_global[:l.NCO] for l in dmesh.local])
+    assert np.array_equal(np.sort(owned), np.arange(NC))
+
+    space = LagrangeFiniteElementSpace(mesh, p=2)
+    ips = space.interpolation_points()
+    gdof = space.number_of_global_dofs()
+    count = np.zeros(gdof, dtype=np.int_)
+    for local, dm in zip(dmesh.local, dmesh.dof_maps(p=2)):
+        lspace = LagrangeFiniteElementSpace(local.mesh, p=2)
+        assert np.allclose(lspace.interpolation_points(), ips[dm.l2g])
+        count[dm.l2g[dm.isOwned]] += 1
+        for q, idx in dm.recv.items():
+            assert np.all(dm.owner[idx] == q)
+    assert np.all(count == 1)
+
+
+def run(local, dm, transport, p, queue):
+    space = LagrangeFiniteElementSpace(local.mesh, p=p)
+    A = space.stiff_matrix() + space.mass_matrix()
+    exchange = HaloExchange(dm, transport)
+
+    # 幽灵自由度上填入全局编号
+    u = np.where(dm.isOwned, dm.l2g, -1).astype(np.float64)
+    exchange.update(u)
+    err0 = np.abs(u - dm.l2g).max()
+
+    # 每个进程给自己的幽灵副本加 1, 拥有者收到的是副本的个数
+    v = np.where(dm.isOwned, 0.0, 1.0)
+    exchange.update(v, mode='add')
+
+    x = np.sin(dm.l2g.astype(np.float64))
+    x[~dm.isOwned] = 0.0
+    y = DistributedOperator(A, exchange).matvec(x)
+    queue.put((dm.rank, err0, v[dm.isOwned], y[dm.isOwned]))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8),
+        reason="multiprocessing.shared_memory needs Python 3.8")
+@pytest.mark.skipif('fork' not in mp.get_all_start_methods(),
+        reason="the fork start method is not available")
+def test_halo_exchange_processes():
+    p = 2
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=16, ny=16, meshtype='tri')
+    dmesh = DistributedMesh(mesh, nparts=4)
+    dofmaps = dmesh.dof_maps(p=p)
+
+    ctx = mp.get_context('fork')
+    transports = SharedMemoryTransport.create(4, dmesh.message_counts(dofmaps),
+            ctx=ctx)
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=run, args=(dmesh.local[i], dofmaps[i],
+        transports[i], p, queue)) for i in range(4)]
+    try:
+        for proc in procs:
+            proc.start()
+        result = [queue.get(timeout=60) for proc in procs]
+        for proc in procs:
+            proc.join(timeout=60)
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        transports[0].close()
+
+    space = LagrangeFiniteElementSpace(mesh, p=p)
+    A = space.stiff_matrix() + space.mass_matrix()
+    gdof = space.number_of_global_dofs()
+    y0 = A@np.sin(np.arange(gdof, dtype=np.float64))
+    ncopy = np.zeros(gdof)
+    for dm in dofmaps:
+        ncopy[dm.l2g[~dm.isOwned]] += 1
+
+    for rank, err0, v, y in result:
+        dm = dofmaps[rank]
+        assert err0 == 0
+        assert np.array_equal(v, ncopy[dm.l2g[dm.isOwned]])
+        assert np.allclose(y, y0[dm.l2g[dm.isOwned]], atol=1e-12)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from fealpy.common import DynamicArray
+
+
+def test_growth():
+    a = DynamicArray(np.arange(6).reshape(3, 2))
+    assert a.shape == (3, 2)
+    a.extend(np.arange(6, 10).reshape(2, 2))
+    a.append([10, 11])
+    assert len(a) == 6
+    assert a.capacity >= 6
+    assert np.array_equal(a[:], np.arange(12).reshape(6, 2))
+
+    capacity = a.capacity
+    data = a.increase_size(capacity)
+    data[:] = -1
+    assert a.capacity == 2*capacity
+    assert np.all(a[6:] == -1)
+
+
+def test_delete():
+    a = DynamicArray(np.arange(10)*10)
+    isMarked = np.zeros(10, dtype=np.bool_)
+    isMarked[[1, 4, 5]] = True
+    idxmap = a.delete(isMarked)
+    assert np.array_equal(a[:], [0, 20, 30, 60, 70, 80, 90])
+    assert np.array_equal(idxmap[~isMarked], np.arange(7))
+    assert np.all(idxmap[isMarked] == -1)
+
+    idxmap = a.delete([0, 6])
+    assert np.array_equal(a[:], [20, 30, 60, 70, 80])
+    assert idxmap[1] == 0
+
+
+def test_operators():
+    a = DynamicArray(np.arange(5))
+    assert np.array_equal(a == 2, np.arange(5) == 2)
+    assert np.array_equal(1 + a, np.arange(1, 6))
+    a += 1
+    assert isinstance(a, DynamicArray)
+    assert np.array_equal(np.asarray(a), np.arange(1, 6))
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import spsolve
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import ParametricLagrangeFiniteElementSpace
+from fealpy.solver import MassMatrixSolver, CellOperator, hrz_lumped_mass
+
+
+def spaces(p=2):
+    mesh = MF.boxmesh2d([0, 2, 0, 1], nx=6, ny=3, p=p, meshtype='quad')
+    cspace = ParametricLagrangeFiniteElementSpace(mesh, p=p, spacetype='C')
+    dspace = ParametricLagrangeFiniteElementSpace(mesh, p=p-1, spacetype='D')
+    return mesh, cspace, dspace
+
+
+def test_mass_matrix_solver():
+    mesh, space, _ = spaces()
+    rho = 1 + np.random.rand(mesh.number_of_cells())
+    M = space.mass_matrix(c=rho)
+    gdof = space.number_of_global_dofs()
+
+    b = np.random.rand(gdof, 2)
+    x = MassMatrixSolver(M).solve(b)
+    assert np.allclose(M@x, b)
+
+    # 集中质量矩阵保持总质量
+    mass = rho.sum()*2/mesh.number_of_cells()
+    d = MassMatrixSolver(M, lumped='rowsum').diag
+    assert np.isclose(d.sum(), mass)
+
+    cell2dof = space.cell_to_dof()
+    d = hrz_lumped_mass(space.cell_mass_matrix(c=rho), cell2dof, gdof)
+    assert np.isclose(d.sum(), mass)
+    assert np.all(d > 0)
+    x = MassMatrixSolver(M, lumped=d).solve(b)
+    assert np.allclose(d[:, None]*x, b)
+
+    with pytest.raises(ValueError):
+        MassMatrixSolver(M, lumped='diag')
+
+
+def test_cell_operator():
+    mesh, cspace, dspace = spaces()
+    NC = mesh.number_of_cells()
+    c2d0 = cspace.cell_to_dof()
+    c2d1 = dspace.cell_to_dof()
+    gdof0 = cspace.number_of_global_dofs()
+    gdof1 = dspace.number_of_global_dofs()
+    K = np.random.rand(NC, c2d0.shape[1], c2d1.shape[1])
+
+    I = np.broadcast_to(c2d0[:, :, None], K.shape)
+    J = np.broadcast_to(c2d1[:, None, :], K.shape)
+    A = csr_matrix((K.flat, (I.flat, J.flat)), shape=(gdof0, gdof1))
+
+    op = CellOperator(c2d0, gdof0, c2d1, gdof1)
+    B = op.tocsr(K)
+    assert abs(A - B).max() < 1e-12
+    assert abs(2*A - op.tocsr(2*K)).max() < 1e-12
+
+    u = np.random.rand(gdof1, 3)
+    v = np.random.rand(gdof0)
+    assert np.allclose(op.matvec(K, u), A@u)
+    assert np.allclose(op.rmatvec(K, v), v@A)
+    assert np.allclose(op.row_sum(K), A@np.ones(gdof1))
+
+    # 多余的尾轴按分量分别求行和
+    K2 = np.stack([K, 2*K], axis=-1)
+    assert np.allclose(op.row_sum(K2), np.c_[A.sum(axis=1), 2*A.sum(axis=1)])
+
+
+def old_solve_one_step(sim):
+    """
+    @brief 改为单元算子之前的时间推进: 每步组装力矩阵, 用 spsolve 求解
+    """
+    c2d0 = sim.cspace.cell_to_dof()
+    c2d1 = sim.dspace.cell_to_dof()
+    gdof0 = sim.cspace.number_of_global_dofs()
+    gdof1 = sim.dspace.number_of_global_dofs()
+
+    def force_matrix():
+        K = sim.cell_force_matrix()
+        I = np.broadcast_to(c2d0[:, :, None], shape=K.shape[:-1])
+        J = np.broadcast_to(c2d1[:, None, :], shape=K.shape[:-1])
+        return [csr_matrix((K[..., i].flat, (I.flat, J.flat)),
+            shape=(gdof0, gdof1)) for i in range(K.shape[-1])]
+
+    dt = sim.timeline.current_time_step_length()
+    one = np.ones(gdof1)
+
+    M0, M1 = force_matrix()
+    sim.cv[:, 0] = sim.v[:, 0] - dt/2*spsolve(sim.MV, M0@one)
+    sim.cv[:, 1] = sim.v[:, 1] - dt/2*spsolve(sim.MV, M1@one)
+    sim.apply_boundary_condition(sim.cv)
+    F = spsolve(sim.ME, sim.cv[:, 0]@M0 + sim.cv[:, 1]@M1)
+    sim.ce[:] = sim.e + dt/2*F
+    sim.cx[:] = sim.x + dt/2*sim.cv
+
+    sim.mesh1.node[:] = sim.cx
+    M0, M1 = force_matrix()
+    sim.cv[:, 0] = sim.v[:, 0] - dt*spsolve(sim.MV, M0@one)
+    sim.cv[:, 1] = sim.v[:, 1] - dt*spsolve(sim.MV, M1@one)
+    sim.apply_boundary_condition(sim.cv)
+    v = (sim.cv + sim.v)/2
+    F = spsolve(sim.ME, v[:, 0]@M0 + v[:, 1]@M1)
+    sim.ce[:] = sim.e + dt*F
+    sim.cx[:] = sim.x + dt*v
+
+    sim.x[:] = sim.cx
+    sim.v[:] = sim.cv
+    sim.e[:] = sim.ce
+    sim.mesh1.node[:] = sim.x
+
+
+def test_lagrangian_hydrodynamics_regression():
+    import os
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app', 'fluid'))
+    from TriplePointShockInteractionModel import TriplePointShockInteractionModel
+    from LagrangianHydrodynamicsSimulator import LagrangianHydrodynamicsSimulator
+
+    model = TriplePointShockInteractionModel()
+    sim0 = LagrangianHydrodynamicsSimulator(model, p=2, NT=1000)
+    sim1 = LagrangianHydrodynamicsSimulator(model, p=2, NT=1000)
+    for i in range(2):
+        old_solve_one_step(sim0)
+        sim1.solve_one_step()
+        for a in ('x', 'v', 'e'):
+            u0 = getattr(sim0, a)
+            u1 = getattr(sim1, a)
+            assert np.allclose(u0, u1, rtol=1e-12, atol=1e-14)
+    assert np.abs(sim1.v).max() > 0
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.pde.poisson_3d import CosCosCosData
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.functionspace import ConformingVirtualElementSpace2d
+
+
+@pytest.mark.parametrize("chunksize", [None, 7, 10**6])
+@pytest.mark.parametrize("p", [1, 2])
+def test_fem_errors(p, chunksize):
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=8, ny=8, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=p)
+    uh = space.interpolation(pde.solution)
+    ia = space.integralalg
+
+    terms = [(pde.solution, uh, 2), (pde.gradient, uh.grad_value, 2),
+            (pde.solution, uh, 3), (uh, None, 2)]
+    e, eta = ia.errors(terms, celltype=True, chunksize=chunksize)
+    assert eta.shape == (4, mesh.number_of_cells())
+
+    for k, (u, v, power) in enumerate(terms[:3]):
+        assert np.isclose(e[k], ia.error(u, v, power=power))
+        assert np.allclose(eta[k], ia.error(u, v, power=power, celltype=True))
+        assert np.isclose(e[k], np.sum(eta[k]**power)**(1/power))
+    assert np.isclose(e[3], ia.L2_norm(uh))
+
+    # 能量范数: 系数为 2I 时是 H1 半范的 sqrt(2) 倍
+    K = 2*np.eye(2)
+    e0 = ia.errors([(pde.gradient, uh.grad_value, 2, K),
+        (pde.gradient, uh.grad_value, 2, 2.0)], chunksize=chunksize)
+    assert np.allclose(e0, np.sqrt(2)*e[1])
+
+
+def test_fem_max_error():
+    pde = CosCosCosData()
+    mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=2, ny=2, nz=2, meshtype='tet')
+    space = LagrangeFiniteElementSpace(mesh, p=1)
+    uh = space.interpolation(pde.solution)
+
+    bcs, ws = space.integralalg.integrator.get_quadrature_points_and_weights()
+    ps = mesh.bc_to_point(bcs)
+    d = np.abs(pde.solution(ps) - uh(bcs))
+    e, eta = space.integralalg.errors([(pde.solution, uh, np.inf)],
+            celltype=True, memory=1000)
+    assert np.isclose(e[0], d.max())
+    assert np.allclose(eta[0], d.max(axis=0))
+
+
+def test_polygon_errors():
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=4, ny=4, meshtype='poly')
+    space = ConformingVirtualElementSpace2d(mesh, p=2)
+    sh = space.project_to_smspace(space.interpolation(pde.solution))
+    ia = space.integralalg
+
+    e, eta = ia.errors([(pde.solution, sh.value, 2),
+        (pde.gradient, sh.grad_value, 2)], celltype=True, chunksize=5)
+    assert np.isclose(e[0], ia.error(pde.solution, sh.value))
+    assert np.isclose(e[1], ia.error(pde.gradient, sh.grad_value))
+    assert np.allclose(eta[0], ia.error(pde.solution, sh.value, celltype=True))
+
+
+@pytest.mark.parametrize("nx, chunksize", [(8, 7), (8, 10**6), (24, None)])
+def test_cellwise_coefficient(nx, chunksize):
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=nx, ny=nx, meshtype='tri')
+    NC = mesh.number_of_cells()
+    space = LagrangeFiniteElementSpace(mesh, p=1)
+    uh = space.interpolation(pde.solution)
+    ia = space.integralalg
+
+    a = 1 + np.random.rand(NC)
+    K = np.einsum('c, ij->cij', a, np.eye(2))
+    K[:, 0, 1] = K[:, 1, 0] = 0.1 # 非对角的部分
+    _, eta = ia.errors([(pde.gradient, uh.grad_value, 2)], celltype=True,
+            chunksize=chunksize)
+    e, eta0 = ia.errors([(pde.gradient, uh.grad_value, 2, a),
+        (pde.gradient, uh.grad_value, 2, K)], celltype=True, chunksize=chunksize)
+    assert np.allclose(eta0[0]**2, a*eta[0]**2)
+
+    bcs, ws = ia.integrator.get_quadrature_points_and_weights()
+    d = pde.gradient(mesh.bc_to_point(bcs)) - uh.grad_value(bcs)
+    val = np.einsum('q, qci, cij, qcj, c->c', ws, d, K, d, mesh.entity_measure('cell'))
+    assert np.allclose(eta0[1]**2, val)
+
+    with pytest.raises(ValueError):
+        ia.errors([(pde.gradient, uh.grad_value, 2, a[:-1])])
+
+
+def test_polygon_cellwise_coefficient():
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=4, ny=4, meshtype='poly')
+    space = ConformingVirtualElementSpace2d(mesh, p=2)
+    sh = space.project_to_smspace(space.interpolation(pde.solution))
+    ia = space.integralalg
+
+    a = 1 + np.random.rand(mesh.number_of_cells())
+    K = np.einsum('c, ij->cij', a, np.eye(2))
+    _, eta = ia.errors([(pde.gradient, sh.grad_value, 2)], celltype=True, chunksize=5)
+    _, eta0 = ia.errors([(pde.gradient, sh.grad_value, 2, a),
+        (pde.gradient, sh.grad_value, 2, K)], celltype=True, chunksize=5)
+    assert np.allclose(eta0[0]**2, a*eta[0]**2)
+    assert np.allclose(eta0[1], eta0[0])
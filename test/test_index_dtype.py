@@ -0,0 +1,54 @@
+import numpy as np
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh import TriangleMesh, TetrahedronMesh
+from fealpy.mesh.core import index_dtype
+from fealpy.functionspace import LagrangeFiniteElementSpace
+
+
+def test_index_dtype():
+    assert index_dtype(10) == np.int32
+    assert index_dtype(2**31 - 1) == np.int32
+    assert index_dtype(2**31) == np.int64
+    assert index_dtype(10, itype=np.int64) == np.int64
+
+
+def test_triangle_mesh():
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=4, ny=4, meshtype='tri')
+    node = mesh.entity('node')
+    cell = mesh.entity('cell').astype(np.int64)
+
+    mesh = TriangleMesh(node, cell)
+    assert mesh.itype == np.int32
+    assert mesh.ds.edge2cell.dtype == np.int32
+    assert mesh.ds.cell_to_edge().dtype == np.int32
+
+    mesh.uniform_refine()
+    assert mesh.ds.cell.dtype == np.int32
+    space = LagrangeFiniteElementSpace(mesh, p=3)
+    assert space.cell_to_dof().dtype == np.int32
+    assert space.dof.edge_to_dof().dtype == np.int32
+
+    mesh = TriangleMesh(node, cell, itype=np.int64)
+    assert mesh.ds.edge2cell.dtype == np.int64
+    space = LagrangeFiniteElementSpace(mesh, p=3)
+    assert space.cell_to_dof().dtype == np.int64
+
+
+def test_tetrahedron_mesh():
+    mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=2, ny=2, nz=2, meshtype='tet')
+    node = mesh.entity('node')
+    cell = mesh.entity('cell')
+    m32 = TetrahedronMesh(node, cell)
+    m64 = TetrahedronMesh(node, cell, itype=np.int64)
+    assert m32.ds.face2cell.dtype == np.int32
+    assert m32.ds.cell_to_edge().dtype == np.int32
+    assert m64.ds.cell_to_edge().dtype == np.int64
+
+    s32 = LagrangeFiniteElementSpace(m32, p=4, q=7)
+    s64 = LagrangeFiniteElementSpace(m64, p=4, q=7)
+    assert s32.cell_to_dof().dtype == np.int32
+    assert np.array_equal(s32.cell_to_dof(), s64.cell_to_dof())
+    A = s32.stiff_matrix()
+    B = s64.stiff_matrix()
+    assert abs(A - B).max() == 0.0
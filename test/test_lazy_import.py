@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import subprocess
+
+import fealpy
+
+HEAVY = ['matplotlib', 'vtk', 'meshio', 'gmsh', 'taichi', 'meshpy', 'pyamg', 'sympy']
+
+
+def loaded_heavy_modules(code):
+    script = code + """
+import sys, json
+print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))
+"""
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(fealpy.__file__))
+    env['PYTHONPATH'] = os.pathsep.join([root, env.get('PYTHONPATH', '')])
+    out = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE, universal_newlines=True, check=True,
+            env=env).stdout
+    return set(json.loads(out.strip().splitlines()[-1])) & set(HEAVY)
+
+
+def test_import_does_not_load_heavy_dependencies():
+    code = "import fealpy.mesh, fealpy.functionspace, fealpy.solver, fealpy.pde"
+    assert loaded_heavy_modules(code) == set()
+
+    code = """
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+mesh = MF.boxmesh2d([0, 1, 0, 1], nx=2, ny=2, meshtype='tri')
+space = LagrangeFiniteElementSpace(mesh, p=2)
+A = space.stiff_matrix()
+"""
+    assert loaded_heavy_modules(code) == set()
+
+
+def test_lazy_attributes():
+    import fealpy.mesh as mesh
+    import fealpy.solver as solver
+    from fealpy.mesh import TriangleMesh, LinearQuadtree, unique_row
+    from fealpy.mesh.TriangleMesh import TriangleMesh as TriangleMesh0
+
+    assert TriangleMesh is TriangleMesh0
+    assert mesh.TriangleMesh is TriangleMesh
+    assert 'HalfEdgeMesh2d' in dir(mesh)
+    assert 'HalfEdgeMesh2d' in mesh.__all__
+    assert solver.DirectSolver.__name__ == 'DirectSolver'
+    assert mesh.MeshFactory.__name__ == 'fealpy.mesh.MeshFactory'
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import UniformMesh2d, UniformMesh3d
+
+
+@pytest.mark.parametrize("method", ['fmm', 'fsm'])
+def test_redistance_2d(method):
+    nx, ny = 40, 20
+    mesh = UniformMesh2d([0, nx, 0, ny], h=(1/nx, 1/ny))
+    node = mesh.node.reshape(nx+1, ny+1, 2)
+    r = np.sqrt(np.sum((node - 0.5)**2, axis=-1))
+    phi = (r - 0.3)**3*(1 + r)
+    info = mesh.redistance(phi, method=method)
+    assert info['niter'] > 0
+    assert np.max(np.abs(phi - (r - 0.3))) < 0.05
+
+
+def test_redistance_3d_fmm_equals_fsm():
+    mesh = UniformMesh3d([0, 10, 0, 8, 0, 12], h=(1/10, 1/8, 1/12))
+    node = mesh.node
+    r = np.sqrt(np.sum((node - 0.5)**2, axis=-1))
+    phi0 = 2*(r - 0.3)
+    phi1 = phi0.copy()
+    mesh.redistance(phi0, method='fmm')
+    mesh.redistance(phi1, method='fsm')
+    assert np.allclose(phi0, phi1)
+    assert np.all(np.sign(phi0) == np.sign(r - 0.3))
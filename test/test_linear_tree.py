@@ -0,0 +1,67 @@
+import numpy as np
+
+from fealpy.mesh import LinearQuadtree, LinearOctree
+
+
+def circle_refine(tree, center, n):
+    for i in range(n):
+        bc = tree.entity_barycenter()
+        d = np.abs(np.sqrt(np.sum((bc - center)**2, axis=1)) - 0.3)
+        tree.refine(d < 2*tree.cell_size()[:, 0])
+
+
+def is_balanced(tree):
+    for offset in tree.offsets():
+        idx = tree.neighbor(offset)
+        flag = idx >= 0
+        if np.any(np.abs(tree.level[idx[flag]] - tree.level[flag]) > 1):
+            return False
+    return True
+
+
+def test_linear_quadtree():
+    tree = LinearQuadtree([0, 2, 0, 1], 2, 1, maxlevel=10)
+    circle_refine(tree, [1.0, 0.5], 5)
+    assert is_balanced(tree)
+    assert np.all(np.diff(tree.key) > 0)
+
+    mesh = tree.to_mesh()
+    assert np.isclose(mesh.entity_measure('cell').sum(), 2.0)
+
+    isHangingNode, P = tree.hanging_node_constraints()
+    assert np.any(isHangingNode)
+    node = mesh.entity('node')
+    u = 1 + 2*node[:, 0] - 3*node[:, 1] + node[:, 0]*node[:, 1]
+    assert np.allclose(P@u, u)
+
+    pmesh = tree.to_pmesh()
+    assert np.isclose(pmesh.entity_measure('cell').sum(), 2.0)
+
+    p = np.random.rand(50, 2)*[2, 1]
+    idx = tree.locate(p)
+    bc = tree.entity_barycenter()[idx]
+    h = tree.cell_size()[idx]
+    assert np.all(np.abs(p - bc) <= h/2 + 1e-12)
+
+    data = {'u': np.ones(tree.number_of_leaves())}
+    while tree.coarsen(np.ones(tree.number_of_leaves(), dtype=np.bool_), data=data) > 0:
+        assert is_balanced(tree)
+        assert len(data['u']) == tree.number_of_leaves()
+    assert np.allclose(data['u'], 1)
+
+
+def test_linear_octree():
+    tree = LinearOctree([0, 1, 0, 1, 0, 1], 1, 1, 1)
+    circle_refine(tree, [0.5, 0.5, 0.5], 3)
+    assert is_balanced(tree)
+
+    mesh = tree.to_mesh()
+    node = mesh.entity('node')
+    cell = mesh.entity('cell')
+    h = tree.cell_size()
+    assert np.allclose(node[cell[:, 6]] - node[cell[:, 0]], h)
+    assert np.isclose(np.prod(h, axis=1).sum(), 1.0)
+
+    isHangingNode, P = tree.hanging_node_constraints()
+    u = 1 + node[:, 0] - 3*node[:, 1] + node[:, 0]*node[:, 1]*node[:, 2]
+    assert np.allclose(P@u, u)
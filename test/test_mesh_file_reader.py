@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh import InpFileReader, FABFileReader, PolyFileReader
+
+
+def write_inp(fname, mesh, etype, quadratic=False):
+    node = mesh.entity('node')
+    cell = mesh.entity('cell')
+    NN = len(node)
+    nodeid = 10 + 3*np.arange(NN) # 不连续的节点编号
+    with open(fname, 'w') as f:
+        f.write('** generated\n*Heading\n test\n*Node\n')
+        for i, p in zip(nodeid, node):
+            f.write('{}, '.format(i) + ', '.join(map(repr, p)) + '\n')
+        f.write('*Element, type={}, elset=EALL\n'.format(etype))
+        for i, c in enumerate(nodeid[cell]):
+            if quadratic: # 加上虚拟的边中点编号, 并分成两行
+                c = np.r_[c, np.full(6, nodeid[0])]
+                f.write('{}, '.format(i+1) + ', '.join(map(str, c[:5])) + ',\n')
+                f.write(', '.join(map(str, c[5:])) + '\n')
+            else:
+                f.write('{}, '.format(i+1) + ', '.join(map(str, c)) + '\n')
+        f.write('*Nset, nset=ALL, generate\n 1, {}, 1\n*End Step\n'.format(NN))
+
+
+@pytest.mark.parametrize("chunksize", [37, 2**20])
+def test_inp_reader(tmp_path, chunksize):
+    mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=3, ny=3, nz=3, meshtype='tet')
+    fname = str(tmp_path/'tet.inp')
+    write_inp(fname, mesh, 'C3D4')
+    m = InpFileReader(fname, chunksize=chunksize).read().to_mesh()
+    assert m.__class__.__name__ == 'TetrahedronMesh'
+    assert np.allclose(m.entity('node'), mesh.entity('node'))
+    assert np.all(m.entity('cell') == mesh.entity('cell'))
+
+    # 二次单元跨行, 只保留顶点, 去掉没有用到的节点
+    write_inp(fname, mesh, 'C3D10', quadratic=True)
+    reader = InpFileReader(fname, chunksize=chunksize).read()
+    assert reader.elements['C3D10'][1].shape == (mesh.number_of_cells(), 10)
+    assert len(reader.elset['EALL'][1]) == mesh.number_of_cells()
+    m = reader.to_mesh()
+    assert np.all(m.entity('cell') == mesh.entity('cell'))
+
+    mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=2, ny=2, nz=2, meshtype='hex')
+    write_inp(fname, mesh, 'C3D8R')
+    m = InpFileReader(fname, chunksize=chunksize).read().to_mesh()
+    assert m.__class__.__name__ == 'HexahedronMesh'
+    assert np.all(m.entity('cell') == mesh.entity('cell'))
+
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=4, ny=4, meshtype='tri')
+    write_inp(fname, mesh, 'CPS3')
+    m = InpFileReader(fname, chunksize=chunksize).read().to_mesh()
+    assert m.__class__.__name__ == 'TriangleMesh'
+    assert m.geo_dimension() == 2
+    assert np.isclose(m.entity_measure('cell').sum(), 1.0)
+
+
+@pytest.mark.parametrize("chunksize", [7, 2**20])
+def test_inp_reader_comments(tmp_path, chunksize):
+    fname = str(tmp_path/'quad.inp')
+    with open(fname, 'w') as f:
+        f.write('*Node\n1, 0.0, 0.0\n2, 1.0, 0.0\n** a comment in the data block\n'
+                '3, 1.0, 1.0\n**\n4, 0.0, 1.0\n** before the keyword\n'
+                '*Element, type=CPS4\n** a comment\n1, 1, 2,\n** continuation\n 3, 4\n')
+    reader = InpFileReader(fname, chunksize=chunksize).read()
+    assert np.all(reader.nodeid == [1, 2, 3, 4])
+    assert np.all(reader.elements['CPS4'][1] == [[1, 2, 3, 4]])
+    m = reader.to_mesh()
+    assert m.__class__.__name__ == 'QuadrangleMesh'
+    assert np.isclose(m.entity_measure('cell').sum(), 1.0)
+
+    # 连续编号时也要检查未定义的节点
+    with open(fname, 'w') as f:
+        f.write('*Node\n1, 0.0, 0.0\n2, 1.0, 0.0\n3, 1.0, 1.0\n'
+                '*Element, type=CPS3\n1, 1, 2, 5\n')
+    with pytest.raises(ValueError, match='undefined nodes'):
+        InpFileReader(fname, chunksize=chunksize).read().to_mesh()
+
+
+@pytest.mark.parametrize("chunksize", [29, 2**20])
+def test_fab_reader(tmp_path, chunksize):
+    NF = 5
+    NV = np.array([3, 4, 5, 4, 3])
+    node = np.random.rand(NV.sum(), 3)
+    fname = str(tmp_path/'dfn.fab')
+    with open(fname, 'w') as f:
+        f.write('BEGIN FORMAT\n Format = Ascii\n No_Fractures = {}\n No_Nodes = {}\n'
+                ' No_Properties = 3\nEND FORMAT\n\n'.format(NF, NV.sum()))
+        f.write('BEGIN PROPERTIES\n Prop1 = (Real*4) "Transmissivity"\nEND PROPERTIES\n\n')
+        f.write('BEGIN FRACTURE\n')
+        s = 0
+        for i in range(NF):
+            f.write('{} {} 1 {} 0.5 0.25\n'.format(i+1, NV[i], i))
+            for j in range(NV[i]):
+                f.write('  {} {:.17g} {:.17g} {:.17g}\n'.format(j+1, *node[s]))
+                s += 1
+            f.write('  0 {} 0 1\n'.format(i))
+        f.write('END FRACTURE\n\nBEGIN ROCKBLOCK\n1 2 3\nEND ROCKBLOCK\n')
+
+    reader = FABFileReader(fname, chunksize=chunksize).read()
+    assert reader.format['No_Fractures'] == '5'
+    assert np.allclose(reader.node, node)
+    assert np.all(reader.fractureLocation == np.r_[0, np.cumsum(NV)])
+    assert np.allclose(reader.unknown[:, 0], np.arange(NF))
+    assert np.allclose(reader.prop, np.c_[np.arange(NF), np.zeros(NF), np.ones(NF)])
+
+    mesh = reader.to_mesh()
+    assert mesh.number_of_cells() == np.sum(NV - 2)
+    assert np.all(mesh.celldata['fracture'] == np.repeat(np.arange(NF), NV - 2))
+
+
+@pytest.mark.parametrize("chunksize", [16, 2**20])
+def test_poly_reader(tmp_path, chunksize):
+    fname = str(tmp_path/'square.poly')
+    with open(fname, 'w') as f:
+        f.write('# square with a hole\n4 2 0 1\n1 0 0 1\n2 1 0 1 # corner\n'
+                '3 1 1 1\n4 0 1 1\n\n4 1\n1 1 2 1\n2 2 3 1\n3 3 4 1\n4 4 1 1\n'
+                '1\n1 0.5 0.5\n1\n1 0.2 0.2 7 0.01\n')
+    data = PolyFileReader(fname, chunksize=chunksize).read()
+    assert np.allclose(data['vertices']['xy'], [[0, 0], [1, 0], [1, 1], [0, 1]])
+    assert np.all(data['segments']['endpoint'] == [[0, 1], [1, 2], [2, 3], [3, 0]])
+    assert np.allclose(data['holes']['xy'], [[0.5, 0.5]])
+    assert np.allclose(data['regions']['maxarea'], [0.01])
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from scipy.sparse.linalg import spsolve, cg
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.boundarycondition import DirichletBC
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.solver.mixed_precision import MixedPrecisionSolver
+
+
+def poisson_system(ftype, p=2):
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=8, ny=8, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=p, ftype=ftype)
+    uh = space.function()
+    A = space.stiff_matrix()
+    F = space.source_vector(pde.source)
+    A, F = DirichletBC(space, pde.dirichlet).apply(A, F, uh)
+    return space, uh, A, F
+
+
+def test_float32_space():
+    space, uh, A, F = poisson_system(np.float32)
+    assert uh.dtype == np.float32
+    assert A.dtype == np.float32
+    assert F.dtype == np.float32
+    assert space.mass_matrix().dtype == np.float32
+    assert space.linear_elasticity_matrix(1.0, 1.0).dtype == np.float32
+
+    _, _, A64, F64 = poisson_system(np.float64)
+    assert np.allclose(A.toarray(), A64.toarray(), rtol=1e-5, atol=1e-5)
+    assert np.allclose(F, F64, rtol=1e-5, atol=1e-6)
+
+    # 插值函数的类型和空间的浮点类型一致
+    pde = CosCosData()
+    assert space.interpolation(pde.solution).dtype == np.float32
+    assert space.interpolation(pde.solution, dtype=np.float64).dtype == np.float64
+
+
+@pytest.mark.parametrize("inner", ['lu', 'cg'])
+def test_iterative_refinement(inner):
+    _, _, A, F = poisson_system(np.float64)
+    x0 = spsolve(A.tocsc(), F)
+
+    solver = MixedPrecisionSolver(A, inner=inner)
+    x = solver.solve(F)
+    assert solver.residuals[-1] < 1e-12
+    assert len(solver.residuals) < 10
+    assert solver.info == 0
+    assert np.allclose(x, x0, rtol=1e-10, atol=1e-12)
+
+
+def test_preconditioner():
+    _, _, A, F = poisson_system(np.float64)
+    solver = MixedPrecisionSolver(A, inner='lu')
+    count = []
+    x, info = cg(A, F, M=solver.preconditioner(), callback=count.append)
+    assert info == 0
+    assert len(count) < 5
+    assert np.allclose(A@x, F, atol=1e-5*np.linalg.norm(F))
+
+
+def test_not_converged():
+    _, _, A, F = poisson_system(np.float64)
+    # float64 达不到的精度: 残量停滞, 报告没有收敛
+    solver = MixedPrecisionSolver(A, inner='lu', tol=1e-30)
+    with pytest.warns(RuntimeWarning, match='did not converge'):
+        solver.solve(F)
+    assert solver.info == len(solver.residuals) - 1 > 0
+
+    solver = MixedPrecisionSolver(A, inner='cg', maxit=1, inner_maxit=2)
+    with pytest.warns(RuntimeWarning):
+        solver.solve(F)
+    assert solver.info == 1
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from scipy.sparse import diags
+
+from fealpy.solver.ode import DormandPrinceSolver, BogackiShampineSolver
+from fealpy.solver.ode import RosenbrockSolver, BDFSolver
+
+
+class LinearODE:
+    """
+    x' = A x + cos(t)
+    """
+    def __init__(self, A):
+        self.A = A
+        self.shape = A.shape
+        self.dtype = np.float64
+        self.t = 0.0
+
+    def set_time(self, t):
+        self.t = t
+
+    def mv(self, x, out):
+        out[:] = self.A@x + np.cos(self.t)
+        return out
+
+    def jacobian(self, x):
+        return self.A
+
+
+def exact(x0, T):
+    # A = [[-1, 1], [-1, -1]] 的解析解由矩阵指数给出, 这里用很细的 RK4 近似
+    from fealpy.solver.ode import RK4Solver
+    A = np.array([[-1.0, 1.0], [-1.0, -1.0]])
+    f = LinearODE(A)
+    x = x0.copy()
+    NT = 20000
+    dt = T/NT
+    s = RK4Solver(f)
+    for i in range(NT):
+        s.step(x, i*dt, dt)
+    return x
+
+
+@pytest.mark.parametrize("Solver", [DormandPrinceSolver, BogackiShampineSolver,
+    RosenbrockSolver, BDFSolver])
+def test_adaptive_solver(Solver):
+    A = np.array([[-1.0, 1.0], [-1.0, -1.0]])
+    x0 = np.array([1.0, 0.0])
+    x = x0.copy()
+    solver = Solver(LinearODE(A), rtol=1e-6, atol=1e-9)
+    timeline = solver.run(x, 0.0, 0.01, 2.0)
+    assert np.isclose(timeline.all_time_levels()[-1], 2.0)
+    assert np.max(np.abs(x - exact(x0, 2.0))) < 1e-4
+
+
+def test_jacobian_reuse():
+    A = diags([-1000*np.linspace(1, 2, 50)], [0], format='csr')
+    x = np.ones(50)
+    solver = BDFSolver(LinearODE(A), rtol=1e-4, atol=1e-6)
+    timeline = solver.run(x, 0.0, 1e-4, 1.0)
+    NL = timeline.number_of_time_levels()
+    assert NL < 500
+    assert solver.stat['njev'] < NL/5
+    assert solver.stat['nlu'] < NL
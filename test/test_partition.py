@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.graph.partition import part_mesh, entity_graph, edge_cut, imbalance
+from fealpy.graph.partition import hilbert_index, morton_index
+
+
+@pytest.mark.parametrize("d", [2, 3])
+def test_space_filling_curve(d):
+    n = 8
+    p = np.stack(np.meshgrid(*[np.arange(n)]*d, indexing='ij'), axis=-1)
+    p = p.reshape(-1, d).astype(np.float64)
+    for index in [hilbert_index, morton_index]:
+        key = index(p, nbits=3)
+        assert np.array_equal(np.sort(key), np.arange(n**d))
+    # Hilbert 曲线上相邻的两个点在网格上也相邻
+    order = np.argsort(hilbert_index(p, nbits=3))
+    assert np.all(np.abs(np.diff(p[order], axis=0)).sum(axis=1) == 1)
+
+
+@pytest.mark.parametrize("method", ['rcb', 'hilbert', 'morton', 'spectral'])
+@pytest.mark.parametrize("nparts", [2, 5])
+def test_part_mesh(method, nparts):
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=16, ny=16, meshtype='tri')
+    NC = mesh.number_of_cells()
+    edgecuts, parts = part_mesh(mesh, nparts=nparts, method=method)
+    assert parts.shape == (NC, )
+    assert np.array_equal(np.unique(parts), np.arange(nparts))
+    assert imbalance(parts, nparts) < 1.05
+    graph = entity_graph(mesh)
+    assert edgecuts == edge_cut(graph, parts)
+    assert edgecuts < 0.25*graph.nnz/2
+
+    w = np.ones(NC)
+    w[mesh.entity_barycenter('cell')[:, 0] < 0.5] = 3.0
+    _, parts = part_mesh(mesh, nparts=nparts, method=method, weights=w)
+    assert imbalance(parts, nparts, weights=w) < 1.05
+
+
+def test_part_mesh_3d():
+    mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=4, ny=4, nz=4, meshtype='tet')
+    for method in ['rcb', 'hilbert', 'spectral']:
+        _, parts = part_mesh(mesh, nparts=4, method=method)
+        assert imbalance(parts, 4) == 1.0
+    _, parts = part_mesh(mesh, entity='node', nparts=3)
+    assert len(parts) == mesh.number_of_nodes()
@@ -0,0 +1,63 @@
+import numpy as np
+
+from fealpy.common import RaggedArray
+
+
+def test_ragged_array():
+    rows = [np.array([3, 1, 4]), np.array([], dtype=np.int_), np.array([1, 5]),
+            np.array([9, 2, 6])]
+    a = RaggedArray.from_list(rows)
+    assert len(a) == 4
+    assert np.array_equal(a.lengths(), [3, 0, 2, 3])
+    assert np.array_equal(a.row_index(), [0, 0, 0, 2, 2, 3, 3, 3])
+    assert np.array_equal(a.local_index(), [0, 1, 2, 0, 1, 0, 1, 2])
+
+    # 整数和切片不复制数据
+    assert np.shares_memory(a[2], a.data)
+    b = a[2:]
+    assert np.shares_memory(b.data, a.data)
+    assert all(np.array_equal(x, y) for x, y in zip(b, rows[2:]))
+    c = a[[3, 0]]
+    assert all(np.array_equal(x, y) for x, y in zip(c, [rows[3], rows[0]]))
+
+    assert np.array_equal(a.sum(), [8, 0, 6, 17])
+    assert np.array_equal(a.max(initial=-1), [4, -1, 5, 9])
+    assert all(np.array_equal(x, np.roll(y, 1)) for x, y in zip(a.roll(1), rows))
+    assert all(np.array_equal(x, np.roll(y, -1)) for x, y in zip(a.roll(-1), rows))
+
+    d = a.to_dense(fill=-1)
+    assert np.array_equal(d[2], [1, 5, -1])
+
+    for index, val in a.dense_buckets():
+        for i, v in zip(index, val):
+            assert np.array_equal(rows[i], v)
+
+    A = a.to_csr(10).toarray()
+    assert A.sum() == 8 and A[3, 9] and A[0, 4]
+    A[:] = False
+    assert np.array_equal(a.data, [3, 1, 4, 1, 5, 9, 2, 6])
+
+
+def test_ragged_array_vector_data():
+    node = np.random.rand(5, 2)
+    a = RaggedArray.from_lengths(np.array([0, 1, 2, 1, 2, 3, 4]), [3, 4])
+    bc = a.with_data(node[a.data]).mean()
+    assert np.allclose(bc[0], node[[0, 1, 2]].mean(axis=0))
+    assert np.allclose(bc[1], node[[1, 2, 3, 4]].mean(axis=0))
+
+
+def test_polygon_cell_to_edge():
+    from fealpy.mesh import MeshFactory as MF
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=3, ny=2, meshtype='poly')
+    ds = mesh.ds
+    cell, cellLocation = mesh.entity('cell')
+    edge = mesh.entity('edge')
+    cell2edge = ds.cell_to_edge()
+    # 第 j 条边连接第 j 个和第 j+1 个顶点
+    totalEdge = np.sort(ds.total_edge(), axis=1)
+    assert np.array_equal(np.sort(edge[cell2edge], axis=1), totalEdge)
+
+    A = ds.cell_to_edge(return_sparse=True)
+    row = ds.cellArray.row_index()
+    assert A.nnz == len(cell2edge)
+    assert np.all(A[row, cell2edge])
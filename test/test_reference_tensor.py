@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.functionspace.lagrange_reference_tensor import lagrange_reference_tensors
+
+
+def quadrature_matrix(space, basis, c=None):
+    gdof = space.number_of_global_dofs()
+    cell2dof = space.cell_to_dof()
+    return space.integralalg.serial_construct_matrix((basis, cell2dof, gdof), c=c)
+
+
+@pytest.mark.parametrize("p, TD", [(1, 1), (3, 1), (1, 2), (4, 2), (2, 3)])
+def test_reference_tensors(p, TD):
+    M, S = lagrange_reference_tensors(p, TD)
+    # 基函数的和为 1, 质量张量所有元素之和是参考单元的体积比 1
+    assert np.isclose(M.sum(), 1.0)
+    assert np.allclose(M, M.T)
+    assert np.allclose(S, S.transpose(1, 0, 3, 2))
+    # 参考单元上的单元刚度矩阵, 常数在它的核中
+    Dlambda = np.r_[-np.ones((1, TD)), np.eye(TD)]
+    A = np.einsum('kmij, id, jd->km', S, Dlambda, Dlambda)
+    assert np.allclose(A.sum(axis=1), 0.0)
+    assert lagrange_reference_tensors(p, TD)[0] is M
+
+
+@pytest.mark.parametrize("p", [1, 2, 3, 4, 5])
+def test_triangle(p):
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=3, ny=3, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=p, q=11)
+    NC = mesh.number_of_cells()
+    K = np.array([[2.0, 0.5], [0.3, 1.0]])
+
+    for c in [None, 3.0, K]:
+        A = space.stiff_matrix(c=c)
+        B = quadrature_matrix(space, space.grad_basis, c=c)
+        assert np.allclose(A.toarray(), B.toarray(), atol=1e-10)
+
+    A = space.mass_matrix(c=2.0)
+    B = quadrature_matrix(space, space.basis, c=2.0)
+    assert np.allclose(A.toarray(), B.toarray(), atol=1e-12)
+
+    # 分片常数的系数
+    c = np.arange(1, NC+1, dtype=np.float64)
+    A = space.stiff_matrix(c=c)
+    B = space.stiff_matrix(c=np.einsum('c, mn->cmn', c, np.eye(2)))
+    assert np.allclose(A.toarray(), B.toarray())
+    A = space.mass_matrix(c=c)
+    B = space.mass_matrix()
+    assert not np.allclose(A.toarray(), B.toarray())
+    assert np.allclose(A.toarray().sum(), np.sum(c*space.cellmeasure))
+
+
+@pytest.mark.parametrize("p", [1, 2, 3])
+def test_tetrahedron(p):
+    mesh = MF.boxmesh3d([0, 1, 0, 1, 0, 1], nx=2, ny=2, nz=2, meshtype='tet')
+    space = LagrangeFiniteElementSpace(mesh, p=p, q=7)
+    A = space.stiff_matrix()
+    B = quadrature_matrix(space, space.grad_basis)
+    assert np.allclose(A.toarray(), B.toarray(), atol=1e-10)
+    A = space.mass_matrix()
+    B = quadrature_matrix(space, space.basis)
+    assert np.allclose(A.toarray(), B.toarray(), atol=1e-12)
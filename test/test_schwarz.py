@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from scipy.sparse.linalg import cg, gmres, spsolve
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import LagrangeFiniteElementSpace
+from fealpy.boundarycondition import DirichletBC
+from fealpy.pde.poisson_2d import CosCosData
+from fealpy.pde.linear_elasticity_model import BoxDomainData3d
+from fealpy.graph.partition import part_mesh
+from fealpy.solver.schwarz import SchwarzPreconditioner
+
+
+def elasticity_system():
+    pde = BoxDomainData3d()
+    mesh = pde.init_mesh(n=1)
+    space = LagrangeFiniteElementSpace(mesh, p=1)
+    uh = space.function(dim=3)
+    A = space.linear_elasticity_matrix(pde.lam, pde.mu)
+    F = space.source_vector(pde.source, dim=3)
+    bc = DirichletBC(space, pde.dirichlet, threshold=pde.is_dirichlet_boundary)
+    A, F = bc.apply(A, F, uh)
+    return mesh, space, A, F
+
+
+def iterations(solver, A, F, M=None):
+    count = []
+    x, info = solver(A, F, M=M, tol=1e-10, callback=count.append)
+    assert info == 0
+    return x, len(count)
+
+
+@pytest.mark.parametrize("coarse", [None, 'nicolaides', 'rigid'])
+def test_additive_schwarz_elasticity(coarse):
+    mesh, space, A, F = elasticity_system()
+    x0 = spsolve(A.tocsc(), F)
+    _, parts = part_mesh(mesh, nparts=4)
+    P = SchwarzPreconditioner(A, space.cell_to_dof(), parts, dim=3,
+            coarse=coarse, points=space.interpolation_points(), nthreads=2)
+    assert P.number_of_subdomains() == 4
+
+    _, n0 = iterations(cg, A, F)
+    x, n1 = iterations(cg, A, F, M=P.preconditioner())
+    assert n1 < n0/3
+    assert np.allclose(x, x0, atol=1e-8*np.abs(x0).max())
+
+
+def test_restricted_schwarz_poisson():
+    pde = CosCosData()
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=16, ny=16, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=2)
+    uh = space.function()
+    A = space.stiff_matrix()
+    F = space.source_vector(pde.source)
+    A, F = DirichletBC(space, pde.dirichlet).apply(A, F, uh)
+    x0 = spsolve(A.tocsc(), F)
+    _, parts = part_mesh(mesh, nparts=4, method='hilbert')
+
+    P = SchwarzPreconditioner(A, space.cell_to_dof(), parts, restricted=True,
+            overlap=2, coarse='nicolaides')
+    r = np.random.rand(A.shape[0])
+    z = P.solve(r)
+    assert np.all(np.isfinite(z))
+
+    x, info = gmres(A, F, M=P.preconditioner(), tol=1e-10, restart=50)
+    assert info == 0
+    assert np.allclose(x, x0, atol=1e-8*np.abs(x0).max())
+
+    # 单线程和多线程的结果相同
+    Q = SchwarzPreconditioner(A, space.cell_to_dof(), parts, restricted=True,
+            overlap=2, coarse='nicolaides', nthreads=3)
+    assert np.allclose(Q.solve(r), z)
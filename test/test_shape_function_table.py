@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.mesh.core import lagrange_shape_function, lagrange_grad_shape_function
+from fealpy.mesh.core import tabulate_lagrange_shape_function
+from fealpy.mesh.core import tabulate_lagrange_grad_shape_function
+from fealpy.functionspace import LagrangeFiniteElementSpace
+
+
+def grad_shape_function_loop(bc, p):
+    # 用中心差分近似对重心坐标的偏导数, 用来对比
+    TD = bc.shape[-1] - 1
+    h = 1e-6
+    R = np.zeros(bc.shape[:-1] + (lagrange_shape_function(bc, p).shape[-1], TD+1))
+    for i in range(TD+1):
+        e = np.zeros(TD+1)
+        e[i] = h
+        R[..., i] = (lagrange_shape_function(bc + e, p)
+                - lagrange_shape_function(bc - e, p))/(2*h)
+    return R
+
+
+@pytest.mark.parametrize("p, TD", [(1, 1), (3, 1), (1, 2), (4, 2), (3, 3)])
+def test_tabulate(p, TD):
+    bc = np.random.default_rng(0).dirichlet(np.ones(TD+1), size=5)
+    phi = tabulate_lagrange_shape_function(bc, p)
+    assert tabulate_lagrange_shape_function(bc.copy(), p) is phi
+    assert not phi.flags.writeable
+    assert np.allclose(phi, lagrange_shape_function(bc, p))
+
+    R = tabulate_lagrange_grad_shape_function(bc, p)
+    assert tabulate_lagrange_grad_shape_function(bc, p) is R
+    assert np.allclose(R, grad_shape_function_loop(bc, p), atol=1e-6)
+
+    # 多于二维的重心坐标数组不缓存
+    bcs = np.broadcast_to(bc, (2, ) + bc.shape)
+    assert tabulate_lagrange_shape_function(bcs, p).flags.writeable
+
+
+def test_grad_basis():
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=2, ny=2, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=3)
+    bcs, ws = space.integrator.get_quadrature_points_and_weights()
+    gphi = space.grad_basis(bcs)
+    R = lagrange_grad_shape_function(bcs, 3)
+    Dlambda = mesh.grad_lambda()
+    assert np.allclose(gphi, np.einsum('...ij, kjm->...kim', R, Dlambda))
+    assert np.allclose(space.grad_basis(bcs, index=[1, 3]), gphi[:, [1, 3]])
+    assert np.allclose(mesh.grad_shape_function(bcs, p=3), gphi)
+
+
+def test_public_basis_writeable():
+    mesh = MF.boxmesh2d([0, 1, 0, 1], nx=2, ny=2, meshtype='tri')
+    space = LagrangeFiniteElementSpace(mesh, p=2)
+    bcs, ws = space.integrator.get_quadrature_points_and_weights()
+    phi0 = lagrange_shape_function(bcs, 2)
+
+    # 公开的方法返回可写的数组, 修改它们不影响缓存的表格
+    for phi in (space.basis(bcs), space.face_basis(bcs), mesh.shape_function(bcs, p=2)):
+        assert phi.flags.writeable
+        phi *= 2
+    assert np.allclose(space.basis(bcs)[:, 0, :], phi0)
+    assert np.allclose(mesh.shape_function(bcs, p=2), phi0)
@@ -0,0 +1,78 @@
+import numpy as np
+from scipy.sparse import diags, kron, identity
+
+from fealpy.mesh import UniformMesh2d, UniformMesh3d
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import ParametricLagrangeFiniteElementSpace
+from fealpy.solver import FastPoissonSolver
+
+
+def test_laplace_stencil():
+    mesh = UniformMesh3d([0, 4, 0, 3, 0, 5], h=(0.1, 0.2, 0.3))
+    L = mesh.laplace_stencil()
+    A = mesh.laplace_operator()
+    u = np.random.rand(*L.gshape)
+    assert np.allclose(L@u, (A@u.reshape(-1)).reshape(L.gshape))
+    assert np.allclose(L.diagonal(), A.diagonal())
+
+
+def test_tensor_product_operator():
+    mesh = UniformMesh2d([0, 5, 0, 3], h=(0.2, 0.3))
+    S = mesh.stiff_operator()
+    A = mesh.stiff_matrix()
+    u = np.random.rand(*S.gshape)
+    assert np.allclose(S@u, (A@u.reshape(-1)).reshape(S.gshape))
+    assert np.allclose(A.sum(axis=1), 0)
+    assert np.isclose(mesh.mass_matrix().sum(), 1.0*0.9)
+
+    # 和一般的双线性元空间组装的矩阵比较, 按节点坐标对应自由度
+    qmesh = MF.boxmesh2d([0, 1, 0, 0.9], nx=5, ny=3, p=1, meshtype='quad')
+    space = ParametricLagrangeFiniteElementSpace(qmesh, p=1)
+    ips = space.interpolation_points()
+    idx = np.rint(ips[:, 0]/0.2).astype(np.int_)*4 + np.rint(ips[:, 1]/0.3).astype(np.int_)
+    NN = mesh.number_of_nodes()
+    assert np.array_equal(np.sort(idx), np.arange(NN))
+    S0 = np.zeros((NN, NN))
+    S0[idx[:, None], idx] = space.stiff_matrix().toarray()
+    M0 = np.zeros((NN, NN))
+    M0[idx[:, None], idx] = space.mass_matrix().toarray()
+    assert np.allclose(A.toarray(), S0)
+    assert np.allclose(mesh.mass_matrix().toarray(), M0)
+
+    M = mesh.mass_operator()
+    assert np.allclose(M@u, (M0@u.reshape(-1)).reshape(M.gshape))
+
+
+def test_fast_poisson_solver():
+    mesh = UniformMesh2d([0, 16, 0, 8], h=(1/16, 1/8))
+    shape = (17, 9)
+    f = np.random.rand(*shape)
+    uh = np.random.rand(*shape)
+    bd = uh.copy()
+    uh = FastPoissonSolver(mesh).solve(f, uh)
+    r = (mesh.laplace_operator()@uh.reshape(-1)).reshape(shape) - f
+    assert np.max(np.abs(r[1:-1, 1:-1])) < 1e-10
+    assert np.all(uh[0] == bd[0]) and np.all(uh[:, -1] == bd[:, -1])
+
+
+def test_fast_poisson_solver_periodic():
+    h = (1/16, 1/8)
+    mesh = UniformMesh2d([0, 16, 0, 8], h=h)
+    shape = (17, 9)
+    f = np.random.rand(*shape)
+    f[:-1, :-1] -= f[:-1, :-1].mean() # 周期问题的右端项均值为零
+    uh = FastPoissonSolver(mesh, bc='periodic').solve(f)
+
+    # 环面上的五点差分格式
+    def periodic_laplace(n, h):
+        e = np.ones(n)
+        L = diags([-e[1:], 2*e, -e[1:]], [-1, 0, 1]).tolil()
+        L[0, -1] = L[-1, 0] = -1
+        return L.tocsr()/h**2
+    Lx = periodic_laplace(16, h[0])
+    Ly = periodic_laplace(8, h[1])
+    L = kron(Lx, identity(8)) + kron(identity(16), Ly)
+    u = uh[:-1, :-1]
+    assert np.allclose(L@u.reshape(-1), f[:-1, :-1].reshape(-1), atol=1e-10)
+    assert np.isclose(u.mean(), 0)
+    assert np.all(uh[-1] == uh[0]) and np.all(uh[:, -1] == uh[:, 0])
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from fealpy.timeintegratoralg import UniformTimeLine, TimeIntegrationDriver
+
+
+class DecayModel:
+    def __init__(self, fail=None):
+        self.fail = fail
+
+    def solve(self, data, timeline):
+        if timeline.current == self.fail:
+            raise RuntimeError("simulated failure")
+        data[:] = data - timeline.current_time_step_length()*data
+
+
+class Recorder:
+    def __init__(self):
+        self.tags = []
+
+    def __call__(self, data, tag):
+        self.tags.append(tag)
+
+
+@pytest.mark.parametrize("worker", ['thread', 'process'])
+def test_checkpoint_and_resume(tmp_path, worker):
+    u0 = np.ones(5)
+    u = u0.copy()
+    TimeIntegrationDriver(UniformTimeLine(0, 1, 20), DecayModel()).run(u)
+    assert np.allclose(u, (1 - 0.05)**20)
+
+    v = u0.copy()
+    driver = TimeIntegrationDriver(UniformTimeLine(0, 1, 20), DecayModel(fail=13),
+            path=str(tmp_path), interval=4, keep=2, worker=worker)
+    with pytest.raises(RuntimeError):
+        driver.run(v)
+    assert len(list(tmp_path.glob('checkpoint_*.npz'))) == 2
+
+    output = Recorder()
+    driver = TimeIntegrationDriver(UniformTimeLine(0, 1, 20), DecayModel(),
+            output=output if worker == 'thread' else None,
+            path=str(tmp_path), interval=4, keep=2, worker=worker)
+    info = driver.run(v, resume=True)
+    assert info['start'] == 12
+    assert info['nstep'] == 8
+    assert np.allclose(v, u)
+    if worker == 'thread':
+        assert output.tags[0] == str(13).zfill(10)
+
+
+def test_solve_error_not_hidden_by_worker_error():
+    def output(data, tag):
+        raise ValueError("output failure")
+
+    driver = TimeIntegrationDriver(UniformTimeLine(0, 1, 20), DecayModel(fail=5),
+            output=output)
+    with pytest.raises(RuntimeError, match="simulated failure"):
+        driver.run(np.ones(5))
+
+    driver = TimeIntegrationDriver(UniformTimeLine(0, 1, 20), DecayModel(),
+            output=output)
+    with pytest.raises(RuntimeError, match="output failure"):
+        driver.run(np.ones(5))
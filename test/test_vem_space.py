@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from fealpy.mesh import MeshFactory as MF
+from fealpy.functionspace import ConformingVirtualElementSpace2d
+from fealpy.functionspace import NonConformingVirtualElementSpace2d
+
+
+def local_stiff_matrix(space, i):
+    """
+    @brief 逐个单元计算的局部刚度矩阵, 作为批量计算的参照
+    """
+    cell2dof, cell2dofLocation = space.dof.cell2dof, space.dof.cell2dofLocation
+    s = slice(cell2dofLocation[i], cell2dofLocation[i+1])
+    D = space.D[s]
+    B = space.B[:, s]
+    G = B@D
+    PI1 = np.linalg.inv(G)@B
+    G[0, :] = 0
+    M = np.eye(PI1.shape[1]) - D@PI1
+    return cell2dof[s], PI1.T@G@PI1 + M.T@M
+
+
+def local_mass_matrix(space, i):
+    """
+    @brief 逐个单元计算的局部质量矩阵, 作为批量计算的参照
+    """
+    cell2dof, cell2dofLocation = space.dof.cell2dof, space.dof.cell2dofLocation
+    s = slice(cell2dofLocation[i], cell2dofLocation[i+1])
+    D = space.D[s]
+    H = space.H[i]
+    PI0 = space.PI0[i]
+    M = np.eye(PI0.shape[1]) - D@PI0
+    area = space.smspace.cellmeasure[i]
+    return cell2dof[s], PI0.T@H@PI0 + area*M.T@M
+
+
+def assemble(space, local):
+    gdof = space.number_of_global_dofs()
+    A = np.zeros((gdof, gdof), dtype=np.float64)
+    for i in range(space.mesh.number_of_cells()):
+        cd, K = local(space, i)
+        np.add.at(A, (cd[:, None], cd), K)
+    return A
+
+
+@pytest.mark.parametrize("Space", [ConformingVirtualElementSpace2d,
+    NonConformingVirtualElementSpace2d])
+@pytest.mark.parametrize("p", [2, 3])
+def test_batched_stiff_matrix(Space, p):
+    mesh = MF.polygon_mesh(meshtype='triquad')
+    NV = mesh.number_of_vertices_of_cells()
+    assert len(np.unique(NV)) > 1
+
+    space = Space(mesh, p=p)
+    A = space.stiff_matrix().toarray()
+    assert np.allclose(A, assemble(space, local_stiff_matrix))
+
+
+@pytest.mark.parametrize("Space", [ConformingVirtualElementSpace2d,
+    NonConformingVirtualElementSpace2d])
+@pytest.mark.parametrize("p", [1, 2, 3])
+def test_batched_mass_matrix(Space, p):
+    mesh = MF.polygon_mesh(meshtype='triquad')
+    space = Space(mesh, p=p)
+    M = space.mass_matrix().toarray()
+    assert np.allclose(M, assemble(space, local_mass_matrix))
+
+    # 逐个单元的投影矩阵列表由分组缓存的结果拆出
+    NC = mesh.number_of_cells()
+    assert len(space.PI1) == len(space.C) == len(space.PI0) == NC
+    for i in range(NC):
+        assert np.allclose(space.PI0[i], np.linalg.inv(space.H[i])@space.C[i])
+
+
+def test_conforming_p1_stiff_matrix():
+    mesh = MF.polygon_mesh(meshtype='triquad')
+    space = ConformingVirtualElementSpace2d(mesh, p=1)
+    cell2dof, cell2dofLocation = space.cell_to_dof()
+    gdof = space.number_of_global_dofs()
+    tG = np.diag([0.0, 1.0, 1.0])
+
+    def local(A, i, cfun=None):
+        s = slice(cell2dofLocation[i], cell2dofLocation[i+1])
+        PI1 = space.PI1[i]
+        N = PI1.shape[1]
+        M = np.eye(N) - space.D[s]@PI1
+        if cfun is None: # 最低阶时使用相邻顶点差分形式的稳定化
+            S = 2*np.eye(N) - np.roll(np.eye(N), 1, axis=1) - np.roll(np.eye(N), -1, axis=1)
+            K = PI1.T@tG@PI1 + M.T@S@M
+        else:
+            K = cfun(space.smspace.cellbarycenter[i])*(PI1.T@tG@PI1 + M.T@M)
+        cd = cell2dof[s]
+        np.add.at(A, (cd[:, None], cd), K)
+
+    A0 = np.zeros((gdof, gdof), dtype=np.float64)
+    for i in range(mesh.number_of_cells()):
+        local(A0, i)
+    assert np.allclose(space.stiff_matrix().toarray(), A0)
+
+    # 常数函数在刚度矩阵的核中
+    assert np.allclose(space.stiff_matrix()@np.ones(gdof), 0)
+
+    cfun = lambda p: 1 + p[..., 0]**2 + p[..., 1]
+    A0 = np.zeros((gdof, gdof), dtype=np.float64)
+    for i in range(mesh.number_of_cells()):
+        local(A0, i, cfun=cfun)
+    assert np.allclose(space.stiff_matrix(cfun=cfun).toarray(), A0)
+
+
+@pytest.mark.parametrize("p", [2, 3])
+def test_conforming_stiff_matrix_cfun(p):
+    mesh = MF.polygon_mesh(meshtype='triquad')
+    space = ConformingVirtualElementSpace2d(mesh, p=p)
+    cfun = lambda p: 2 + np.sin(p[..., 0])
+    k = cfun(space.smspace.cellbarycenter)
+
+    def local(space, i):
+        cd, K = local_stiff_matrix(space, i)
+        return cd, k[i]*K
+    A = space.stiff_matrix(cfun=cfun).toarray()
+    assert np.allclose(A, assemble(space, local))